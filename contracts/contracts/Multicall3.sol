@@ -0,0 +1,169 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+/**
+ * @title Multicall3
+ * @dev Agrega várias leituras (ou chamadas) em um único eth_call, todas no mesmo bloco
+ * Mesma interface do Multicall3 canônico (0xcA11bde05977b3631167028862bE2a173976CA11,
+ * já implantado na Polygon e na Amoy); este contrato é para redes locais/de teste
+ * onde ele não existe - ver scripts/deploy-multicall.js
+ */
+contract Multicall3 {
+
+    struct Call {
+        address target;
+        bytes callData;
+    }
+
+    struct Call3 {
+        address target;
+        bool allowFailure;
+        bytes callData;
+    }
+
+    struct Call3Value {
+        address target;
+        bool allowFailure;
+        uint256 value;
+        bytes callData;
+    }
+
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    /**
+     * @dev Agrega chamadas; reverte se qualquer uma falhar
+     */
+    function aggregate(Call[] calldata calls)
+        public
+        payable
+        returns (uint256 blockNumber, bytes[] memory returnData)
+    {
+        blockNumber = block.number;
+        returnData = new bytes[](calls.length);
+        for (uint256 i = 0; i < calls.length; i++) {
+            (bool success, bytes memory ret) = calls[i].target.call(calls[i].callData);
+            require(success, "Multicall3: call failed");
+            returnData[i] = ret;
+        }
+    }
+
+    /**
+     * @dev Agrega chamadas; com requireSuccess=false falhas voltam como success=false
+     */
+    function tryAggregate(bool requireSuccess, Call[] calldata calls)
+        public
+        payable
+        returns (Result[] memory returnData)
+    {
+        returnData = new Result[](calls.length);
+        for (uint256 i = 0; i < calls.length; i++) {
+            (bool success, bytes memory ret) = calls[i].target.call(calls[i].callData);
+            if (requireSuccess) {
+                require(success, "Multicall3: call failed");
+            }
+            returnData[i] = Result(success, ret);
+        }
+    }
+
+    /**
+     * @dev tryAggregate devolvendo também número e hash do bloco
+     */
+    function tryBlockAndAggregate(bool requireSuccess, Call[] calldata calls)
+        public
+        payable
+        returns (uint256 blockNumber, bytes32 blockHash, Result[] memory returnData)
+    {
+        blockNumber = block.number;
+        blockHash = blockhash(block.number);
+        returnData = tryAggregate(requireSuccess, calls);
+    }
+
+    /**
+     * @dev aggregate devolvendo número e hash do bloco
+     */
+    function blockAndAggregate(Call[] calldata calls)
+        public
+        payable
+        returns (uint256 blockNumber, bytes32 blockHash, Result[] memory returnData)
+    {
+        (blockNumber, blockHash, returnData) = tryBlockAndAggregate(true, calls);
+    }
+
+    /**
+     * @dev Agrega chamadas com allowFailure por chamada (usado pelo SDK)
+     */
+    function aggregate3(Call3[] calldata calls)
+        public
+        payable
+        returns (Result[] memory returnData)
+    {
+        returnData = new Result[](calls.length);
+        for (uint256 i = 0; i < calls.length; i++) {
+            Call3 calldata calli = calls[i];
+            (bool success, bytes memory ret) = calli.target.call(calli.callData);
+            require(calli.allowFailure || success, "Multicall3: call failed");
+            returnData[i] = Result(success, ret);
+        }
+    }
+
+    /**
+     * @dev aggregate3 com valor por chamada; msg.value tem que bater com a soma
+     */
+    function aggregate3Value(Call3Value[] calldata calls)
+        public
+        payable
+        returns (Result[] memory returnData)
+    {
+        uint256 valAccumulator;
+        returnData = new Result[](calls.length);
+        for (uint256 i = 0; i < calls.length; i++) {
+            Call3Value calldata calli = calls[i];
+            valAccumulator += calli.value;
+            (bool success, bytes memory ret) = calli.target.call{value: calli.value}(calli.callData);
+            require(calli.allowFailure || success, "Multicall3: call failed");
+            returnData[i] = Result(success, ret);
+        }
+        require(msg.value == valAccumulator, "Multicall3: value mismatch");
+    }
+
+    function getBlockHash(uint256 blockNumber) public view returns (bytes32 blockHash) {
+        blockHash = blockhash(blockNumber);
+    }
+
+    function getBlockNumber() public view returns (uint256 blockNumber) {
+        blockNumber = block.number;
+    }
+
+    function getCurrentBlockCoinbase() public view returns (address coinbase) {
+        coinbase = block.coinbase;
+    }
+
+    function getCurrentBlockGasLimit() public view returns (uint256 gaslimit) {
+        gaslimit = block.gaslimit;
+    }
+
+    function getCurrentBlockTimestamp() public view returns (uint256 timestamp) {
+        timestamp = block.timestamp;
+    }
+
+    function getEthBalance(address addr) public view returns (uint256 balance) {
+        balance = addr.balance;
+    }
+
+    function getLastBlockHash() public view returns (bytes32 blockHash) {
+        unchecked {
+            blockHash = blockhash(block.number - 1);
+        }
+    }
+
+    function getBasefee() public view returns (uint256 basefee) {
+        basefee = block.basefee;
+    }
+
+    function getChainId() public view returns (uint256 chainid) {
+        chainid = block.chainid;
+    }
+}
@@ -0,0 +1,53 @@
+const hre = require("hardhat");
+const fs = require("fs");
+
+// Endereço canônico do Multicall3 (mesmo em Polygon, Amoy e na maioria das redes)
+const CANONICAL_MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11";
+
+async function main() {
+  console.log("🚀 Multicall3 em", hre.network.name, "\n");
+
+  const existing = await hre.ethers.provider.getCode(CANONICAL_MULTICALL3);
+  let multicallAddress = CANONICAL_MULTICALL3;
+
+  if (existing !== "0x") {
+    console.log("✅ Multicall3 já existe no endereço canônico:", CANONICAL_MULTICALL3);
+  } else {
+    console.log("1️⃣ Deploying Multicall3...");
+    const Multicall3 = await hre.ethers.getContractFactory("Multicall3");
+    const multicall = await Multicall3.deploy();
+    await multicall.waitForDeployment();
+    multicallAddress = await multicall.getAddress();
+    console.log("✅ Multicall3 deployed to:", multicallAddress);
+
+    // Em redes locais (hardhat/anvil) copia o código para o endereço canônico,
+    // assim o SDK funciona sem configurar multicall_address
+    try {
+      const code = await hre.ethers.provider.getCode(multicallAddress);
+      await hre.network.provider.send("hardhat_setCode", [CANONICAL_MULTICALL3, code]);
+      multicallAddress = CANONICAL_MULTICALL3;
+      console.log("✅ Código copiado para o endereço canônico:", CANONICAL_MULTICALL3);
+    } catch (error) {
+      console.log("ℹ️  Rede sem hardhat_setCode - use multicall_address =", multicallAddress);
+    }
+  }
+
+  // Acrescenta ao deployed-addresses.json sem perder os outros contratos
+  const path = "deployed-addresses.json";
+  const addresses = fs.existsSync(path) ? JSON.parse(fs.readFileSync(path)) : {};
+  if (addresses.network && addresses.network !== hre.network.name) {
+    console.log(`ℹ️  ${path} é da rede ${addresses.network} - não alterado`);
+    return;
+  }
+  addresses.multicall = multicallAddress;
+  addresses.network = hre.network.name;
+  fs.writeFileSync(path, JSON.stringify(addresses, null, 2));
+  console.log("💾 Address saved to deployed-addresses.json");
+}
+
+main()
+  .then(() => process.exit(0))
+  .catch((error) => {
+    console.error(error);
+    process.exit(1);
+  });
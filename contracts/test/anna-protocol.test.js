@@ -289,6 +289,69 @@ describe("ANNA Protocol", function () {
     });
   });
 
+  describe("Multicall3", function () {
+    let multicall;
+
+    beforeEach(async function () {
+      const Multicall3 = await ethers.getContractFactory("Multicall3");
+      multicall = await Multicall3.deploy();
+      await multicall.waitForDeployment();
+
+      await identity.connect(agent1).registerAgent(
+        agent1.address,
+        "did:anna:0x123",
+        "LLM",
+        "v1",
+        ["legal"]
+      );
+    });
+
+    it("Should aggregate identity reads in one call", async function () {
+      const identityAddress = await identity.getAddress();
+      const calls = [
+        {
+          target: identityAddress,
+          allowFailure: true,
+          callData: identity.interface.encodeFunctionData("agentIdByAddress", [agent1.address])
+        },
+        {
+          target: identityAddress,
+          allowFailure: true,
+          callData: identity.interface.encodeFunctionData("agentIdByAddress", [agent2.address])
+        },
+        {
+          target: identityAddress,
+          allowFailure: true,
+          callData: identity.interface.encodeFunctionData("getAgentMetadata", [1])
+        },
+        {
+          target: identityAddress,
+          allowFailure: true,
+          callData: identity.interface.encodeFunctionData("getAgentMetadata", [2])
+        }
+      ];
+
+      const results = await multicall.aggregate3.staticCall(calls);
+
+      expect(identity.interface.decodeFunctionResult("agentIdByAddress", results[0].returnData)[0]).to.equal(1);
+      expect(identity.interface.decodeFunctionResult("agentIdByAddress", results[1].returnData)[0]).to.equal(0);
+      const [metadata] = identity.interface.decodeFunctionResult("getAgentMetadata", results[2].returnData);
+      expect(metadata.did).to.equal("did:anna:0x123");
+      // Agente 2 não existe: falha isolada, as outras chamadas seguem
+      expect(results[3].success).to.equal(false);
+    });
+
+    it("Should revert when a call that does not allow failure fails", async function () {
+      const calls = [{
+        target: await identity.getAddress(),
+        allowFailure: false,
+        callData: identity.interface.encodeFunctionData("getAgentMetadata", [2])
+      }];
+
+      await expect(multicall.aggregate3.staticCall(calls)).to.be.revertedWith("Multicall3: call failed");
+    });
+  });
+
   describe("Integration Test", function () {
     it("Should complete full workflow", async function () {
       // 1. Registrar agente
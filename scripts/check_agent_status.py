@@ -1,11 +1,24 @@
 """
 Script simples para verificar status do agente
+
+Uso:
+    python check_agent_status.py                      # wallet do PRIVATE_KEY
+    python check_agent_status.py 0xabc... 0xdef...    # vários endereços
+    python check_agent_status.py --file agentes.txt   # um endereço por linha
+
+Vários endereços são consultados em lotes JSON-RPC (uma requisição para
+até 100 endereços) em vez de uma chamada por endereço.
 """
 
 from web3 import Web3
 from eth_account import Account
 from dotenv import load_dotenv
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sdk'))
+
+from anna_batch import CallBatcher
 
 load_dotenv()
 
@@ -14,7 +27,6 @@ PRIVATE_KEY = os.getenv("PRIVATE_KEY") or os.getenv("VERIFIER_PRIVATE_KEY")
 IDENTITY_CONTRACT = "0x8b9b5D3f698BE53Ae98162f6e013Bc9214bc7AF0"
 
 w3 = Web3(Web3.HTTPProvider(POLYGON_AMOY_RPC))
-account = Account.from_key(PRIVATE_KEY)
 
 identity_abi = [
     {
@@ -31,12 +43,47 @@ identity = w3.eth.contract(
     abi=identity_abi
 )
 
+
+def read_addresses(argv):
+    if argv[:1] == ["--file"] and len(argv) > 1:
+        with open(argv[1]) as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return argv
+
+
+addresses = read_addresses(sys.argv[1:])
+
+if len(addresses) > 1:
+    print(f"🔍 Verificando status de {len(addresses)} agentes...")
+    print()
+    try:
+        functions = [identity.functions.agentIdByAddress(Web3.to_checksum_address(a)) for a in addresses]
+        agent_ids = CallBatcher(w3).call(functions, return_exceptions=True)
+    except Exception as e:
+        print(f"❌ Erro ao verificar: {e}")
+        sys.exit(1)
+
+    registered = 0
+    for address, agent_id in zip(addresses, agent_ids):
+        if isinstance(agent_id, Exception):
+            print(f"   ⚠️  {address}  erro: {agent_id}")
+        elif agent_id == 0:
+            print(f"   ❌ {address}  não registrado")
+        else:
+            registered += 1
+            print(f"   ✅ {address}  Agent ID {agent_id}")
+    print()
+    print(f"Registrados: {registered}/{len(addresses)}")
+    sys.exit(0)
+
+address = Web3.to_checksum_address(addresses[0]) if addresses else Account.from_key(PRIVATE_KEY).address
+
 print("🔍 Verificando status do agente...")
-print(f"   Wallet: {account.address}")
+print(f"   Wallet: {address}")
 print()
 
 try:
-    agent_id = identity.functions.agentIdByAddress(account.address).call()
+    agent_id = identity.functions.agentIdByAddress(address).call()
     
     if agent_id == 0:
         print("❌ Agente NÃO está registrado")
@@ -44,7 +91,7 @@ try:
     else:
         print("✅ Agente JÁ ESTÁ REGISTRADO!")
         print(f"   Agent ID: {agent_id}")
-        print(f"   DID: did:anna:{account.address.lower()}")
+        print(f"   DID: did:anna:{address.lower()}")
         print()
         print("🎉 Você pode pular a etapa de registro!")
         print("   Vá direto para submeter attestations!")
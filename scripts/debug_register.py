@@ -6,6 +6,11 @@ from web3 import Web3
 from eth_account import Account
 from dotenv import load_dotenv
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sdk'))
+
+from anna_fees import FeeOracle
 
 load_dotenv()
 
@@ -14,6 +19,8 @@ PRIVATE_KEY = os.getenv("PRIVATE_KEY") or os.getenv("VERIFIER_PRIVATE_KEY")
 IDENTITY_CONTRACT = "0x8b9b5D3f698BE53Ae98162f6e013Bc9214bc7AF0"
 
 w3 = Web3(Web3.HTTPProvider(POLYGON_AMOY_RPC))
+# Taxas EIP-1559 do eth_feeHistory, buscadas uma vez e reaproveitadas pelas transações do script
+fees = FeeOracle(w3, background=False)
 account = Account.from_key(PRIVATE_KEY)
 
 print("🔍 DEBUG - Investigando falha no registro")
@@ -131,13 +138,14 @@ try:
         'from': account.address,
         'nonce': w3.eth.get_transaction_count(account.address),
         'gas': int(gas_estimate * 1.2),  # 20% a mais de margem
-        'gasPrice': w3.eth.gas_price
+        **fees.tx_fees()
     })
     
     print(f"📝 Transação construída:")
     print(f"   Gas: {tx['gas']}")
-    print(f"   Gas Price: {w3.from_wei(tx['gasPrice'], 'gwei')} Gwei")
-    print(f"   Custo estimado: {w3.from_wei(tx['gas'] * tx['gasPrice'], 'ether'):.6f} MATIC")
+    max_fee = tx.get('maxFeePerGas', tx.get('gasPrice'))
+    print(f"   Max Fee: {w3.from_wei(max_fee, 'gwei')} Gwei")
+    print(f"   Custo máximo: {w3.from_wei(tx['gas'] * max_fee, 'ether'):.6f} MATIC")
     print()
     
     signed_tx = account.sign_transaction(tx)
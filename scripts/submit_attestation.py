@@ -10,6 +10,12 @@ from web3 import Web3
 from eth_account import Account
 from dotenv import load_dotenv
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sdk'))
+
+from anna_fees import FeeOracle
+from anna_gas import GasEstimator
 
 load_dotenv()
 
@@ -18,6 +24,10 @@ PRIVATE_KEY = os.getenv("PRIVATE_KEY") or os.getenv("VERIFIER_PRIVATE_KEY")
 ATTESTATION_CONTRACT = "0xEd98b7Ed960924cEf4d5dfF174252CE88DeCb4e8"
 
 w3 = Web3(Web3.HTTPProvider(POLYGON_AMOY_RPC))
+# Taxas EIP-1559 do eth_feeHistory, buscadas uma vez e reaproveitadas pelas transações do script
+fees = FeeOracle(w3, background=False)
+# Limite de gas pelo calldata real em vez de um valor fixo
+gas = GasEstimator(w3)
 account = Account.from_key(PRIVATE_KEY)
 
 print("📝 ANNA Protocol - Submeter Attestation")
@@ -78,16 +88,17 @@ print()
 try:
     print("⏳ Submetendo attestation...")
     
-    tx = attestation.functions.submitAttestation(
+    submit = attestation.functions.submitAttestation(
         content_hash,
         reasoning_hash,
         "claude-3.5-sonnet",
         "test-contract"
-    ).build_transaction({
+    )
+    tx = submit.build_transaction({
         'from': account.address,
         'nonce': w3.eth.get_transaction_count(account.address),
-        'gas': 300000,
-        'gasPrice': w3.eth.gas_price
+        'gas': gas.estimate_call(submit, account.address),
+        **fees.tx_fees()
     })
     
     signed_tx = account.sign_transaction(tx)
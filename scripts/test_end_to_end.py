@@ -11,6 +11,12 @@ from web3 import Web3
 from eth_account import Account
 from dotenv import load_dotenv
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sdk'))
+
+from anna_fees import FeeOracle
+from anna_gas import GasEstimator
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -33,6 +39,10 @@ print()
 
 # Setup Web3
 w3 = Web3(Web3.HTTPProvider(POLYGON_AMOY_RPC))
+# Taxas EIP-1559 do eth_feeHistory, buscadas uma vez e reaproveitadas pelas transações do script
+fees = FeeOracle(w3, background=False)
+# Limite de gas pelo calldata real em vez de um valor fixo
+gas = GasEstimator(w3)
 account = Account.from_key(PRIVATE_KEY)
 
 print(f"✅ Conectado à Polygon Amoy")
@@ -128,15 +138,16 @@ try:
     else:
         print("⏳ Registrando nova identidade...")
         
-        tx = identity.functions.registerAgent(
+        register = identity.functions.registerAgent(
             "LLM",
             "claude-3.5-sonnet",
             ["blockchain", "web3", "smart-contracts"]
-        ).build_transaction({
+        )
+        tx = register.build_transaction({
             'from': account.address,
             'nonce': w3.eth.get_transaction_count(account.address),
-            'gas': 300000,
-            'gasPrice': w3.eth.gas_price
+            'gas': gas.estimate_call(register, account.address),
+            **fees.tx_fees()
         })
         
         signed_tx = account.sign_transaction(tx)
@@ -243,16 +254,17 @@ print()
 try:
     print("⏳ Submetendo attestation...")
     
-    tx = attestation.functions.submitAttestation(
+    submit = attestation.functions.submitAttestation(
         content_hash,
         reasoning_hash,
         "claude-3.5-sonnet",
         "legal-contract"
-    ).build_transaction({
+    )
+    tx = submit.build_transaction({
         'from': account.address,
         'nonce': w3.eth.get_transaction_count(account.address),
-        'gas': 300000,
-        'gasPrice': w3.eth.gas_price
+        'gas': gas.estimate_call(submit, account.address),
+        **fees.tx_fees()
     })
     
     signed_tx = account.sign_transaction(tx)
@@ -0,0 +1,533 @@
+"""
+ANNA Protocol SDK - Cliente assíncrono (asyncio)
+
+Mesma API do ANNAClient, com os métodos como corrotinas, sobre AsyncWeb3 +
+aiohttp. Um agente atendendo muitas requisições atesta em paralelo em vez
+de enfileirar submit_attestation:
+
+- leituras independentes (agentIdByAddress, taxas) rodam juntas, e as
+  leituras em massa saem em paralelo (Multicall3 quando disponível)
+- todas as requisições do cliente dividem um pool de conexões keep-alive
+  (o AsyncHTTPProvider padrão abre uma conexão por requisição)
+- nonces alocados localmente (anna_nonce.NonceManager, o mesmo do
+  ANNAClient da wallet): milhares de submissões em voo da mesma wallet sem
+  consultar eth_getTransactionCount em cada uma
+- taxas, gas e recibos vêm dos serviços compartilhados do SDK (FeeOracle,
+  GasEstimator, ReceiptWatcher), que rodam em threads próprias e respondem
+  da memória; o event loop só espera por eles quando o cache está vazio
+
+Uso:
+    async with AsyncANNAClient(private_key, identity_contract=..., attestation_contract=...) as client:
+        results = await asyncio.gather(*(
+            client.submit_attestation(content, reasoning, "legal-contract") for content, reasoning in itens
+        ))
+"""
+
+import time
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+from eth_account import Account
+from eth_account.messages import encode_typed_data
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+
+from anna_batch import CallError, decode_result, encode_call
+from anna_cache import install_cache
+from anna_codec import encode_submit_attestation
+from anna_fees import FeeOracle
+from anna_gas import GasEstimator
+from anna_multicall import Multicall
+from anna_nonce import SEND_RETRIES, SEND_RETRY_DELAY, NonceManager, is_already_known, is_nonce_conflict, is_transient
+from anna_receipts import ReceiptWatcher
+from anna_rpc import make_web3, parse_urls
+from anna_sdk import NETWORKS, ANNAClient, AttestationResult, AttestationStatus, Identity, Reasoning
+from anna_tracing import Tracer
+
+
+class AsyncANNAClient:
+    """
+    Cliente asyncio do ANNA Protocol SDK
+
+    Uso básico:
+    ```python
+    client = AsyncANNAClient(private_key="0x...", network="polygon-amoy", attestation_contract="0x...")
+    async with client:
+        result = await client.submit_attestation(content, reasoning, "legal-contract")
+    ```
+    """
+
+    # ABIs, mensagem EIP-712 e leitura do recibo são os mesmos do cliente síncrono
+    _load_abis = ANNAClient._load_abis
+    _attestation_hashes = staticmethod(ANNAClient._attestation_hashes)
+    _attestation_typed_data = ANNAClient._attestation_typed_data
+    _attestation_id_from_receipt = ANNAClient._attestation_id_from_receipt
+    _attestation_id = ANNAClient._attestation_id
+    _gap_filler_tx = ANNAClient._gap_filler_tx
+
+    def __init__(
+        self,
+        private_key: str,
+        network: str = "polygon-amoy",
+        identity_contract: Optional[str] = None,
+        attestation_contract: Optional[str] = None,
+        reputation_contract: Optional[str] = None,
+        tracer: Optional[Tracer] = None,
+        rpc_urls: Optional[List[str]] = None,
+        rpc_options: Optional[Dict] = None,
+        pool_size: int = 100,
+        request_timeout: float = 30.0,
+        read_concurrency: int = 32,
+        multicall_address: Optional[str] = None,
+        fee_urgency: str = "medium",
+        fee_options: Optional[Dict] = None,
+        gas_options: Optional[Dict] = None,
+        rpc_cache: bool = True,
+        confirmations: int = 0
+    ):
+        """
+        Inicializa o cliente (sem chamadas RPC; a conexão abre no primeiro uso ou em connect())
+
+        Args:
+            private_key: Chave privada da wallet do agente (com 0x)
+            network: Rede blockchain ("polygon-amoy" ou "polygon-mainnet")
+            identity_contract: Endereço do contrato AnnaIdentity (opcional)
+            attestation_contract: Endereço do contrato AnnaAttestation (opcional)
+            reputation_contract: Endereço do contrato AnnaReputation (opcional)
+            tracer: Tracing por attestation (se None, usa ANNA_TRACE_FILE quando definido)
+            rpc_urls: Endpoints RPC; o caminho assíncrono usa o primeiro, os serviços
+                compartilhados (taxas, gas, recibos) usam todos com failover
+            rpc_options: Opções do MultiRPCProvider dos serviços compartilhados
+            pool_size: Conexões HTTP simultâneas no pool do cliente
+            request_timeout: Timeout total de cada requisição (segundos)
+            read_concurrency: eth_call em andamento ao mesmo tempo nos métodos em massa
+            multicall_address: Multicall3 usado nos métodos em massa (se None, o canônico da rede)
+            fee_urgency: Percentil de gorjeta das transações: "low" (p10), "medium" (p50) ou "high" (p90)
+            fee_options: Opções do FeeOracle; valem para o primeiro cliente do RPC
+            gas_options: Opções do GasEstimator; valem para o primeiro cliente do RPC
+            rpc_cache: Se True, instala o cache de respostas JSON-RPC na conexão dos serviços compartilhados
+            confirmations: Blocos por cima exigidos antes de considerar uma transação confirmada
+        """
+        if network not in NETWORKS:
+            raise ValueError(f"Network inválida. Use: {list(NETWORKS.keys())}")
+
+        self.network = network
+        self.network_config = NETWORKS[network]
+        rpc = rpc_urls or self.network_config["rpc"]
+        self.w3 = AsyncWeb3(AsyncHTTPProvider(parse_urls(rpc)[0]))
+        self.pool_size = pool_size
+        self.request_timeout = request_timeout
+        self._session: Optional[ClientSession] = None
+        self._connect_lock = asyncio.Lock()
+
+        # Serviços compartilhados por RPC no processo (os mesmos do ANNAClient)
+        self.sync_w3 = make_web3(rpc, **(rpc_options or {}))
+        self.rpc_cache = install_cache(self.sync_w3) if rpc_cache else None
+        self.fee_urgency = fee_urgency
+        self.fee_oracle = FeeOracle.shared(self.sync_w3, **(fee_options or {}))
+        self.gas_estimator = GasEstimator.shared(self.sync_w3, **(gas_options or {}))
+        self.confirmations = confirmations
+        self.receipts = ReceiptWatcher.shared(self.sync_w3)
+        # Só codifica/decodifica aggregate3; as chamadas saem pelo AsyncWeb3
+        self.multicall = Multicall(self.sync_w3, multicall_address or self.network_config["multicall"])
+        self._multicall_available: Optional[bool] = None
+        self._reads = asyncio.Semaphore(max(1, read_concurrency))
+
+        self.account = Account.from_key(private_key)
+        self.address = self.account.address
+        self.tracer = tracer or Tracer.from_env("sdk")
+        self._chain_id: Optional[int] = None
+        self._agent_id = 0  # guardado depois de registrado (não muda mais)
+        # Mesma fila de nonces do ANNAClient da wallet no processo
+        self.nonces = NonceManager.shared(self.sync_w3, self.address)
+
+        self.identity_contract = identity_contract
+        self.attestation_contract = attestation_contract
+        self.reputation_contract = reputation_contract
+        self._load_abis()
+        if self.identity_contract:
+            self.identity = self.w3.eth.contract(
+                address=Web3.to_checksum_address(self.identity_contract), abi=self.identity_abi
+            )
+        if self.attestation_contract:
+            self.attestation = self.w3.eth.contract(
+                address=Web3.to_checksum_address(self.attestation_contract), abi=self.attestation_abi
+            )
+        if self.reputation_contract:
+            self.reputation = self.w3.eth.contract(
+                address=Web3.to_checksum_address(self.reputation_contract), abi=self.reputation_abi
+            )
+
+    # ------------------------------------------------------------
+    # Conexão
+    # ------------------------------------------------------------
+
+    async def connect(self) -> "AsyncANNAClient":
+        """Abre o pool de conexões e confere o RPC (idempotente; chamado pelos métodos)"""
+        if self._session is not None:
+            return self
+        async with self._connect_lock:
+            if self._session is None:
+                session = ClientSession(
+                    connector=TCPConnector(limit=self.pool_size),
+                    timeout=ClientTimeout(total=self.request_timeout),
+                    raise_for_status=True
+                )
+                await self.w3.provider.cache_async_session(session)
+                if not await self.w3.is_connected():
+                    await session.close()
+                    raise ConnectionError(f"Não foi possível conectar ao RPC: {self.w3.provider.endpoint_uri}")
+                self._chain_id = await self.w3.eth.chain_id
+                self._session = session
+        return self
+
+    async def close(self):
+        """Fecha o pool de conexões"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncANNAClient":
+        return await self.connect()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    @property
+    def chain_id(self) -> Optional[int]:
+        """Chain ID do RPC (lido em connect())"""
+        return self._chain_id
+
+    # ------------------------------------------------------------
+    # Transações
+    # ------------------------------------------------------------
+
+    async def _own_agent_id(self) -> int:
+        if not self._agent_id:
+            self._agent_id = await self.identity.functions.agentIdByAddress(self.address).call()
+        return self._agent_id
+
+    async def _send(self, tx: Dict) -> bytes:
+        """
+        Estima o gas, aloca o nonce, assina e envia; retorna o hash. Mesmas
+        regras do ANNAClient._broadcast: erro transitório reenvia a mesma
+        transação, conflito de nonce ressincroniza e reassina uma vez, e
+        recusa devolve o nonce (sem mexer nos nonces das outras em voo)
+        """
+        tx['gas'] = await asyncio.to_thread(self.gas_estimator.estimate, tx)
+        tx['nonce'] = await asyncio.to_thread(self.nonces.next)
+        signed_tx = self.account.sign_transaction(tx)
+        conflicts = failures = 0
+        while True:
+            try:
+                return await self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            except Exception as e:
+                if is_already_known(e):
+                    return signed_tx.hash
+                if is_transient(e, (ClientError,)) and failures < SEND_RETRIES:
+                    await asyncio.sleep(SEND_RETRY_DELAY * 2 ** failures)
+                    failures += 1
+                    continue
+                if not is_nonce_conflict(e):
+                    if not self.nonces.release(tx['nonce']):
+                        await self._fill_gaps()
+                    raise
+                await asyncio.to_thread(self.nonces.resync)
+                conflicts += 1
+                if conflicts > 1:
+                    raise
+                tx['nonce'] = await asyncio.to_thread(self.nonces.next)
+                signed_tx = self.account.sign_transaction(tx)
+
+    async def _fill_gaps(self):
+        """Como ANNAClient._fill_gaps: transferência de 0 para a própria wallet em cada lacuna"""
+        while True:
+            nonce = self.nonces.take_released()
+            if nonce is None:
+                return
+            fees = await asyncio.to_thread(self.fee_oracle.tx_fees, self.fee_urgency)
+            tx = self._gap_filler_tx(nonce, fees)
+            try:
+                await self.w3.eth.send_raw_transaction(self.account.sign_transaction(tx).raw_transaction)
+            except Exception as e:
+                if not (is_already_known(e) or is_nonce_conflict(e)):
+                    self.nonces.release(nonce)
+                    return
+
+    async def _wait(self, tx: Dict, tx_hash: bytes):
+        receipt = await self.receipts.wait_async(tx_hash, confirmations=self.confirmations)
+        if receipt['status'] != 1:
+            self.gas_estimator.observe(tx, receipt)
+            raise Exception("Transação falhou")
+        return receipt
+
+    async def register_identity(
+        self,
+        model_type: str,
+        model_version: str,
+        specializations: List[str],
+        wait_for_confirmation: bool = True
+    ) -> Identity:
+        """
+        Registra a identidade do agente (apenas primeira vez)
+
+        Raises:
+            ValueError: Se já tiver identidade registrada
+            Exception: Se houver erro na transação
+        """
+        if not self.identity_contract:
+            raise ValueError("Endereço do contrato Identity não configurado")
+        await self.connect()
+
+        agent_id, fees = await asyncio.gather(
+            self._own_agent_id(), asyncio.to_thread(self.fee_oracle.tx_fees, self.fee_urgency)
+        )
+        if agent_id != 0:
+            raise ValueError(f"Agente já registrado com ID: {agent_id}")
+
+        tx = {
+            'to': self.identity.address,
+            'data': self.identity.encode_abi("registerAgent", args=[model_type, model_version, specializations]),
+            'value': 0,
+            'from': self.address,
+            **fees,
+            'chainId': self.chain_id
+        }
+        tx_hash = await self._send(tx)
+
+        if wait_for_confirmation:
+            await self._wait(tx, tx_hash)
+            agent_id = await self._own_agent_id()
+
+        return Identity(
+            agent_id=agent_id if wait_for_confirmation else 0,
+            did=f"did:anna:{self.address.lower()}",
+            address=self.address,
+            model_type=model_type,
+            model_version=model_version,
+            specializations=specializations,
+            creation_time=int(time.time())
+        )
+
+    async def submit_attestation(
+        self,
+        content: str,
+        reasoning: Reasoning,
+        category: str,
+        tier: str = "basic",
+        wait_for_confirmation: bool = True
+    ) -> AttestationResult:
+        """
+        Submete uma attestation ao protocolo (várias podem estar em voo ao mesmo tempo)
+
+        Raises:
+            ValueError: Se parâmetros inválidos
+            Exception: Se houver erro na transação
+        """
+        if not self.attestation_contract:
+            raise ValueError("Endereço do contrato Attestation não configurado")
+        await self.connect()
+
+        started = time.time()
+        content_hash, reasoning_hash = self._attestation_hashes(content, reasoning)
+
+        # Independentes: identidade (da memória depois da primeira) e taxas do oráculo
+        agent_id, fees = await asyncio.gather(
+            self._own_agent_id(), asyncio.to_thread(self.fee_oracle.tx_fees, self.fee_urgency)
+        )
+        if agent_id == 0:
+            raise ValueError("Agente não registrado. Execute register_identity() primeiro.")
+
+        model_version = "v1.0"  # Em produção, buscar do contrato Identity
+        timestamp = int(time.time())
+
+        signing_started = time.time()
+        typed_data = self._attestation_typed_data(content_hash, reasoning_hash, model_version, timestamp, category)
+        signature = self.account.sign_message(encode_typed_data(full_message=typed_data)).signature
+
+        build_started = time.time()
+        tx = {
+            'to': self.attestation.address,
+            'data': encode_submit_attestation(content_hash, reasoning_hash, model_version, category, signature),
+            'value': 0,
+            'from': self.address,
+            **fees,
+            'chainId': self.chain_id
+        }
+        send_started = time.time()
+        tx_hash = await self._send(tx)
+        sent_at = time.time()
+        tx_hash_hex = tx_hash.hex()
+
+        attestation_id = self._attestation_id(content_hash, reasoning_hash, timestamp)
+
+        receipt = None
+        if wait_for_confirmation:
+            receipt = await self._wait(tx, tx_hash)
+            attestation_id = self._attestation_id_from_receipt(receipt) or attestation_id
+
+        if self.tracer.enabled:
+            trace = dict(submit_tx_hash=tx_hash_hex, agent=self.address, category=category)
+            self.tracer.record(attestation_id, "sdk.prepare", started, signing_started, **trace)
+            self.tracer.record(attestation_id, "sdk.sign_message", signing_started, build_started, **trace)
+            self.tracer.record(attestation_id, "sdk.build_tx", build_started, send_started, **trace)
+            self.tracer.record(attestation_id, "sdk.send", send_started, sent_at, **trace)
+            if receipt is not None:
+                self.tracer.record(
+                    attestation_id, "sdk.mempool", sent_at, time.time(),
+                    block_number=receipt['blockNumber'], **trace
+                )
+
+        return AttestationResult(
+            attestation_id=attestation_id,
+            tx_hash=tx_hash_hex,
+            status=AttestationStatus.PENDING,
+            timestamp=timestamp,
+            explorer_url=f"{self.network_config['explorer']}/tx/{tx_hash_hex}"
+        )
+
+    # ------------------------------------------------------------
+    # Leituras
+    # ------------------------------------------------------------
+
+    async def _resolve_block(self, block):
+        return await self.w3.eth.block_number if block == "latest" else block
+
+    async def _calls(self, functions: List, block) -> List:
+        """eth_call em paralelo (até read_concurrency), decodificados na ordem de entrada"""
+        codec = self.w3.codec
+
+        async def call(function):
+            async with self._reads:
+                raw = await self.w3.eth.call(
+                    {"to": function.address, "data": "0x" + encode_call(codec, function).hex()}, block
+                )
+            result = decode_result(codec, function, raw)
+            if isinstance(result, CallError):
+                raise result
+            return result
+
+        return list(await asyncio.gather(*(call(function) for function in functions)))
+
+    async def _bulk_read(self, calls: List, block="latest") -> List:
+        """Leituras em massa: Multicall3 quando implantado na rede, senão eth_call em paralelo"""
+        if not calls:
+            return []
+        block = await self._resolve_block(block)
+        if self._multicall_available is None:
+            self._multicall_available = len(await self.w3.eth.get_code(self.multicall.address)) > 0
+        if self._multicall_available:
+            aggregates = self.multicall.aggregates(calls)
+            return self.multicall.unpack(calls, await self._calls(aggregates, block))
+        return await self._calls(calls, block)
+
+    async def get_attestation(self, attestation_id: str) -> Dict[str, Any]:
+        """Busca informações de uma attestation"""
+        if not self.attestation_contract:
+            raise ValueError("Endereço do contrato Attestation não configurado")
+        await self.connect()
+        attestation_data = await self.attestation.functions.attestations(attestation_id).call()
+        return ANNAClient._attestation_dict(attestation_data)
+
+    async def get_attestations(self, attestation_ids: List[str]) -> List[Dict[str, Any]]:
+        """Busca várias attestations (na ordem de entrada)"""
+        if not self.attestation_contract:
+            raise ValueError("Endereço do contrato Attestation não configurado")
+        await self.connect()
+        calls = [self.attestation.functions.attestations(attestation_id) for attestation_id in attestation_ids]
+        return [ANNAClient._attestation_dict(data) for data in await self._bulk_read(calls)]
+
+    async def wait_for_verification(
+        self,
+        attestation_id: str,
+        timeout: int = 60,
+        poll_interval: int = 5
+    ) -> AttestationResult:
+        """
+        Aguarda a verificação de uma attestation
+
+        Raises:
+            TimeoutError: Se exceder o timeout
+        """
+        start_time = time.time()
+
+        while time.time() - start_time < timeout:
+            attestation = await self.get_attestation(attestation_id)
+
+            if attestation["status"] != AttestationStatus.PENDING:
+                self.tracer.record(
+                    attestation_id, "sdk.wait_verification", start_time, time.time(),
+                    status=attestation["status"].value
+                )
+                return AttestationResult(
+                    attestation_id=attestation_id,
+                    tx_hash="",
+                    status=attestation["status"],
+                    timestamp=attestation["timestamp"],
+                    explorer_url=f"{self.network_config['explorer']}/address/{self.attestation_contract}",
+                    verified=attestation["status"] == AttestationStatus.VERIFIED,
+                    score=attestation["consistency_score"],
+                    verifier=attestation["verifier"],
+                    verification_time=attestation["verification_time"]
+                )
+
+            await asyncio.sleep(poll_interval)
+
+        raise TimeoutError(f"Verificação não concluída em {timeout}s")
+
+    async def get_reputation(self, agent_address: Optional[str] = None) -> int:
+        """Score de reputação de um agente (se None, o próprio)"""
+        if not self.reputation_contract:
+            raise ValueError("Endereço do contrato Reputation não configurado")
+        await self.connect()
+        return await self.reputation.functions.getReputationScore(agent_address or self.address).call()
+
+    async def get_reputations(self, agent_addresses: List[str]) -> List[int]:
+        """Scores de reputação de vários agentes (na ordem de entrada)"""
+        if not self.reputation_contract:
+            raise ValueError("Endereço do contrato Reputation não configurado")
+        await self.connect()
+        return await self._bulk_read([self.reputation.functions.getReputationScore(a) for a in agent_addresses])
+
+    async def get_balance(self) -> float:
+        """Saldo de MATIC da wallet"""
+        await self.connect()
+        return self.w3.from_wei(await self.w3.eth.get_balance(self.address), 'ether')
+
+    async def get_identity(self, address: Optional[str] = None) -> Optional[Dict]:
+        """Identidade de um agente (se None, o próprio); None se não registrado"""
+        if not self.identity_contract:
+            raise ValueError("Endereço do contrato Identity não configurado")
+        await self.connect()
+        addr = address or self.address
+        agent_id = await self.identity.functions.agentIdByAddress(addr).call()
+        return ANNAClient._identity_dict(addr, agent_id)
+
+    async def get_identities(self, addresses: List[str]) -> List[Optional[Dict]]:
+        """Identidades de vários agentes (None para não registrados), na ordem de entrada"""
+        if not self.identity_contract:
+            raise ValueError("Endereço do contrato Identity não configurado")
+        await self.connect()
+        agent_ids = await self._bulk_read([self.identity.functions.agentIdByAddress(a) for a in addresses])
+        return [ANNAClient._identity_dict(addr, agent_id) for addr, agent_id in zip(addresses, agent_ids)]
+
+    async def get_agent_snapshots(self, addresses: List[str], block="latest") -> List[Dict[str, Any]]:
+        """Identidade, metadados e reputação de vários agentes, tudo lido no mesmo bloco"""
+        if not self.identity_contract or not self.reputation_contract:
+            raise ValueError("Endereços dos contratos Identity e Reputation são necessários")
+        await self.connect()
+
+        block = await self._resolve_block(block)
+        n = len(addresses)
+        results = await self._bulk_read(
+            [self.identity.functions.agentIdByAddress(a) for a in addresses]
+            + [self.reputation.functions.getFullReputation(a) for a in addresses],
+            block=block
+        )
+        agent_ids, reputations = results[:n], results[n:]
+
+        registered = [agent_id for agent_id in agent_ids if agent_id]
+        metadata = dict(zip(registered, await self._bulk_read(
+            [self.identity.functions.getAgentMetadata(agent_id) for agent_id in registered], block=block
+        )))
+        return ANNAClient._snapshot_dicts(addresses, block, agent_ids, reputations, metadata)
@@ -0,0 +1,210 @@
+"""
+ANNA Protocol - Leituras de contrato em lote (JSON-RPC batch)
+
+Junta muitos eth_call em requisições JSON-RPC em lote: N leituras custam
+N / batch_size idas ao RPC em vez de N. Os lotes rodam em paralelo
+(concurrency) e todos leem o mesmo bloco, e os resultados voltam na ordem
+de entrada.
+
+Uso:
+    batcher = CallBatcher(w3, batch_size=200, concurrency=4)
+    results = batcher.call([contract.functions.attestations(i) for i in ids])
+
+Só respostas que mostram um RPC sem suporte a lotes (resposta que não é
+lista, "method not found") desligam os lotes de vez; erros passageiros
+repetem o lote e, persistindo, só aquele lote vai item a item.
+
+Erros por item (revert, attestation inexistente que reverte, ...) levantam
+CallError; com return_exceptions=True o item vira a própria exceção e os
+demais seguem normalmente.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from eth_utils import to_checksum_address
+from eth_utils.abi import function_abi_to_4byte_selector, get_abi_input_types, get_abi_output_types
+from hexbytes import HexBytes
+from web3.datastructures import NamedElementOnion
+
+from anna_rpc import batch_unsupported
+
+logger = logging.getLogger(__name__)
+
+
+class CallError(Exception):
+    """eth_call de um item do lote falhou (revert ou erro do nó)"""
+
+    def __init__(self, message: str, code: Optional[int] = None, data: Any = None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.data = data
+
+
+def _normalize_input(abi_type: str, value):
+    if abi_type == "address" and isinstance(value, str):
+        return to_checksum_address(value)
+    if abi_type.startswith("bytes") and not abi_type.endswith("]") and isinstance(value, str):
+        return bytes(HexBytes(value))
+    return value
+
+
+def _normalize_output(abi_type: str, value):
+    """Mesmo formato de ContractFunction.call(): endereços com checksum"""
+    if abi_type == "address":
+        return to_checksum_address(value)
+    if abi_type.startswith("address[") and isinstance(value, (list, tuple)):
+        return [to_checksum_address(v) for v in value]
+    return value
+
+
+def encode_call(codec, function) -> bytes:
+    """Calldata (seletor + argumentos) de uma ContractFunction com argumentos"""
+    abi = function.abi
+    input_types = get_abi_input_types(abi)
+    args = [_normalize_input(t, v) for t, v in zip(input_types, function.args)]
+    return function_abi_to_4byte_selector(abi) + codec.encode(input_types, args)
+
+
+def decode_result(codec, function, raw: bytes):
+    """
+    Decodifica o retorno de um eth_call: valor único para um retorno, lista
+    para vários; CallError se veio vazio (contrato inexistente ou sem código)
+    """
+    output_types = get_abi_output_types(function.abi)
+    if not raw and output_types:
+        return CallError("eth_call retornou vazio (contrato inexistente neste bloco?)")
+    values = [_normalize_output(t, v) for t, v in zip(output_types, codec.decode(output_types, raw))]
+    return values[0] if len(values) == 1 else values
+
+
+class CallBatcher:
+    """Executa listas de chamadas de contrato (ContractFunction com argumentos) em lotes"""
+
+    def __init__(self, w3, batch_size: int = 100, concurrency: int = 4, batch_retries: int = 2,
+                 retry_delay: float = 0.2):
+        """
+        Args:
+            w3: Instância Web3 conectada (os lotes passam pelos middlewares dela)
+            batch_size: Máximo de eth_call por requisição em lote
+            concurrency: Lotes em andamento ao mesmo tempo
+            batch_retries: Novas tentativas de um lote após erro passageiro (rede, sobrecarga)
+            retry_delay: Espera antes da primeira nova tentativa (dobra a cada uma)
+        """
+        self.w3 = w3
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.batch_retries = max(0, batch_retries)
+        self.retry_delay = retry_delay
+        self.batches = 0
+        self._batch_supported = True
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # Codificação
+    # ------------------------------------------------------------
+
+    def _request(self, function, block, tx: Dict) -> tuple:
+        data = encode_call(self.w3.codec, function)
+        params = dict(tx, to=function.address, data="0x" + data.hex())
+        return ("eth_call", [params, block])
+
+    def _decode(self, function, response: Dict):
+        if "error" in response:
+            error = response["error"]
+            return CallError(error.get("message", str(error)), error.get("code"), error.get("data"))
+        return decode_result(self.w3.codec, function, HexBytes(response.get("result") or b""))
+
+    # ------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------
+
+    def _middleware(self) -> NamedElementOnion:
+        # O middleware de validação consulta eth_chainId para cada item do lote
+        # (400 idas extras num lote de 200) só para checar o chainId da tx, que
+        # um eth_call não leva - os demais middlewares seguem valendo
+        return NamedElementOnion([
+            (middleware, name) for middleware, name in self.w3.middleware_onion.middleware
+            if name != "validation"
+        ])
+
+    def _send(self, requests: List[tuple]) -> List[Dict]:
+        for attempt in range(self.batch_retries + 1):
+            if not self._batch_supported:
+                break
+            try:
+                request_func = self.w3.provider.batch_request_func(self.w3, self._middleware())
+                reply = request_func(requests)
+                if isinstance(reply, list) and len(reply) == len(requests):
+                    with self._lock:
+                        self.batches += 1
+                    return reply
+            except Exception as e:
+                reply = e
+            if batch_unsupported(reply, len(requests)):
+                # Alguns RPCs públicos não aceitam lotes - cai para chamadas individuais
+                logger.warning(f"RPC não suportou leitura em lote ({str(reply)[:200]}); usando chamadas individuais")
+                self._batch_supported = False
+            elif attempt < self.batch_retries:
+                time.sleep(self.retry_delay * 2 ** attempt)
+            else:
+                # Falha passageira repetida: só este lote vai item a item
+                logger.warning(f"Lote falhou {attempt + 1} vezes ({str(reply)[:200]}); lendo item a item")
+        responses = []
+        for method, params in requests:
+            try:
+                responses.append(self.w3.provider.make_request(method, params))
+            except Exception as e:
+                responses.append({"error": {"message": str(e)}})
+        return responses
+
+    def call(
+        self,
+        functions: Sequence,
+        block: Union[int, str] = "latest",
+        tx: Optional[Dict] = None,
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        Executa as chamadas em lotes e devolve os resultados na ordem de entrada
+
+        Args:
+            functions: ContractFunction já com argumentos (ex.: contract.functions.f(x))
+            block: Bloco lido por todos os lotes ("latest" é fixado no número atual)
+            tx: Campos extras do eth_call (ex.: {'from': endereço})
+            return_exceptions: Se True, itens com erro viram CallError em vez de levantar
+
+        Raises:
+            CallError: Primeiro item com erro (quando return_exceptions=False)
+        """
+        functions = list(functions)
+        if not functions:
+            return []
+        if block == "latest":
+            # Todos os lotes enxergam o mesmo estado, mesmo que um bloco chegue no meio
+            block = self.w3.eth.block_number
+        block_param = hex(block) if isinstance(block, int) else block
+        requests = [self._request(f, block_param, tx or {}) for f in functions]
+        chunks = [range(i, min(i + self.batch_size, len(requests))) for i in range(0, len(requests), self.batch_size)]
+
+        def run(chunk: range) -> List[Dict]:
+            return self._send([requests[i] for i in chunk])
+
+        if len(chunks) == 1 or self.concurrency == 1:
+            responses = [run(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(chunks)), thread_name_prefix="batch") as pool:
+                responses = list(pool.map(run, chunks))
+
+        results = []
+        for chunk, chunk_responses in zip(chunks, responses):
+            for i, response in zip(chunk, chunk_responses):
+                result = self._decode(functions[i], response)
+                if isinstance(result, CallError) and not return_exceptions:
+                    raise result
+                results.append(result)
+        return results
@@ -0,0 +1,428 @@
+"""
+ANNA Protocol - Cache de respostas JSON-RPC (middleware web3)
+
+As mesmas respostas imutáveis eram buscadas de novo a cada uso: eth_chainId
+a cada início e linha de log, attestations(id) de attestations já
+verificadas, metadados de agentes que não mudam. O middleware guarda as
+respostas com uma política por método:
+
+- "forever": dado imutável - eth_chainId, net_version, blocos por hash e,
+  abaixo de head - finality_depth, blocos, recibos, transações, logs e
+  leituras em bloco numérico
+- "block": depende do head ("latest"): vale enquanto o head não muda
+  (o head vem de eth_blockNumber, guardado por head_ttl segundos)
+- "ttl": segundos fixos (eth_blockNumber)
+
+Regras por função para eth_call (CallRule), pelo seletor:
+- attestations(id) que não muda mais (contestada, ou verificada/rejeitada
+  há mais que o prazo de contestação de 7 dias), lida em bloco finalizado:
+  forever; nos demais casos, como qualquer eth_call (por bloco)
+- agentIdByAddress(a) != 0 (agente registrado): forever
+- getAgentMetadata(tokenId): ttl de 5 minutos
+
+Requisições de leitura idênticas em voo são deduplicadas (uma vai ao nó, as
+outras esperam a mesma resposta). Erros e resultados nulos (recibo ainda
+pendente) nunca são guardados, e eth_getTransactionCount nunca é cacheado
+(nonce tem que vir do nó).
+
+Uso:
+    cache = install_cache(w3)          # uma vez por conexão
+    ...
+    print(cache.hit_rate, cache.report())
+"""
+
+import json
+import time
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from anna_codec import AGENT_ID_BY_ADDRESS, ATTESTATIONS, GET_AGENT_METADATA
+
+FOREVER, BLOCK, TTL = "forever", "block", "ttl"
+
+# Política de cada método; os ausentes passam direto
+METHOD_POLICIES = {
+    "eth_chainId": FOREVER,
+    "net_version": FOREVER,
+    "eth_getBlockByHash": FOREVER,
+    "eth_getTransactionReceipt": FOREVER,  # só depois de finalizado
+    "eth_getTransactionByHash": FOREVER,  # idem
+    "eth_getLogs": FOREVER,  # só intervalos finalizados
+    "eth_getBlockByNumber": BLOCK,
+    "eth_call": BLOCK,
+    "eth_getBalance": BLOCK,
+    "eth_getCode": BLOCK,
+    "eth_getStorageAt": BLOCK,
+    "eth_gasPrice": BLOCK,
+    "eth_maxPriorityFeePerGas": BLOCK,
+    "eth_feeHistory": BLOCK,
+    "eth_blockNumber": TTL,
+}
+
+# Posição do parâmetro de bloco (tag ou número) em cada método
+BLOCK_PARAM = {
+    "eth_call": 1,
+    "eth_getBalance": 1,
+    "eth_getCode": 1,
+    "eth_getStorageAt": 2,
+    "eth_getBlockByNumber": 0,
+}
+
+# Leituras que podem ser deduplicadas em voo mesmo sem cache
+DEDUPE_ONLY = {"eth_getTransactionCount", "eth_estimateGas"}
+
+
+# AnnaAttestation.challengeAttestation: verificada/rejeitada pode virar Challenged por 7 dias
+CHALLENGE_PERIOD = 7 * 24 * 3600
+STATUS_PENDING, STATUS_CHALLENGED = 0, 3
+
+
+@dataclass
+class CallRule:
+    """Política de eth_call para uma função (seletor), decidida pelo resultado"""
+    policy: str  # FOREVER ou TTL
+    ttl: float = 0.0
+    when: Optional[Callable[[bytes], bool]] = None  # guarda só se when(resultado) for verdadeiro
+    finalized_only: bool = False  # só leituras em bloco finalizado (reorg não desfaz o resultado)
+
+
+def _word(data: bytes, index: int) -> int:
+    return int.from_bytes(data[index * 32:(index + 1) * 32], "big")
+
+
+def attestation_settled(data: bytes, now: Optional[float] = None) -> bool:
+    """
+    Retorno de attestations(id) que não muda mais: status (palavra 5)
+    Challenged, ou Verified/Rejected com verificationTime (palavra 8) além do
+    prazo de contestação
+    """
+    if len(data) < 288:
+        return False
+    status = _word(data, 5)
+    if status == STATUS_CHALLENGED:
+        return True
+    if status == STATUS_PENDING:
+        return False
+    return _word(data, 8) + CHALLENGE_PERIOD < (time.time() if now is None else now)
+
+
+DEFAULT_CALL_RULES = {
+    ATTESTATIONS: CallRule(FOREVER, when=attestation_settled, finalized_only=True),
+    # ID atribuído no registro não muda
+    AGENT_ID_BY_ADDRESS: CallRule(FOREVER, when=lambda data: len(data) >= 32 and _word(data, 0) != 0),
+    GET_AGENT_METADATA: CallRule(TTL, ttl=300.0),
+}
+
+
+class _Flight:
+    """Requisição em andamento; as idênticas esperam o mesmo resultado"""
+    __slots__ = ("done", "response", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+def _json_default(value):
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    return str(value)
+
+
+def _block_number(tag) -> Optional[int]:
+    """Número de um parâmetro de bloco, ou None para tags ("latest", "pending", ...)"""
+    if isinstance(tag, int):
+        return tag
+    if isinstance(tag, str) and tag.startswith("0x"):
+        return int(tag, 16)
+    return None
+
+
+def _result_block(result) -> Optional[int]:
+    if isinstance(result, dict):
+        number = result.get("blockNumber")
+        return _block_number(number) if number is not None else None
+    return None
+
+
+class RPCCache:
+    """Respostas JSON-RPC em cache, com política por método e deduplicação em voo"""
+
+    def __init__(
+        self,
+        max_entries: int = 50000,
+        head_ttl: float = 1.0,
+        finality_depth: int = 64,
+        call_rules: Optional[Dict[bytes, CallRule]] = None
+    ):
+        """
+        Args:
+            max_entries: Respostas guardadas (LRU)
+            head_ttl: Segundos em que o eth_blockNumber guardado vale (atraso máximo para ver bloco novo)
+            finality_depth: Blocos abaixo do head considerados finais (imutáveis)
+            call_rules: Seletor -> CallRule para eth_call (padrão: DEFAULT_CALL_RULES)
+        """
+        self.max_entries = max_entries
+        self.head_ttl = head_ttl
+        self.finality_depth = finality_depth
+        self.call_rules = dict(DEFAULT_CALL_RULES if call_rules is None else call_rules)
+        self.head: Optional[int] = None
+        self._head_at = 0.0
+        self.hits = Counter()
+        self.misses = Counter()
+        self.deduped = Counter()
+        # chave -> (resposta, head em que vale, expira em, bloco mínimo)
+        self._entries: "OrderedDict[Tuple, Tuple]" = OrderedDict()
+        self._inflight: Dict[Tuple, _Flight] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # Estatísticas
+    # ------------------------------------------------------------
+
+    @property
+    def hit_rate(self) -> float:
+        """Fração das requisições atendidas sem ir ao nó (cache ou deduplicação)"""
+        served = sum(self.hits.values()) + sum(self.deduped.values())
+        total = served + sum(self.misses.values())
+        return served / total if total else 0.0
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Requisições, acertos e taxa de acerto por método"""
+        report = {}
+        for method in sorted(set(self.hits) | set(self.misses) | set(self.deduped)):
+            hits, deduped, misses = self.hits[method], self.deduped[method], self.misses[method]
+            total = hits + deduped + misses
+            report[method] = {
+                "requests": total, "hits": hits, "deduped": deduped,
+                "hit_rate": round((hits + deduped) / total, 4) if total else 0.0
+            }
+        return report
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # ------------------------------------------------------------
+    # Chaves e validade
+    # ------------------------------------------------------------
+
+    @staticmethod
+    def _key(method: str, params) -> Tuple:
+        return (method, json.dumps(params, sort_keys=True, default=_json_default))
+
+    def _finalized(self, number: Optional[int]) -> bool:
+        return number is not None and self.head is not None and number <= self.head - self.finality_depth
+
+    def _call_rule(self, params) -> Tuple[Optional[str], Optional[CallRule]]:
+        call = params[0] if params and isinstance(params[0], dict) else {}
+        data = call.get("data") or call.get("input") or ""
+        if isinstance(data, str):
+            selector = bytes.fromhex(data[2:10]) if data.startswith("0x") and len(data) >= 10 else None
+        else:
+            selector = bytes(data[:4]) or None
+        rule = self.call_rules.get(selector)
+        if rule is None:
+            return None, None
+        # A regra ignora o bloco pedido: vale de since_block em diante
+        return json.dumps(call, sort_keys=True, default=_json_default), rule
+
+    def _get(self, key: Tuple, block: Optional[int] = None) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            response, head, expires_at, since = entry
+            if head is not None and head != self.head:
+                return None
+            if expires_at is not None and time.monotonic() > expires_at:
+                del self._entries[key]
+                return None
+            if since is not None and block is not None and block < since:
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def _put(self, key: Tuple, response: Dict, head=None, ttl: Optional[float] = None, since=None):
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (response, head, expires_at, since)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # ------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------
+
+    def lookup(self, method: str, params) -> Optional[Dict]:
+        """Resposta guardada para a requisição, se houver uma válida"""
+        policy = METHOD_POLICIES.get(method)
+        if policy is None:
+            return None
+        if method == "eth_call":
+            rule_key, rule = self._call_rule(params)
+            if rule is not None:
+                block = _block_number(params[1]) if len(params) > 1 else None
+                response = self._get(("rule", rule_key), block)
+                if response is not None:
+                    return response
+        return self._get(self._key(method, params))
+
+    def store(self, method: str, params, response: Dict):
+        """Guarda a resposta conforme a política do método (erros e nulos nunca)"""
+        policy = METHOD_POLICIES.get(method)
+        if policy is None or not isinstance(response, dict) or "error" in response or "result" not in response:
+            return
+        result = response["result"]
+        if result is None:
+            return
+        key = self._key(method, params)
+
+        if method == "eth_blockNumber":
+            with self._lock:
+                self.head = _block_number(result)
+                self._head_at = time.monotonic()
+            self._put(key, response, ttl=self.head_ttl)
+            return
+        if policy == FOREVER:
+            if method in ("eth_getTransactionReceipt", "eth_getTransactionByHash"):
+                if not self._finalized(_result_block(result)):
+                    return
+            elif method == "eth_getLogs":
+                query = params[0] if params else {}
+                if "blockHash" not in query and not self._finalized(_block_number(query.get("toBlock"))):
+                    return
+            self._put(key, response)
+            return
+
+        # "block": número finalizado vale para sempre; o resto, enquanto o head não muda
+        index = BLOCK_PARAM.get(method)
+        block = _block_number(params[index]) if index is not None and len(params) > index else None
+        if index is not None and len(params) > index and params[index] == "pending":
+            return
+        if method == "eth_call":
+            rule_key, rule = self._call_rule(params)
+            if (
+                rule is not None
+                and (rule.when is None or rule.when(bytes.fromhex(result[2:])))
+                and (not rule.finalized_only or self._finalized(block))
+            ):
+                since = block if block is not None else self.head
+                ttl = rule.ttl if rule.policy == TTL else None
+                self._put(("rule", rule_key), response, ttl=ttl, since=since)
+                return
+        if self._finalized(block):
+            self._put(key, response)
+        elif self.head is not None:
+            self._put(key, response, head=self.head)
+
+    # ------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------
+
+    def _refresh_head(self, make_request):
+        # A validade das leituras "block" depende do head, buscado no máximo a cada head_ttl
+        if self.head is None or time.monotonic() - self._head_at > self.head_ttl:
+            self.request(make_request, "eth_blockNumber", [])
+
+    def request(self, make_request, method: str, params) -> Dict:
+        """Atende pela memória, espera uma requisição idêntica em voo, ou vai ao nó"""
+        if method not in METHOD_POLICIES and method not in DEDUPE_ONLY:
+            return make_request(method, params)
+        if METHOD_POLICIES.get(method) == BLOCK:
+            self._refresh_head(make_request)
+
+        response = self.lookup(method, params)
+        if response is not None:
+            self.hits[method] += 1
+            return dict(response)
+
+        key = self._key(method, params)
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            self.deduped[method] += 1
+            if flight.error is not None:
+                raise flight.error
+            return dict(flight.response)
+
+        self.misses[method] += 1
+        try:
+            flight.response = make_request(method, params)
+            self.store(method, params, flight.response)
+            return flight.response
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    def request_batch(self, make_batch_request, requests_info: List[Tuple[str, Any]]):
+        """Lote: itens em cache saem da memória, os demais vão juntos em um lote menor"""
+        responses: List[Optional[Dict]] = []
+        missing = []
+        for index, (method, params) in enumerate(requests_info):
+            response = self.lookup(method, params)
+            if response is not None:
+                self.hits[method] += 1
+                responses.append(dict(response))
+            else:
+                responses.append(None)
+                missing.append(index)
+        if not missing:
+            return responses
+
+        fetched = make_batch_request([requests_info[index] for index in missing])
+        if not isinstance(fetched, list):
+            return fetched  # erro do lote inteiro: devolve como veio
+        for index, response in zip(missing, fetched):
+            method, params = requests_info[index]
+            self.misses[method] += 1
+            self.store(method, params, response)
+            responses[index] = response
+        return responses
+
+
+def rpc_cache_middleware(cache: RPCCache):
+    """Classe de middleware web3 v7 ligada ao cache; instalar com w3.middleware_onion.add(...)"""
+    from web3.middleware.base import Web3Middleware
+
+    class RpcCacheMiddleware(Web3Middleware):
+        def wrap_make_request(self, make_request):
+            def middleware(method, params):
+                return cache.request(make_request, method, params)
+            return middleware
+
+        def wrap_make_batch_request(self, make_batch_request):
+            def middleware(requests_info):
+                return cache.request_batch(make_batch_request, requests_info)
+            return middleware
+
+    return RpcCacheMiddleware
+
+
+def install_cache(w3, **options) -> RPCCache:
+    """
+    Instala o cache uma única vez por conexão (na camada mais externa, então
+    os acertos não chegam aos demais middlewares nem às métricas de RPC)
+    e devolve o RPCCache dela; as opções valem só na primeira instalação
+    """
+    cache = getattr(w3, "_anna_rpc_cache", None)
+    if cache is None:
+        cache = RPCCache(**options)
+        w3.middleware_onion.add(rpc_cache_middleware(cache), name="anna_rpc_cache")
+        w3._anna_rpc_cache = cache
+    return cache
@@ -0,0 +1,241 @@
+"""
+ANNA Protocol - Codec ABI pré-compilado
+
+Seletores e topics dos contratos ANNA calculados uma vez na importação,
+decodificação de logs direto para registros compactos (__slots__) e
+calldata montado à mão, sem passar pelo objeto Contract do web3 (busca
+dinâmica na ABI, AttributeDict e formatadores por item).
+
+Uso:
+    logs = w3.eth.get_logs({"address": contrato, "topics": [[ATTESTATION_SUBMITTED]], ...})
+    for event in decode_logs(logs):
+        print(event.attestation_id.hex(), event.agent, event.category)
+
+    tx = {"to": contrato, "data": encode_verify_attestation(attestation_id, True, 95), "gas": 200000}
+
+Aceita logs como vêm do web3 (HexBytes, ints) ou crus do JSON-RPC (strings hex).
+Os resultados são os mesmos do caminho do web3 (ver verifier/bench_codec.py).
+"""
+
+from functools import lru_cache
+from typing import Iterable, List, Optional, Union
+
+from eth_abi import encode
+from eth_utils import keccak, to_checksum_address
+
+
+def _selector(signature: str) -> bytes:
+    return keccak(text=signature)[:4]
+
+
+# ============================================================
+# SELETORES E TOPICS
+# ============================================================
+
+# AnnaAttestation
+VERIFY_ATTESTATION = _selector("verifyAttestation(bytes32,bool,uint8)")
+SUBMIT_ATTESTATION = _selector("submitAttestation(bytes32,bytes32,string,string)")
+SUBMIT_ATTESTATION_SIGNED = _selector("submitAttestation(bytes32,bytes32,string,string,bytes)")
+ATTESTATIONS = _selector("attestations(bytes32)")
+
+# AnnaIdentity
+AGENT_ID_BY_ADDRESS = _selector("agentIdByAddress(address)")
+GET_AGENT_METADATA = _selector("getAgentMetadata(uint256)")
+
+# AnnaReputation
+GET_FULL_REPUTATION = _selector("getFullReputation(address)")
+
+ATTESTATION_SUBMITTED = keccak(text="AttestationSubmitted(bytes32,address,string,uint256)")
+# Status é enum no contrato: uint8 na assinatura do evento
+ATTESTATION_VERIFIED = keccak(text="AttestationVerified(bytes32,address,uint8,uint8)")
+REPUTATION_UPDATED = keccak(text="ReputationUpdated(address,uint256,uint256)")
+
+_SUBMIT_TYPES = ["bytes32", "bytes32", "string", "string"]
+_SUBMIT_SIGNED_TYPES = _SUBMIT_TYPES + ["bytes"]
+_TRUE_WORD = (1).to_bytes(32, "big")
+_FALSE_WORD = bytes(32)
+
+
+# ============================================================
+# REGISTROS
+# ============================================================
+
+class LogRecord:
+    """Campos comuns a todo log decodificado"""
+    __slots__ = ("address", "block_number", "transaction_hash", "log_index")
+    event = ""
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields())
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self._fields()
+        )
+
+    @classmethod
+    def _fields(cls) -> List[str]:
+        return [name for klass in reversed(cls.__mro__) for name in getattr(klass, "__slots__", ())]
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self._fields()}
+
+
+class AttestationSubmitted(LogRecord):
+    __slots__ = ("attestation_id", "agent", "category", "timestamp")
+    event = "AttestationSubmitted"
+
+
+class AttestationVerified(LogRecord):
+    __slots__ = ("attestation_id", "verifier", "status", "consistency_score")
+    event = "AttestationVerified"
+
+
+class ReputationUpdated(LogRecord):
+    __slots__ = ("agent", "new_score", "timestamp")
+    event = "ReputationUpdated"
+
+
+# ============================================================
+# DECODIFICAÇÃO
+# ============================================================
+
+def _raw(value) -> bytes:
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    return bytes(value)
+
+
+def _int(value) -> int:
+    return int(value, 16) if isinstance(value, str) else value
+
+
+@lru_cache(maxsize=65536)
+def _address(word: bytes) -> str:
+    # Os mesmos agentes se repetem muito: o checksum (keccak) fica em cache
+    return to_checksum_address(word[-20:])
+
+
+def _word(data: bytes, index: int) -> int:
+    end = (index + 1) * 32
+    if len(data) < end:
+        raise IndexError(f"palavra {index} além dos {len(data)} bytes de dados")
+    return int.from_bytes(data[end - 32:end], "big")
+
+
+def _fill(record: LogRecord, log) -> LogRecord:
+    record.address = _address(_raw(log["address"]))
+    record.block_number = _int(log.get("blockNumber"))
+    record.transaction_hash = _raw(log["transactionHash"]) if log.get("transactionHash") is not None else None
+    record.log_index = _int(log.get("logIndex"))
+    return record
+
+
+def _decode_submitted(topics: List[bytes], data: bytes) -> AttestationSubmitted:
+    record = AttestationSubmitted()
+    record.attestation_id = topics[1]
+    record.agent = _address(topics[2])
+    offset = _word(data, 0)
+    record.timestamp = _word(data, 1)
+    length = _word(data[offset:], 0)
+    if offset + 32 + length > len(data):
+        raise IndexError(f"string de {length} bytes além dos {len(data)} bytes de dados")
+    record.category = data[offset + 32:offset + 32 + length].decode("utf-8", errors="replace")
+    return record
+
+
+def _decode_verified(topics: List[bytes], data: bytes) -> AttestationVerified:
+    record = AttestationVerified()
+    record.attestation_id = topics[1]
+    record.verifier = _address(topics[2])
+    record.status = _word(data, 0)
+    record.consistency_score = _word(data, 1)
+    return record
+
+
+def _decode_reputation(topics: List[bytes], data: bytes) -> ReputationUpdated:
+    record = ReputationUpdated()
+    record.agent = _address(topics[1])
+    record.new_score = _word(data, 0)
+    record.timestamp = _word(data, 1)
+    return record
+
+
+_DECODERS = {
+    ATTESTATION_SUBMITTED: (_decode_submitted, 3),
+    ATTESTATION_VERIFIED: (_decode_verified, 3),
+    REPUTATION_UPDATED: (_decode_reputation, 2)
+}
+
+
+def decode_log(log) -> Optional[LogRecord]:
+    """
+    Decodifica um log de evento ANNA
+
+    Returns:
+        Registro do evento, ou None se o log não é de um evento conhecido
+
+    Raises:
+        ValueError: Log com o topic certo mas dados malformados
+    """
+    topics = log["topics"]
+    if not topics:
+        return None
+    topics = [_raw(topic) for topic in topics]
+    decoder = _DECODERS.get(topics[0])
+    if decoder is None:
+        return None
+    decode, topic_count = decoder
+    data = _raw(log["data"])
+    if len(topics) != topic_count:
+        raise ValueError(f"log {log.get('transactionHash')!r}: {len(topics)} topics, esperado {topic_count}")
+    try:
+        return _fill(decode(topics, data), log)
+    except (IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"log malformado: {e}") from e
+
+
+def decode_logs(logs: Iterable, event: Optional[type] = None) -> List[LogRecord]:
+    """Decodifica uma lista de logs, ignorando eventos desconhecidos (ou de outro tipo, com event)"""
+    records = []
+    for log in logs:
+        record = decode_log(log)
+        if record is not None and (event is None or type(record) is event):
+            records.append(record)
+    return records
+
+
+# ============================================================
+# CODIFICAÇÃO
+# ============================================================
+
+def _bytes32(value: Union[bytes, str]) -> bytes:
+    raw = _raw(value)
+    if len(raw) != 32:
+        raise ValueError(f"bytes32 com {len(raw)} bytes")
+    return raw
+
+
+def encode_verify_attestation(attestation_id: Union[bytes, str], passed: bool, score: int) -> bytes:
+    """Calldata de verifyAttestation(bytes32,bool,uint8) - só argumentos estáticos, montado à mão"""
+    if not 0 <= score <= 255:
+        raise ValueError(f"score fora de uint8: {score}")
+    return (
+        VERIFY_ATTESTATION + _bytes32(attestation_id)
+        + (_TRUE_WORD if passed else _FALSE_WORD) + score.to_bytes(32, "big")
+    )
+
+
+def encode_submit_attestation(
+    content_hash: Union[bytes, str],
+    reasoning_hash: Union[bytes, str],
+    model_version: str,
+    category: str,
+    signature: Optional[bytes] = None
+) -> bytes:
+    """Calldata de submitAttestation (com signature, a variante EIP-712 usada pelo SDK)"""
+    args = [_bytes32(content_hash), _bytes32(reasoning_hash), model_version, category]
+    if signature is None:
+        return SUBMIT_ATTESTATION + encode(_SUBMIT_TYPES, args)
+    return SUBMIT_ATTESTATION_SIGNED + encode(_SUBMIT_SIGNED_TYPES, args + [_raw(signature)])
@@ -0,0 +1,713 @@
+"""
+ANNA Protocol - Devchain (nó JSON-RPC local para testes de carga e soak)
+
+Substituto em memória de um nó com o contrato AnnaAttestation já implantado.
+Implementa só o que o SDK e o verificador usam:
+
+- eth_chainId, eth_blockNumber, eth_getBlockByNumber, eth_getBalance,
+  eth_getTransactionCount, eth_gasPrice, eth_maxPriorityFeePerGas,
+  eth_feeHistory, eth_estimateGas, eth_call, eth_getLogs, eth_getCode,
+  eth_sendRawTransaction, eth_getTransactionReceipt, eth_getTransactionByHash
+- Lotes JSON-RPC (lista de requisições)
+- AnnaAttestation: attestations, authorizedVerifiers, attestationCount,
+  submitAttestation, verifyAttestation e os eventos AttestationSubmitted /
+  AttestationVerified
+- Multicall3 no endereço canônico: aggregate3 e getBlockNumber
+- Nonces como num nó real: por remetente, só a sequência contínua a partir
+  do nonce atual entra no bloco; transações com lacuna ficam na fila
+
+Extras para testes:
+- Latência injetada por requisição (fixa + jitter, ou por método) e taxa de erro
+- anna_injectAttestations(count, agents): AttestationSubmitted sintéticos
+  no próximo bloco, sem precisar de agentes registrados
+- Retenção limitada de blocos/recibos para rodar por milhões de eventos
+
+Uso:
+    python anna_devchain.py --port 8545 --block-time 1 --latency 0.02 --jitter 0.01
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import rlp
+from eth_abi import decode, encode
+from eth_account import Account
+from eth_account.typed_transactions import TypedTransaction
+from eth_utils import function_signature_to_4byte_selector, keccak, to_checksum_address
+from hexbytes import HexBytes
+
+# Endereço do primeiro deploy de uma conta padrão do hardhat (só um valor fixo conhecido)
+DEFAULT_CONTRACT = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+# Multicall3 canônico (o mesmo de anna_multicall.MULTICALL3_ADDRESS)
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+DEFAULT_CHAIN_ID = 1337
+
+ATTESTATION_TYPES = ["bytes32", "bytes32", "address", "string", "uint256", "uint8", "uint8", "address", "uint256", "string"]
+STATUS_PENDING, STATUS_VERIFIED, STATUS_REJECTED = 0, 1, 2
+ZERO_ADDRESS = "0x" + "00" * 20
+
+SELECTORS = {
+    function_signature_to_4byte_selector(signature): name
+    for name, signature in (
+        ("attestations", "attestations(bytes32)"),
+        ("authorizedVerifiers", "authorizedVerifiers(address)"),
+        ("attestationCount", "attestationCount(address)"),
+        ("verifyAttestation", "verifyAttestation(bytes32,bool,uint8)"),
+        ("submitAttestation", "submitAttestation(bytes32,bytes32,string,string)"),
+        # Variante usada pelo SDK (com assinatura EIP-712)
+        ("submitAttestationSigned", "submitAttestation(bytes32,bytes32,string,string,bytes)"),
+        ("aggregate3", "aggregate3((address,bool,bytes)[])"),
+        ("getBlockNumber", "getBlockNumber()"),
+    )
+}
+SUBMIT_FUNCTIONS = ("submitAttestation", "submitAttestationSigned")
+SUBMITTED_TOPIC = keccak(text="AttestationSubmitted(bytes32,address,string,uint256)")
+VERIFIED_TOPIC = keccak(text="AttestationVerified(bytes32,address,uint8,uint8)")
+
+
+# Modelo de gas aproximado: intrínseco + calldata + execução por função + 1 slot por palavra de string gravada
+EXECUTION_GAS = {"verifyAttestation": 45000, "submitAttestation": 160000, "submitAttestationSigned": 170000}
+STORAGE_WORD_GAS = 22100
+
+
+def _gas_used(data: bytes) -> int:
+    gas = 21000 + sum(16 if byte else 4 for byte in data)
+    name = SELECTORS.get(data[:4])
+    gas += EXECUTION_GAS.get(name, 0)
+    if name in SUBMIT_FUNCTIONS:
+        try:
+            model_version, category = decode(["bytes32", "bytes32", "string", "string"], data[4:])[2:4]
+        except Exception:
+            return gas
+        words = (len(model_version.encode()) + 31) // 32 + (len(category.encode()) + 31) // 32
+        gas += STORAGE_WORD_GAS * words
+    return gas
+
+
+def _hex(value) -> str:
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    return hex(value)
+
+
+def _bytes(value: str) -> bytes:
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+
+def _topic_address(address: str) -> bytes:
+    return b"\x00" * 12 + _bytes(address)
+
+
+class Revert(Exception):
+    """Revert de execução (vira o erro JSON-RPC code 3 com Error(string))"""
+    pass
+
+
+class RpcError(Exception):
+    def __init__(self, message: str, code: int = -32000):
+        super().__init__(message)
+        self.code = code
+
+
+class DevChain:
+    """Estado da chain em memória; thread-safe (um lock para todas as requisições)"""
+
+    def __init__(
+        self,
+        chain_id: int = DEFAULT_CHAIN_ID,
+        contract: str = DEFAULT_CONTRACT,
+        block_time: float = 1.0,
+        automine: bool = False,
+        base_fee: int = 30 * 10**9,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        method_latency: Optional[Dict[str, float]] = None,
+        error_rate: float = 0.0,
+        retain_blocks: int = 5000,
+        verifiers: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            chain_id: Chain ID retornado por eth_chainId
+            contract: Endereço do AnnaAttestation simulado
+            block_time: Segundos entre blocos (0 = só mina sob demanda)
+            automine: Se True, cada transação é minerada no ato em um bloco próprio
+            base_fee: baseFeePerGas constante dos blocos
+            latency: Atraso fixo por requisição HTTP (segundos)
+            jitter: Atraso extra aleatório, uniforme entre 0 e jitter
+            method_latency: Atraso por método (substitui latency para esses métodos)
+            error_rate: Fração das requisições que falham com -32005 (limite excedido, como um RPC público sobrecarregado)
+            retain_blocks: Quantos blocos (e seus logs/recibos) manter em memória
+            verifiers: Verificadores autorizados (None = qualquer endereço)
+        """
+        self.chain_id = chain_id
+        self.contract = to_checksum_address(contract)
+        self.block_time = block_time
+        self.automine = automine
+        self.base_fee = base_fee
+        self.latency = latency
+        self.jitter = jitter
+        self.method_latency = method_latency or {}
+        self.error_rate = error_rate
+        self.retain_blocks = retain_blocks
+        self.verifiers = {v.lower() for v in verifiers} if verifiers is not None else None
+
+        self.blocks: Dict[int, Dict] = {}
+        self.head = -1
+        self.attestations: Dict[bytes, list] = {}
+        self.attestation_block: Dict[bytes, int] = {}
+        self.attestation_counts: Dict[str, int] = {}
+        self.nonces: Dict[str, int] = {}
+        self.pending: Dict[bytes, Dict] = {}
+        self.pending_by_sender: Dict[tuple, bytes] = {}
+        self.injected: List[tuple] = []
+        self.receipts: Dict[bytes, Dict] = {}
+        self.transactions: Dict[bytes, Dict] = {}
+        self.stats = {"requests": 0, "calls": 0, "injected": 0, "transactions": 0, "verified": 0}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.mine()
+
+    # ------------------------------------------------------------
+    # Blocos
+    # ------------------------------------------------------------
+
+    def mine(self) -> int:
+        """Fecha um bloco com as transações pendentes e os eventos injetados"""
+        with self._lock:
+            number = self.head + 1
+            timestamp = int(time.time())
+            block_hash = keccak(b"anna-devchain-block" + number.to_bytes(8, "big"))
+            logs, receipts = [], []
+
+            for attestation_id, agent, category in self.injected:
+                self._create_attestation(attestation_id, agent, category, timestamp, number)
+                logs.append(self._submitted_log(attestation_id, agent, category, timestamp))
+            self.injected.clear()
+
+            cumulative_gas = 0
+            for index, (tx_hash, tx) in enumerate(self._executable()):
+                gas_used = _gas_used(tx["data"])
+                if tx["gas"] < gas_used:
+                    # Sem gas: reverte consumindo todo o limite
+                    tx_logs, status, gas_used = [], 0, tx["gas"]
+                else:
+                    tx_logs, status = self._execute(tx, timestamp, number)
+                cumulative_gas += gas_used
+                self.nonces[tx["from"]] = tx["nonce"] + 1
+                receipt = {
+                    "transactionHash": _hex(tx_hash),
+                    "transactionIndex": hex(index),
+                    "blockHash": _hex(block_hash),
+                    "blockNumber": hex(number),
+                    "from": tx["from"],
+                    "to": tx["to"],
+                    "cumulativeGasUsed": hex(cumulative_gas),
+                    "gasUsed": hex(gas_used),
+                    "effectiveGasPrice": hex(min(tx["max_fee"], self.base_fee + tx["priority_fee"])),
+                    "contractAddress": None,
+                    "logs": [],
+                    "logsBloom": "0x" + "00" * 256,
+                    "status": hex(status),
+                    "type": hex(tx["type"])
+                }
+                for log in tx_logs:
+                    log["transactionHash"] = _hex(tx_hash)
+                    log["transactionIndex"] = hex(index)
+                receipt["logs"] = tx_logs
+                logs.extend(tx_logs)
+                self.receipts[tx_hash] = receipt
+                receipts.append(tx_hash)
+                self.transactions[tx_hash] = dict(tx, blockNumber=number, blockHash=block_hash, index=index)
+                del self.pending[tx_hash]
+                del self.pending_by_sender[(tx["from"], tx["nonce"])]
+
+            for log_index, log in enumerate(logs):
+                log.update(blockNumber=hex(number), blockHash=_hex(block_hash), logIndex=hex(log_index), removed=False)
+                log.setdefault("transactionHash", _hex(keccak(b"injected" + number.to_bytes(8, "big") + log_index.to_bytes(4, "big"))))
+                log.setdefault("transactionIndex", "0x0")
+
+            self.blocks[number] = {"number": number, "hash": block_hash, "timestamp": timestamp, "logs": logs, "receipts": receipts}
+            self.head = number
+            self._prune()
+            return number
+
+    def _executable(self) -> List[tuple]:
+        """
+        Pendentes que entram no bloco: por remetente, a sequência contínua a
+        partir do nonce atual (como um nó real, nonces com lacuna ficam na fila)
+        """
+        by_sender: Dict[str, list] = {}
+        for tx_hash, tx in self.pending.items():
+            by_sender.setdefault(tx["from"], []).append((tx_hash, tx))
+        executable = []
+        for sender, txs in by_sender.items():
+            expected = self.nonces.get(sender, 0)
+            for tx_hash, tx in sorted(txs, key=lambda item: item[1]["nonce"]):
+                if tx["nonce"] != expected:
+                    break
+                executable.append((tx_hash, tx))
+                expected += 1
+        return executable
+
+    def _prune(self):
+        oldest = self.head - self.retain_blocks
+        while oldest >= 0 and oldest in self.blocks:
+            block = self.blocks.pop(oldest)
+            for tx_hash in block["receipts"]:
+                self.receipts.pop(tx_hash, None)
+                self.transactions.pop(tx_hash, None)
+            oldest -= 1
+        # Attestations já verificadas de blocos descartados também saem da memória
+        if len(self.attestation_block) > 2 * self.retain_blocks:
+            horizon = self.head - self.retain_blocks
+            for attestation_id in [a for a, n in self.attestation_block.items() if n < horizon]:
+                if self.attestations[attestation_id][5] != STATUS_PENDING:
+                    del self.attestations[attestation_id]
+                    del self.attestation_block[attestation_id]
+
+    def run_blocks(self):
+        while not self._stop.wait(self.block_time):
+            self.mine()
+
+    # ------------------------------------------------------------
+    # Contrato AnnaAttestation
+    # ------------------------------------------------------------
+
+    def _create_attestation(self, attestation_id: bytes, agent: str, category: str, timestamp: int, number: int,
+                            content_hash: bytes = b"\x00" * 32, reasoning_hash: bytes = b"\x00" * 32,
+                            model_version: str = "v1.0"):
+        self.attestations[attestation_id] = [
+            content_hash, reasoning_hash, agent, model_version, timestamp, STATUS_PENDING, 0, ZERO_ADDRESS, 0, category
+        ]
+        self.attestation_block[attestation_id] = number
+        self.attestation_counts[agent.lower()] = self.attestation_counts.get(agent.lower(), 0) + 1
+
+    def _submitted_log(self, attestation_id: bytes, agent: str, category: str, timestamp: int) -> Dict:
+        return {
+            "address": self.contract,
+            "topics": [_hex(SUBMITTED_TOPIC), _hex(attestation_id), _hex(_topic_address(agent))],
+            "data": _hex(encode(["string", "uint256"], [category, timestamp]))
+        }
+
+    def _authorized(self, address: str) -> bool:
+        return self.verifiers is None or address.lower() in self.verifiers
+
+    def _check_verify(self, sender: str, attestation_id: bytes, score: int):
+        if not self._authorized(sender):
+            raise Revert("Not authorized verifier")
+        if score > 100:
+            raise Revert("Invalid score")
+        attestation = self.attestations.get(attestation_id)
+        if attestation is None:
+            raise Revert("Attestation does not exist")
+        if attestation[5] != STATUS_PENDING:
+            raise Revert("Already verified")
+        return attestation
+
+    def _execute(self, tx: Dict, timestamp: int, number: int):
+        """Aplica uma transação minerada; retorna (logs, status)"""
+        data = tx["data"]
+        if tx["to"] is None or tx["to"].lower() != self.contract.lower() or len(data) < 4:
+            return [], 1
+        name = SELECTORS.get(data[:4])
+        try:
+            if name == "verifyAttestation":
+                attestation_id, passed, score = decode(["bytes32", "bool", "uint8"], data[4:])
+                attestation = self._check_verify(tx["from"], attestation_id, score)
+                attestation[5] = STATUS_VERIFIED if passed else STATUS_REJECTED
+                attestation[6] = score
+                attestation[7] = tx["from"]
+                attestation[8] = timestamp
+                self.stats["verified"] += 1
+                return [{
+                    "address": self.contract,
+                    "topics": [_hex(VERIFIED_TOPIC), _hex(attestation_id), _hex(_topic_address(tx["from"]))],
+                    "data": _hex(encode(["uint8", "uint8"], [attestation[5], score]))
+                }], 1
+            if name in SUBMIT_FUNCTIONS:
+                types = ["bytes32", "bytes32", "string", "string"] + (["bytes"] if name == "submitAttestationSigned" else [])
+                content_hash, reasoning_hash, model_version, category = decode(types, data[4:])[:4]
+                attestation_id = keccak(content_hash + reasoning_hash + _bytes(tx["from"]) + timestamp.to_bytes(32, "big"))
+                if attestation_id in self.attestations:
+                    raise Revert("Attestation already exists")
+                self._create_attestation(attestation_id, tx["from"], category, timestamp, number,
+                                         content_hash, reasoning_hash, model_version)
+                return [self._submitted_log(attestation_id, tx["from"], category, timestamp)], 1
+        except Revert:
+            return [], 0
+        return [], 1
+
+    def _multicall(self, name: Optional[str], data: bytes) -> str:
+        if name == "getBlockNumber":
+            return _hex(encode(["uint256"], [self.head]))
+        if name != "aggregate3":
+            raise Revert("Function not supported by devchain")
+        (calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+        results = []
+        for target, allow_failure, call_data in calls:
+            try:
+                results.append((True, _bytes(self._call({"to": target, "data": _hex(call_data), "from": MULTICALL3_ADDRESS}))))
+            except Revert as e:
+                if not allow_failure:
+                    raise Revert("Multicall3: call failed")
+                results.append((False, bytes.fromhex("08c379a0") + encode(["string"], [str(e)])))
+        return _hex(encode(["(bool,bytes)[]"], [results]))
+
+    def _call(self, params: Dict) -> str:
+        data = _bytes(params.get("data") or params.get("input") or "0x")
+        to = params.get("to")
+        name = SELECTORS.get(data[:4])
+        if to is not None and to.lower() == MULTICALL3_ADDRESS.lower():
+            return self._multicall(name, data)
+        if to is None or to.lower() != self.contract.lower():
+            return "0x"
+        if name == "attestations":
+            (attestation_id,) = decode(["bytes32"], data[4:])
+            values = self.attestations.get(attestation_id) or [
+                b"\x00" * 32, b"\x00" * 32, ZERO_ADDRESS, "", 0, 0, 0, ZERO_ADDRESS, 0, ""
+            ]
+            return _hex(encode(ATTESTATION_TYPES, values))
+        if name == "authorizedVerifiers":
+            (address,) = decode(["address"], data[4:])
+            return _hex(encode(["bool"], [self._authorized(address)]))
+        if name == "attestationCount":
+            (address,) = decode(["address"], data[4:])
+            return _hex(encode(["uint256"], [self.attestation_counts.get(address.lower(), 0)]))
+        if name == "verifyAttestation":
+            attestation_id, _, score = decode(["bytes32", "bool", "uint8"], data[4:])
+            self._check_verify(params.get("from", ZERO_ADDRESS), attestation_id, score)
+            return "0x"
+        raise Revert("Function not supported by devchain")
+
+    # ------------------------------------------------------------
+    # Transações
+    # ------------------------------------------------------------
+
+    def _decode_raw(self, raw: bytes) -> Dict:
+        sender = Account.recover_transaction(raw)
+        if raw[0] <= 0x7f:
+            fields = TypedTransaction.from_bytes(HexBytes(raw)).as_dict()
+            max_fee = fields.get("maxFeePerGas", fields.get("gasPrice", 0))
+            priority_fee = fields.get("maxPriorityFeePerGas", max_fee)
+            tx_type = raw[0]
+        else:
+            nonce, gas_price, gas, to, value, data = rlp.decode(raw)[:6]
+            fields = {"nonce": int.from_bytes(nonce, "big"), "gas": int.from_bytes(gas, "big"),
+                      "to": to, "value": int.from_bytes(value, "big"), "data": data}
+            max_fee = priority_fee = int.from_bytes(gas_price, "big")
+            tx_type = 0
+        to = fields.get("to")
+        return {
+            "from": sender,
+            "to": to_checksum_address(to) if to else None,
+            "nonce": fields["nonce"],
+            "gas": fields["gas"],
+            "value": fields.get("value", 0),
+            "data": bytes(fields.get("data", b"")),
+            "max_fee": max_fee,
+            "priority_fee": priority_fee,
+            "type": tx_type
+        }
+
+    def send_raw(self, raw_hex: str) -> str:
+        raw = _bytes(raw_hex)
+        tx_hash = keccak(raw)
+        tx = self._decode_raw(raw)
+        with self._lock:
+            if tx_hash in self.pending or tx_hash in self.receipts:
+                raise RpcError("already known")
+            expected = self.nonces.get(tx["from"], 0)
+            if tx["nonce"] < expected:
+                raise RpcError("nonce too low")
+            replaced = self.pending_by_sender.get((tx["from"], tx["nonce"]))
+            if replaced is not None:
+                old = self.pending[replaced]
+                if tx["max_fee"] * 10 < old["max_fee"] * 11 or tx["priority_fee"] * 10 < old["priority_fee"] * 11:
+                    raise RpcError("replacement transaction underpriced")
+                del self.pending[replaced]
+            self.pending[tx_hash] = tx
+            self.pending_by_sender[(tx["from"], tx["nonce"])] = tx_hash
+            self.stats["transactions"] += 1
+        if self.automine:
+            self.mine()
+        return _hex(tx_hash)
+
+    def inject(self, count: int, agents: Optional[List[str]] = None, category: str = "soak") -> List[str]:
+        """Agenda `count` AttestationSubmitted sintéticos para o próximo bloco"""
+        agents = agents or [to_checksum_address(keccak(text="agent-0")[:20])]
+        ids = []
+        with self._lock:
+            base = self.stats["injected"]
+            for i in range(count):
+                attestation_id = keccak(b"anna-devchain-attestation" + (base + i).to_bytes(8, "big"))
+                self.injected.append((attestation_id, agents[(base + i) % len(agents)], category))
+                ids.append(_hex(attestation_id))
+            self.stats["injected"] += count
+        if self.automine or self.block_time <= 0:
+            self.mine()
+        return ids
+
+    # ------------------------------------------------------------
+    # JSON-RPC
+    # ------------------------------------------------------------
+
+    def _block_json(self, number: int) -> Optional[Dict]:
+        block = self.blocks.get(number)
+        if block is None:
+            return None
+        return {
+            "number": hex(number),
+            "hash": _hex(block["hash"]),
+            "parentHash": _hex(self.blocks[number - 1]["hash"]) if number - 1 in self.blocks else "0x" + "00" * 32,
+            "nonce": "0x0000000000000000",
+            "sha3Uncles": "0x" + "00" * 32,
+            "logsBloom": "0x" + "00" * 256,
+            "transactionsRoot": "0x" + "00" * 32,
+            "stateRoot": "0x" + "00" * 32,
+            "receiptsRoot": "0x" + "00" * 32,
+            "miner": ZERO_ADDRESS,
+            "difficulty": "0x0",
+            "totalDifficulty": "0x0",
+            "extraData": "0x",
+            "size": "0x0",
+            "gasLimit": hex(30_000_000),
+            "gasUsed": hex(50000 * len(block["receipts"])),
+            "timestamp": hex(block["timestamp"]),
+            "transactions": [_hex(h) for h in block["receipts"]],
+            "uncles": [],
+            "baseFeePerGas": hex(self.base_fee),
+            "mixHash": "0x" + "00" * 32
+        }
+
+    def _block_number(self, tag) -> int:
+        if tag in (None, "latest", "pending", "safe", "finalized"):
+            return self.head
+        if tag == "earliest":
+            return 0
+        return int(tag, 16) if isinstance(tag, str) else int(tag)
+
+    def _get_logs(self, params: Dict) -> List[Dict]:
+        start = self._block_number(params.get("fromBlock", "latest"))
+        end = min(self._block_number(params.get("toBlock", "latest")), self.head)
+        address = params.get("address")
+        addresses = {a.lower() for a in ([address] if isinstance(address, str) else address or [])}
+        topics = params.get("topics") or []
+        result = []
+        for number in range(max(start, self.head - self.retain_blocks), end + 1):
+            for log in self.blocks.get(number, {}).get("logs", ()):
+                if addresses and log["address"].lower() not in addresses:
+                    continue
+                if any(
+                    wanted is not None and log["topics"][i] not in (wanted if isinstance(wanted, list) else [wanted])
+                    for i, wanted in enumerate(topics[:len(log["topics"])])
+                ):
+                    continue
+                result.append(log)
+        return result
+
+    def handle(self, method: str, params: list):
+        self.stats["calls"] += 1
+        if method == "web3_clientVersion":
+            return "anna-devchain/1.0"
+        if method == "net_version":
+            return str(self.chain_id)
+        if method == "eth_chainId":
+            return hex(self.chain_id)
+        if method == "eth_blockNumber":
+            return hex(self.head)
+        if method == "eth_getBlockByNumber":
+            with self._lock:
+                return self._block_json(self._block_number(params[0]))
+        if method == "eth_getCode":
+            # Código de mentira, só para quem checa se há contrato no endereço
+            deployed = params[0].lower() in (self.contract.lower(), MULTICALL3_ADDRESS.lower())
+            return "0x6080604052" if deployed else "0x"
+        if method == "eth_getBalance":
+            return hex(1000 * 10**18)
+        if method == "eth_getTransactionCount":
+            with self._lock:
+                address = to_checksum_address(params[0])
+                count = self.nonces.get(address, 0)
+                if len(params) > 1 and params[1] == "pending":
+                    count += sum(1 for sender, _ in self.pending_by_sender if sender == address)
+                return hex(count)
+        if method == "eth_gasPrice":
+            return hex(self.base_fee + 2 * 10**9)
+        if method == "eth_maxPriorityFeePerGas":
+            return hex(2 * 10**9)
+        if method == "eth_feeHistory":
+            count = min(int(params[0], 16) if isinstance(params[0], str) else int(params[0]), 1024)
+            percentiles = params[2] if len(params) > 2 else []
+            with self._lock:
+                # Como num nó real: não há histórico antes do bloco 0
+                count = min(count, self.head + 1)
+                oldest = self.head - count + 1
+            return {
+                "oldestBlock": hex(oldest),
+                "baseFeePerGas": [hex(self.base_fee)] * (count + 1),
+                "gasUsedRatio": [0.5] * count,
+                "reward": [[hex(2 * 10**9)] * len(percentiles) for _ in range(count)]
+            }
+        if method == "eth_estimateGas":
+            data = _bytes(params[0].get("data") or params[0].get("input") or "0x")
+            if SELECTORS.get(data[:4]) not in SUBMIT_FUNCTIONS:
+                with self._lock:
+                    self._call(params[0])
+            return hex(_gas_used(data))
+        if method == "eth_call":
+            with self._lock:
+                return self._call(params[0])
+        if method == "eth_getLogs":
+            with self._lock:
+                return self._get_logs(params[0])
+        if method == "eth_sendRawTransaction":
+            return self.send_raw(params[0])
+        if method == "eth_getTransactionReceipt":
+            with self._lock:
+                return self.receipts.get(_bytes(params[0]))
+        if method == "eth_getTransactionByHash":
+            with self._lock:
+                tx_hash = _bytes(params[0])
+                tx = self.transactions.get(tx_hash) or self.pending.get(tx_hash)
+                if tx is None:
+                    return None
+                return {
+                    "hash": _hex(tx_hash), "from": tx["from"], "to": tx["to"], "nonce": hex(tx["nonce"]),
+                    "gas": hex(tx["gas"]), "value": hex(tx["value"]), "input": _hex(tx["data"]),
+                    "blockNumber": hex(tx["blockNumber"]) if "blockNumber" in tx else None,
+                    "maxFeePerGas": hex(tx["max_fee"]), "maxPriorityFeePerGas": hex(tx["priority_fee"]),
+                    "type": hex(tx["type"])
+                }
+        if method == "anna_injectAttestations":
+            return self.inject(int(params[0]), params[1] if len(params) > 1 else None)
+        if method == "anna_mine":
+            return hex(self.mine())
+        if method == "anna_stats":
+            with self._lock:
+                return dict(self.stats, head=self.head, pending_attestations=sum(
+                    1 for a in self.attestations.values() if a[5] == STATUS_PENDING
+                ))
+        raise RpcError(f"Method {method} not supported by devchain", -32601)
+
+    def respond(self, request: Dict) -> Dict:
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        if self.error_rate and random.random() < self.error_rate:
+            response["error"] = {"code": -32005, "message": "limit exceeded (injected failure)"}
+            return response
+        try:
+            response["result"] = self.handle(request["method"], request.get("params") or [])
+        except Revert as e:
+            response["error"] = {
+                "code": 3,
+                "message": f"execution reverted: {e}",
+                "data": "0x08c379a0" + encode(["string"], [str(e)]).hex()
+            }
+        except RpcError as e:
+            response["error"] = {"code": e.code, "message": str(e)}
+        except Exception as e:
+            response["error"] = {"code": -32603, "message": f"{type(e).__name__}: {e}"}
+        return response
+
+    def delay_for(self, methods: List[str]) -> float:
+        delay = max((self.method_latency.get(m, self.latency) for m in methods), default=self.latency)
+        return delay + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    # ------------------------------------------------------------
+    # Servidor
+    # ------------------------------------------------------------
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8545, background: bool = True) -> str:
+        """Sobe o servidor HTTP (e a produção de blocos); retorna a URL do RPC"""
+        chain = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Cabeçalho e corpo saem em writes separados: sem Nagle não há espera de ACK atrasado
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                requests = body if isinstance(body, list) else [body]
+                chain.stats["requests"] += 1
+                delay = chain.delay_for([r.get("method", "") for r in requests])
+                if delay > 0:
+                    time.sleep(delay)
+                responses = [chain.respond(r) for r in requests]
+                payload = json.dumps(responses if isinstance(body, list) else responses[0]).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        if self.block_time > 0 and not self.automine:
+            threading.Thread(target=self.run_blocks, name="devchain-blocks", daemon=True).start()
+        url = f"http://{host}:{self._server.server_address[1]}"
+        if background:
+            threading.Thread(target=self._server.serve_forever, name="devchain-http", daemon=True).start()
+        else:
+            print(f"ANNA devchain em {url} (chain {self.chain_id}, contrato {self.contract})", flush=True)
+            try:
+                self._server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+        return url
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='In-memory JSON-RPC chain with the AnnaAttestation contract, for load and soak tests')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8545)
+    parser.add_argument('--chain-id', type=int, default=DEFAULT_CHAIN_ID)
+    parser.add_argument('--contract', default=DEFAULT_CONTRACT, help='Address of the simulated AnnaAttestation')
+    parser.add_argument('--block-time', type=float, default=1.0, help='Seconds between blocks (default: 1)')
+    parser.add_argument('--automine', action='store_true', help='Mine each transaction immediately')
+    parser.add_argument('--latency', type=float, default=0.0, help='Fixed delay per HTTP request in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra uniform random delay per request in seconds')
+    parser.add_argument('--method-latency', default='',
+                        help='Per-method delay, e.g. eth_getLogs=0.2,eth_sendRawTransaction=0.05')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with an error')
+    parser.add_argument('--retain-blocks', type=int, default=5000, help='Blocks kept in memory (default: 5000)')
+    parser.add_argument('--verifiers', default=None, help='Comma-separated authorized verifiers (default: any)')
+    args = parser.parse_args()
+
+    method_latency = {}
+    for part in filter(None, args.method_latency.split(',')):
+        method, _, seconds = part.partition('=')
+        method_latency[method.strip()] = float(seconds)
+
+    chain = DevChain(
+        chain_id=args.chain_id,
+        contract=args.contract,
+        block_time=args.block_time,
+        automine=args.automine,
+        latency=args.latency,
+        jitter=args.jitter,
+        method_latency=method_latency,
+        error_rate=args.error_rate,
+        retain_blocks=args.retain_blocks,
+        verifiers=args.verifiers.split(',') if args.verifiers else None
+    )
+    chain.serve(args.host, args.port, background=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+ANNA Protocol - Oráculo de taxas EIP-1559 compartilhado
+
+Em vez de um eth_gasPrice (preço legado) por transação, um oráculo por RPC
+consulta eth_feeHistory uma vez por bloco em background e serve
+maxFeePerGas / maxPriorityFeePerGas da memória:
+
+- maxPriorityFeePerGas: mediana, nos últimos `blocks` blocos, do percentil
+  de gorjeta da urgência pedida ("low" = p10, "medium" = p50, "high" = p90)
+- maxFeePerGas: baseFee do próximo bloco * base_fee_multiplier + gorjeta
+  (margem para a baseFee subir enquanto a tx espera)
+
+Sem a thread (ou se ela parar), o último snapshot vale por `ttl` segundos;
+depois disso a próxima consulta busca de novo de forma síncrona. Redes sem
+EIP-1559 (sem baseFeePerGas) caem para gasPrice.
+
+Uso:
+    oracle = FeeOracle.shared(w3)            # um por RPC no processo
+    tx.update(oracle.tx_fees("high"))        # {'maxFeePerGas': ..., 'maxPriorityFeePerGas': ...}
+"""
+
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from anna_rpc import provider_key
+
+logger = logging.getLogger(__name__)
+
+# Urgência -> percentil da gorjeta paga nos blocos recentes
+DEFAULT_URGENCY = {"low": 10, "medium": 50, "high": 90}
+
+
+@dataclass
+class FeeSnapshot:
+    """Taxas calculadas a partir do eth_feeHistory de um bloco"""
+    block: int
+    base_fee: int  # baseFee estimada do próximo bloco (0 = rede sem EIP-1559)
+    priority_fees: Dict[str, int] = field(default_factory=dict)  # urgência -> wei
+    gas_price: Optional[int] = None  # só em redes sem EIP-1559
+    fetched_at: float = 0.0
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+def _median(values: List[int]) -> int:
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2] if ordered else 0
+
+
+class FeeOracle:
+    """Taxas EIP-1559 servidas da memória, atualizadas uma vez por bloco"""
+
+    _shared: Dict[object, "FeeOracle"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        w3,
+        blocks: int = 20,
+        urgency: Optional[Dict[str, int]] = None,
+        base_fee_multiplier: int = 2,
+        min_priority_fee_gwei: float = 0.0,
+        poll_interval: float = 2.0,
+        ttl: float = 30.0,
+        background: bool = True
+    ):
+        """
+        Args:
+            w3: Instância Web3 conectada
+            blocks: Blocos de histórico considerados (eth_feeHistory)
+            urgency: Nome da urgência -> percentil de gorjeta (padrão: low=10, medium=50, high=90)
+            base_fee_multiplier: maxFeePerGas = baseFee * multiplicador + gorjeta
+            min_priority_fee_gwei: Piso da gorjeta (ex.: 25 na Polygon, que recusa menos)
+            poll_interval: Segundos entre checagens de bloco novo na thread de background
+            ttl: Idade máxima do snapshot antes de buscar de novo de forma síncrona
+            background: Se True, inicia a thread de atualização no primeiro uso
+        """
+        self.w3 = w3
+        self.blocks = blocks
+        self.urgency = dict(urgency or DEFAULT_URGENCY)
+        self.base_fee_multiplier = base_fee_multiplier
+        self.min_priority_fee_wei = int(min_priority_fee_gwei * 10**9)
+        self.poll_interval = poll_interval
+        self.ttl = ttl
+        self.background = background
+        self.stats = {"served": 0, "refreshes": 0, "sync_refreshes": 0, "errors": 0}
+        self._snapshot: Optional[FeeSnapshot] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def shared(cls, w3, **options) -> "FeeOracle":
+        """
+        Oráculo único por RPC no processo (SDK, verificador e tenants da mesma
+        rede dividem o mesmo); as opções valem só na primeira criação
+        """
+        key = provider_key(w3)
+        with cls._shared_lock:
+            oracle = cls._shared.get(key)
+            if oracle is None:
+                oracle = cls._shared[key] = cls(w3, **options)
+            return oracle
+
+    # ------------------------------------------------------------
+    # Atualização
+    # ------------------------------------------------------------
+
+    def _fetch(self) -> FeeSnapshot:
+        percentiles = sorted(set(self.urgency.values()))
+        history = self.w3.eth.fee_history(self.blocks, "latest", percentiles)
+        base_fees = history.get("baseFeePerGas") or []
+        newest = history["oldestBlock"] + len(history.get("gasUsedRatio") or []) - 1
+        # O último baseFeePerGas é o do próximo bloco
+        base_fee = base_fees[-1] if base_fees else 0
+        if not base_fee:
+            return FeeSnapshot(block=newest, base_fee=0, gas_price=self.w3.eth.gas_price, fetched_at=time.time())
+
+        # Blocos vazios reportam gorjeta 0 e puxariam a mediana para baixo
+        rewards = [
+            reward for reward, ratio in zip(history.get("reward") or [], history.get("gasUsedRatio") or [])
+            if ratio > 0 and reward
+        ]
+        fallback = None
+        priority_fees = {}
+        for name, percentile in self.urgency.items():
+            index = percentiles.index(percentile)
+            fee = _median([reward[index] for reward in rewards])
+            if not fee:
+                if fallback is None:
+                    fallback = self.w3.eth.max_priority_fee
+                fee = fallback
+            priority_fees[name] = max(fee, self.min_priority_fee_wei)
+        return FeeSnapshot(block=newest, base_fee=base_fee, priority_fees=priority_fees, fetched_at=time.time())
+
+    def refresh(self) -> FeeSnapshot:
+        """Busca o eth_feeHistory agora e troca o snapshot"""
+        snapshot = self._fetch()
+        with self._lock:
+            self._snapshot = snapshot
+            self.stats["refreshes"] += 1
+        return snapshot
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                snapshot = self._snapshot
+                if snapshot is None or self.w3.eth.block_number > snapshot.block:
+                    self.refresh()
+            except Exception as e:
+                # Segue servindo o último snapshot até o ttl vencer
+                self.stats["errors"] += 1
+                logger.warning(f"Oráculo de taxas: falha ao atualizar ({e})")
+
+    def start(self):
+        """Inicia a thread que atualiza a cada bloco novo"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="fee-oracle", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    # ------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------
+
+    def snapshot(self) -> FeeSnapshot:
+        """Snapshot atual (busca de forma síncrona se não há um ou se passou do ttl)"""
+        if self.background and self._thread is None:
+            with self._refresh_lock:
+                self.start()
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.age > self.ttl:
+            # Um só busca; quem chegou junto reaproveita o resultado
+            with self._refresh_lock:
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.age > self.ttl:
+                    self.stats["sync_refreshes"] += 1
+                    snapshot = self.refresh()
+        self.stats["served"] += 1
+        return snapshot
+
+    def _fees(self, snapshot: FeeSnapshot, urgency: str, base_fee_multiplier: Optional[int]) -> tuple:
+        if not snapshot.base_fee:
+            return snapshot.gas_price, snapshot.gas_price
+        priority_fee = snapshot.priority_fees[urgency]
+        multiplier = self.base_fee_multiplier if base_fee_multiplier is None else base_fee_multiplier
+        return snapshot.base_fee * multiplier + priority_fee, priority_fee
+
+    def fees(self, urgency: str = "medium", base_fee_multiplier: Optional[int] = None) -> tuple:
+        """
+        Retorna (maxFeePerGas, maxPriorityFeePerGas) em wei para a urgência
+        (em redes sem EIP-1559, gasPrice nos dois)
+
+        Raises:
+            KeyError: Urgência não configurada
+        """
+        return self._fees(self.snapshot(), urgency, base_fee_multiplier)
+
+    def tx_fees(self, urgency: str = "medium") -> Dict[str, int]:
+        """Campos de taxa para o dict da transação (EIP-1559, ou gasPrice em redes legadas)"""
+        snapshot = self.snapshot()
+        if not snapshot.base_fee:
+            return {"gasPrice": snapshot.gas_price}
+        max_fee, priority_fee = self._fees(snapshot, urgency, None)
+        return {"maxFeePerGas": max_fee, "maxPriorityFeePerGas": priority_fee}
@@ -0,0 +1,188 @@
+"""
+ANNA Protocol - Estimativa de gas em cache
+
+Em vez de um limite de gas fixo por chamada (200000/300000), que reserva
+espaço demais no bloco e não cobre strings longas em category/modelVersion
+ou listas grandes de specializations, o estimador roda eth_estimateGas uma
+vez por (contrato, função, faixa de tamanho do calldata) e guarda o
+resultado:
+
+- o limite devolvido é a estimativa * (1 + margin)
+- faixas de `bucket_bytes` bytes: chamadas de tamanho parecido custam
+  parecido; um calldata maior que o já medido na faixa estima de novo e a
+  faixa fica com a maior estimativa
+- transação que falhou sem gas (gasUsed ~ limite) ou estimativa que reverteu
+  derruba a entrada; a próxima chamada estima de novo (depois de falta de
+  gas, nunca abaixo do limite que falhou)
+
+Uso:
+    estimator = GasEstimator.shared(w3)      # um por RPC no processo
+    tx["gas"] = estimator.estimate(tx)       # tx com 'from', 'to' e 'data'
+    gas = estimator.estimate_call(contract.functions.registerAgent(...), conta)
+    ...
+    estimator.observe(tx, receipt)           # refaz a estimativa se faltou gas
+"""
+
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from anna_batch import encode_call
+from anna_rpc import provider_key
+
+logger = logging.getLogger(__name__)
+
+# Fração do limite a partir da qual uma tx revertida é tratada como "sem gas"
+OUT_OF_GAS_RATIO = 0.95
+
+
+@dataclass
+class GasEntry:
+    """Estimativa guardada para uma faixa de calldata"""
+    gas: int  # resultado bruto do eth_estimateGas (sem margem)
+    size: int  # tamanho do calldata medido (bytes)
+    estimated_at: float
+
+
+def _data(tx: Dict) -> bytes:
+    data = tx.get("data") or tx.get("input") or b""
+    if isinstance(data, str):
+        return bytes.fromhex(data[2:] if data.startswith("0x") else data)
+    return bytes(data)
+
+
+class GasEstimator:
+    """Limites de gas estimados uma vez por função e faixa de calldata"""
+
+    _shared: Dict[object, "GasEstimator"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        w3,
+        margin: float = 0.2,
+        bucket_bytes: int = 256,
+        max_gas: Optional[int] = None
+    ):
+        """
+        Args:
+            w3: Instância Web3 conectada
+            margin: Folga sobre a estimativa (0.2 = +20%)
+            bucket_bytes: Largura das faixas de tamanho de calldata
+            max_gas: Teto opcional do limite devolvido
+        """
+        self.w3 = w3
+        self.margin = margin
+        self.bucket_bytes = max(32, bucket_bytes)
+        self.max_gas = max_gas
+        self.stats = {"hits": 0, "estimates": 0, "invalidations": 0, "out_of_gas": 0}
+        self._entries: Dict[Tuple, GasEntry] = {}
+        self._floors: Dict[Tuple, int] = {}  # limites que já falharam sem gas
+        self._lock = threading.Lock()
+        self._estimate_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, w3, **options) -> "GasEstimator":
+        """
+        Estimador único por RPC no processo (SDK, verificador e tenants da
+        mesma rede dividem o cache); as opções valem só na primeira criação
+        """
+        key = provider_key(w3)
+        with cls._shared_lock:
+            estimator = cls._shared.get(key)
+            if estimator is None:
+                estimator = cls._shared[key] = cls(w3, **options)
+            return estimator
+
+    def key(self, tx: Dict) -> Tuple:
+        """(contrato, seletor, faixa de tamanho) da chamada"""
+        data = _data(tx)
+        return (str(tx.get("to") or "").lower(), data[:4], len(data) // self.bucket_bytes)
+
+    def _limit(self, gas: int) -> int:
+        limit = int(gas * (1 + self.margin))
+        return min(limit, self.max_gas) if self.max_gas else limit
+
+    def _fresh(self, key: Tuple, size: int) -> Optional[GasEntry]:
+        entry = self._entries.get(key)
+        return entry if entry is not None and entry.size >= size else None
+
+    def estimate(self, tx: Dict) -> int:
+        """
+        Limite de gas para a transação (da memória, ou via eth_estimateGas na
+        primeira chamada da faixa)
+
+        Args:
+            tx: Dict com 'from', 'to', 'data' e opcionalmente 'value'
+
+        Raises:
+            ContractLogicError: A chamada reverteria (nada é guardado)
+        """
+        key = self.key(tx)
+        size = len(_data(tx))
+        with self._lock:
+            entry = self._fresh(key, size)
+        if entry is not None:
+            self.stats["hits"] += 1
+            return self._limit(entry.gas)
+        # Uma estimativa por vez; quem esperava reaproveita o resultado
+        with self._estimate_lock:
+            with self._lock:
+                entry = self._fresh(key, size)
+            if entry is None:
+                entry = self._estimate(key, tx, size)
+                self.stats["estimates"] += 1
+            else:
+                self.stats["hits"] += 1
+        return self._limit(entry.gas)
+
+    def estimate_call(self, function, sender: str, value: int = 0) -> int:
+        """Como estimate(), a partir de uma ContractFunction com argumentos"""
+        return self.estimate({
+            "from": sender,
+            "to": function.address,
+            "data": encode_call(self.w3.codec, function),
+            "value": value
+        })
+
+    def _estimate(self, key: Tuple, tx: Dict, size: int) -> GasEntry:
+        params = {"from": tx["from"], "to": tx["to"], "data": "0x" + _data(tx).hex()}
+        if tx.get("value"):
+            params["value"] = tx["value"]
+        try:
+            gas = self.w3.eth.estimate_gas(params)
+        except Exception:
+            self.invalidate(tx)
+            raise
+        with self._lock:
+            previous = self._entries.get(key)
+            gas = max(gas, previous.gas if previous else 0, self._floors.get(key, 0))
+            entry = GasEntry(gas=gas, size=size, estimated_at=time.time())
+            self._entries[key] = entry
+        return entry
+
+    def invalidate(self, tx: Dict):
+        """Descarta a estimativa da faixa da transação"""
+        with self._lock:
+            if self._entries.pop(self.key(tx), None) is not None:
+                self.stats["invalidations"] += 1
+
+    def observe(self, tx: Dict, receipt) -> bool:
+        """
+        Confere o recibo: se a transação reverteu usando quase todo o limite,
+        a estimativa da faixa é descartada e o limite que falhou vira piso
+
+        Returns:
+            True se a falha foi tratada como falta de gas
+        """
+        if receipt["status"] == 1 or receipt["gasUsed"] < tx["gas"] * OUT_OF_GAS_RATIO:
+            return False
+        self.stats["out_of_gas"] += 1
+        logger.warning(f"Transação sem gas ({receipt['gasUsed']}/{tx['gas']}); estimativa descartada")
+        with self._lock:
+            key = self.key(tx)
+            self._floors[key] = max(self._floors.get(key, 0), tx["gas"])
+        self.invalidate(tx)
+        return True
@@ -0,0 +1,186 @@
+"""
+ANNA Protocol - Leituras agregadas com Multicall3
+
+Empacota centenas de leituras de contrato (attestations, agentIdByAddress,
+getAgentMetadata, getFullReputation, ...) em uma única chamada
+aggregate3 do Multicall3, executada como um eth_call em um bloco fixo.
+Todas as leituras enxergam o mesmo estado, e 1000 leituras custam
+1000 / calls_per_multicall eth_call em vez de 1000. Quando há mais de um
+aggregate3, eles seguem juntos em lotes JSON-RPC (CallBatcher).
+
+O Multicall3 canônico já existe na Polygon e na Amoy; em redes locais
+use contracts/scripts/deploy-multicall.js (ou a devchain, que o simula).
+
+Uso:
+    multicall = Multicall(w3)
+    ids, reps = multicall.call_groups(
+        [identity.functions.agentIdByAddress(a) for a in agentes],
+        [reputation.functions.getFullReputation(a) for a in agentes]
+    )
+"""
+
+import logging
+from typing import Any, List, Optional, Sequence, Union
+
+from web3 import Web3
+
+from anna_batch import CallBatcher, CallError, decode_result, encode_call
+
+logger = logging.getLogger(__name__)
+
+# Mesmo endereço em Polygon, Amoy e na maioria das redes EVM
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# Error(string) padrão do Solidity
+_ERROR_SELECTOR = bytes.fromhex("08c379a0")
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"}
+                ],
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"}
+                ],
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    },
+    {
+        "inputs": [],
+        "name": "getBlockNumber",
+        "outputs": [{"name": "blockNumber", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+
+def _revert_message(codec, data: bytes) -> str:
+    if data[:4] == _ERROR_SELECTOR:
+        try:
+            return codec.decode(["string"], data[4:])[0]
+        except Exception:
+            pass
+    return f"revert 0x{data.hex()}" if data else "revert"
+
+
+class Multicall:
+    """Agrega leituras de contrato via Multicall3.aggregate3 em um bloco fixo"""
+
+    def __init__(
+        self,
+        w3,
+        address: str = MULTICALL3_ADDRESS,
+        calls_per_multicall: int = 200,
+        batcher: Optional[CallBatcher] = None
+    ):
+        """
+        Args:
+            w3: Instância Web3 conectada
+            address: Endereço do Multicall3 (padrão: canônico)
+            calls_per_multicall: Leituras por aggregate3 (limita gás e tamanho da resposta do eth_call)
+            batcher: CallBatcher usado para enviar vários aggregate3 juntos
+        """
+        self.w3 = w3
+        self.address = Web3.to_checksum_address(address)
+        self.calls_per_multicall = max(1, calls_per_multicall)
+        self.batcher = batcher or CallBatcher(w3)
+        self.contract = w3.eth.contract(address=self.address, abi=MULTICALL3_ABI)
+        self.last_block: Optional[int] = None
+        self._available: Optional[bool] = None
+
+    def available(self) -> bool:
+        """Se há Multicall3 implantado no endereço (consultado uma vez)"""
+        if self._available is None:
+            try:
+                self._available = len(self.w3.eth.get_code(self.address)) > 0
+            except Exception as e:
+                logger.warning(f"Não foi possível checar o Multicall3 em {self.address}: {e}")
+                self._available = False
+            if not self._available:
+                logger.info(f"Sem Multicall3 em {self.address}; leituras em massa usam lotes JSON-RPC")
+        return self._available
+
+    def resolve_block(self, block: Union[int, str] = "latest") -> int:
+        """Fixa "latest" no número do bloco atual (para encadear leituras no mesmo estado)"""
+        return self.w3.eth.block_number if block == "latest" else block
+
+    def call(
+        self,
+        functions: Sequence,
+        block: Union[int, str] = "latest",
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        Executa as leituras via aggregate3 e devolve os resultados na ordem de entrada
+
+        Args:
+            functions: ContractFunction já com argumentos (ex.: contract.functions.f(x))
+            block: Bloco lido ("latest" é fixado no número atual; ver last_block)
+            return_exceptions: Se True, leituras que reverteram viram CallError em vez de levantar
+
+        Raises:
+            CallError: Primeira leitura com erro (quando return_exceptions=False)
+        """
+        functions = list(functions)
+        if not functions:
+            return []
+        block = self.resolve_block(block)
+        self.last_block = block
+        outputs = self.batcher.call(self.aggregates(functions), block=block)
+        return self.unpack(functions, outputs, return_exceptions)
+
+    def aggregates(self, functions: Sequence) -> List:
+        """Chamadas aggregate3 (ContractFunction) com as leituras, calls_per_multicall por chamada"""
+        codec = self.w3.codec
+        calls = [(f.address, True, encode_call(codec, f)) for f in functions]
+        size = self.calls_per_multicall
+        return [self.contract.functions.aggregate3(calls[i:i + size]) for i in range(0, len(calls), size)]
+
+    def unpack(self, functions: Sequence, outputs: Sequence, return_exceptions: bool = False) -> List[Any]:
+        """Resultados das leituras a partir dos retornos decodificados de aggregates()"""
+        codec = self.w3.codec
+        results = []
+        for function, (success, data) in zip(functions, (item for output in outputs for item in output)):
+            if success:
+                result = decode_result(codec, function, data)
+            else:
+                result = CallError(_revert_message(codec, data), data=data)
+            if isinstance(result, CallError) and not return_exceptions:
+                raise result
+            results.append(result)
+        return results
+
+    def call_groups(
+        self,
+        *groups: Sequence,
+        block: Union[int, str] = "latest",
+        return_exceptions: bool = False
+    ) -> List[List[Any]]:
+        """
+        Como call(), para vários grupos de leituras de uma vez (ex.: ids e
+        reputações dos mesmos agentes); devolve uma lista de resultados por grupo
+        """
+        groups = [list(group) for group in groups]
+        flat = self.call([f for group in groups for f in group], block=block, return_exceptions=return_exceptions)
+        results, start = [], 0
+        for group in groups:
+            results.append(flat[start:start + len(group)])
+            start += len(group)
+        return results
@@ -0,0 +1,182 @@
+"""
+ANNA Protocol - Nonces locais por wallet
+
+Em vez de um eth_getTransactionCount por transação (duas transações no mesmo
+bloco recebem o mesmo nonce e uma substitui ou derruba a outra), o gerenciador
+busca o nonce "pending" do nó uma vez e incrementa localmente:
+
+- next(): próximo nonce (thread-safe; a primeira chamada consulta o nó)
+- release(nonce): envio recusado; o nonce volta a ser usado pelo próximo
+  envio (os devolvidos saem antes dos novos, então a lacuna é preenchida sem
+  mexer nos nonces já em voo)
+- resync(): relê o nonce "pending" do nó sem voltar atrás dos já alocados
+  (ex.: "nonce too low" porque outro processo usou a mesma wallet)
+- reset(): relê o nonce do nó e descarta o contador local (transações que
+  não saíram do mempool; só com nada em voo)
+
+Uso:
+    nonces = NonceManager.shared(w3, conta.address)   # um por RPC e wallet no processo
+    tx["nonce"] = nonces.next()
+    try:
+        w3.eth.send_raw_transaction(...)
+    except Exception as e:
+        if is_nonce_conflict(e): nonces.resync()
+        else: nonces.release(tx["nonce"])
+
+Erro transitório (timeout, conexão caída, -32005/rate limit) não diz se a
+transação chegou ao nó: reenvie a mesma transação assinada ("already known"
+conta como enviada) antes de devolver o nonce. Um nonce devolvido abaixo de
+outros já enviados deixa uma lacuna que prende as transações de cima até ser
+ocupado: release() retorna False nesse caso e take_released() entrega o nonce
+para quem vai preencher a lacuna.
+"""
+
+import heapq
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from anna_rpc import RETRYABLE_CODES, RETRYABLE_MESSAGES, provider_key
+
+logger = logging.getLogger(__name__)
+
+# Nonce já usado por outra transação (minerada ou no mempool)
+NONCE_CONFLICT_ERRORS = ("nonce too low", "replacement transaction underpriced")
+# A mesma transação assinada já está no mempool: o envio vale
+ALREADY_KNOWN_ERRORS = ("already known", "known transaction")
+# Falhas de rede (ConnectionError, timeouts, requests): a transação pode ter chegado
+TRANSPORT_ERRORS = (OSError,)
+# Reenvios da mesma transação assinada depois de erro transitório (espera dobra a cada um)
+SEND_RETRIES = 3
+SEND_RETRY_DELAY = 0.2
+
+
+def _message(error: Exception) -> str:
+    return str(error).lower()
+
+
+def is_nonce_conflict(error: Exception) -> bool:
+    return any(text in _message(error) for text in NONCE_CONFLICT_ERRORS)
+
+
+def is_already_known(error: Exception) -> bool:
+    return any(text in _message(error) for text in ALREADY_KNOWN_ERRORS)
+
+
+def _rpc_error(error: Exception) -> Dict:
+    response = getattr(error, "rpc_response", None)  # web3 7: Web3RPCError
+    if isinstance(response, dict) and isinstance(response.get("error"), dict):
+        return response["error"]
+    if error.args and isinstance(error.args[0], dict):  # web3 6: ValueError({...})
+        return error.args[0]
+    return {}
+
+
+def is_transient(error: Exception, extra: tuple = ()) -> bool:
+    """
+    Falha de rede ou sobrecarga do nó, não recusa da transação (extra:
+    exceções de outro transporte, ex. aiohttp.ClientError)
+    """
+    if isinstance(error, TRANSPORT_ERRORS + tuple(extra)):
+        return True
+    message = _message(error)
+    return _rpc_error(error).get("code") in RETRYABLE_CODES or any(m in message for m in RETRYABLE_MESSAGES)
+
+
+class NonceManager:
+    """Nonces de uma wallet alocados localmente, ressincronizados com o nó em conflitos e lacunas"""
+
+    _shared: Dict[object, "NonceManager"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, w3, address: str):
+        """
+        Args:
+            w3: Instância Web3 conectada
+            address: Wallet que assina as transações
+        """
+        self.w3 = w3
+        self.address = address
+        self.stats = {"allocated": 0, "released": 0, "resyncs": 0, "resets": 0}
+        self._next: Optional[int] = None
+        self._released: List[int] = []  # heap de nonces devolvidos abaixo de _next
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, w3, address: str, chain_id: Optional[int] = None) -> "NonceManager":
+        """
+        Gerenciador único por RPC e wallet no processo (clientes da mesma wallet não colidem)
+
+        Args:
+            chain_id: Se informado, a chave é a rede e não o RPC: conexões
+                diferentes para a mesma chain (outra URL, outro tenant) dividem
+                o mesmo contador
+        """
+        key = (("chain", chain_id) if chain_id is not None else provider_key(w3), address.lower())
+        with cls._shared_lock:
+            manager = cls._shared.get(key)
+            if manager is None:
+                manager = cls._shared[key] = cls(w3, address)
+            return manager
+
+    def _fetch(self) -> int:
+        return self.w3.eth.get_transaction_count(self.address, "pending")
+
+    def next(self) -> int:
+        """Próximo nonce: um devolvido (o menor), senão o contador local"""
+        with self._lock:
+            self.stats["allocated"] += 1
+            if self._released:
+                return heapq.heappop(self._released)
+            if self._next is None:
+                self._next = self._fetch()
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def release(self, nonce: int) -> bool:
+        """
+        Devolve um nonce que não chegou a ser usado (o próximo next() o reaproveita)
+
+        Returns:
+            False se nonces acima dele já foram alocados: há uma lacuna até
+            alguém usar o nonce (next() ou take_released())
+        """
+        with self._lock:
+            self.stats["released"] += 1
+            if self._next is None or nonce >= self._next or nonce in self._released:
+                return True
+            if nonce == self._next - 1:
+                self._next = nonce
+                return True
+            heapq.heappush(self._released, nonce)
+            return False
+
+    def take_released(self) -> Optional[int]:
+        """Menor nonce devolvido ainda não reaproveitado (None se não há lacuna)"""
+        with self._lock:
+            return heapq.heappop(self._released) if self._released else None
+
+    def resync(self) -> int:
+        """
+        Relê o nonce "pending" do nó; o contador só avança (nonces já alocados
+        e em voo não são entregues de novo) e devolvidos que o nó já passou
+        são descartados
+        """
+        with self._lock:
+            pending = self._fetch()
+            self._next = max(pending, self._next or 0)
+            self._released = [nonce for nonce in self._released if nonce >= pending]
+            heapq.heapify(self._released)
+            self.stats["resyncs"] += 1
+            logger.info(f"Nonce de {self.address} ressincronizado com o nó: {self._next}")
+            return self._next
+
+    def reset(self) -> int:
+        """Volta ao nonce "pending" do nó, descartando contador e devolvidos"""
+        with self._lock:
+            self._next = self._fetch()
+            self._released = []
+            self.stats["resets"] += 1
+            logger.info(f"Nonce de {self.address} reiniciado a partir do nó: {self._next}")
+            return self._next
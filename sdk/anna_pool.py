@@ -0,0 +1,157 @@
+"""
+ANNA Protocol - Pool de clientes para muitas wallets de agentes
+
+Operadores com centenas de wallets não precisam de um ANNAClient completo por
+agente (um HTTPProvider, um is_connected(), ABIs e objetos de contrato a cada
+vez): o pool conecta uma vez e cada agente recebe um cliente leve sobre a
+mesma conexão.
+
+Compartilhado entre os agentes:
+- Provider (com failover e cache de respostas JSON-RPC), contratos e Multicall3
+- FeeOracle, GasEstimator e ReceiptWatcher
+
+Próprio de cada agente:
+- Conta e fila de nonces (NonceManager): agentes diferentes enviam em
+  paralelo, e transações da mesma wallet nunca repetem nonce, mesmo vindas de
+  várias threads
+
+Uso:
+    pool = ANNAClientPool(network="polygon-amoy", identity_contract="0x...",
+                          attestation_contract="0x...")
+    for chave in chaves:
+        pool.add(chave)
+    pool[endereco].submit_attestation(content, reasoning, "legal-contract")
+    resultados = pool.map(lambda client: client.submit_attestations(itens[client.address]))
+    pool.remove(endereco)
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from eth_account import Account
+from web3 import Web3
+
+from anna_sdk import ANNAClient
+
+logger = logging.getLogger(__name__)
+
+
+class ANNAClientPool:
+    """Clientes de várias wallets sobre uma conexão, um oráculo de taxas e um watcher de recibos"""
+
+    def __init__(self, private_keys: Iterable[str] = (), max_workers: int = 16, **client_options):
+        """
+        Args:
+            private_keys: Chaves dos agentes iniciais (outras entram com add())
+            max_workers: Threads usadas por map()
+            **client_options: Opções do ANNAClient (network, contratos, rpc_urls,
+                fee_urgency, confirmations, ...), iguais para todos os agentes
+
+        Raises:
+            ConnectionError: RPC inacessível (verificado uma vez, aqui)
+        """
+        # Cliente modelo: conecta, carrega ABIs e cria os contratos uma vez.
+        # A conta dele é descartável e nunca assina.
+        self._template = ANNAClient(private_key=Account.create().key, **client_options)
+        self.max_workers = max_workers
+        self._clients: Dict[str, ANNAClient] = {}
+        self._lock = threading.Lock()
+        for private_key in private_keys:
+            self.add(private_key)
+
+    @property
+    def w3(self) -> Web3:
+        return self._template.w3
+
+    @property
+    def fee_oracle(self):
+        return self._template.fee_oracle
+
+    @property
+    def receipts(self):
+        return self._template.receipts
+
+    def add(self, private_key: str) -> ANNAClient:
+        """Adiciona um agente (a mesma wallet de novo devolve o cliente existente)"""
+        client = self._template.with_account(private_key)
+        with self._lock:
+            existing = self._clients.get(client.address.lower())
+            if existing is not None:
+                return existing
+            self._clients[client.address.lower()] = client
+        logger.info(f"Agente {client.address} adicionado ao pool ({len(self)} agentes)")
+        return client
+
+    def remove(self, address: str) -> Optional[ANNAClient]:
+        """
+        Retira um agente do pool; envios em andamento terminam normalmente e a
+        fila de nonces da wallet continua valendo se ela voltar
+
+        Returns:
+            O cliente retirado (None se a wallet não estava no pool)
+        """
+        with self._lock:
+            client = self._clients.pop(address.lower(), None)
+        if client is not None:
+            logger.info(f"Agente {client.address} retirado do pool ({len(self)} agentes)")
+        return client
+
+    def get(self, address: str) -> Optional[ANNAClient]:
+        with self._lock:
+            return self._clients.get(address.lower())
+
+    def __getitem__(self, address: str) -> ANNAClient:
+        client = self.get(address)
+        if client is None:
+            raise KeyError(address)
+        return client
+
+    def __contains__(self, address: str) -> bool:
+        return self.get(address) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+    def __iter__(self) -> Iterator[ANNAClient]:
+        return iter(self.clients())
+
+    def clients(self) -> List[ANNAClient]:
+        """Cópia da lista de agentes (add/remove durante a iteração não a alteram)"""
+        with self._lock:
+            return list(self._clients.values())
+
+    @property
+    def addresses(self) -> List[str]:
+        return [client.address for client in self.clients()]
+
+    def map(self, function: Callable[[ANNAClient], object], addresses: Optional[List[str]] = None) -> Dict[str, object]:
+        """
+        Executa function(cliente) para cada agente em paralelo
+
+        Args:
+            function: Chamada por agente (ex.: lambda c: c.submit_attestation(...))
+            addresses: Agentes a usar (se None, todos do pool)
+
+        Returns:
+            Dict endereço -> resultado, ou a exceção levantada para aquele agente
+        """
+        clients = self.clients() if addresses is None else [self[address] for address in addresses]
+        if not clients:
+            return {}
+
+        def run(client):
+            try:
+                return function(client)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(clients)), thread_name_prefix="agent") as pool:
+            return dict(zip((client.address for client in clients), pool.map(run, clients)))
+
+    def get_reputations(self) -> Dict[str, int]:
+        """Scores de todos os agentes do pool em lote"""
+        addresses = self.addresses
+        return dict(zip(addresses, self._template.get_reputations(addresses)))
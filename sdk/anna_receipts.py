@@ -0,0 +1,393 @@
+"""
+ANNA Protocol - Watcher de recibos guiado por blocos
+
+wait_for_transaction_receipt por transação faz cada chamador consultar o nó
+sozinho: 500 transações pendentes são 500 loops de polling. O watcher lê
+cada bloco novo uma única vez, cruza as transações dele com uma tabela de
+futures indexada pelo hash e busca (em lote) só os recibos das transações
+encontradas:
+
+- confirmations: o future só resolve quando o bloco da transação tem N
+  blocos por cima; reorgs (parentHash diferente do bloco lido antes) devolvem
+  as transações dos blocos descartados para a tabela de pendentes
+- hashes vistos nos últimos blocos ficam indexados: watch() de uma
+  transação que já foi minerada resolve no próximo ciclo
+- pendentes há mais de fallback_interval segundos são conferidos direto
+  no nó (cobre o que foi minerado antes do watcher começar)
+- sem transações pendentes a thread fica parada (nenhuma chamada RPC)
+- vários watch() do mesmo hash têm futures, prazos e confirmações próprios
+- o número do bloco atual é lido direto no provider, fora do anna_cache
+
+Uso (síncrono ou asyncio):
+    watcher = ReceiptWatcher.shared(w3)
+    receipt = watcher.wait(tx_hash, confirmations=2)
+    receipt = await watcher.wait_async(tx_hash)
+    future = watcher.watch(tx_hash)          # concurrent.futures.Future
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple, Union
+
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from anna_rpc import provider_key
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(tx_hash: Union[str, bytes]) -> str:
+    if isinstance(tx_hash, str):
+        return "0x" + tx_hash.lower().removeprefix("0x")
+    return "0x" + bytes(tx_hash).hex()
+
+
+class _Watch:
+    """Uma transação aguardada"""
+    __slots__ = ("future", "confirmations", "deadline", "checked_at")
+
+    def __init__(self, future: Future, confirmations: int, deadline: Optional[float]):
+        self.future = future
+        self.confirmations = confirmations
+        self.deadline = deadline
+        self.checked_at = time.monotonic()
+
+
+class ReceiptWatcher:
+    """Resolve os recibos de muitas transações lendo cada bloco uma vez"""
+
+    _shared: Dict[object, "ReceiptWatcher"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        w3,
+        poll_interval: float = 0.5,
+        confirmations: int = 0,
+        history_blocks: int = 64,
+        fallback_interval: float = 60.0
+    ):
+        """
+        Args:
+            w3: Instância Web3 conectada
+            poll_interval: Segundos entre checagens de bloco novo (só com transações aguardadas)
+            confirmations: Blocos por cima exigidos por padrão antes de resolver
+            history_blocks: Blocos recentes indexados (hashes de transações e de blocos, para reorgs)
+            fallback_interval: Pendentes há mais que isso são conferidos direto no nó
+        """
+        self.w3 = w3
+        self.poll_interval = poll_interval
+        self.confirmations = confirmations
+        self.history_blocks = history_blocks
+        self.fallback_interval = fallback_interval
+        self.stats = {"blocks": 0, "resolved": 0, "timeouts": 0, "reorgs": 0, "receipt_requests": 0}
+        # Hash -> watches (um por chamada de watch()) e, nos minerados, o número do bloco
+        self._pending: Dict[str, List[_Watch]] = {}
+        self._mined: Dict[str, Tuple[List[_Watch], int]] = {}
+        # Blocos recentes: número -> hash, e hash de transação -> número do bloco
+        self._block_hashes: Dict[int, bytes] = {}
+        self._recent: Dict[str, int] = {}
+        self._recent_blocks = deque()
+        self._last: Optional[int] = None
+        self._lock = threading.Lock()
+        self._tick_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def shared(cls, w3, **options) -> "ReceiptWatcher":
+        """
+        Watcher único por RPC no processo (SDK, verificador e tenants da mesma
+        rede dividem a mesma leitura de blocos); as opções valem só na primeira criação
+        """
+        key = provider_key(w3)
+        with cls._shared_lock:
+            watcher = cls._shared.get(key)
+            if watcher is None:
+                watcher = cls._shared[key] = cls(w3, **options)
+            return watcher
+
+    # ------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------
+
+    def watch(
+        self,
+        tx_hash: Union[str, bytes],
+        timeout: Optional[float] = None,
+        confirmations: Optional[int] = None
+    ) -> Future:
+        """
+        Future resolvido com o recibo (AttributeDict, como o do web3) quando a
+        transação tiver `confirmations` blocos por cima
+
+        Raises (no future):
+            TimeExhausted: Passou `timeout` segundos sem o recibo
+        """
+        tx_hash = _normalize(tx_hash)
+        future = Future()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        watch = _Watch(future, self.confirmations if confirmations is None else confirmations, deadline)
+        with self._lock:
+            if tx_hash in self._pending:
+                self._pending[tx_hash].append(watch)
+            elif tx_hash in self._mined:
+                self._mined[tx_hash][0].append(watch)
+            else:
+                block = self._recent.get(tx_hash)
+                if block is not None:
+                    self._mined[tx_hash] = ([watch], block)
+                else:
+                    self._pending[tx_hash] = [watch]
+        self._start()
+        self._wake.set()
+        return future
+
+    def wait(
+        self,
+        tx_hash: Union[str, bytes],
+        timeout: Optional[float] = 120,
+        confirmations: Optional[int] = None
+    ):
+        """Bloqueia até o recibo (substituto de w3.eth.wait_for_transaction_receipt)"""
+        return self.watch(tx_hash, timeout, confirmations).result()
+
+    async def wait_async(
+        self,
+        tx_hash: Union[str, bytes],
+        timeout: Optional[float] = 120,
+        confirmations: Optional[int] = None
+    ):
+        """Como wait(), sem bloquear o event loop"""
+        return await asyncio.wrap_future(self.watch(tx_hash, timeout, confirmations))
+
+    def forget(self, tx_hash: Union[str, bytes]):
+        """Para de aguardar a transação (ex.: versão substituída) e cancela os futures dela"""
+        tx_hash = _normalize(tx_hash)
+        with self._lock:
+            watches = self._pending.pop(tx_hash, None)
+            if watches is None:
+                watches = (self._mined.pop(tx_hash, None) or ([], None))[0]
+        for watch in watches:
+            watch.future.cancel()
+
+    def __len__(self) -> int:
+        return len(self._pending) + len(self._mined)
+
+    # ------------------------------------------------------------
+    # Thread
+    # ------------------------------------------------------------
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="receipt-watcher", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not len(self):
+                # Nada aguardado: dorme até o próximo watch()
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            self._wake.clear()
+            try:
+                self.tick()
+            except Exception as e:
+                logger.warning(f"Watcher de recibos: falha ao ler blocos ({e})")
+            # Próximo ciclo em poll_interval, ou antes se chegar um watch() novo
+            # (a transação pode já estar minerada), nunca mais de 10 por intervalo
+            self._stop.wait(self.poll_interval / 10)
+            self._wake.wait(self.poll_interval * 0.9)
+
+    def tick(self):
+        """Um ciclo: lê os blocos novos, resolve os confirmados, confere atrasados e expira"""
+        with self._tick_lock:
+            self._tick()
+
+    def _head(self) -> int:
+        # Direto no provider: o eth_blockNumber do cache (anna_cache) atrasaria
+        # em até head_ttl a descoberta do bloco que o watcher existe para ver
+        response = self.w3.provider.make_request("eth_blockNumber", [])
+        if "error" in response:
+            raise ValueError(response["error"])
+        return int(response["result"], 16)
+
+    def _tick(self):
+        head = self._head()
+        if self._last is None or head - self._last > self.history_blocks:
+            # Primeiro ciclo (ou volta de um longo período parado): relê só os
+            # últimos history_blocks (transações enviadas antes do watch())
+            self._last = max(head - self.history_blocks, -1)
+        while self._last < head:
+            numbers = list(range(self._last + 1, min(head, self._last + self.history_blocks) + 1))
+            if not all(self._scan(number, block) for number, block in zip(numbers, self._blocks(numbers))):
+                break
+        self._resolve(head)
+        self._fallback()
+        self._expire()
+
+    def _blocks(self, numbers: List[int]) -> List:
+        """Blocos (só hashes das transações) em um lote JSON-RPC (individuais se o lote falhar)"""
+        if len(numbers) == 1:
+            return [self.w3.eth.get_block(numbers[0])]
+        try:
+            with self.w3.batch_requests() as batch:
+                for number in numbers:
+                    batch.add(self.w3.eth.get_block(number))
+                return list(batch.execute())
+        except Exception:
+            return [self.w3.eth.get_block(number) for number in numbers]
+
+    def _scan(self, number: int, block) -> bool:
+        if block is None:
+            return False
+        parent = self._block_hashes.get(number - 1)
+        if parent is not None and bytes(block["parentHash"]) != parent:
+            self._rewind(number - 1)
+            return False
+
+        hashes = [_normalize(tx) for tx in block["transactions"]]
+        with self._lock:
+            self._block_hashes[number] = bytes(block["hash"])
+            for tx_hash in hashes:
+                self._recent[tx_hash] = number
+                watches = self._pending.pop(tx_hash, None)
+                if watches is not None:
+                    self._mined[tx_hash] = (watches, number)
+            self._recent_blocks.append((number, hashes))
+            while len(self._recent_blocks) > self.history_blocks:
+                old_number, old_hashes = self._recent_blocks.popleft()
+                self._block_hashes.pop(old_number, None)
+                for tx_hash in old_hashes:
+                    if self._recent.get(tx_hash) == old_number:
+                        del self._recent[tx_hash]
+            self._last = number
+        self.stats["blocks"] += 1
+        return True
+
+    def _rewind(self, number: int):
+        """Reorg: volta até o último bloco com o mesmo hash e devolve as transações aos pendentes"""
+        fork = number
+        while fork in self._block_hashes:
+            block = self.w3.eth.get_block(fork)
+            if block is not None and bytes(block["hash"]) == self._block_hashes[fork]:
+                break
+            fork -= 1
+        self.stats["reorgs"] += 1
+        logger.warning(f"Reorg detectado: relendo a partir do bloco {fork + 1}")
+        with self._lock:
+            for tx_hash, (watches, block_number) in list(self._mined.items()):
+                if block_number > fork:
+                    del self._mined[tx_hash]
+                    self._pending[tx_hash] = watches
+            while self._recent_blocks and self._recent_blocks[-1][0] > fork:
+                old_number, old_hashes = self._recent_blocks.pop()
+                self._block_hashes.pop(old_number, None)
+                for tx_hash in old_hashes:
+                    self._recent.pop(tx_hash, None)
+            self._last = fork
+
+    def _receipts(self, hashes: List[str]) -> List:
+        """Recibos das transações em um lote JSON-RPC (individuais se o lote falhar)"""
+        self.stats["receipt_requests"] += 1
+        try:
+            with self.w3.batch_requests() as batch:
+                for tx_hash in hashes:
+                    batch.add(self.w3.eth.get_transaction_receipt(tx_hash))
+                return list(batch.execute())
+        except Exception:
+            # Lote recusado, ou algum recibo sumiu (reorg): um a um
+            receipts = []
+            for tx_hash in hashes:
+                try:
+                    receipts.append(self.w3.eth.get_transaction_receipt(tx_hash))
+                except TransactionNotFound:
+                    receipts.append(None)
+            return receipts
+
+    def _resolve(self, head: int):
+        with self._lock:
+            ready = [
+                tx_hash for tx_hash, (watches, number) in self._mined.items()
+                if any(head - number >= watch.confirmations for watch in watches)
+            ]
+        if not ready:
+            return
+        receipts = self._receipts(ready)
+        resolved = []
+        with self._lock:
+            for tx_hash, receipt in zip(ready, receipts):
+                entry = self._mined.pop(tx_hash, None)
+                if entry is None:
+                    continue  # esquecida enquanto buscava
+                watches = entry[0]
+                if receipt is None:
+                    self._pending[tx_hash] = watches
+                    continue
+                number = receipt["blockNumber"]
+                waiting = [watch for watch in watches if head - number < watch.confirmations]
+                resolved.extend((watch, receipt) for watch in watches if head - number >= watch.confirmations)
+                if waiting:
+                    self._mined[tx_hash] = (waiting, number)
+        # Fora do lock: callbacks dos futures podem chamar watch()
+        for watch, receipt in resolved:
+            if not watch.future.done():
+                watch.future.set_result(receipt)
+            self.stats["resolved"] += 1
+
+    def _fallback(self):
+        now = time.monotonic()
+        with self._lock:
+            stale = [
+                (h, ws) for h, ws in self._pending.items()
+                if now - min(w.checked_at for w in ws) > self.fallback_interval
+            ]
+        for tx_hash, watches in stale:
+            for watch in watches:
+                watch.checked_at = now
+            try:
+                receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+            with self._lock:
+                watches = self._pending.pop(tx_hash, None)
+                if watches is not None:
+                    self._mined[tx_hash] = (watches, receipt["blockNumber"])
+
+    def _expire(self):
+        now = time.monotonic()
+
+        def alive(watch: _Watch) -> bool:
+            return not watch.future.cancelled() and (watch.deadline is None or now <= watch.deadline)
+
+        expired = []
+        with self._lock:
+            for table in (self._pending, self._mined):
+                for tx_hash, entry in list(table.items()):
+                    watches = entry if table is self._pending else entry[0]
+                    if all(alive(watch) for watch in watches):
+                        continue
+                    expired.extend((tx_hash, watch) for watch in watches if not alive(watch))
+                    remaining = [watch for watch in watches if alive(watch)]
+                    if not remaining:
+                        del table[tx_hash]
+                    elif table is self._pending:
+                        table[tx_hash] = remaining
+                    else:
+                        table[tx_hash] = (remaining, entry[1])
+        for tx_hash, watch in expired:
+            if not watch.future.done():
+                self.stats["timeouts"] += 1
+                watch.future.set_exception(TimeExhausted(f"Transação {tx_hash} sem recibo no prazo"))
@@ -0,0 +1,394 @@
+"""
+ANNA Protocol - Provider multi-RPC com failover e leituras hedged
+
+Substitui um único Web3.HTTPProvider(rpc_url) por uma lista de endpoints:
+
+- Sessões HTTP keep-alive com pool de conexões por endpoint
+- Latência e taxa de erro por endpoint em EWMA; leituras vão para o endpoint
+  saudável mais rápido e, se ele falhar, para o próximo (failover)
+- Endpoint com falhas seguidas fica fora por um tempo (cooldown); endpoint
+  atrasado em blocos vai para o fim da fila
+- Hedging opcional: se a leitura demora mais que N vezes a latência típica do
+  endpoint, a mesma requisição vai para o segundo melhor e vale a primeira resposta
+- Escritas (eth_sendRawTransaction) são transmitidas para vários endpoints
+
+Uso:
+    from anna_rpc import make_web3
+    w3 = make_web3("https://rpc-amoy.polygon.technology,https://outro-rpc", hedge=True)
+
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Any, Dict, List, Optional, Sequence, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from eth_utils import keccak
+from web3 import Web3
+from web3.exceptions import BadResponseFormat
+from web3.providers import JSONBaseProvider
+
+logger = logging.getLogger(__name__)
+
+WRITE_METHODS = {"eth_sendRawTransaction"}
+
+# Filtros vivem no nó que os criou: sempre no mesmo endpoint, sem hedge
+STATEFUL_METHODS = {
+    "eth_newFilter", "eth_newBlockFilter", "eth_newPendingTransactionFilter",
+    "eth_getFilterChanges", "eth_getFilterLogs", "eth_uninstallFilter"
+}
+
+# Erros JSON-RPC que indicam problema do endpoint (não da requisição): tenta o próximo
+RETRYABLE_CODES = {-32005, -32603}
+RETRYABLE_MESSAGES = ("rate limit", "too many requests", "timeout", "timed out", "unavailable", "header not found")
+
+# Erros de um lote JSON-RPC que indicam RPC sem suporte a lotes (não vale tentar de novo)
+BATCH_UNSUPPORTED_CODES = {-32600, -32601}
+BATCH_UNSUPPORTED_MESSAGES = ("batch", "method not found", "not supported")
+
+
+class EndpointError(Exception):
+    """Resposta que conta como falha do endpoint (HTTP, rede ou erro JSON-RPC de sobrecarga)"""
+
+    def __init__(self, message: str, response: Optional[Dict] = None):
+        super().__init__(message)
+        self.response = response
+
+
+def parse_urls(rpc: Union[str, Sequence[str]]) -> List[str]:
+    """Aceita uma URL, uma lista ou URLs separadas por vírgula (ex.: POLYGON_AMOY_RPC=url1,url2)"""
+    if isinstance(rpc, str):
+        rpc = rpc.replace(",", " ").split()
+    return [url.strip() for url in rpc if url and url.strip()]
+
+
+def _is_retryable(response: Any) -> bool:
+    error = response.get("error") if isinstance(response, dict) else None
+    if not error:
+        return False
+    message = str(error.get("message", "")).lower()
+    return error.get("code") in RETRYABLE_CODES or any(m in message for m in RETRYABLE_MESSAGES)
+
+
+def batch_unsupported(reply: Any, size: Optional[int] = None) -> bool:
+    """
+    Se a resposta a um lote JSON-RPC (ou a exceção levantada ao enviá-lo) mostra
+    que o RPC não aceita lotes: resposta que não é lista (ou com outro tamanho)
+    ou "method not found"/"invalid request". Erros de rede e de sobrecarga dão
+    False - o lote vale a pena de novo na próxima vez
+    """
+    if isinstance(reply, BadResponseFormat):
+        return True
+    if isinstance(reply, Exception):
+        response = getattr(reply, "rpc_response", None)  # web3 7: Web3RPCError
+        if not isinstance(response, dict) and reply.args and isinstance(reply.args[0], dict):
+            response = {"error": reply.args[0]}  # web3 6: ValueError({...})
+        if not isinstance(response, dict):
+            return False
+        reply = response
+    if isinstance(reply, list):
+        return size is not None and len(reply) != size
+    if _is_retryable(reply):
+        return False
+    error = reply.get("error") if isinstance(reply, dict) else None
+    if not isinstance(error, dict):
+        return True
+    message = str(error.get("message", "")).lower()
+    return error.get("code") in BATCH_UNSUPPORTED_CODES or any(m in message for m in BATCH_UNSUPPORTED_MESSAGES)
+
+
+class Endpoint:
+    """Um RPC: sessão keep-alive e estatísticas EWMA"""
+
+    def __init__(self, url: str, pool_size: int = 16):
+        self.url = url
+        # Só o host em logs e métricas: URLs de RPC costumam levar a chave de API no caminho
+        self.host = urlparse(url).netloc or url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Content-Type"] = "application/json"
+        self.latency: Optional[float] = None  # EWMA em segundos (None = ainda sem medida)
+        self.error_rate = 0.0                 # EWMA de 0 a 1
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.down_until = 0.0
+        self.head: Optional[int] = None
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.down_until
+
+    def score(self) -> float:
+        """Menor é melhor; endpoint nunca usado recebe 0 para ser experimentado logo"""
+        if self.latency is None:
+            return 0.0 if self.requests == 0 else float("inf")
+        return self.latency * (1 + 4 * self.error_rate)
+
+    def snapshot(self) -> Dict:
+        return {
+            "host": self.host,
+            "latency_ms": None if self.latency is None else round(self.latency * 1000, 2),
+            "error_rate": round(self.error_rate, 4),
+            "requests": self.requests,
+            "failures": self.failures,
+            "healthy": self.healthy(time.monotonic()),
+            "head": self.head
+        }
+
+
+class MultiRPCProvider(JSONBaseProvider):
+    """Provider web3 sobre vários endpoints JSON-RPC"""
+
+    def __init__(
+        self,
+        urls: Union[str, Sequence[str]],
+        timeout: float = 10.0,
+        alpha: float = 0.2,
+        hedge: bool = False,
+        hedge_multiplier: float = 3.0,
+        hedge_min_delay: float = 0.05,
+        broadcast: int = 3,
+        max_failures: int = 3,
+        cooldown: float = 30.0,
+        max_lag: int = 3,
+        pool_size: int = 16
+    ):
+        """
+        Args:
+            urls: Endpoints (lista ou separados por vírgula), em ordem de preferência inicial
+            timeout: Timeout HTTP por requisição (segundos)
+            alpha: Peso da última medida nas EWMA de latência e erro
+            hedge: Se True, leituras lentas são repetidas no segundo melhor endpoint
+            hedge_multiplier: Hedge após hedge_multiplier × latência EWMA do endpoint escolhido
+            hedge_min_delay: Espera mínima antes do hedge (segundos)
+            broadcast: Em quantos endpoints cada transação assinada é enviada
+            max_failures: Falhas seguidas que tiram o endpoint de rotação
+            cooldown: Segundos fora de rotação depois de max_failures
+            max_lag: Blocos de atraso em relação ao endpoint mais adiantado antes de ir para o fim da fila
+            pool_size: Conexões keep-alive por endpoint (e workers de hedge/broadcast)
+        """
+        super().__init__()
+        urls = parse_urls(urls)
+        if not urls:
+            raise ValueError("Nenhum endpoint RPC informado")
+        self.endpoints = [Endpoint(url, pool_size) for url in urls]
+        self.timeout = timeout
+        self.alpha = alpha
+        self.hedge = hedge
+        self.hedge_multiplier = hedge_multiplier
+        self.hedge_min_delay = hedge_min_delay
+        self.broadcast = max(1, broadcast)
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.max_lag = max_lag
+        self.hedges = 0
+        self.hedges_won = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="rpc")
+
+    def __str__(self) -> str:
+        return f"MultiRPC {', '.join(e.host for e in self.endpoints)}"
+
+    @property
+    def endpoint_uri(self) -> str:
+        """Endpoint preferido no momento (compatível com HTTPProvider.endpoint_uri)"""
+        return self.ranked()[0].url
+
+    # ------------------------------------------------------------
+    # Seleção
+    # ------------------------------------------------------------
+
+    def ranked(self) -> List[Endpoint]:
+        """Endpoints do melhor para o pior: saudáveis e em dia primeiro, depois por score"""
+        now = time.monotonic()
+        heads = [e.head for e in self.endpoints if e.head is not None]
+        best_head = max(heads) if heads else None
+
+        def key(endpoint: Endpoint):
+            lagging = best_head is not None and endpoint.head is not None and best_head - endpoint.head > self.max_lag
+            if not endpoint.healthy(now):
+                return (2, endpoint.down_until)
+            return (1 if lagging else 0, endpoint.score())
+
+        return sorted(self.endpoints, key=key)
+
+    def _observe(self, endpoint: Endpoint, elapsed: float, ok: bool):
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.error_rate += self.alpha * ((0.0 if ok else 1.0) - endpoint.error_rate)
+            if ok:
+                endpoint.consecutive_failures = 0
+                endpoint.latency = elapsed if endpoint.latency is None else endpoint.latency + self.alpha * (elapsed - endpoint.latency)
+                return
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.max_failures:
+                endpoint.down_until = time.monotonic() + self.cooldown
+                endpoint.consecutive_failures = 0
+                logger.warning(f"RPC {endpoint.host} fora de rotação por {self.cooldown:.0f}s ({self.max_failures} falhas seguidas)")
+
+    def _call(self, endpoint: Endpoint, method: str, data: bytes):
+        """Uma requisição HTTP; levanta EndpointError se a falha for do endpoint"""
+        started = time.perf_counter()
+        try:
+            reply = endpoint.session.post(endpoint.url, data=data, timeout=self.timeout)
+            reply.raise_for_status()
+            response = self.decode_rpc_response(reply.content)
+        except (requests.RequestException, ValueError) as e:
+            self._observe(endpoint, time.perf_counter() - started, ok=False)
+            raise EndpointError(f"{endpoint.host}: {e}") from e
+        retryable = _is_retryable(response) if isinstance(response, dict) else any(map(_is_retryable, response))
+        self._observe(endpoint, time.perf_counter() - started, ok=not retryable)
+        if retryable:
+            raise EndpointError(f"{endpoint.host}: {response}", response)
+        if method == "eth_blockNumber" and isinstance(response, dict) and isinstance(response.get("result"), str):
+            endpoint.head = int(response["result"], 16)
+        return response
+
+    # ------------------------------------------------------------
+    # Leituras: failover e hedge
+    # ------------------------------------------------------------
+
+    def _failover(self, candidates: List[Endpoint], method: str, data: bytes):
+        last_error = None
+        for endpoint in candidates:
+            try:
+                return self._call(endpoint, method, data)
+            except EndpointError as e:
+                last_error = e
+        if last_error.response is not None:
+            return last_error.response
+        raise ConnectionError(f"Todos os endpoints RPC falharam ({method}): {last_error}")
+
+    def _hedged(self, candidates: List[Endpoint], method: str, data: bytes):
+        primary = candidates[0]
+        delay = max(self.hedge_min_delay, self.hedge_multiplier * (primary.latency or self.timeout))
+        pending = {self._executor.submit(self._call, primary, method, data): primary}
+        done, _ = wait(pending, timeout=delay)
+        if not done:
+            self.hedges += 1
+            pending[self._executor.submit(self._call, candidates[1], method, data)] = candidates[1]
+        remaining = candidates[2:] if len(pending) > 1 else candidates[1:]
+        last_error = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                endpoint = pending.pop(future)
+                try:
+                    response = future.result()
+                except EndpointError as e:
+                    last_error = e
+                    continue
+                if endpoint is not primary:
+                    self.hedges_won += 1
+                return response
+        # Primário e hedge falharam: segue em sequência pelos demais
+        if remaining:
+            return self._failover(remaining, method, data)
+        if last_error.response is not None:
+            return last_error.response
+        raise ConnectionError(f"Todos os endpoints RPC falharam ({method}): {last_error}")
+
+    def _read(self, method: str, data: bytes):
+        candidates = self.ranked()
+        if method in STATEFUL_METHODS:
+            # Sempre o primeiro endpoint configurado que estiver saudável
+            now = time.monotonic()
+            candidates = [e for e in self.endpoints if e.healthy(now)] or self.endpoints
+            return self._failover(candidates[:1], method, data)
+        if self.hedge and len(candidates) > 1:
+            return self._hedged(candidates, method, data)
+        return self._failover(candidates, method, data)
+
+    # ------------------------------------------------------------
+    # Escritas: broadcast
+    # ------------------------------------------------------------
+
+    def _broadcast(self, method: str, params: Any, data: bytes):
+        """Envia para os `broadcast` melhores; vale a primeira aceitação"""
+        targets = self.ranked()[:self.broadcast]
+        futures = [self._executor.submit(self._call, endpoint, method, data) for endpoint in targets]
+        rejected, last_error = None, None
+        for future in as_completed(futures):
+            try:
+                response = future.result()
+            except EndpointError as e:
+                last_error = e
+                continue
+            if "error" not in response:
+                return response
+            message = str(response["error"].get("message", "")).lower()
+            if "already known" in message or "known transaction" in message:
+                # Outro endpoint já repassou a mesma transação: o hash é o da transação assinada
+                tx_hash = "0x" + keccak(Web3.to_bytes(hexstr=params[0])).hex()
+                return {"jsonrpc": "2.0", "id": response.get("id"), "result": tx_hash}
+            rejected = rejected or response
+        if rejected is not None:
+            return rejected
+        raise ConnectionError(f"Transação não aceita por nenhum endpoint RPC: {last_error}")
+
+    # ------------------------------------------------------------
+    # Interface do provider
+    # ------------------------------------------------------------
+
+    def make_request(self, method, params):
+        data = self.encode_rpc_request(method, params)
+        if method in WRITE_METHODS:
+            return self._broadcast(method, params, data)
+        return self._read(method, data)
+
+    def make_batch_request(self, batch_requests):
+        data = self.encode_batch_rpc_request(batch_requests)
+        methods = [method for method, _ in batch_requests]
+        if any(m in WRITE_METHODS or m in STATEFUL_METHODS for m in methods):
+            response = self._failover(self.ranked(), "batch", data)
+        else:
+            response = self._read("batch", data)
+        if not isinstance(response, list):
+            return response
+        return sorted(response, key=lambda r: r.get("id", 0))
+
+    def snapshot(self) -> List[Dict]:
+        """Estatísticas por endpoint, do melhor para o pior"""
+        return [endpoint.snapshot() for endpoint in self.ranked()]
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        for endpoint in self.endpoints:
+            endpoint.session.close()
+
+
+def provider_key(w3):
+    """
+    Identifica o RPC por trás de um Web3 (URL, ou a lista de URLs do
+    MultiRPCProvider), para objetos compartilhados por RPC no processo
+    """
+    provider = w3.provider
+    # A lista primeiro: o endpoint_uri do MultiRPCProvider é o endpoint mais
+    # rápido no momento e muda quando o ranking de latência muda
+    endpoints = getattr(provider, "endpoints", None)
+    if endpoints:
+        return tuple(e.url for e in endpoints)
+    endpoint = getattr(provider, "endpoint_uri", None)
+    if endpoint:
+        return str(endpoint)
+    return id(provider)
+
+
+def make_web3(rpc: Union[str, Sequence[str]], **options) -> Web3:
+    """
+    Web3 para uma ou várias URLs
+
+    Com uma única URL mantém o Web3.HTTPProvider de sempre (hedge e broadcast
+    não se aplicam); com várias, usa MultiRPCProvider(urls, **options).
+    """
+    urls = parse_urls(rpc)
+    if len(urls) == 1:
+        return Web3(Web3.HTTPProvider(urls[0]))
+    return Web3(MultiRPCProvider(urls, **options))
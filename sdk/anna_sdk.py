@@ -9,10 +9,11 @@ Autor: ANNA Protocol Team
 Licença: MIT
 """
 
+import copy
 import json
 import time
 import hashlib
-from typing import Dict, Optional, List, Tuple, Any
+from typing import Dict, Optional, List, Tuple, Any, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
 from web3 import Web3
@@ -20,6 +21,17 @@ from eth_account import Account
 from eth_account.messages import encode_typed_data
 import requests
 
+from anna_batch import CallBatcher
+from anna_cache import install_cache
+from anna_codec import ATTESTATION_SUBMITTED, encode_submit_attestation
+from anna_fees import FeeOracle
+from anna_gas import GasEstimator
+from anna_multicall import MULTICALL3_ADDRESS, Multicall
+from anna_nonce import SEND_RETRIES, SEND_RETRY_DELAY, NonceManager, is_already_known, is_nonce_conflict, is_transient
+from anna_receipts import ReceiptWatcher
+from anna_rpc import make_web3
+from anna_tracing import Tracer
+
 
 # ============================================================
 # CONFIGURAÇÕES E CONSTANTES
@@ -29,15 +41,20 @@ NETWORKS = {
     "polygon-amoy": {
         "rpc": "https://rpc-amoy.polygon.technology/",
         "chain_id": 80002,
-        "explorer": "https://www.oklink.com/amoy"
+        "explorer": "https://www.oklink.com/amoy",
+        "multicall": MULTICALL3_ADDRESS
     },
     "polygon-mainnet": {
         "rpc": "https://polygon-rpc.com",
         "chain_id": 137,
-        "explorer": "https://polygonscan.com"
+        "explorer": "https://polygonscan.com",
+        "multicall": MULTICALL3_ADDRESS
     }
 }
 
+# topic0 do evento AttestationSubmitted(bytes32 indexed attestationId, address indexed agent, string, uint256)
+ATTESTATION_SUBMITTED_TOPIC = ATTESTATION_SUBMITTED
+
 
 # ============================================================
 # TIPOS E ENUMS
@@ -174,7 +191,18 @@ class ANNAClient:
         network: str = "polygon-amoy",
         identity_contract: Optional[str] = None,
         attestation_contract: Optional[str] = None,
-        reputation_contract: Optional[str] = None
+        reputation_contract: Optional[str] = None,
+        tracer: Optional[Tracer] = None,
+        rpc_urls: Optional[List[str]] = None,
+        rpc_options: Optional[Dict] = None,
+        batch_size: int = 100,
+        batch_concurrency: int = 4,
+        multicall_address: Optional[str] = None,
+        fee_urgency: str = "medium",
+        fee_options: Optional[Dict] = None,
+        gas_options: Optional[Dict] = None,
+        rpc_cache: bool = True,
+        confirmations: int = 0
     ):
         """
         Inicializa o cliente ANNA
@@ -185,6 +213,17 @@ class ANNAClient:
             identity_contract: Endereço do contrato AnnaIdentity (opcional)
             attestation_contract: Endereço do contrato AnnaAttestation (opcional)
             reputation_contract: Endereço do contrato AnnaReputation (opcional)
+            tracer: Tracing por attestation (se None, usa ANNA_TRACE_FILE quando definido)
+            rpc_urls: Endpoints RPC com failover (se None, usa o RPC padrão da rede)
+            rpc_options: Opções do MultiRPCProvider (ex.: {"hedge": True}) quando há vários endpoints
+            batch_size: Leituras por requisição JSON-RPC em lote nos métodos em massa (get_attestations, ...)
+            batch_concurrency: Lotes enviados em paralelo nos métodos em massa
+            multicall_address: Multicall3 usado nos métodos em massa (se None, o canônico da rede)
+            fee_urgency: Percentil de gorjeta das transações: "low" (p10), "medium" (p50) ou "high" (p90)
+            fee_options: Opções do FeeOracle (ex.: {"min_priority_fee_gwei": 25}); valem para o primeiro cliente do RPC
+            gas_options: Opções do GasEstimator (ex.: {"margin": 0.3}); valem para o primeiro cliente do RPC
+            rpc_cache: Se True, instala o cache de respostas JSON-RPC (anna_cache) na conexão
+            confirmations: Blocos por cima exigidos antes de considerar uma transação confirmada
         """
         # Validar network
         if network not in NETWORKS:
@@ -193,14 +232,32 @@ class ANNAClient:
         # Configurar Web3
         self.network = network
         self.network_config = NETWORKS[network]
-        self.w3 = Web3(Web3.HTTPProvider(self.network_config["rpc"]))
+        rpc = rpc_urls or self.network_config["rpc"]
+        self.w3 = make_web3(rpc, **(rpc_options or {}))
+        # chainId, attestations finalizadas, metadados de agentes etc. saem da memória
+        self.rpc_cache = install_cache(self.w3) if rpc_cache else None
         
         if not self.w3.is_connected():
-            raise ConnectionError(f"Não foi possível conectar ao RPC: {self.network_config['rpc']}")
+            raise ConnectionError(f"Não foi possível conectar ao RPC: {rpc}")
         
         # Configurar conta
         self.account = Account.from_key(private_key)
         self.address = self.account.address
+        self.tracer = tracer or Tracer.from_env("sdk")
+        self._chain_id: Optional[int] = None
+        # Nonces locais: várias transações da wallet no mesmo bloco sem colidir
+        self.nonces = NonceManager.shared(self.w3, self.address)
+        # Taxas EIP-1559 da memória, um oráculo por RPC compartilhado no processo
+        self.fee_urgency = fee_urgency
+        self.fee_oracle = FeeOracle.shared(self.w3, **(fee_options or {}))
+        self.gas_estimator = GasEstimator.shared(self.w3, **(gas_options or {}))
+        # Recibos: uma leitura por bloco para todas as transações aguardadas no processo
+        self.confirmations = confirmations
+        self.receipts = ReceiptWatcher.shared(self.w3)
+        self.batcher = CallBatcher(self.w3, batch_size=batch_size, concurrency=batch_concurrency)
+        self.multicall = Multicall(
+            self.w3, multicall_address or self.network_config["multicall"], batcher=self.batcher
+        )
         
         # Endereços dos contratos
         self.identity_contract = identity_contract
@@ -229,6 +286,25 @@ class ANNAClient:
                 abi=self.reputation_abi
             )
     
+    def with_account(self, private_key: str) -> "ANNAClient":
+        """
+        Cliente de outra wallet sobre a mesma conexão, contratos, caches,
+        oráculo de taxas e watcher de recibos (sem novo provider, is_connected()
+        nem ABIs); os nonces ficam na fila própria da wallet
+        """
+        client = copy.copy(self)
+        client.account = Account.from_key(private_key)
+        client.address = client.account.address
+        client.nonces = NonceManager.shared(self.w3, client.address)
+        return client
+    
+    @property
+    def chain_id(self) -> int:
+        """Chain ID do RPC (consultado uma vez)"""
+        if self._chain_id is None:
+            self._chain_id = self.w3.eth.chain_id
+        return self._chain_id
+    
     def _load_abis(self):
         """Carrega ABIs dos contratos (versão simplificada)"""
         # Em produção, carregar de arquivos JSON
@@ -252,6 +328,27 @@ class ANNAClient:
                 "outputs": [{"name": "", "type": "uint256"}],
                 "stateMutability": "view",
                 "type": "function"
+            },
+            {
+                "inputs": [{"name": "tokenId", "type": "uint256"}],
+                "name": "getAgentMetadata",
+                "outputs": [
+                    {
+                        "components": [
+                            {"name": "did", "type": "string"},
+                            {"name": "modelType", "type": "string"},
+                            {"name": "modelVersion", "type": "string"},
+                            {"name": "operator", "type": "address"},
+                            {"name": "specializations", "type": "string[]"},
+                            {"name": "registrationDate", "type": "uint256"},
+                            {"name": "isActive", "type": "bool"}
+                        ],
+                        "name": "",
+                        "type": "tuple"
+                    }
+                ],
+                "stateMutability": "view",
+                "type": "function"
             }
         ]
         
@@ -296,6 +393,18 @@ class ANNAClient:
                 "outputs": [{"name": "", "type": "uint256"}],
                 "stateMutability": "view",
                 "type": "function"
+            },
+            {
+                "inputs": [{"name": "agent", "type": "address"}],
+                "name": "getFullReputation",
+                "outputs": [
+                    {"name": "score", "type": "uint256"},
+                    {"name": "totalAttestations", "type": "uint256"},
+                    {"name": "verifiedAttestations", "type": "uint256"},
+                    {"name": "averageConsistency", "type": "uint256"}
+                ],
+                "stateMutability": "view",
+                "type": "function"
             }
         ]
     
@@ -330,25 +439,24 @@ class ANNAClient:
         if agent_id != 0:
             raise ValueError(f"Agente já registrado com ID: {agent_id}")
         
-        # Preparar transação
-        tx = self.identity.functions.registerAgent(
-            model_type,
-            model_version,
-            specializations
-        ).build_transaction({
+        # Preparar transação (limite de gas estimado pelo tamanho de specializations)
+        tx = {
+            'to': self.identity.address,
+            'data': self.identity.encode_abi("registerAgent", args=[model_type, model_version, specializations]),
+            'value': 0,
             'from': self.address,
-            'nonce': self.w3.eth.get_transaction_count(self.address),
-            'gas': 200000,
-            'gasPrice': self.w3.eth.gas_price
-        })
+            **self.fee_oracle.tx_fees(self.fee_urgency),
+            'chainId': self.chain_id
+        }
+        tx['gas'] = self.gas_estimator.estimate(tx)
         
         # Assinar e enviar
-        signed_tx = self.account.sign_transaction(tx)
-        tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        tx_hash = self._broadcast(tx, self._sign(tx))
         
         if wait_for_confirmation:
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = self.receipts.wait(tx_hash, confirmations=self.confirmations)
             if receipt['status'] != 1:
+                self.gas_estimator.observe(tx, receipt)
                 raise Exception("Transação falhou")
             
             # Buscar agent_id criado
@@ -395,18 +503,8 @@ class ANNAClient:
         if not self.attestation_contract:
             raise ValueError("Endereço do contrato Attestation não configurado")
         
-        # Validar reasoning
-        if not 0 <= reasoning.confidence <= 1:
-            raise ValueError("Confidence deve estar entre 0 e 1")
-        
-        if len(reasoning.reasoning_steps) == 0:
-            raise ValueError("Reasoning deve ter pelo menos 1 step")
-        
-        # Calcular hashes
-        content_hash = Web3.keccak(text=content)
-        reasoning_dict = reasoning.to_dict()
-        reasoning_json = json.dumps(reasoning_dict, sort_keys=True)
-        reasoning_hash = Web3.keccak(text=reasoning_json)
+        started = time.time()
+        content_hash, reasoning_hash = self._attestation_hashes(content, reasoning)
         
         # Obter model version
         agent_id = self.identity.functions.agentIdByAddress(self.address).call()
@@ -414,85 +512,56 @@ class ANNAClient:
             raise ValueError("Agente não registrado. Execute register_identity() primeiro.")
         
         model_version = "v1.0"  # Em produção, buscar do contrato Identity
-        
-        # Preparar dados para assinatura EIP-712
-        domain_data = {
-            "name": "ANNA Protocol",
-            "version": "1",
-            "chainId": self.network_config["chain_id"],
-            "verifyingContract": self.attestation_contract
-        }
-        
-        message_types = {
-            "Attestation": [
-                {"name": "contractHash", "type": "bytes32"},
-                {"name": "reasoningHash", "type": "bytes32"},
-                {"name": "agent", "type": "address"},
-                {"name": "modelVersion", "type": "string"},
-                {"name": "timestamp", "type": "uint256"},
-                {"name": "category", "type": "string"}
-            ]
-        }
-        
         timestamp = int(time.time())
         
-        message_data = {
-            "contractHash": content_hash,
-            "reasoningHash": reasoning_hash,
-            "agent": self.address,
-            "modelVersion": model_version,
-            "timestamp": timestamp,
-            "category": category
-        }
-        
-        # Assinar com EIP-712
-        typed_data = {
-            "types": {
-                "EIP712Domain": [
-                    {"name": "name", "type": "string"},
-                    {"name": "version", "type": "string"},
-                    {"name": "chainId", "type": "uint256"},
-                    {"name": "verifyingContract", "type": "address"}
-                ],
-                **message_types
-            },
-            "primaryType": "Attestation",
-            "domain": domain_data,
-            "message": message_data
-        }
-        
+        signing_started = time.time()
+        typed_data = self._attestation_typed_data(content_hash, reasoning_hash, model_version, timestamp, category)
         encoded_data = encode_typed_data(full_message=typed_data)
         signature = self.account.sign_message(encoded_data).signature
         
-        # Preparar transação
-        tx = self.attestation.functions.submitAttestation(
-            content_hash,
-            reasoning_hash,
-            model_version,
-            category,
-            signature
-        ).build_transaction({
+        # Preparar transação (calldata pelo codec pré-compilado, sem build_transaction)
+        build_started = time.time()
+        tx = {
+            'to': self.attestation.address,
+            'data': encode_submit_attestation(content_hash, reasoning_hash, model_version, category, signature),
+            'value': 0,
             'from': self.address,
-            'nonce': self.w3.eth.get_transaction_count(self.address),
-            'gas': 300000,
-            'gasPrice': self.w3.eth.gas_price
-        })
+            **self.fee_oracle.tx_fees(self.fee_urgency),
+            'chainId': self.chain_id
+        }
+        tx['gas'] = self.gas_estimator.estimate(tx)
         
         # Assinar e enviar
-        signed_tx = self.account.sign_transaction(tx)
-        tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        sign_tx_started = time.time()
+        signed_tx = self._sign(tx)
+        send_started = time.time()
+        tx_hash = self._broadcast(tx, signed_tx)
+        sent_at = time.time()
         tx_hash_hex = tx_hash.hex()
         
-        # Calcular attestation_id (mesmo cálculo do contrato)
-        attestation_id = Web3.keccak(
-            Web3.solidity_keccak(['bytes32', 'bytes32', 'address', 'uint256'],
-                                [content_hash, reasoning_hash, self.address, timestamp])
-        ).hex()
+        attestation_id = self._attestation_id(content_hash, reasoning_hash, timestamp)
         
+        receipt = None
         if wait_for_confirmation:
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = self.receipts.wait(tx_hash, confirmations=self.confirmations)
             if receipt['status'] != 1:
+                self.gas_estimator.observe(tx, receipt)
                 raise Exception("Transação falhou")
+            # O contrato usa block.timestamp: o ID definitivo vem do evento no recibo
+            attestation_id = self._attestation_id_from_receipt(receipt) or attestation_id
+        
+        if self.tracer.enabled:
+            trace = dict(submit_tx_hash=tx_hash_hex, agent=self.address, category=category)
+            self.tracer.record(attestation_id, "sdk.prepare", started, signing_started, **trace)
+            self.tracer.record(attestation_id, "sdk.sign_message", signing_started, build_started, **trace)
+            self.tracer.record(attestation_id, "sdk.build_tx", build_started, sign_tx_started, **trace)
+            self.tracer.record(attestation_id, "sdk.sign_tx", sign_tx_started, send_started, **trace)
+            self.tracer.record(attestation_id, "sdk.send", send_started, sent_at, **trace)
+            if receipt is not None:
+                self.tracer.record(
+                    attestation_id, "sdk.mempool", sent_at, time.time(),
+                    block_number=receipt['blockNumber'], **trace
+                )
         
         # Construir URL do explorer
         explorer_url = f"{self.network_config['explorer']}/tx/{tx_hash_hex}"
@@ -505,6 +574,245 @@ class ANNAClient:
             explorer_url=explorer_url
         )
     
+    def submit_attestations(
+        self,
+        items: List[Tuple[str, Reasoning, str]],
+        wait_for_confirmation: bool = True,
+        timeout: float = 180
+    ) -> List[Union[AttestationResult, Exception]]:
+        """
+        Submete várias attestations de uma vez: assina todas, envia as transações
+        em sequência com nonces locais (várias entram no mesmo bloco) e acompanha
+        os recibos juntos
+        
+        Args:
+            items: Tuplas (content, reasoning, category)
+            wait_for_confirmation: Aguardar os recibos
+            timeout: Tempo máximo aguardando os recibos (segundos)
+        
+        Returns:
+            Um resultado por item, na ordem de entrada: AttestationResult ou a
+            exceção do item (ValueError de validação, erro do envio, "Transação
+            falhou", TimeExhausted)
+        
+        Raises:
+            ValueError: Contrato não configurado ou agente não registrado
+        """
+        if not self.attestation_contract:
+            raise ValueError("Endereço do contrato Attestation não configurado")
+        
+        agent_id = self.identity.functions.agentIdByAddress(self.address).call()
+        if agent_id == 0:
+            raise ValueError("Agente não registrado. Execute register_identity() primeiro.")
+        
+        model_version = "v1.0"  # Em produção, buscar do contrato Identity
+        fees = self.fee_oracle.tx_fees(self.fee_urgency)
+        results: List[Union[AttestationResult, Exception, None]] = [None] * len(items)
+        
+        # 1. Hashes, assinaturas EIP-712, calldata e gas de todos os itens
+        prepared = []
+        for index, (content, reasoning, category) in enumerate(items):
+            try:
+                content_hash, reasoning_hash = self._attestation_hashes(content, reasoning)
+                timestamp = int(time.time())
+                typed_data = self._attestation_typed_data(
+                    content_hash, reasoning_hash, model_version, timestamp, category
+                )
+                signature = self.account.sign_message(encode_typed_data(full_message=typed_data)).signature
+                tx = {
+                    'to': self.attestation.address,
+                    'data': encode_submit_attestation(content_hash, reasoning_hash, model_version, category, signature),
+                    'value': 0,
+                    'from': self.address,
+                    **fees,
+                    'chainId': self.chain_id
+                }
+                tx['gas'] = self.gas_estimator.estimate(tx)
+            except Exception as e:
+                results[index] = e
+                continue
+            prepared.append((index, tx, self._attestation_id(content_hash, reasoning_hash, timestamp), timestamp))
+        
+        # 2. Envio em sequência, sem esperar recibos
+        sent = []
+        for index, tx, attestation_id, timestamp in prepared:
+            try:
+                tx_hash = self._broadcast(tx, self._sign(tx))
+            except Exception as e:
+                results[index] = e
+                continue
+            sent.append((index, tx, tx_hash, attestation_id, timestamp))
+        
+        # 3. Recibos de todas juntas (uma leitura por bloco no ReceiptWatcher)
+        futures = {}
+        if wait_for_confirmation:
+            futures = {
+                index: self.receipts.watch(tx_hash, timeout=timeout, confirmations=self.confirmations)
+                for index, _, tx_hash, _, _ in sent
+            }
+        stuck = False
+        for index, tx, tx_hash, attestation_id, timestamp in sent:
+            if wait_for_confirmation:
+                try:
+                    receipt = futures[index].result()
+                except Exception as e:
+                    results[index] = e
+                    stuck = True
+                    continue
+                if receipt['status'] != 1:
+                    self.gas_estimator.observe(tx, receipt)
+                    results[index] = Exception("Transação falhou")
+                    continue
+                attestation_id = self._attestation_id_from_receipt(receipt) or attestation_id
+            results[index] = AttestationResult(
+                attestation_id=attestation_id,
+                tx_hash=tx_hash.hex(),
+                status=AttestationStatus.PENDING,
+                timestamp=timestamp,
+                explorer_url=f"{self.network_config['explorer']}/tx/{tx_hash.hex()}"
+            )
+        if stuck:
+            # Transação sem recibo: confere o nonce do nó. resync() e não reset():
+            # o gerenciador é compartilhado (threads, pool, cliente async) e
+            # pode ter outros nonces em voo que não podem ser entregues de novo
+            self.nonces.resync()
+        return results
+    
+    def _sign(self, tx: Dict):
+        """Aloca o nonce (local) e assina a transação"""
+        tx['nonce'] = self.nonces.next()
+        return self.account.sign_transaction(tx)
+    
+    def _broadcast(self, tx: Dict, signed_tx) -> bytes:
+        """
+        Envia a transação assinada. Erro transitório (rede, rate limit) reenvia
+        a mesma transação; nonce já usado (outro processo na mesma wallet)
+        ressincroniza com o nó e reassina uma vez; envio recusado por outro
+        motivo devolve o nonce (e fecha a lacuna se outras já saíram acima dele)
+        """
+        conflicts = failures = 0
+        while True:
+            try:
+                return self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            except Exception as e:
+                if is_already_known(e):
+                    return signed_tx.hash
+                if is_transient(e) and failures < SEND_RETRIES:
+                    time.sleep(SEND_RETRY_DELAY * 2 ** failures)
+                    failures += 1
+                    continue
+                if not is_nonce_conflict(e):
+                    if not self.nonces.release(tx['nonce']):
+                        self._fill_gaps()
+                    raise
+                self.nonces.resync()
+                conflicts += 1
+                if conflicts > 1:
+                    raise
+                signed_tx = self._sign(tx)
+    
+    def _fill_gaps(self):
+        """
+        Ocupa nonces devolvidos abaixo de transações já enviadas com uma
+        transferência de 0 para a própria wallet (sem isso, as de cima ficam
+        presas no mempool até o próximo envio da wallet)
+        """
+        while True:
+            nonce = self.nonces.take_released()
+            if nonce is None:
+                return
+            tx = self._gap_filler_tx(nonce, self.fee_oracle.tx_fees(self.fee_urgency))
+            try:
+                self.w3.eth.send_raw_transaction(self.account.sign_transaction(tx).raw_transaction)
+            except Exception as e:
+                if not (is_already_known(e) or is_nonce_conflict(e)):
+                    # Fica para o próximo envio da wallet
+                    self.nonces.release(nonce)
+                    return
+    
+    def _gap_filler_tx(self, nonce: int, fees: Dict) -> Dict:
+        return {
+            'to': self.address,
+            'value': 0,
+            'gas': 21000,
+            'from': self.address,
+            'nonce': nonce,
+            **fees,
+            'chainId': self.chain_id
+        }
+    
+    def _attestation_id(self, content_hash: bytes, reasoning_hash: bytes, timestamp: int) -> str:
+        """attestation_id provisório (mesmo cálculo do contrato, com o timestamp local)"""
+        return Web3.keccak(
+            Web3.solidity_keccak(['bytes32', 'bytes32', 'address', 'uint256'],
+                                [content_hash, reasoning_hash, self.address, timestamp])
+        ).hex()
+    
+    @staticmethod
+    def _attestation_hashes(content: str, reasoning: Reasoning) -> Tuple[bytes, bytes]:
+        """Valida o reasoning e retorna (contractHash, reasoningHash)"""
+        if not 0 <= reasoning.confidence <= 1:
+            raise ValueError("Confidence deve estar entre 0 e 1")
+        
+        if len(reasoning.reasoning_steps) == 0:
+            raise ValueError("Reasoning deve ter pelo menos 1 step")
+        
+        content_hash = Web3.keccak(text=content)
+        reasoning_json = json.dumps(reasoning.to_dict(), sort_keys=True)
+        return content_hash, Web3.keccak(text=reasoning_json)
+    
+    def _attestation_typed_data(
+        self,
+        content_hash: bytes,
+        reasoning_hash: bytes,
+        model_version: str,
+        timestamp: int,
+        category: str
+    ) -> Dict:
+        """Mensagem EIP-712 da attestation (assinada pelo agente)"""
+        return {
+            "types": {
+                "EIP712Domain": [
+                    {"name": "name", "type": "string"},
+                    {"name": "version", "type": "string"},
+                    {"name": "chainId", "type": "uint256"},
+                    {"name": "verifyingContract", "type": "address"}
+                ],
+                "Attestation": [
+                    {"name": "contractHash", "type": "bytes32"},
+                    {"name": "reasoningHash", "type": "bytes32"},
+                    {"name": "agent", "type": "address"},
+                    {"name": "modelVersion", "type": "string"},
+                    {"name": "timestamp", "type": "uint256"},
+                    {"name": "category", "type": "string"}
+                ]
+            },
+            "primaryType": "Attestation",
+            "domain": {
+                "name": "ANNA Protocol",
+                "version": "1",
+                "chainId": self.network_config["chain_id"],
+                "verifyingContract": self.attestation_contract
+            },
+            "message": {
+                "contractHash": content_hash,
+                "reasoningHash": reasoning_hash,
+                "agent": self.address,
+                "modelVersion": model_version,
+                "timestamp": timestamp,
+                "category": category
+            }
+        }
+    
+    def _attestation_id_from_receipt(self, receipt) -> Optional[str]:
+        """ID da attestation emitido no evento AttestationSubmitted do recibo"""
+        for log in receipt['logs']:
+            topics = log['topics']
+            if (len(topics) > 1 and topics[0] == ATTESTATION_SUBMITTED_TOPIC
+                    and log['address'].lower() == self.attestation_contract.lower()):
+                return topics[1].hex()
+        return None
+    
     def get_attestation(self, attestation_id: str) -> Dict[str, Any]:
         """
         Busca informações de uma attestation
@@ -519,14 +827,40 @@ class ANNAClient:
             raise ValueError("Endereço do contrato Attestation não configurado")
         
         attestation_data = self.attestation.functions.attestations(attestation_id).call()
+        return self._attestation_dict(attestation_data)
+    
+    def get_attestations(self, attestation_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Busca várias attestations em requisições JSON-RPC em lote
         
+        Args:
+            attestation_ids: IDs das attestations (bytes32 hex)
+        
+        Returns:
+            Lista de dicts (mesmo formato de get_attestation), na ordem de entrada
+        """
+        if not self.attestation_contract:
+            raise ValueError("Endereço do contrato Attestation não configurado")
+        
+        calls = [self.attestation.functions.attestations(attestation_id) for attestation_id in attestation_ids]
+        return [self._attestation_dict(data) for data in self._bulk_read(calls)]
+    
+    def _bulk_read(self, calls: List, block="latest") -> List:
+        """Leituras em massa: Multicall3 quando implantado na rede, senão lotes JSON-RPC"""
+        if self.multicall.available():
+            return self.multicall.call(calls, block=block)
+        return self.batcher.call(calls, block=block)
+    
+    @staticmethod
+    def _attestation_dict(attestation_data) -> Dict[str, Any]:
         return {
             "contract_hash": attestation_data[0].hex(),
             "reasoning_hash": attestation_data[1].hex(),
             "agent": attestation_data[2],
             "model_version": attestation_data[3],
             "timestamp": attestation_data[4],
-            "status": AttestationStatus(attestation_data[5]),
+            # enum Status do contrato, na mesma ordem de AttestationStatus
+            "status": list(AttestationStatus)[attestation_data[5]],
             "consistency_score": attestation_data[6],
             "verifier": attestation_data[7],
             "verification_time": attestation_data[8],
@@ -559,6 +893,10 @@ class ANNAClient:
             attestation = self.get_attestation(attestation_id)
             
             if attestation["status"] != AttestationStatus.PENDING:
+                self.tracer.record(
+                    attestation_id, "sdk.wait_verification", start_time, time.time(),
+                    status=attestation["status"].value
+                )
                 return AttestationResult(
                     attestation_id=attestation_id,
                     tx_hash="",  # Não temos o tx_hash da verificação aqui
@@ -592,6 +930,18 @@ class ANNAClient:
         score = self.reputation.functions.getReputationScore(address).call()
         return score
     
+    def get_reputations(self, agent_addresses: List[str]) -> List[int]:
+        """
+        Busca o score de reputação de vários agentes em requisições em lote
+        
+        Returns:
+            Scores (0-1000) na ordem de entrada
+        """
+        if not self.reputation_contract:
+            raise ValueError("Endereço do contrato Reputation não configurado")
+        
+        return self._bulk_read([self.reputation.functions.getReputationScore(a) for a in agent_addresses])
+    
     def get_balance(self) -> float:
         """
         Retorna o saldo de MATIC da wallet
@@ -617,7 +967,89 @@ class ANNAClient:
         
         addr = address or self.address
         agent_id = self.identity.functions.agentIdByAddress(addr).call()
+        return self._identity_dict(addr, agent_id)
+    
+    def get_identities(self, addresses: List[str]) -> List[Optional[Dict]]:
+        """
+        Busca a identidade de vários agentes em requisições em lote
         
+        Returns:
+            Dicts de identidade (None para não registrados), na ordem de entrada
+        """
+        if not self.identity_contract:
+            raise ValueError("Endereço do contrato Identity não configurado")
+        
+        agent_ids = self._bulk_read([self.identity.functions.agentIdByAddress(a) for a in addresses])
+        return [self._identity_dict(addr, agent_id) for addr, agent_id in zip(addresses, agent_ids)]
+    
+    def get_agent_snapshots(self, addresses: List[str], block="latest") -> List[Dict[str, Any]]:
+        """
+        Identidade, metadados e reputação de vários agentes, tudo lido no mesmo bloco
+        
+        Usa o Multicall3 (centenas de leituras por eth_call) quando disponível.
+        
+        Args:
+            addresses: Endereços dos agentes
+            block: Bloco lido ("latest" é fixado no número atual)
+        
+        Returns:
+            Dicts com address, block, agent_id, identity (None se não registrado)
+            e reputation, na ordem de entrada
+        """
+        if not self.identity_contract or not self.reputation_contract:
+            raise ValueError("Endereços dos contratos Identity e Reputation são necessários")
+        
+        block = self.multicall.resolve_block(block)
+        n = len(addresses)
+        results = self._bulk_read(
+            [self.identity.functions.agentIdByAddress(a) for a in addresses]
+            + [self.reputation.functions.getFullReputation(a) for a in addresses],
+            block=block
+        )
+        agent_ids, reputations = results[:n], results[n:]
+        
+        # Metadados dependem do agent_id - segunda rodada, no mesmo bloco
+        registered = [agent_id for agent_id in agent_ids if agent_id]
+        metadata = dict(zip(registered, self._bulk_read(
+            [self.identity.functions.getAgentMetadata(agent_id) for agent_id in registered], block=block
+        )))
+        return self._snapshot_dicts(addresses, block, agent_ids, reputations, metadata)
+    
+    @classmethod
+    def _snapshot_dicts(cls, addresses: List[str], block: int, agent_ids: List[int], reputations: List,
+                        metadata: Dict) -> List[Dict[str, Any]]:
+        snapshots = []
+        for addr, agent_id, reputation in zip(addresses, agent_ids, reputations):
+            score, total, verified, average = reputation
+            snapshots.append({
+                "address": Web3.to_checksum_address(addr),
+                "block": block,
+                "agent_id": agent_id,
+                "identity": cls._metadata_dict(metadata[agent_id]) if agent_id else None,
+                "reputation": {
+                    "score": score,
+                    "total_attestations": total,
+                    "verified_attestations": verified,
+                    "average_consistency": average
+                }
+            })
+        return snapshots
+    
+    @staticmethod
+    def _metadata_dict(metadata) -> Dict[str, Any]:
+        did, model_type, model_version, operator, specializations, registration_date, is_active = metadata
+        return {
+            "did": did,
+            "model_type": model_type,
+            "model_version": model_version,
+            "operator": Web3.to_checksum_address(operator),
+            "specializations": list(specializations),
+            "registration_date": registration_date,
+            "is_active": is_active
+        }
+    
+    @staticmethod
+    def _identity_dict(addr: str, agent_id: int) -> Optional[Dict]:
         if agent_id == 0:
             return None
         
@@ -0,0 +1,214 @@
+"""
+ANNA Protocol - Tracing ponta a ponta por attestation
+
+Spans compartilhados pelo SDK e pelo verificador, com o ID da attestation
+como trace_id, para acompanhar a latência de uma attestation desde
+ANNAClient.submit_attestation até a inclusão de verifyAttestation:
+
+    sdk.prepare -> sdk.sign -> sdk.send -> sdk.mempool
+    verifier.detection_lag -> verifier.queue -> verifier.fetch -> verifier.verify
+    -> verifier.sign -> verifier.mine
+
+Sem dependências externas (o verificador importa este módulo no caminho
+de inicialização). Desligado por padrão; liga com um arquivo de saída:
+
+    export ANNA_TRACE_FILE=logs/traces.jsonl     # SDK e verificador
+    python anna_tracing.py waterfall logs/traces.jsonl ../verifier/logs/traces.jsonl
+
+Spans do SDK enviados sem aguardar o recibo usam um ID provisório; o
+waterfall os junta ao trace do verificador pelo tx_hash da submissão.
+"""
+
+import os
+import json
+import time
+import uuid
+import argparse
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Iterable, List, Optional
+
+
+def normalize_trace_id(attestation_id) -> str:
+    """ID da attestation como trace_id: hex minúsculo sem 0x (aceita str ou bytes)"""
+    if isinstance(attestation_id, (bytes, bytearray)):
+        return bytes(attestation_id).hex()
+    return str(attestation_id).lower().removeprefix("0x")
+
+
+@dataclass
+class Span:
+    """Intervalo de tempo de uma etapa, em segundos desde a época (time.time)"""
+    trace_id: str
+    name: str
+    start: float
+    end: float
+    service: str
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    attributes: Dict = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class JsonlExporter:
+    """Um span por linha em um arquivo local (vários processos podem anexar ao mesmo arquivo)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(asdict(span), default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    """
+    Registra spans de um serviço ("sdk", "verifier")
+
+    Sem exportador o tracer fica desligado: record() e span() retornam
+    sem alocar nada além da chamada.
+    """
+
+    def __init__(self, service: str, exporter: Optional[JsonlExporter] = None):
+        self.service = service
+        self.exporter = exporter
+
+    @classmethod
+    def from_env(cls, service: str, var: str = "ANNA_TRACE_FILE") -> "Tracer":
+        path = os.getenv(var)
+        return cls(service, JsonlExporter(path) if path else None)
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def record(self, trace_id, name: str, start: float, end: float, **attributes) -> Optional[Span]:
+        """Registra um span com início e fim já conhecidos (ex.: timestamp do bloco)"""
+        if self.exporter is None or start is None or end is None:
+            return None
+        span = Span(
+            trace_id=normalize_trace_id(trace_id),
+            name=name,
+            start=start,
+            end=end,
+            service=self.service,
+            attributes=attributes
+        )
+        self.exporter.export(span)
+        return span
+
+    @contextmanager
+    def span(self, trace_id, name: str, **attributes):
+        """Mede o bloco with como um span; atributos podem ser adicionados ao dict retornado"""
+        if self.exporter is None:
+            yield attributes
+            return
+        start = time.time()
+        try:
+            yield attributes
+        finally:
+            self.record(trace_id, name, start, time.time(), **attributes)
+
+
+NOOP_TRACER = Tracer("noop")
+
+
+# ============================================================
+# WATERFALL
+# ============================================================
+
+def load_spans(paths: Iterable[str]) -> List[Span]:
+    spans = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    spans.append(Span(**json.loads(line)))
+    return spans
+
+
+def group_traces(spans: List[Span]) -> Dict[str, List[Span]]:
+    """
+    Agrupa por trace_id, juntando spans de IDs provisórios do SDK ao trace do
+    verificador quando o tx_hash da submissão coincide
+    """
+    by_tx = {}
+    for span in spans:
+        tx_hash = span.attributes.get("submit_tx_hash")
+        if tx_hash and span.service == "verifier":
+            by_tx[normalize_trace_id(tx_hash)] = span.trace_id
+    traces: Dict[str, List[Span]] = {}
+    for span in spans:
+        tx_hash = span.attributes.get("submit_tx_hash")
+        trace_id = by_tx.get(normalize_trace_id(tx_hash), span.trace_id) if tx_hash else span.trace_id
+        traces.setdefault(trace_id, []).append(span)
+    for trace in traces.values():
+        trace.sort(key=lambda s: (s.start, s.end))
+    return traces
+
+
+def format_waterfall(trace_id: str, spans: List[Span], width: int = 50) -> str:
+    origin = min(s.start for s in spans)
+    total = max(s.end for s in spans) - origin or 1e-9
+    lines = [f"attestation {trace_id[:16]}...  total {total:.3f}s"]
+    for s in spans:
+        offset = int((s.start - origin) / total * width)
+        length = max(1, int(s.duration / total * width))
+        bar = " " * offset + "█" * min(length, width - offset)
+        lines.append(f"  {s.name:24} {s.start - origin:9.3f}s {s.duration:9.3f}s |{bar:<{width}}|")
+    return "\n".join(lines)
+
+
+def summarize(traces: Dict[str, List[Span]]) -> str:
+    """Tempo médio e máximo por etapa em todos os traces"""
+    durations: Dict[str, List[float]] = {}
+    for spans in traces.values():
+        for s in spans:
+            durations.setdefault(s.name, []).append(s.duration)
+    lines = [f"{'etapa':24} {'n':>6} {'média s':>10} {'máx s':>10}"]
+    for name, values in sorted(durations.items(), key=lambda kv: -sum(kv[1])):
+        lines.append(f"{name:24} {len(values):6} {sum(values) / len(values):10.3f} {max(values):10.3f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-attestation latency waterfall from ANNA trace files')
+    sub = parser.add_subparsers(dest='command', required=True)
+    waterfall = sub.add_parser('waterfall', help='Print one waterfall per attestation')
+    waterfall.add_argument('files', nargs='+', help='JSONL trace files (SDK and verifier)')
+    waterfall.add_argument('--id', default=None, help='Only this attestation ID (prefix allowed)')
+    waterfall.add_argument('--last', type=int, default=10, help='Show the N most recent traces (default: 10)')
+    summary = sub.add_parser('summary', help='Mean and max duration of each stage across traces')
+    summary.add_argument('files', nargs='+')
+    args = parser.parse_args()
+
+    traces = group_traces(load_spans(args.files))
+    if args.command == 'summary':
+        print(summarize(traces))
+        return
+
+    selected = sorted(traces.items(), key=lambda kv: kv[1][0].start)
+    if args.id:
+        prefix = normalize_trace_id(args.id)
+        selected = [(t, s) for t, s in selected if t.startswith(prefix)]
+    for trace_id, spans in selected[-args.last:]:
+        print(format_waterfall(trace_id, spans))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -333,7 +333,7 @@ print(f"✅ Attestation: {result.attestation_id[:16]}...")
 print(f"✅ Contrato: {len(contract_text)} caracteres")
 print(f"✅ Verificação: {'Aprovada' if verification.verified else 'Pendente'}")
 print(f"✅ Score: {verification.score if verification.verified else 'N/A'}/100")
-print(f"✅ Gas usado: ~{client.w3.eth.gas_price / 10**9:.2f} Gwei")
+print(f"✅ Max fee: ~{client.fee_oracle.fees(client.fee_urgency)[0] / 10**9:.2f} Gwei")
 print()
 print("🎉 PROCESSO CONCLUÍDO COM SUCESSO!")
 print("=" * 60)
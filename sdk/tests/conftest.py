@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Módulos do SDK são planos (import anna_codec, ...), como nos scripts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
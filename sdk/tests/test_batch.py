@@ -0,0 +1,95 @@
+"""CallBatcher: só um RPC sem suporte a lotes desliga os lotes"""
+
+import pytest
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from web3 import Web3
+from web3.exceptions import BadResponseFormat, Web3RPCError
+
+from anna_batch import CallBatcher
+from anna_devchain import DevChain, DEFAULT_CONTRACT
+from anna_rpc import batch_unsupported
+
+COUNT_ABI = [{
+    "type": "function", "name": "attestationCount", "stateMutability": "view",
+    "inputs": [{"name": "agent", "type": "address"}], "outputs": [{"name": "", "type": "uint256"}]
+}]
+AGENT = "0x" + "11" * 20
+
+
+def _error(code, message):
+    return {"jsonrpc": "2.0", "id": None, "error": {"code": code, "message": message}}
+
+
+@pytest.mark.parametrize("reply, unsupported", [
+    (_error(-32601, "the method batch does not exist/is not available"), True),
+    (_error(-32600, "invalid request"), True),
+    ({"jsonrpc": "2.0", "id": 1, "result": "0x1"}, True),
+    (BadResponseFormat("batch"), True),
+    (Web3RPCError("x", rpc_response=_error(-32601, "Method not found")), True),
+    (_error(-32005, "limit exceeded"), False),
+    (_error(-32603, "internal error"), False),
+    (RequestsConnectionError("reset by peer"), False),
+    (TimeoutError(), False),
+    (Web3RPCError("x", rpc_response=_error(429, "Too Many Requests")), False),
+])
+def test_batch_unsupported(reply, unsupported):
+    assert batch_unsupported(reply) is unsupported
+
+
+def test_batch_unsupported_list_size():
+    assert batch_unsupported([{}, {}], 2) is False
+    assert batch_unsupported([{}], 2) is True
+
+
+@pytest.fixture
+def node():
+    chain = DevChain(block_time=0)
+    url = chain.serve(port=0, background=True)
+    w3 = Web3(Web3.HTTPProvider(url))
+    yield w3, w3.eth.contract(address=DEFAULT_CONTRACT, abi=COUNT_ABI)
+    chain.stop()
+
+
+def _script(w3, replies):
+    """batch_request_func que devolve (ou levanta) as respostas dadas e depois segue para o nó"""
+    original = w3.provider.batch_request_func
+    calls = []
+
+    def batch_request_func(w3_, middleware):
+        real = original(w3_, middleware)
+
+        def request(requests):
+            calls.append(len(requests))
+            if replies:
+                reply = replies.pop(0)
+                if isinstance(reply, Exception):
+                    raise reply
+                return reply
+            return real(requests)
+        return request
+
+    w3.provider.batch_request_func = batch_request_func
+    return calls
+
+
+def test_transient_errors_retry_batch(node):
+    w3, contract = node
+    calls = _script(w3, [RequestsConnectionError("reset"), _error(-32005, "limit exceeded")])
+    batcher = CallBatcher(w3, retry_delay=0)
+    assert len(batcher.call([contract.functions.attestationCount(AGENT)] * 3)) == 3
+    assert batcher._batch_supported and batcher.batches == 1 and len(calls) == 3
+
+    # Persistindo, só aquele lote vai item a item
+    _script(w3, [_error(-32005, "limit exceeded")] * 3)
+    assert len(batcher.call([contract.functions.attestationCount(AGENT)] * 3)) == 3
+    assert batcher._batch_supported and batcher.batches == 1
+
+
+def test_unsupported_disables_batches(node):
+    w3, contract = node
+    calls = _script(w3, [_error(-32601, "Method not found")])
+    batcher = CallBatcher(w3, retry_delay=0)
+    assert len(batcher.call([contract.functions.attestationCount(AGENT)] * 3)) == 3
+    assert not batcher._batch_supported and len(calls) == 1
+    batcher.call([contract.functions.attestationCount(AGENT)])
+    assert len(calls) == 1
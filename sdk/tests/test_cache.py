@@ -0,0 +1,114 @@
+import time
+from collections import Counter
+
+from anna_cache import CHALLENGE_PERIOD, RPCCache, attestation_settled
+from anna_codec import AGENT_ID_BY_ADDRESS, ATTESTATIONS, GET_AGENT_METADATA
+
+
+def _words(*values):
+    return b"".join(v.to_bytes(32, "big") for v in values)
+
+
+def _attestation(status, verification_time=0):
+    # contentHash, reasoningHash, agent, modelVersion(off), timestamp, status, score, verifier, verificationTime, category(off)
+    return _words(1, 2, 3, 320, 100, status, 90, 4, verification_time, 352) + _words(0, 0)
+
+
+class FakeNode:
+    """make_request de mentira: head fixo e resultado configurável por método"""
+
+    def __init__(self, head=1000):
+        self.head = head
+        self.calls = Counter()
+        self.results = {}
+
+    def __call__(self, method, params):
+        self.calls[method] += 1
+        if method == "eth_blockNumber":
+            return {"jsonrpc": "2.0", "id": 1, "result": hex(self.head)}
+        return {"jsonrpc": "2.0", "id": 1, "result": self.results.get(method)}
+
+
+def _call(selector, block="latest"):
+    return [{"to": "0x" + "11" * 20, "data": "0x" + selector.hex() + "00" * 32}, block]
+
+
+def test_attestation_settled():
+    now = time.time()
+    assert not attestation_settled(_attestation(0), now)
+    assert attestation_settled(_attestation(3, int(now)), now)
+    # Verificada/rejeitada ainda pode ser contestada dentro do prazo
+    assert not attestation_settled(_attestation(1, int(now) - 3600), now)
+    assert not attestation_settled(_attestation(2, int(now) - 3600), now)
+    assert attestation_settled(_attestation(1, int(now - CHALLENGE_PERIOD) - 60), now)
+    assert not attestation_settled(b"\x00" * 64, now)
+
+
+def test_recent_verified_attestation_is_cached_per_block_only():
+    node, cache = FakeNode(), RPCCache(head_ttl=0)
+    node.results["eth_call"] = "0x" + _attestation(1, int(time.time())).hex()
+    for _ in range(3):
+        cache.request(node, "eth_call", _call(ATTESTATIONS))
+    assert node.calls["eth_call"] == 1
+    node.head += 1
+    cache.request(node, "eth_call", _call(ATTESTATIONS))
+    assert node.calls["eth_call"] == 2
+
+
+def test_settled_attestation_needs_finalized_block():
+    node, cache = FakeNode(), RPCCache(head_ttl=0, finality_depth=64)
+    node.results["eth_call"] = "0x" + _attestation(3).hex()
+    cache.request(node, "eth_call", _call(ATTESTATIONS, hex(node.head)))
+    node.head += 1
+    cache.request(node, "eth_call", _call(ATTESTATIONS, hex(node.head)))
+    assert node.calls["eth_call"] == 2
+
+    cache.request(node, "eth_call", _call(ATTESTATIONS, hex(node.head - 100)))
+    node.head += 10
+    cache.request(node, "eth_call", _call(ATTESTATIONS))
+    assert node.calls["eth_call"] == 3
+
+
+def test_agent_id_forever_only_when_registered():
+    node, cache = FakeNode(), RPCCache(head_ttl=0)
+    node.results["eth_call"] = "0x" + _words(0).hex()
+    cache.request(node, "eth_call", _call(AGENT_ID_BY_ADDRESS))
+    node.head += 1
+    cache.request(node, "eth_call", _call(AGENT_ID_BY_ADDRESS))
+    assert node.calls["eth_call"] == 2
+
+    node.results["eth_call"] = "0x" + _words(7).hex()
+    node.head += 1
+    cache.request(node, "eth_call", _call(AGENT_ID_BY_ADDRESS))
+    node.head += 5
+    cache.request(node, "eth_call", _call(AGENT_ID_BY_ADDRESS))
+    assert node.calls["eth_call"] == 3
+
+
+def test_agent_metadata_rule_uses_ttl_across_blocks():
+    node, cache = FakeNode(), RPCCache(head_ttl=0)
+    node.results["eth_call"] = "0x" + _words(1, 2).hex()
+    cache.request(node, "eth_call", _call(GET_AGENT_METADATA))
+    node.head += 3
+    cache.request(node, "eth_call", _call(GET_AGENT_METADATA))
+    assert node.calls["eth_call"] == 1
+
+
+def test_nonce_and_null_results_are_never_cached():
+    node, cache = FakeNode(), RPCCache(head_ttl=0)
+    node.results["eth_getTransactionCount"] = "0x5"
+    for _ in range(2):
+        cache.request(node, "eth_getTransactionCount", ["0x" + "22" * 20, "pending"])
+    assert node.calls["eth_getTransactionCount"] == 2
+
+    for _ in range(2):
+        cache.request(node, "eth_getTransactionReceipt", ["0x" + "33" * 32])
+    assert node.calls["eth_getTransactionReceipt"] == 2
+
+
+def test_chain_id_cached_forever():
+    node, cache = FakeNode(), RPCCache(head_ttl=0)
+    node.results["eth_chainId"] = "0x1"
+    for _ in range(3):
+        cache.request(node, "eth_chainId", [])
+    assert node.calls["eth_chainId"] == 1
@@ -0,0 +1,170 @@
+import json
+import os
+
+import pytest
+from eth_utils import keccak
+
+import anna_codec
+from anna_sdk import ANNAClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _artifact(name):
+    with open(os.path.join(ROOT, "contracts", "artifacts", "contracts", f"{name}.sol", f"{name}.json")) as f:
+        return json.load(f)["abi"]
+
+
+def _sdk_abis():
+    holder = type("Holder", (), {})()
+    ANNAClient._load_abis(holder)
+    return holder
+
+
+def _signature(entry):
+    return f"{entry['name']}({','.join(i['type'] for i in entry.get('inputs', []))})"
+
+
+SDK = _sdk_abis()
+with open(os.path.join(ROOT, "verifier", "attestation_abi.json")) as f:
+    VERIFIER_ABI = json.load(f)
+ABIS = {
+    "AnnaAttestation": _artifact("AnnaAttestation"),
+    "AnnaIdentity": _artifact("AnnaIdentity"),
+    "AnnaReputation": _artifact("AnnaReputation"),
+    "sdk.attestation": SDK.attestation_abi,
+    "sdk.identity": SDK.identity_abi,
+    "sdk.reputation": SDK.reputation_abi,
+    "verifier.attestation": VERIFIER_ABI,
+}
+
+# Cada seletor do codec tem que existir, com os mesmos tipos, nas ABIs que o usam
+SELECTORS = [
+    ("VERIFY_ATTESTATION", "verifyAttestation", ["AnnaAttestation", "verifier.attestation"]),
+    ("SUBMIT_ATTESTATION", "submitAttestation", ["AnnaAttestation", "verifier.attestation"]),
+    ("SUBMIT_ATTESTATION_SIGNED", "submitAttestation", ["sdk.attestation"]),
+    ("ATTESTATIONS", "attestations", ["AnnaAttestation", "sdk.attestation", "verifier.attestation"]),
+    ("AGENT_ID_BY_ADDRESS", "agentIdByAddress", ["AnnaIdentity", "sdk.identity"]),
+    ("GET_AGENT_METADATA", "getAgentMetadata", ["AnnaIdentity", "sdk.identity"]),
+    ("GET_FULL_REPUTATION", "getFullReputation", ["AnnaReputation", "sdk.reputation"]),
+]
+TOPICS = [
+    ("ATTESTATION_SUBMITTED", "AttestationSubmitted", ["AnnaAttestation", "verifier.attestation"]),
+    ("ATTESTATION_VERIFIED", "AttestationVerified", ["AnnaAttestation", "verifier.attestation"]),
+    ("REPUTATION_UPDATED", "ReputationUpdated", ["AnnaReputation"]),
+]
+
+
+@pytest.mark.parametrize("constant,name,abis", SELECTORS)
+def test_selector_matches_abi(constant, name, abis):
+    selector = getattr(anna_codec, constant)
+    for abi_name in abis:
+        selectors = {
+            keccak(text=_signature(e))[:4] for e in ABIS[abi_name] if e.get("type") == "function" and e["name"] == name
+        }
+        assert selector in selectors, f"{constant} não bate com {name} em {abi_name}"
+
+
+@pytest.mark.parametrize("constant,name,abis", TOPICS)
+def test_topic_matches_abi(constant, name, abis):
+    topic = getattr(anna_codec, constant)
+    for abi_name in abis:
+        topics = {keccak(text=_signature(e)) for e in ABIS[abi_name] if e.get("type") == "event" and e["name"] == name}
+        assert topic in topics, f"{constant} não bate com {name} em {abi_name}"
+
+
+# ------------------------------------------------------------
+# Ida e volta: calldata e logs do codec contra web3/eth_abi
+# ------------------------------------------------------------
+
+ATTESTATION_ID = bytes(range(32))
+AGENT = "0x" + "ab" * 20
+CONTRACT = "0x" + "cd" * 20
+
+
+def _contract(abi_name):
+    from web3 import Web3
+    return Web3().eth.contract(address=Web3.to_checksum_address(CONTRACT), abi=ABIS[abi_name])
+
+
+def _topic_address(address):
+    return bytes(12) + bytes.fromhex(address[2:])
+
+
+def _log(topics, data, as_hex=False):
+    log = {
+        "address": CONTRACT, "topics": topics, "data": data, "blockNumber": 7,
+        "transactionHash": b"\x11" * 32, "logIndex": 2, "blockHash": b"\x22" * 32, "transactionIndex": 0
+    }
+    if as_hex:
+        log = dict(
+            log, topics=["0x" + t.hex() for t in topics], data="0x" + data.hex(),
+            blockNumber=hex(7), logIndex=hex(2), transactionHash="0x" + "11" * 32
+        )
+    return log
+
+
+@pytest.mark.parametrize("passed,score", [(True, 0), (False, 255), (True, 87)])
+def test_verify_calldata_matches_web3(passed, score):
+    expected = _contract("AnnaAttestation").encode_abi("verifyAttestation", [ATTESTATION_ID, passed, score])
+    assert "0x" + anna_codec.encode_verify_attestation(ATTESTATION_ID, passed, score).hex() == expected
+    assert anna_codec.encode_verify_attestation("0x" + ATTESTATION_ID.hex(), passed, score).hex() == expected[2:]
+
+
+def test_verify_calldata_rejects_bad_input():
+    with pytest.raises(ValueError):
+        anna_codec.encode_verify_attestation(ATTESTATION_ID, True, 256)
+    with pytest.raises(ValueError):
+        anna_codec.encode_verify_attestation(ATTESTATION_ID[:31], True, 1)
+
+
+def test_submit_calldata_matches_web3():
+    args = [ATTESTATION_ID, b"\x01" * 32, "model-ção-v1", "legal-contract"]
+    expected = _contract("AnnaAttestation").encode_abi("submitAttestation", args)
+    assert "0x" + anna_codec.encode_submit_attestation(*args).hex() == expected
+
+    signature = b"\x05" * 65
+    expected = _contract("sdk.attestation").encode_abi("submitAttestation", args + [signature])
+    assert "0x" + anna_codec.encode_submit_attestation(*args, signature=signature).hex() == expected
+
+
+@pytest.mark.parametrize("as_hex", [False, True])
+def test_submitted_log_round_trip(as_hex):
+    from eth_abi import encode
+
+    data = encode(["string", "uint256"], ["catégorie", 1_700_000_000])
+    log = _log([anna_codec.ATTESTATION_SUBMITTED, ATTESTATION_ID, _topic_address(AGENT)], data, as_hex)
+    record = anna_codec.decode_log(log)
+    event = _contract("AnnaAttestation").events.AttestationSubmitted().process_log(_log(
+        [anna_codec.ATTESTATION_SUBMITTED, ATTESTATION_ID, _topic_address(AGENT)], data
+    ))
+    assert isinstance(record, anna_codec.AttestationSubmitted)
+    args = event["args"]
+    assert record.attestation_id == args["attestationId"]
+    assert record.agent == args["agent"]
+    assert record.category == args["category"] == "catégorie"
+    assert record.timestamp == args["timestamp"]
+    assert (record.block_number, record.log_index, record.transaction_hash) == (7, 2, b"\x11" * 32)
+
+
+def test_verified_and_reputation_logs_round_trip():
+    from eth_abi import encode
+
+    verified = _log(
+        [anna_codec.ATTESTATION_VERIFIED, ATTESTATION_ID, _topic_address(AGENT)], encode(["uint8", "uint8"], [1, 93])
+    )
+    reputation = _log([anna_codec.REPUTATION_UPDATED, _topic_address(AGENT)], encode(["uint256", "uint256"], [870, 5]))
+    records = anna_codec.decode_logs([verified, reputation, _log([keccak(text="Other()")], b"")])
+    assert [type(r) for r in records] == [anna_codec.AttestationVerified, anna_codec.ReputationUpdated]
+    assert (records[0].status, records[0].consistency_score) == (1, 93)
+    assert (records[1].new_score, records[1].timestamp) == (870, 5)
+    assert anna_codec.decode_logs([verified, reputation], event=anna_codec.ReputationUpdated) == records[1:]
+
+
+def test_malformed_log_raises():
+    log = _log([anna_codec.ATTESTATION_SUBMITTED, ATTESTATION_ID], b"")
+    with pytest.raises(ValueError):
+        anna_codec.decode_log(log)
+    log = _log([anna_codec.ATTESTATION_SUBMITTED, ATTESTATION_ID, _topic_address(AGENT)], b"\x00" * 31)
+    with pytest.raises(ValueError):
+        anna_codec.decode_log(log)
@@ -0,0 +1,99 @@
+"""NonceManager: release, resync e reset"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from anna_nonce import NonceManager, is_transient
+
+ADDRESS = "0x" + "33" * 20
+
+
+class FakeEth:
+    def __init__(self, pending=5):
+        self.pending = pending
+        self.reads = 0
+
+    def get_transaction_count(self, address, block):
+        assert block == "pending"
+        self.reads += 1
+        return self.pending
+
+
+@pytest.fixture
+def node():
+    eth = FakeEth()
+    return eth, NonceManager(type("W3", (), {"eth": eth})(), ADDRESS)
+
+
+def test_counts_locally(node):
+    eth, nonces = node
+    assert [nonces.next() for _ in range(3)] == [5, 6, 7]
+    assert eth.reads == 1
+
+
+def test_concurrent_next_is_unique(node):
+    _, nonces = node
+    with ThreadPoolExecutor(16) as pool:
+        allocated = list(pool.map(lambda _: nonces.next(), range(500)))
+    assert sorted(allocated) == list(range(5, 505))
+
+
+def test_release_last_rewinds(node):
+    _, nonces = node
+    nonces.next()
+    last = nonces.next()
+    assert nonces.release(last) is True
+    assert nonces.next() == last
+
+
+def test_release_below_leaves_gap_reused_first(node):
+    _, nonces = node
+    first, second, third = nonces.next(), nonces.next(), nonces.next()
+    assert nonces.release(first) is False  # acima dele já há nonces em voo
+    assert nonces.release(first) is True  # duplicado: ignorado
+    assert nonces.next() == first
+    assert nonces.next() == third + 1
+
+    nonces.release(second)
+    assert nonces.take_released() == second
+    assert nonces.take_released() is None
+
+
+def test_resync_only_moves_forward(node):
+    eth, nonces = node
+    for _ in range(3):
+        nonces.next()  # 5, 6, 7 em voo
+    nonces.release(5)
+    nonces.release(6)
+
+    # O nó ainda não viu os nonces em voo: nada é entregue de novo
+    eth.pending = 5
+    assert nonces.resync() == 8
+    assert nonces.take_released() == 5
+
+    # O nó passou de nonces devolvidos: eles são descartados
+    nonces.release(5)
+    eth.pending = 12
+    assert nonces.resync() == 12
+    assert nonces.take_released() is None
+    assert nonces.next() == 12
+
+
+def test_reset_rereads_node(node):
+    eth, nonces = node
+    nonces.next()
+    nonces.next()
+    nonces.release(5)
+    eth.pending = 3
+    assert nonces.reset() == 3
+    assert nonces.next() == 3
+    assert nonces.stats["resets"] == 1
+
+
+def test_is_transient():
+    assert is_transient(ConnectionResetError())
+    assert is_transient(ValueError({"code": -32005, "message": "limit exceeded"}))
+    assert is_transient(Exception("429 Too Many Requests: rate limit"))
+    assert not is_transient(ValueError({"code": -32000, "message": "insufficient funds for gas"}))
+    assert not is_transient(ValueError({"code": -32000, "message": "nonce too low"}))
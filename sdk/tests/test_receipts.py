@@ -0,0 +1,72 @@
+"""ReceiptWatcher: vários watch() do mesmo hash"""
+
+import pytest
+from eth_account import Account
+from web3 import Web3
+from web3.exceptions import TimeExhausted
+
+from anna_devchain import DevChain
+from anna_receipts import ReceiptWatcher
+
+
+@pytest.fixture
+def node():
+    chain = DevChain(block_time=0)
+    url = chain.serve(port=0, background=True)
+    yield chain, Web3(Web3.HTTPProvider(url))
+    chain.stop()
+
+
+def _send(w3):
+    account = Account.create()
+    signed = account.sign_transaction({
+        "to": account.address, "value": 0, "gas": 21000, "nonce": 0,
+        "maxFeePerGas": 60 * 10**9, "maxPriorityFeePerGas": 10**9, "chainId": w3.eth.chain_id
+    })
+    return w3.eth.send_raw_transaction(signed.raw_transaction).hex()
+
+
+def test_second_watch_does_not_orphan_first(node):
+    chain, w3 = node
+    watcher = ReceiptWatcher(w3, poll_interval=0.05)
+    try:
+        tx_hash = _send(w3)
+        first = watcher.watch(tx_hash, timeout=10)
+        second = watcher.watch(tx_hash, timeout=10, confirmations=1)
+        chain.mine()
+        assert first.result(timeout=5)["transactionHash"].hex() == tx_hash.removeprefix("0x")
+        assert not second.done()
+        chain.mine()
+        assert second.result(timeout=5)["blockNumber"] == first.result()["blockNumber"]
+        assert len(watcher) == 0
+    finally:
+        watcher.stop()
+
+
+def test_expired_watch_leaves_others(node):
+    chain, w3 = node
+    watcher = ReceiptWatcher(w3, poll_interval=0.05)
+    try:
+        tx_hash = _send(w3)
+        short = watcher.watch(tx_hash, timeout=0.2)
+        long = watcher.watch(tx_hash, timeout=10)
+        with pytest.raises(TimeExhausted):
+            short.result(timeout=5)
+        assert len(watcher) == 1
+        chain.mine()
+        assert long.result(timeout=5) is not None
+    finally:
+        watcher.stop()
+
+
+def test_forget_cancels_every_watch(node):
+    _, w3 = node
+    watcher = ReceiptWatcher(w3, poll_interval=0.05)
+    try:
+        tx_hash = _send(w3)
+        futures = [watcher.watch(tx_hash) for _ in range(3)]
+        watcher.forget(tx_hash)
+        assert all(future.cancelled() for future in futures)
+        assert len(watcher) == 0
+    finally:
+        watcher.stop()
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Controle de admissão por agente
+
+Impede que um único agente inundando submitAttestation faça os demais
+esperarem na fila FIFO do verificador, usando memória fixa mesmo com
+milhões de endereços distintos:
+
+1. Count-min sketch estima quantas attestations cada agente submeteu na
+   janela atual (contadores envelhecem pela metade a cada decay_interval)
+2. Um top-k mantém os maiores emissores (heavy hitters)
+3. Só os heavy hitters recebem token bucket; o que excede a taxa é adiado
+   para os próximos polls, sempre depois do tráfego dos demais agentes
+"""
+
+import time
+import hashlib
+import logging
+from array import array
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CountMinSketch:
+    """Estimativa de frequência em memória fixa (width x depth contadores)"""
+
+    def __init__(self, width: int = 4096, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.rows = [array('L', [0]) * width for _ in range(depth)]
+        self.total = 0
+
+    def _indexes(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key: str, count: int = 1) -> int:
+        """Incrementa a chave e retorna a nova estimativa (atualização conservadora)"""
+        indexes = self._indexes(key)
+        estimate = min(row[i] for row, i in zip(self.rows, indexes)) + count
+        for row, i in zip(self.rows, indexes):
+            if row[i] < estimate:
+                row[i] = estimate
+        self.total += count
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        return min(row[i] for row, i in zip(self.rows, self._indexes(key)))
+
+    def decay(self):
+        """Divide todos os contadores por 2 (janela deslizante aproximada)"""
+        for row in self.rows:
+            for i in range(self.width):
+                row[i] >>= 1
+        self.total >>= 1
+
+
+class TokenBucket:
+    """Token bucket simples (tokens/segundo, com rajada máxima)"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated_at")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class AdmissionController:
+    """Admissão por agente: prioriza agentes normais e limita os heavy hitters"""
+
+    def __init__(
+        self,
+        width: int = 4096,
+        depth: int = 4,
+        top_k: int = 32,
+        heavy_share: float = 0.2,
+        min_heavy_count: int = 20,
+        rate: float = 0.2,
+        burst: float = 5,
+        decay_interval: float = 300,
+        max_deferred: int = 100000
+    ):
+        """
+        Args:
+            width, depth: Dimensões do count-min sketch
+            top_k: Quantos maiores emissores acompanhar
+            heavy_share: Fração do tráfego da janela a partir da qual o agente é heavy hitter
+            min_heavy_count: Mínimo de submissões na janela para ser heavy hitter
+            rate: Attestations/segundo admitidas por heavy hitter
+            burst: Rajada máxima admitida por heavy hitter
+            decay_interval: Segundos entre cada envelhecimento (÷2) dos contadores
+            max_deferred: Tamanho máximo do backlog adiado (acima disso, admite no fim da fila)
+        """
+        self.sketch = CountMinSketch(width, depth)
+        self.top_k = top_k
+        self.heavy_share = heavy_share
+        self.min_heavy_count = min_heavy_count
+        self.rate = rate
+        self.burst = burst
+        self.decay_interval = decay_interval
+        self.max_deferred = max_deferred
+
+        self.top: Dict[str, int] = {}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.deferred = deque()
+        self.deferred_by_agent = Counter()
+        self.deferred_total = 0
+        self._last_decay = time.monotonic()
+
+    def _maybe_decay(self):
+        now = time.monotonic()
+        if now - self._last_decay < self.decay_interval:
+            return
+        self._last_decay = now
+        self.sketch.decay()
+        self.top = {agent: count >> 1 for agent, count in self.top.items() if count >> 1 > 0}
+        for agent in list(self.buckets):
+            if not self.is_heavy(agent):
+                del self.buckets[agent]
+
+    def observe(self, agent: str):
+        """Registra uma submissão do agente"""
+        self._maybe_decay()
+        estimate = self.sketch.add(agent)
+
+        if agent in self.top or len(self.top) < self.top_k:
+            self.top[agent] = estimate
+            return
+        smallest = min(self.top, key=self.top.get)
+        if estimate > self.top[smallest]:
+            del self.top[smallest]
+            self.buckets.pop(smallest, None)
+            self.top[agent] = estimate
+
+    def is_heavy(self, agent: str) -> bool:
+        count = self.top.get(agent)
+        if count is None or count < self.min_heavy_count:
+            return False
+        return count >= self.heavy_share * self.sketch.total
+
+    def _admit_heavy(self, agent: str) -> bool:
+        bucket = self.buckets.get(agent)
+        if bucket is None:
+            bucket = self.buckets[agent] = TokenBucket(self.rate, self.burst)
+        return bucket.take()
+
+    def schedule(self, items: List[Tuple[str, str]]) -> List[str]:
+        """
+        Ordena o trabalho do poll e adia o excesso dos heavy hitters
+
+        Args:
+            items: Novos itens (attestation_id, agent) deste poll
+
+        Returns:
+            IDs a processar agora, em ordem de prioridade: agentes normais
+            primeiro, depois heavy hitters dentro da taxa (incluindo o backlog)
+        """
+        normal, limited = [], []
+        backlog = len(self.deferred)
+
+        # Backlog primeiro, em ordem de chegada, para não reordenar o mesmo agente
+        for _ in range(backlog):
+            attestation_id, agent = self._pop_deferred()
+            self._route(attestation_id, agent, normal, limited)
+        for attestation_id, agent in items:
+            self._route(attestation_id, agent, normal, limited)
+
+        # Backlog cheio: o excedente é admitido, mas por último
+        overflow = []
+        while len(self.deferred) > self.max_deferred:
+            overflow.append(self._pop_deferred()[0])
+
+        if self.deferred:
+            logger.info(f"⏸️  {len(self.deferred)} attestations adiadas por limite de taxa de heavy hitters")
+        return normal + limited + overflow
+
+    def _route(self, attestation_id: str, agent: str, normal: list, limited: list):
+        if not self.is_heavy(agent):
+            normal.append(attestation_id)
+        elif self._admit_heavy(agent):
+            limited.append(attestation_id)
+        else:
+            self.deferred.append((attestation_id, agent))
+            self.deferred_by_agent[agent] += 1
+            self.deferred_total += 1
+
+    def snapshot(self) -> Dict:
+        """Estado que schedule() altera: backlog, total adiado e token buckets"""
+        return {
+            "deferred": list(self.deferred),
+            "deferred_total": self.deferred_total,
+            "buckets": {agent: (bucket.tokens, bucket.updated_at) for agent, bucket in self.buckets.items()}
+        }
+
+    def restore(self, snapshot: Dict):
+        """
+        Volta ao estado de snapshot() (poll que falhou antes de processar o que
+        admitiu): o backlog e os tokens gastos voltam; as contagens do sketch
+        ficam, já que observe() vem antes do snapshot
+        """
+        self.deferred = deque(snapshot["deferred"])
+        self.deferred_by_agent = Counter(agent for _, agent in self.deferred)
+        self.deferred_total = snapshot["deferred_total"]
+        self.buckets = {}
+        for agent, (tokens, updated_at) in snapshot["buckets"].items():
+            bucket = self.buckets[agent] = TokenBucket(self.rate, self.burst)
+            bucket.tokens, bucket.updated_at = tokens, updated_at
+
+    def _pop_deferred(self) -> Tuple[str, str]:
+        attestation_id, agent = self.deferred.popleft()
+        self.deferred_by_agent[agent] -= 1
+        if self.deferred_by_agent[agent] <= 0:
+            del self.deferred_by_agent[agent]
+        return attestation_id, agent
+
+    def heavy_hitters(self, limit: Optional[int] = None) -> List[Dict]:
+        """Maiores emissores da janela atual, com a estimativa e se estão limitados"""
+        total = self.sketch.total or 1
+        ranked = sorted(self.top.items(), key=lambda kv: kv[1], reverse=True)[:limit or self.top_k]
+        return [
+            {
+                "agent": agent,
+                "estimated_count": count,
+                "share": round(count / total, 4),
+                "limited": self.is_heavy(agent),
+                "deferred": self.deferred_by_agent.get(agent, 0)
+            }
+            for agent, count in ranked
+        ]
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Benchmark do codec ABI pré-compilado (anna_codec)
+
+Compara, por item, o caminho do web3 (Contract.events / encode_abi /
+build_transaction) com o anna_codec:
+
+- decodificação de logs AttestationSubmitted (logs formatados pelo web3 e
+  logs crus do JSON-RPC)
+- calldata de verifyAttestation e submitAttestation
+
+Os logs vêm de uma devchain em memória (sem HTTP): só CPU é medida.
+
+Uso:
+    python bench_codec.py --logs 5000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sdk'))
+
+from web3 import Web3
+from web3._utils.method_formatters import log_entry_formatter
+
+import anna_codec
+from anna_devchain import DevChain, DEFAULT_CONTRACT
+
+SDK_SUBMIT_ABI = {
+    "inputs": [
+        {"name": "contractHash", "type": "bytes32"},
+        {"name": "reasoningHash", "type": "bytes32"},
+        {"name": "modelVersion", "type": "string"},
+        {"name": "category", "type": "string"},
+        {"name": "signature", "type": "bytes"}
+    ],
+    "name": "submitAttestation",
+    "outputs": [{"name": "", "type": "bytes32"}],
+    "stateMutability": "nonpayable",
+    "type": "function"
+}
+
+
+def timed(label: str, count: int, fn, baseline: float = None) -> float:
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    per_item = elapsed / count * 1e6
+    speedup = f"{baseline / per_item:6.1f}x" if baseline else "     -"
+    print(f"   {label:44} {per_item:9.2f} µs/item {count / elapsed:12,.0f}/s {speedup}")
+    return per_item
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark precompiled ABI codec vs web3 contract path')
+    parser.add_argument('--logs', type=int, default=5000, help='AttestationSubmitted logs to decode (default: 5000)')
+    parser.add_argument('--encodes', type=int, default=20000, help='Calldata encodings per case (default: 20000)')
+    args = parser.parse_args()
+
+    chain = DevChain(automine=True)
+    chain.inject(args.logs, [f"0x{i:040x}" for i in range(1, 101)])
+    raw_logs = chain.handle("eth_getLogs", [{"address": DEFAULT_CONTRACT, "fromBlock": "0x0", "toBlock": "latest"}])
+    web3_logs = [log_entry_formatter(log) for log in raw_logs]
+
+    abi_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'attestation_abi.json')
+    with open(abi_path) as f:
+        abi = json.load(f)
+    w3 = Web3()
+    contract = w3.eth.contract(address=DEFAULT_CONTRACT, abi=abi + [SDK_SUBMIT_ABI])
+    event = contract.events.AttestationSubmitted()
+
+    # Mesmo resultado nos dois caminhos antes de medir
+    records = anna_codec.decode_logs(web3_logs)
+    for record, log in zip(records, web3_logs):
+        args_ = event.process_log(log)["args"]
+        assert (record.attestation_id, record.agent, record.category, record.timestamp) == (
+            args_["attestationId"], args_["agent"], args_["category"], args_["timestamp"]
+        )
+    assert anna_codec.decode_logs(raw_logs) == records
+
+    print(f"\nDecodificação de {len(web3_logs)} logs AttestationSubmitted")
+    base = timed("web3 events.process_log", len(web3_logs), lambda: [event.process_log(log) for log in web3_logs])
+    timed("anna_codec.decode_logs (logs do web3)", len(web3_logs), lambda: anna_codec.decode_logs(web3_logs), base)
+    timed("anna_codec.decode_logs (JSON-RPC cru)", len(raw_logs), lambda: anna_codec.decode_logs(raw_logs), base)
+
+    n = args.encodes
+    attestation_id = os.urandom(32)
+    signature = os.urandom(65)
+
+    print(f"\nCalldata verifyAttestation ({n}x)")
+    assert anna_codec.encode_verify_attestation(attestation_id, True, 95) == bytes.fromhex(
+        contract.encode_abi("verifyAttestation", args=[attestation_id, True, 95])[2:]
+    )
+    base = timed("web3 contract.encode_abi", n,
+                 lambda: [contract.encode_abi("verifyAttestation", args=[attestation_id, True, 95]) for _ in range(n)])
+    timed("anna_codec.encode_verify_attestation", n,
+          lambda: [anna_codec.encode_verify_attestation(attestation_id, True, 95) for _ in range(n)], base)
+
+    print(f"\nCalldata submitAttestation com assinatura ({n}x)")
+    submit_args = [attestation_id, attestation_id, "v1.0", "legal-contract", signature]
+    assert anna_codec.encode_submit_attestation(*submit_args) == bytes.fromhex(
+        contract.encode_abi("submitAttestation", args=submit_args)[2:]
+    )
+    tx_fields = {"from": "0x" + "11" * 20, "nonce": 0, "gas": 300000, "gasPrice": 10**9, "chainId": 80002}
+    base = timed("web3 functions.X(...).build_transaction", n // 10,
+                 lambda: [contract.functions.submitAttestation(*submit_args).build_transaction(tx_fields)
+                          for _ in range(n // 10)])
+    timed("web3 contract.encode_abi", n,
+          lambda: [contract.encode_abi("submitAttestation", args=submit_args) for _ in range(n)], base)
+    timed("anna_codec.encode_submit_attestation", n,
+          lambda: [anna_codec.encode_submit_attestation(*submit_args) for _ in range(n)], base)
+
+
+if __name__ == "__main__":
+    main()
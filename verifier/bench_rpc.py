@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Benchmark do provider multi-RPC
+
+Compara um único HTTPProvider com o MultiRPCProvider (failover e hedge)
+contra devchains locais com latência e erros injetados, ou contra RPCs reais.
+
+Endpoints simulados (padrão):
+- "cauda":    10 ms + até 300 ms aleatórios (rápido na mediana, cauda longa)
+- "estável":  40 ms + até 10 ms
+- "instável": 10 ms, 30% das requisições com erro -32005
+
+Uso:
+    python bench_rpc.py --requests 300
+    python bench_rpc.py --urls https://rpc-amoy.polygon.technology https://outro-rpc --requests 100
+"""
+
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sdk'))
+
+from web3 import Web3
+
+from anna_rpc import MultiRPCProvider
+
+STAND_INS = (
+    ("cauda", dict(latency=0.01, jitter=0.3)),
+    ("estável", dict(latency=0.04, jitter=0.01)),
+    ("instável", dict(latency=0.01, error_rate=0.3))
+)
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)] if ordered else 0.0
+
+
+def start_stand_ins():
+    from anna_devchain import DevChain
+
+    urls = []
+    for name, options in STAND_INS:
+        chain = DevChain(automine=True, **options)
+        urls.append(chain.serve(port=0, background=True))
+        print(f"   {name:9} {urls[-1]} {options}")
+    return urls
+
+
+def run(w3: Web3, requests: int, concurrency: int):
+    latencies, errors = [], 0
+
+    def one(i):
+        started = time.perf_counter()
+        if i % 2:
+            w3.eth.get_block('latest')
+        else:
+            w3.eth.block_number
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(one, i) for i in range(requests)]:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark single vs multi-endpoint RPC provider')
+    parser.add_argument('--urls', nargs='+', default=None, help='Real endpoints (default: local stand-ins)')
+    parser.add_argument('--requests', type=int, default=300, help='Reads per scenario (default: 300)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent callers (default: 4)')
+    args = parser.parse_args()
+
+    if args.urls:
+        urls = args.urls
+    else:
+        print("Endpoints simulados:")
+        urls = start_stand_ins()
+
+    scenarios = [
+        ("único (1º endpoint)", lambda: Web3(Web3.HTTPProvider(urls[0]))),
+        ("multi, failover", lambda: Web3(MultiRPCProvider(urls))),
+        ("multi, hedge", lambda: Web3(MultiRPCProvider(urls, hedge=True)))
+    ]
+    print(f"\n{'cenário':22} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'máx ms':>8} {'erros':>6} {'hedges':>8}")
+    for name, factory in scenarios:
+        w3 = factory()
+        run(w3, 20, 1)  # aquecimento: EWMA e conexões keep-alive
+        latencies, errors = run(w3, args.requests, args.concurrency)
+        provider = w3.provider
+        hedges = f"{provider.hedges}/{provider.hedges_won}" if isinstance(provider, MultiRPCProvider) else "-"
+        print(
+            f"{name:22} {percentile(latencies, 50) * 1000:8.1f} {percentile(latencies, 90) * 1000:8.1f} "
+            f"{percentile(latencies, 99) * 1000:8.1f} {max(latencies, default=0) * 1000:8.1f} {errors:6} {hedges:>8}"
+        )
+        if isinstance(provider, MultiRPCProvider):
+            for endpoint in provider.snapshot():
+                print(f"   {endpoint['host']:22} {endpoint['latency_ms']} ms EWMA, erro {endpoint['error_rate']:.0%}, "
+                      f"{endpoint['requests']} req, {'ok' if endpoint['healthy'] else 'fora'}")
+            provider.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Benchmark do Verify-as-a-Service
+
+Gera carga contra service.py com conexões keep-alive e reporta
+verificações/s e latência p50/p99 (cliente e servidor).
+
+Uso:
+    python service.py --port 8080 &
+    python bench_service.py --url http://127.0.0.1:8080 --connections 64 --duration 10
+    python bench_service.py --mode batch --batch-size 100
+"""
+
+import json
+import time
+import asyncio
+import argparse
+
+import aiohttp
+
+SAMPLE_REASONING = {
+    "input": "Generate legal contract",
+    "reasoning_steps": [
+        {"step_number": 1, "description": "Identified contract type", "rationale": "User requested legal contract"},
+        {"step_number": 2, "description": "Applied legal framework", "rationale": "Used Brazilian Civil Code"}
+    ],
+    "conclusion": "Contract generated successfully",
+    "confidence": 0.92
+}
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)] if ordered else 0.0
+
+
+async def worker(session, url, body, items, deadline, latencies, counters, client_id):
+    headers = {"Content-Type": "application/json", "X-Client-Id": client_id}
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        async with session.post(url, data=body, headers=headers) as resp:
+            await resp.read()
+            if resp.status == 429:
+                counters["rejected"] += 1
+                await asyncio.sleep(0.01)
+                continue
+            if resp.status != 200:
+                counters["errors"] += 1
+                continue
+        latencies.append(time.perf_counter() - started)
+        counters["verifications"] += items
+
+
+async def run(args):
+    if args.mode == "batch":
+        url = f"{args.url}/verify/batch"
+        body = json.dumps([SAMPLE_REASONING] * args.batch_size).encode()
+        items = args.batch_size
+    else:
+        url = f"{args.url}/verify"
+        body = json.dumps(SAMPLE_REASONING).encode()
+        items = 1
+
+    latencies = []
+    counters = {"verifications": 0, "rejected": 0, "errors": 0}
+    connector = aiohttp.TCPConnector(limit=args.connections, keepalive_timeout=60)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        # Cada cliente lógico usa seu próprio X-Client-Id (limite por cliente no servidor)
+        await asyncio.gather(*[
+            worker(session, url, body, items, deadline, latencies, counters, f"bench-{i}")
+            for i in range(args.connections)
+        ])
+        elapsed = time.perf_counter() - started
+
+        async with session.get(f"{args.url}/stats") as resp:
+            server_stats = await resp.json()
+
+    print(f"Modo: {args.mode} | conexões: {args.connections} | duração: {elapsed:.1f}s")
+    print(f"Verificações: {counters['verifications']} ({counters['verifications'] / elapsed:,.0f}/s)")
+    print(f"Requisições:  {len(latencies)} | 429: {counters['rejected']} | erros: {counters['errors']}")
+    print(f"Latência cliente: p50 {percentile(latencies, 50) * 1000:.2f} ms | "
+          f"p99 {percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"Servidor: p50 {server_stats['latency_p50_ms']} ms | p99 {server_stats['latency_p99_ms']} ms | "
+          f"workers {server_stats['workers']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify-as-a-Service load generator')
+    parser.add_argument('--url', default='http://127.0.0.1:8080', help='Service base URL')
+    parser.add_argument('--mode', choices=['single', 'batch'], default='single', help='Endpoint to exercise')
+    parser.add_argument('--batch-size', type=int, default=100, help='Items per /verify/batch request')
+    parser.add_argument('--connections', type=int, default=64, help='Concurrent keep-alive connections')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Benchmark de inicialização do verificador
+
+Mede, em um processo novo a cada rodada, o tempo desde o início do processo
+até a primeira verificação Tier 1 (time-to-first-verification), além de
+import, construção do ANNAVerifier, conexão pronta e checks concluídos.
+
+Compara o modo padrão com --fast-start (cache de regras frio e quente).
+
+Uso:
+    python bench_startup.py --runs 5
+    python bench_startup.py --rpc https://rpc-amoy.polygon.technology --runs 3
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from dotenv import load_dotenv
+
+DEFAULT_CONTRACT = "0xEd98b7Ed960924cEf4d5dfF174252CE88DeCb4e8"
+SAMPLE_ATTESTATION_ID = "0x" + "00" * 32
+
+# Executado no processo filho; imprime os instantes (time.time) de cada fase
+CHILD = r"""
+import json, sys, time, logging
+config = json.loads(sys.argv[1])
+marks = {}
+import verifier
+marks["imported"] = time.time()
+logging.disable(logging.CRITICAL)
+from rules import RulesProvider
+rules = RulesProvider(path=config["rules"], cache_dir=config["rules_cache"])
+with open(config["abi"]) as f:
+    abi = json.load(f)
+error = None
+try:
+    v = verifier.ANNAVerifier(
+        rpc_url=config["rpc"], private_key=config["key"], attestation_contract_address=config["contract"],
+        attestation_abi=abi, dry_run=True, rules=rules, fast_start=config["fast_start"]
+    )
+    marks["constructed"] = time.time()
+    v.verify_reasoning(v.fetch_reasoning(config["attestation_id"]))
+    marks["first_verification"] = time.time()
+    v.ready.wait(config["timeout"])
+    marks["ready"] = time.time()
+    if v.checks_done.wait(config["timeout"]):
+        marks["checks_done"] = time.time()
+    error = v.startup_error and str(v.startup_error)
+except Exception as e:
+    error = str(e)
+print(json.dumps({"marks": marks, "error": error}))
+"""
+
+PHASES = ["imported", "constructed", "first_verification", "ready", "checks_done"]
+
+
+def run_once(config: dict) -> dict:
+    started = time.time()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, json.dumps(config)],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    lines = out.stdout.strip().splitlines()
+    if out.returncode != 0 or not lines:
+        raise RuntimeError(out.stderr.strip()[-500:])
+    result = json.loads(lines[-1])
+    result["elapsed"] = {k: v - started for k, v in result["marks"].items()}
+    return result
+
+
+def median(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2] if ordered else None
+
+
+def fmt(seconds):
+    return f"{seconds * 1000:8.0f} ms" if seconds is not None else "       -   "
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description='Verifier startup benchmark (time-to-first-verification)')
+    parser.add_argument('--rpc', default=os.getenv('POLYGON_AMOY_RPC', 'https://rpc-amoy.polygon.technology'))
+    parser.add_argument('--contract', default=os.getenv('ATTESTATION_CONTRACT_ADDRESS', DEFAULT_CONTRACT))
+    parser.add_argument('--abi', default=os.getenv('ATTESTATION_ABI_PATH', 'attestation_abi.json'))
+    parser.add_argument('--rules', default=os.getenv('VERIFIER_RULES_PATH', 'rules.json'))
+    parser.add_argument('--runs', type=int, default=5, help='Fresh processes per mode (default: 5)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Max seconds waiting for background checks')
+    args = parser.parse_args()
+
+    # Dry run: a chave só assina localmente, nada é enviado
+    key = os.getenv('VERIFIER_PRIVATE_KEY') or "0x" + "11" * 32
+    cache_dir = tempfile.mkdtemp(prefix="rules_cache_")
+    base = {
+        "rpc": args.rpc, "key": key, "contract": args.contract, "abi": os.path.abspath(args.abi),
+        "rules": os.path.abspath(args.rules), "attestation_id": SAMPLE_ATTESTATION_ID, "timeout": args.timeout
+    }
+    modes = [
+        ("padrão", {"fast_start": False, "rules_cache": None}, False),
+        ("fast-start (cache frio)", {"fast_start": True, "rules_cache": cache_dir}, True),
+        ("fast-start (cache quente)", {"fast_start": True, "rules_cache": cache_dir}, False),
+    ]
+
+    print(f"RPC: {args.rpc} | rodadas por modo: {args.runs}\n")
+    print(f"{'modo':28}" + "".join(f"{p:>20}" for p in PHASES))
+    try:
+        for label, overrides, cold in modes:
+            samples, errors = {p: [] for p in PHASES}, set()
+            for _ in range(args.runs):
+                if cold:
+                    shutil.rmtree(cache_dir, ignore_errors=True)
+                result = run_once({**base, **overrides})
+                for phase, seconds in result["elapsed"].items():
+                    samples[phase].append(seconds)
+                if result["error"]:
+                    errors.add(result["error"][:120])
+            print(f"{label:28}" + "".join(f"{fmt(median(samples[p])):>20}" for p in PHASES))
+            for error in errors:
+                print(f"{'':28}  erro: {error}")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print("\nManchete: time-to-first-verification = coluna first_verification (mediana, desde o início do processo)")
+
+
+if __name__ == "__main__":
+    main()
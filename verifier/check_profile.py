@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Tempo e alocações por check Tier 1 (modo instrumentado)
+
+Desligado por padrão: RuleSet.evaluate só faz `if timer:` entre os checks.
+Ligado, cada avaliação registra por check:
+
+- ns: tempo em nanossegundos (time.perf_counter_ns)
+- net_blocks: variação líquida de blocos de memória vivos durante o check
+  (sys.getallocatedblocks depois - antes). Não é uma contagem de alocações:
+  alocações liberadas dentro do check não aparecem e o valor pode ser
+  negativo; mede o que o check deixou retido (ex.: caches que crescem)
+- peak_bytes: pico de memória do check (só com tracemalloc ativo)
+
+As medições são agregadas por check e faixa de tamanho do reasoning,
+exportadas para /metrics (anna_check_seconds) e, opcionalmente, gravadas
+em JSONL (uma linha por avaliação) para reprocessamento offline.
+
+Uso:
+    python verifier.py --profile-checks logs/check_profile.jsonl --profile-checks-sample 10
+    python check_profile.py summarize logs/check_profile.jsonl
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+import tracemalloc
+from typing import Dict, List, Optional
+
+from metrics import CHECK_BLOCKS, CHECK_SECONDS
+
+# Ordem dos checks em RuleSet.evaluate ("score" = cálculo final do score)
+CHECK_NAMES = ("hash", "schema", "fields", "patterns", "confidence", "steps", "size", "score")
+
+# Faixas de tamanho do reasoning serializado (bytes)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536)
+
+
+def size_bucket(size: int) -> str:
+    """Rótulo da faixa de tamanho: '<256', '<1K', ..., '>=64K'"""
+    for bound in SIZE_BUCKETS:
+        if size < bound:
+            return f"<{bound // 1024}K" if bound >= 1024 else f"<{bound}"
+    return f">={SIZE_BUCKETS[-1] // 1024}K"
+
+
+class CheckTimer:
+    """Cronômetro de uma única avaliação; passado para RuleSet.evaluate(timer=...)"""
+
+    __slots__ = ("checks", "size", "_ns", "_blocks", "_traced", "_tracing")
+
+    def __init__(self):
+        self.checks: Dict[str, tuple] = {}  # check -> (ns, net_blocks, peak_bytes)
+        self.size = 0
+        self._tracing = tracemalloc.is_tracing()
+        self.start()
+
+    def start(self):
+        if self._tracing:
+            tracemalloc.reset_peak()
+            self._traced = tracemalloc.get_traced_memory()[0]
+        self._blocks = sys.getallocatedblocks()
+        self._ns = time.perf_counter_ns()
+
+    def mark(self, check: str):
+        """Fecha o check atual e começa a medir o próximo"""
+        elapsed = time.perf_counter_ns() - self._ns
+        net_blocks = sys.getallocatedblocks() - self._blocks
+        peak = tracemalloc.get_traced_memory()[1] - self._traced if self._tracing else None
+        self.checks[check] = (elapsed, net_blocks, peak)
+        # Reinicia depois de registrar: o custo do próprio mark não entra no próximo check
+        self.start()
+
+    def breakdown(self) -> Dict:
+        """Resultado serializável: {'size', 'bucket', 'checks': {check: {'ns', 'net_blocks', 'peak_bytes'}}}"""
+        return {
+            "size": self.size,
+            "bucket": size_bucket(self.size),
+            "checks": {
+                check: {"ns": ns, "net_blocks": net_blocks, "peak_bytes": peak}
+                for check, (ns, net_blocks, peak) in self.checks.items()
+            }
+        }
+
+
+class CheckProfile:
+    """Agrega CheckTimers por (check, faixa de tamanho) e exporta para métricas e JSONL"""
+
+    def __init__(self, path: Optional[str] = None, sample_every: int = 1, export_metrics: bool = True):
+        """
+        Args:
+            path: Arquivo JSONL com uma linha por avaliação (se None, só agrega)
+            sample_every: Instrumenta 1 a cada N avaliações
+            export_metrics: Se True, alimenta anna_check_seconds / anna_check_retained_blocks_total
+        """
+        self.path = path
+        self.sample_every = max(1, sample_every)
+        self.export_metrics = export_metrics
+        self.stats: Dict[tuple, list] = {}  # (check, bucket) -> [count, total_ns, max_ns, net_blocks, max_peak]
+        self._seen = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8") if path else None
+
+    def timer(self) -> Optional[CheckTimer]:
+        """Um CheckTimer se esta avaliação foi amostrada, senão None (sem overhead)"""
+        self._seen += 1
+        return CheckTimer() if self._seen % self.sample_every == 0 else None
+
+    def record(self, timer: CheckTimer, attestation_id: Optional[str] = None, rules_version: Optional[str] = None):
+        bucket = size_bucket(timer.size)
+        with self._lock:
+            for check, (ns, net_blocks, peak) in timer.checks.items():
+                state = self.stats.get((check, bucket))
+                if state is None:
+                    state = self.stats[(check, bucket)] = [0, 0, 0, 0, 0]
+                state[0] += 1
+                state[1] += ns
+                state[2] = max(state[2], ns)
+                state[3] += net_blocks
+                state[4] = max(state[4], peak or 0)
+            if self._file is not None:
+                entry = dict(timer.breakdown(), attestation_id=attestation_id, rules_version=rules_version)
+                self._file.write(json.dumps(entry) + "\n")
+        if not self.export_metrics:
+            return
+        for check, (ns, net_blocks, _) in timer.checks.items():
+            CHECK_SECONDS.observe(ns / 1e9, check=check, size=bucket)
+            # Só o que ficou retido; uma variação negativa (liberou mais do que alocou) não desconta
+            if net_blocks > 0:
+                CHECK_BLOCKS.inc(net_blocks, check=check, size=bucket)
+
+    def summary(self) -> List[Dict]:
+        """Uma linha por (check, faixa), da que mais consome tempo para a que menos consome"""
+        with self._lock:
+            rows = [
+                {
+                    "check": check,
+                    "bucket": bucket,
+                    "count": count,
+                    "mean_ns": total_ns // count,
+                    "max_ns": max_ns,
+                    "total_ns": total_ns,
+                    "mean_net_blocks": net_blocks / count,
+                    "max_peak_bytes": max_peak
+                }
+                for (check, bucket), (count, total_ns, max_ns, net_blocks, max_peak) in self.stats.items()
+            ]
+        return sorted(rows, key=lambda r: r["total_ns"], reverse=True)
+
+    def flush(self):
+        if self._file is not None:
+            with self._lock:
+                self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            with self._lock:
+                self._file.close()
+                self._file = None
+
+
+def load(path: str) -> CheckProfile:
+    """Reagrega um JSONL gravado pelo verificador"""
+    profile = CheckProfile(export_metrics=False)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            timer = CheckTimer()
+            timer.size = entry["size"]
+            # "blocks": arquivos gravados antes do campo se chamar net_blocks
+            timer.checks = {
+                c: (v["ns"], v.get("net_blocks", v.get("blocks", 0)), v["peak_bytes"])
+                for c, v in entry["checks"].items()
+            }
+            profile.record(timer)
+    return profile
+
+
+def format_summary(rows: List[Dict]) -> str:
+    lines = [f"{'check':12} {'faixa':7} {'n':>8} {'média µs':>10} {'máx µs':>10} {'total ms':>10} {'Δblocos':>8}"]
+    for r in rows:
+        lines.append(
+            f"{r['check']:12} {r['bucket']:7} {r['count']:8} {r['mean_ns'] / 1000:10.1f} "
+            f"{r['max_ns'] / 1000:10.1f} {r['total_ns'] / 1e6:10.2f} {r['mean_net_blocks']:8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-check timing breakdown of Tier 1 verification')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    summarize = sub.add_parser('summarize', help='Aggregate a JSONL file written with --profile-checks')
+    summarize.add_argument('path')
+
+    run = sub.add_parser('run', help='Profile the current rules against reasoning JSON files')
+    run.add_argument('files', nargs='+')
+    run.add_argument('--rules', default=None, help='Versioned rules file (default: built-in rules)')
+    run.add_argument('--repeat', type=int, default=1000)
+    run.add_argument('--tracemalloc', action='store_true', help='Also record peak bytes per check')
+    args = parser.parse_args()
+
+    if args.command == 'summarize':
+        print(format_summary(load(args.path).summary()))
+        return
+
+    from rules import RuleSet, load_rules
+
+    rules = load_rules(args.rules) if args.rules else RuleSet()
+    if args.tracemalloc:
+        tracemalloc.start()
+    profile = CheckProfile(export_metrics=False)
+    for path in args.files:
+        with open(path, encoding="utf-8") as f:
+            reasoning = json.load(f)
+        for _ in range(args.repeat):
+            timer = CheckTimer()
+            rules.evaluate(reasoning, timer=timer)
+            profile.record(timer)
+    print(format_summary(profile.summary()))
+
+
+if __name__ == "__main__":
+    main()
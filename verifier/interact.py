@@ -8,6 +8,11 @@ from eth_account import Account
 from dotenv import load_dotenv
 import json
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sdk'))
+
+from anna_gas import GasEstimator
 
 load_dotenv()
 
@@ -17,6 +22,8 @@ class ANNAInteraction:
     def __init__(self):
         self.w3 = Web3(Web3.HTTPProvider(os.getenv('POLYGON_AMOY_RPC')))
         self.account = Account.from_key(os.getenv('PRIVATE_KEY'))
+        # Limite de gas pelo calldata real (strings e listas longas custam mais)
+        self.gas = GasEstimator(self.w3)
         
         # Carregar endereços dos contratos
         with open('../contracts/deployed-addresses.json', 'r') as f:
@@ -73,16 +80,17 @@ class ANNAInteraction:
         print(f"   Model: {model_type} {model_version}")
         print(f"   Specializations: {specializations}")
         
-        tx = self.identity.functions.registerAgent(
+        register = self.identity.functions.registerAgent(
             self.account.address,
             did,
             model_type,
             model_version,
             specializations
-        ).build_transaction({
+        )
+        tx = register.build_transaction({
             'from': self.account.address,
             'nonce': self.w3.eth.get_transaction_count(self.account.address),
-            'gas': 300000,
+            'gas': self.gas.estimate_call(register, self.account.address),
             'gasPrice': self.w3.eth.gas_price
         })
         
@@ -118,15 +126,16 @@ class ANNAInteraction:
         print(f"   Reasoning Hash: {reasoning_hash.hex()[:16]}...")
         print(f"   Category: {category}")
         
-        tx = self.attestation.functions.submitAttestation(
+        submit = self.attestation.functions.submitAttestation(
             content_hash,
             reasoning_hash,
             "v1.0",
             category
-        ).build_transaction({
+        )
+        tx = submit.build_transaction({
             'from': self.account.address,
             'nonce': self.w3.eth.get_transaction_count(self.account.address),
-            'gas': 300000,
+            'gas': self.gas.estimate_call(submit, self.account.address),
             'gasPrice': self.w3.eth.gas_price
         })
         
@@ -173,12 +182,13 @@ class ANNAInteraction:
         
         print(f"\n🔐 Autorizando verificador {verifier_address}...")
         
-        tx = self.attestation.functions.addVerifier(
+        add_verifier = self.attestation.functions.addVerifier(
             Web3.to_checksum_address(verifier_address)
-        ).build_transaction({
+        )
+        tx = add_verifier.build_transaction({
             'from': self.account.address,
             'nonce': self.w3.eth.get_transaction_count(self.account.address),
-            'gas': 100000,
+            'gas': self.gas.estimate_call(add_verifier, self.account.address),
             'gasPrice': self.w3.eth.gas_price
         })
         
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Logging não bloqueante do verificador
+
+- Os loggers só enfileiram o LogRecord (QueueHandler); formatação e escrita
+  em console/arquivo acontecem numa thread separada (QueueListener)
+- JSON de verdade no log estruturado (aspas, quebras de linha e emojis
+  são escapados corretamente)
+- Mensagens com %-formatting preguiçoso: só são formatadas se o registro
+  passar do nível e da amostragem
+- Amostragem por nível para eventos de alto volume: só registros marcados
+  com extra=HOT são amostrados; erros e avisos de inicialização nunca são
+"""
+
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime
+from itertools import count
+from typing import Dict, Optional
+
+# Marca eventos de alto volume (um ou mais por attestation) sujeitos a amostragem
+HOT = {"hot": True}
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Campos padrão do LogRecord (o resto veio de extra= e vai para o JSON)
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "hot"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON válida por registro, incluindo os campos de extra="""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Mantém 1 a cada N registros HOT por nível (ex.: {"INFO": 10, "DEBUG": 100})
+
+    Determinístico (contador), então a fração registrada é exata e não depende
+    de um gerador aleatório no caminho quente.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, int]] = None):
+        super().__init__()
+        self.rates = {logging.getLevelName(level.upper()): n for level, n in (rates or {}).items() if n > 1}
+        self._counters = {level: count() for level in self.rates}
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        n = self.rates.get(record.levelno)
+        if n is None or not getattr(record, "hot", False):
+            return True
+        if next(self._counters[record.levelno]) % n == 0:
+            return True
+        self.dropped += 1
+        return False
+
+
+class _EnqueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que não formata no caminho quente (a thread do listener formata)"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_config: Dict = {}
+
+
+def parse_sampling(spec: str) -> Dict[str, int]:
+    """Converte 'INFO=10,DEBUG=100' em {'INFO': 10, 'DEBUG': 100}"""
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        level, _, n = part.partition("=")
+        rates[level.strip().upper()] = int(n)
+    return rates
+
+
+def configure_logging(
+    level: int = logging.INFO,
+    json_path: Optional[str] = None,
+    sampling: Optional[Dict[str, int]] = None,
+    console: bool = True
+) -> logging.handlers.QueueListener:
+    """
+    Instala o logging assíncrono (idempotente: reconfigurar substitui a anterior)
+
+    Args:
+        level: Nível do logger raiz
+        json_path: Arquivo do log estruturado (JSON por linha) - logger 'structured'
+        sampling: Amostragem 1-em-N por nível para registros HOT
+        console: Se True, escreve também no console (formato texto)
+
+    Returns:
+        O QueueListener em execução (parado automaticamente na saída)
+    """
+    shutdown_logging()
+    _config.update(level=level, json_path=json_path, sampling=sampling, console=console)
+
+    handlers = []
+    if console:
+        stream = logging.StreamHandler()
+        # Force UTF-8 encoding para o handler (emojis no console do Windows)
+        if hasattr(stream.stream, "reconfigure"):
+            try:
+                stream.stream.reconfigure(encoding="utf-8")
+            except (ValueError, OSError):
+                pass
+        stream.setFormatter(logging.Formatter(TEXT_FORMAT))
+        stream.addFilter(lambda record: record.name != "structured")
+        handlers.append(stream)
+
+    structured = logging.getLogger("structured")
+    structured.setLevel(logging.INFO)
+    structured.propagate = False
+    if json_path:
+        file_handler = logging.FileHandler(json_path, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        # Só registros do logger 'structured' vão para o arquivo JSON
+        file_handler.addFilter(logging.Filter("structured"))
+        handlers.append(file_handler)
+
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    enqueue = _EnqueueHandler(log_queue)
+    enqueue.addFilter(SamplingFilter(sampling))
+
+    root = logging.getLogger()
+    root.handlers = [enqueue]
+    root.setLevel(level)
+    structured.handlers = [enqueue]
+
+    _listener.start()
+    return _listener
+
+
+def enable_json_log(json_path: str):
+    """Liga o arquivo JSON estruturado mantendo o restante da configuração atual"""
+    if _config.get("json_path") == json_path:
+        return
+    configure_logging(
+        level=_config.get("level", logging.INFO),
+        json_path=json_path,
+        sampling=_config.get("sampling"),
+        console=_config.get("console", True)
+    )
+
+
+def sampling_filter() -> Optional[SamplingFilter]:
+    """Filtro de amostragem ativo (para reportar quantos registros foram descartados)"""
+    for handler in logging.getLogger().handlers:
+        for f in handler.filters:
+            if isinstance(f, SamplingFilter):
+                return f
+    return None
+
+
+@atexit.register
+def shutdown_logging():
+    """Drena a fila e para a thread do listener (chamado automaticamente na saída)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
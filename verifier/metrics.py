@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Métricas do verificador (formato texto do Prometheus)
+
+Registro em memória, sem dependências externas, exposto via HTTP em /metrics:
+
+- anna_stage_seconds{stage}            histograma por estágio: fetch, schema,
+                                       patterns, scoring, sign, send, mine
+- anna_rpc_requests_total{method}      chamadas JSON-RPC por método (middleware web3)
+- anna_rpc_seconds{method}             latência JSON-RPC por método
+- anna_queue_depth{tenant,queue}       profundidade das filas (poll, adiadas, buffer do log)
+- anna_chain_lag_blocks{tenant}        bloco atual - último bloco processado
+- anna_cache_hit_ratio{tenant,cache}   taxa de acerto dos caches
+- anna_gas_spent_wei_total{tenant}     gas pago pelas verificações (counter)
+- anna_verifications_total{tenant,kind} detectadas, aprovadas, reprovadas, ... (counter)
+- anna_verification_sla_seconds        percentis de AttestationSubmitted -> inclusão
+- anna_check_seconds{check,size}       por check Tier 1 e faixa de tamanho (só com --profile-checks)
+
+Uso:
+    python verifier.py --metrics-port 9100
+    curl http://127.0.0.1:9100/metrics
+"""
+
+import time
+import bisect
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Buckets padrão (segundos): de 100 µs até 10 min, cobre checks locais e mineração
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600
+)
+# Buckets dos checks Tier 1 individuais (segundos): de 1 µs até 100 ms
+CHECK_BUCKETS = (
+    0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001,
+    0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1
+)
+STAGES = ("fetch", "schema", "patterns", "scoring", "sign", "send", "mine")
+SLA_QUANTILES = (0.5, 0.9, 0.99)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name, self.help, self.type = name, help_text, "counter"
+        self.values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def set_total(self, value: float, **labels):
+        """Expõe um total monotônico mantido em outro lugar (ex.: stats do tenant, lido no coletor)"""
+        self.values[_labels(labels)] = value
+
+    def samples(self) -> Iterable[Tuple[str, LabelKey, float]]:
+        for key, value in list(self.values.items()):
+            yield self.name, key, value
+
+
+class Gauge(Counter):
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self.type = "gauge"
+
+    def set(self, value: float, **labels):
+        self.values[_labels(labels)] = value
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.help, self.type = name, help_text, "histogram"
+        self.buckets = buckets
+        self.values: Dict[LabelKey, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            state = self.values.get(key)
+            if state is None:
+                # [contagem por bucket..., soma, total]
+                state = self.values[key] = [0] * len(self.buckets) + [0.0, 0]
+            bucket = bisect.bisect_left(self.buckets, seconds)
+            if bucket < len(self.buckets):
+                state[bucket] += 1
+            state[-2] += seconds
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        for key, state in list(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield f"{self.name}_bucket", key + (("le", _format_value(float(bound))),), cumulative
+            yield f"{self.name}_bucket", key + (("le", "+Inf"),), state[-1]
+            yield f"{self.name}_sum", key, state[-2]
+            yield f"{self.name}_count", key, state[-1]
+
+
+class Summary:
+    """Percentis sobre uma janela deslizante das últimas N observações"""
+
+    def __init__(self, name: str, help_text: str, quantiles=SLA_QUANTILES, window: int = 10000):
+        self.name, self.help, self.type = name, help_text, "summary"
+        self.quantiles = quantiles
+        self.window = window
+        self.values: Dict[LabelKey, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [deque(maxlen=self.window), 0.0, 0]
+            state[0].append(seconds)
+            state[1] += seconds
+            state[2] += 1
+
+    def percentile(self, q: float, **labels) -> Optional[float]:
+        state = self.values.get(_labels(labels))
+        if not state or not state[0]:
+            return None
+        ordered = sorted(state[0])
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+    def samples(self):
+        for key, (window, total, count) in list(self.values.items()):
+            ordered = sorted(window)
+            for q in self.quantiles:
+                value = ordered[min(int(len(ordered) * q), len(ordered) - 1)] if ordered else float("nan")
+                yield self.name, key + (("quantile", str(q)),), value
+            yield f"{self.name}_sum", key, total
+            yield f"{self.name}_count", key, count
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.collectors: Dict[Hashable, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, fn: Callable[[], None], key: Optional[Hashable] = None) -> Hashable:
+        """
+        Função chamada antes de cada scrape para atualizar gauges
+
+        Args:
+            fn: Coletor
+            key: Identifica o coletor (ex.: ("tenant", nome)); registrar de novo
+                com a mesma chave substitui o anterior em vez de acumular
+
+        Returns:
+            A chave, para remove_collector()
+        """
+        key = fn if key is None else key
+        with self._lock:
+            self.collectors[key] = fn
+        return key
+
+    def remove_collector(self, key: Hashable, fn: Optional[Callable[[], None]] = None):
+        """
+        Remove pelo valor devolvido por add_collector() (ou pela própria função);
+        com fn, só se a chave ainda for dela (não remove quem a substituiu)
+        """
+        with self._lock:
+            if fn is None or self.collectors.get(key) == fn:
+                self.collectors.pop(key, None)
+
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self.collectors.values())
+        for collect in collectors:
+            try:
+                collect()
+            except Exception as e:
+                logger.debug("Coletor de métricas falhou: %s", e)
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, key, value in metric.samples():
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram("anna_stage_seconds", "Latency of each verification stage"))
+RPC_REQUESTS = REGISTRY.register(Counter("anna_rpc_requests_total", "JSON-RPC requests by method"))
+RPC_ERRORS = REGISTRY.register(Counter("anna_rpc_errors_total", "JSON-RPC requests that raised or returned an error"))
+RPC_SECONDS = REGISTRY.register(Histogram("anna_rpc_seconds", "JSON-RPC latency by method"))
+RPC_ENDPOINT_LATENCY = REGISTRY.register(Gauge("anna_rpc_endpoint_latency_seconds", "EWMA latency of each RPC endpoint"))
+RPC_ENDPOINT_ERRORS = REGISTRY.register(Gauge("anna_rpc_endpoint_error_rate", "EWMA error rate of each RPC endpoint"))
+RPC_ENDPOINT_UP = REGISTRY.register(Gauge("anna_rpc_endpoint_up", "1 if the RPC endpoint is in rotation, 0 while cooling down"))
+QUEUE_DEPTH = REGISTRY.register(Gauge("anna_queue_depth", "Items waiting in each verifier queue"))
+CHAIN_LAG = REGISTRY.register(Gauge("anna_chain_lag_blocks", "Current block minus last processed block"))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge("anna_cache_hit_ratio", "Hit ratio of each cache"))
+GAS_SPENT = REGISTRY.register(Counter("anna_gas_spent_wei_total", "Gas paid by verification transactions (wei)"))
+VERIFICATIONS = REGISTRY.register(Counter("anna_verifications_total", "Verifier counters (detected, passed, failed, ...)"))
+CHECK_SECONDS = REGISTRY.register(Histogram(
+    "anna_check_seconds", "Latency of each Tier 1 check by payload size (--profile-checks)", CHECK_BUCKETS
+))
+CHECK_BLOCKS = REGISTRY.register(Counter(
+    "anna_check_retained_blocks_total",
+    "Net memory blocks left allocated by each Tier 1 check, positive deltas only (--profile-checks)"
+))
+SLA_SECONDS = REGISTRY.register(Summary(
+    "anna_verification_sla_seconds", "AttestationSubmitted timestamp to verification inclusion"
+))
+
+
+def observe_stage(stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+
+
+# ============================================================
+# MIDDLEWARE WEB3 (contagem e latência de RPC por método)
+# ============================================================
+
+def rpc_metrics_middleware():
+    """Classe de middleware web3 v7; instalar com w3.middleware_onion.add(...)"""
+    from web3.middleware.base import Web3Middleware
+
+    class RpcMetricsMiddleware(Web3Middleware):
+        def wrap_make_request(self, make_request):
+            def middleware(method, params):
+                started = time.perf_counter()
+                try:
+                    response = make_request(method, params)
+                except Exception:
+                    RPC_ERRORS.inc(method=method)
+                    raise
+                finally:
+                    RPC_REQUESTS.inc(method=method)
+                    RPC_SECONDS.observe(time.perf_counter() - started, method=method)
+                if isinstance(response, dict) and "error" in response:
+                    RPC_ERRORS.inc(method=method)
+                return response
+            return middleware
+
+        def wrap_make_batch_request(self, make_batch_request):
+            def middleware(requests_info):
+                started = time.perf_counter()
+                try:
+                    return make_batch_request(requests_info)
+                finally:
+                    elapsed = time.perf_counter() - started
+                    for method, _ in requests_info:
+                        RPC_REQUESTS.inc(method=method)
+                    RPC_SECONDS.observe(elapsed, method="batch")
+            return middleware
+
+    return RpcMetricsMiddleware
+
+
+def instrument_web3(w3):
+    """Instala o middleware de métricas uma única vez por conexão"""
+    if getattr(w3, "_anna_metrics", False):
+        return w3
+    w3.middleware_onion.add(rpc_metrics_middleware(), name="anna_metrics")
+    w3._anna_metrics = True
+    return w3
+
+
+# ============================================================
+# SERVIDOR HTTP
+# ============================================================
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0", registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """Serve /metrics numa thread daemon"""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"📈 Métricas em http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Pré-checagem de submissões do verificador
+
+Antes de gastar gas com verifyAttestation:
+1. Lê o status de todas as attestations da fila em uma única requisição
+   JSON-RPC em lote (attestations(id) para cada ID); erros passageiros repetem
+   o lote, e só um RPC sem suporte a lotes desliga a leitura em lote
+2. Descarta as que não existem ou já não estão Pending
+3. Simula cada verifyAttestation com eth_call e descarta as que reverteriam
+"""
+
+import logging
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# enum Status { Pending, Verified, Rejected, Challenged } (AnnaAttestation.sol)
+STATUS_PENDING = 0
+STATUS_NAMES = {0: "pending", 1: "verified", 2: "rejected", 3: "challenged"}
+
+# Índices da tupla retornada por attestations(bytes32)
+TIMESTAMP_INDEX = 4
+STATUS_INDEX = 5
+
+
+def to_bytes32(attestation_id: str) -> bytes:
+    """Converte um attestation ID hex (com ou sem 0x) para bytes32"""
+    return bytes.fromhex(attestation_id[2:] if attestation_id.startswith('0x') else attestation_id)
+
+
+class PreflightChecker:
+    """Descarta submissões condenadas antes que custem gas"""
+
+    def __init__(self, w3, contract, verifier_address: str, batch_size: int = 100, batch_retries: int = 2,
+                 retry_delay: float = 0.2):
+        """
+        Args:
+            w3: Instância Web3 conectada
+            contract: Contrato AnnaAttestation
+            verifier_address: Endereço usado como 'from' nas simulações
+            batch_size: Máximo de chamadas por requisição em lote
+            batch_retries: Novas tentativas de um lote após erro passageiro (rede, sobrecarga)
+            retry_delay: Espera antes da primeira nova tentativa (dobra a cada uma)
+        """
+        self.w3 = w3
+        self.contract = contract
+        self.verifier_address = verifier_address
+        self.batch_size = batch_size
+        self.batch_retries = batch_retries
+        self.retry_delay = retry_delay
+        self.skip_counts = Counter()
+        self.checked = 0
+        self._batch_supported = True
+
+    def _read_chunk(self, attestation_ids: List[str]) -> List[tuple]:
+        # Import tardio: o verificador só carrega web3 ao conectar (fast start)
+        from web3.exceptions import ContractLogicError
+        from anna_rpc import batch_unsupported
+
+        for attempt in range(self.batch_retries + 1):
+            if not self._batch_supported:
+                break
+            try:
+                with self.w3.batch_requests() as batch:
+                    for attestation_id in attestation_ids:
+                        batch.add(self.contract.functions.attestations(to_bytes32(attestation_id)))
+                    return batch.execute()
+            except ContractLogicError:
+                break  # revert de um item: a leitura individual mostra qual
+            except Exception as e:
+                if batch_unsupported(e):
+                    # Alguns RPCs públicos não aceitam lotes - cai para leitura individual
+                    logger.warning(f"RPC não suportou leitura em lote ({e}); usando chamadas individuais")
+                    self._batch_supported = False
+                elif attempt < self.batch_retries:
+                    time.sleep(self.retry_delay * 2 ** attempt)
+                else:
+                    # Falha passageira repetida: só este lote é lido item a item
+                    logger.warning(f"Leitura em lote falhou {attempt + 1} vezes ({e}); lendo item a item")
+
+        return [
+            self.contract.functions.attestations(to_bytes32(attestation_id)).call()
+            for attestation_id in attestation_ids
+        ]
+
+    def read_statuses(self, attestation_ids: List[str]) -> Dict[str, Optional[int]]:
+        """
+        Lê o status on-chain de várias attestations
+
+        Returns:
+            Dict attestation_id -> status (None se a attestation não existe)
+        """
+        statuses = {}
+        for start in range(0, len(attestation_ids), self.batch_size):
+            chunk = attestation_ids[start:start + self.batch_size]
+            for attestation_id, data in zip(chunk, self._read_chunk(chunk)):
+                statuses[attestation_id] = data[STATUS_INDEX] if data[TIMESTAMP_INDEX] != 0 else None
+        return statuses
+
+    def filter_pending(self, attestation_ids: List[str]) -> Tuple[List[str], Dict[str, str]]:
+        """
+        Mantém apenas as attestations ainda Pending
+
+        Returns:
+            Tuple (ids_pendentes, {id_descartado: motivo})
+        """
+        statuses = self.read_statuses(attestation_ids)
+        pending, skipped = [], {}
+
+        for attestation_id in attestation_ids:
+            self.checked += 1
+            status = statuses.get(attestation_id)
+            if status == STATUS_PENDING:
+                pending.append(attestation_id)
+                continue
+            reason = "not_found" if status is None else f"already_{STATUS_NAMES.get(status, status)}"
+            skipped[attestation_id] = reason
+            self.skip_counts[reason] += 1
+
+        return pending, skipped
+
+    def simulate(self, attestation_id: str, passed: bool, score: int) -> Optional[str]:
+        """
+        Simula verifyAttestation com eth_call
+
+        Returns:
+            None se a transação passaria, ou o motivo do revert
+        """
+        from web3.exceptions import ContractLogicError
+
+        try:
+            self.contract.functions.verifyAttestation(
+                to_bytes32(attestation_id), passed, score
+            ).call({'from': self.verifier_address})
+            return None
+        except ContractLogicError as e:
+            return str(e.message or e)
+
+    def filter_simulated(self, results: Iterable[tuple]) -> Tuple[list, Dict[str, str]]:
+        """
+        Simula um lote de itens (attestation_id, passed, score, ...) e descarta os que reverteriam
+
+        Returns:
+            Tuple (itens_aprovados, {id_descartado: motivo_do_revert})
+        """
+        ready, skipped = [], {}
+        for item in results:
+            attestation_id, passed, score = item[:3]
+            revert_reason = self.simulate(attestation_id, passed, score)
+            if revert_reason is None:
+                ready.append(item)
+                continue
+            skipped[attestation_id] = revert_reason
+            self.skip_counts["simulation_revert"] += 1
+
+        return ready, skipped
+
+    def report(self) -> Dict:
+        """Contadores acumulados de itens checados e descartados por motivo"""
+        return {
+            "checked": self.checked,
+            "skipped": sum(self.skip_counts.values()),
+            "by_reason": dict(self.skip_counts)
+        }
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Profiling embutido do verificador em execução
+
+Captura uma janela limitada (--profile-window segundos) sem reiniciar o
+processo e sem ferramentas externas:
+
+- CPU, modo "sampling" (padrão): uma thread amostra as pilhas de todas as
+  threads (sys._current_frames) e grava pilhas colapsadas, uma por linha
+  ("thread;modulo:funcao;... contagem"), prontas para flamegraph.pl/speedscope
+- CPU, modo "cprofile": cProfile determinístico em cada poll (inclusive nos
+  workers do modo multi-tenant); grava o .prof (pstats) e um relatório texto
+- Memória: tracemalloc durante a janela; grava as maiores alocações por
+  linha e o crescimento em relação ao início da janela
+
+Gatilhos:
+    python verifier.py --profile                # uma janela de CPU + memória na inicialização
+    kill -USR1 <pid>                            # janela de CPU
+    kill -USR2 <pid>                            # janela de memória (tracemalloc)
+
+Arquivos em logs/profiles/: cpu-<data>.collapsed, cpu-<data>.prof/.txt, alloc-<data>.txt
+"""
+
+import os
+import sys
+import time
+import pstats
+import signal
+import logging
+import cProfile
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+MODES = ("sampling", "cprofile")
+
+
+def _timestamp() -> str:
+    return datetime.now().strftime("%Y%m%d-%H%M%S")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+
+class Profiler:
+    """Janelas de profiling sob demanda (uma de CPU e uma de memória por vez)"""
+
+    def __init__(
+        self,
+        directory: str = "logs/profiles",
+        mode: str = "sampling",
+        window: float = 60.0,
+        interval: float = 0.005,
+        top: int = 30
+    ):
+        """
+        Args:
+            directory: Diretório dos arquivos gerados
+            mode: "sampling" (pilhas colapsadas de todas as threads) ou "cprofile"
+            window: Duração de cada janela em segundos
+            interval: Intervalo entre amostras no modo sampling (segundos)
+            top: Linhas nos relatórios de funções e de alocações
+        """
+        if mode not in MODES:
+            raise ValueError(f"Modo de profiling inválido: {mode} (use {', '.join(MODES)})")
+        self.directory = directory
+        self.mode = mode
+        self.window = window
+        self.interval = interval
+        self.top = top
+        self._lock = threading.Lock()
+        self._cpu_active = False
+        self._memory_active = False
+        # Modo cprofile: um Profile por chamada, mesclados no fim da janela
+        self._profiles: List[cProfile.Profile] = []
+        self._inflight = 0
+        self._cpu_started_at = 0.0
+        # Sinais pendentes: o handler só marca e acorda o despachante
+        self._signaled_cpu = False
+        self._signaled_memory = False
+        self._signaled = threading.Event()
+
+    # ------------------------------------------------------------
+    # Gatilhos
+    # ------------------------------------------------------------
+
+    def install_signal_handlers(self) -> bool:
+        """
+        SIGUSR1 = janela de CPU, SIGUSR2 = janela de memória (indisponível no Windows)
+
+        O handler roda na thread principal entre dois bytecodes, possivelmente
+        com self._lock já tomado por call(); por isso só marca o pedido, e a
+        thread profiler-signals abre a janela
+        """
+        if not hasattr(signal, "SIGUSR1") or threading.current_thread() is not threading.main_thread():
+            return False
+        threading.Thread(target=self._dispatch_signals, name="profiler-signals", daemon=True).start()
+        signal.signal(signal.SIGUSR1, self._on_signal)
+        signal.signal(signal.SIGUSR2, self._on_signal)
+        logger.info(f"🩺 Profiling sob demanda: kill -USR1 {os.getpid()} (CPU), kill -USR2 {os.getpid()} (memória)")
+        return True
+
+    def _on_signal(self, signum, frame):
+        if signum == signal.SIGUSR1:
+            self._signaled_cpu = True
+        else:
+            self._signaled_memory = True
+        self._signaled.set()
+
+    def _dispatch_signals(self):
+        while True:
+            self._signaled.wait()
+            self._signaled.clear()
+            if self._signaled_cpu:
+                self._signaled_cpu = False
+                self.start_cpu()
+            if self._signaled_memory:
+                self._signaled_memory = False
+                self.start_memory()
+
+    def start(self):
+        """Janela de CPU e de memória ao mesmo tempo (--profile)"""
+        self.start_cpu()
+        self.start_memory()
+
+    def start_cpu(self) -> bool:
+        with self._lock:
+            if self._cpu_active:
+                logger.info("🩺 Janela de CPU já em andamento; gatilho ignorado")
+                return False
+            self._cpu_active = True
+            self._cpu_started_at = time.time()
+        os.makedirs(self.directory, exist_ok=True)
+        logger.info(f"🩺 Profiling de CPU ({self.mode}) por {self.window:.0f}s")
+        target = self._sample if self.mode == "sampling" else self._end_cprofile_window
+        threading.Thread(target=target, name="profiler-cpu", daemon=True).start()
+        return True
+
+    def start_memory(self) -> bool:
+        with self._lock:
+            if self._memory_active:
+                logger.info("🩺 Janela de memória já em andamento; gatilho ignorado")
+                return False
+            self._memory_active = True
+        os.makedirs(self.directory, exist_ok=True)
+        logger.info(f"🩺 Profiling de memória (tracemalloc) por {self.window:.0f}s")
+        threading.Thread(target=self._trace_memory, name="profiler-memory", daemon=True).start()
+        return True
+
+    # ------------------------------------------------------------
+    # CPU - sampling
+    # ------------------------------------------------------------
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {}
+        stacks = Counter()
+        samples = 0
+        deadline = time.monotonic() + self.window
+        try:
+            while time.monotonic() < deadline:
+                frames = sys._current_frames()
+                if len(names) != len(frames):
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in frames.items():
+                    name = names.get(ident, str(ident))
+                    # As threads do próprio profiler não entram nas pilhas
+                    if ident == own or name.startswith("profiler-"):
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_label(frame))
+                        frame = frame.f_back
+                    stack.append(name)
+                    stacks[";".join(reversed(stack))] += 1
+                samples += 1
+                time.sleep(self.interval)
+            path = os.path.join(self.directory, f"cpu-{_timestamp()}.collapsed")
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            logger.info(f"🩺 Pilhas colapsadas ({samples} amostras): {path}")
+        except Exception as e:
+            logger.error(f"❌ Falha no profiling de CPU: {e}")
+        finally:
+            self._cpu_active = False
+
+    # ------------------------------------------------------------
+    # CPU - cProfile
+    # ------------------------------------------------------------
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """Executa fn; numa janela cprofile ativa, sob um cProfile próprio desta chamada"""
+        if not (self._cpu_active and self.mode == "cprofile"):
+            return fn(*args, **kwargs)
+        profile = cProfile.Profile()
+        with self._lock:
+            self._inflight += 1
+        try:
+            return profile.runcall(fn, *args, **kwargs)
+        finally:
+            with self._lock:
+                self._profiles.append(profile)
+                self._inflight -= 1
+
+    def _end_cprofile_window(self):
+        time.sleep(self.window)
+        # Fecha a janela para novos polls; os em andamento ainda entram (no máximo mais um intervalo)
+        self._cpu_active = False
+        while self._inflight:
+            time.sleep(0.05)
+        with self._lock:
+            profiles, self._profiles = self._profiles, []
+        if not profiles:
+            logger.info("🩺 Janela cprofile terminou sem polls; nada gravado")
+            return
+        try:
+            base = os.path.join(self.directory, f"cpu-{_timestamp()}")
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(base + ".prof")
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                stats.stream = f
+                f.write(f"# {len(profiles)} polls, janela de {time.time() - self._cpu_started_at:.0f}s\n")
+                stats.sort_stats("cumulative").print_stats(self.top)
+                stats.sort_stats("tottime").print_stats(self.top)
+            logger.info(f"🩺 cProfile de {len(profiles)} polls: {base}.prof / {base}.txt")
+        except Exception as e:
+            logger.error(f"❌ Falha ao gravar o cProfile: {e}")
+
+    # ------------------------------------------------------------
+    # Memória - tracemalloc
+    # ------------------------------------------------------------
+
+    def _trace_memory(self):
+        started_here = not tracemalloc.is_tracing()
+        try:
+            if started_here:
+                tracemalloc.start(10)
+            before = tracemalloc.take_snapshot()
+            time.sleep(self.window)
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+
+            ignore = [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+            ]
+            before = before.filter_traces(ignore)
+            after = after.filter_traces(ignore)
+
+            path = os.path.join(self.directory, f"alloc-{_timestamp()}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"# tracemalloc: {current / 1024:.1f} KiB rastreados, pico {peak / 1024:.1f} KiB\n")
+                f.write(f"\n## Crescimento na janela de {self.window:.0f}s (por linha)\n")
+                for diff in after.compare_to(before, "lineno")[:self.top]:
+                    f.write(f"{diff}\n")
+                f.write("\n## Maiores alocações vivas (por linha)\n")
+                for stat in after.statistics("lineno")[:self.top]:
+                    f.write(f"{stat}\n")
+                f.write("\n## Maior alocação viva (pilha)\n")
+                largest = after.statistics("traceback")[:1]
+                for stat in largest:
+                    f.write(f"{stat}\n")
+                    f.write("\n".join(stat.traceback.format()) + "\n")
+            logger.info(f"🩺 Relatório de alocações: {path}")
+        except Exception as e:
+            logger.error(f"❌ Falha no profiling de memória: {e}")
+        finally:
+            if started_here:
+                tracemalloc.stop()
+            self._memory_active = False
@@ -0,0 +1,503 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Log segmentado de resultados de verificação
+
+Substitui o antigo arquivo-por-attestation (logs/verifications/{id[:16]}.json)
+por segmentos append-only:
+
+    segment-00000001.jsonl   uma linha JSON por verificação
+    segment-00000001.idx     índice binário: (attestation_id bytes32, offset, tamanho)
+    segment-00000001.bloom   filtro de Bloom dos IDs do segmento (gravado ao fechá-lo)
+
+- Escritas ficam em buffer e vão para o disco em lote (por quantidade ou tempo)
+- O segmento é rotacionado por tamanho ou idade
+- Só o índice do segmento em escrita fica inteiro em memória (limitado pelo
+  tamanho do segmento). Cada segmento fechado tem um filtro de Bloom em
+  memória (~10 bits por ID, 1% de falsos positivos): uma consulta só lê o .idx
+  dos segmentos cujo filtro acusa o ID, e os índices lidos ficam num LRU
+  (index_cache_segments). Um ID ausente - o caso comum na deduplicação - não
+  lê nenhum .idx
+- A abertura lê os .bloom e confere só o último registro de cada .idx
+- Se um segmento terminar sem o índice completo (queda do processo), o índice
+  é reconstruído a partir do JSONL
+
+Uso (ferramentas):
+    python result_log.py get <attestation_id> --dir logs/verifications
+    python result_log.py stats --dir logs/verifications
+    python result_log.py compact --dir logs/verifications
+    python result_log.py import-legacy --dir logs/verifications
+"""
+
+import os
+import re
+import json
+import glob
+import time
+import struct
+import math
+import hashlib
+import logging
+import argparse
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Registro do índice: attestation_id (32 bytes), offset (8), tamanho (4)
+INDEX_RECORD = struct.Struct("<32sQI")
+# Cabeçalho do .bloom: bits, funções de hash, entradas do .idx de origem
+BLOOM_HEADER = struct.Struct("<QIQ")
+BLOOM_FALSE_POSITIVE_RATE = 0.01
+SEGMENT_PATTERN = re.compile(r"segment-(\d{8})\.jsonl$")
+
+
+def attestation_key(attestation_id: str) -> bytes:
+    """Chave de 32 bytes do índice (o ID completo, sem colisões de prefixo)"""
+    hex_id = attestation_id[2:] if attestation_id.startswith("0x") else attestation_id
+    if len(hex_id) == 64:
+        try:
+            return bytes.fromhex(hex_id)
+        except ValueError:
+            pass
+    return hashlib.sha256(attestation_id.encode()).digest()
+
+
+def segment_paths(directory: str, seq: int) -> Tuple[str, str]:
+    base = os.path.join(directory, f"segment-{seq:08d}")
+    return f"{base}.jsonl", f"{base}.idx"
+
+
+def bloom_path(directory: str, seq: int) -> str:
+    return os.path.join(directory, f"segment-{seq:08d}.bloom")
+
+
+def index_entries(idx_path: str) -> int:
+    """Registros completos no .idx (pelo tamanho do arquivo, sem lê-lo)"""
+    return os.path.getsize(idx_path) // INDEX_RECORD.size if os.path.exists(idx_path) else 0
+
+
+class SegmentBloom:
+    """Filtro de Bloom dos IDs (bytes32) de um segmento fechado"""
+
+    __slots__ = ("bits", "hashes", "entries", "array")
+
+    def __init__(self, entries: int, false_positive_rate: float = BLOOM_FALSE_POSITIVE_RATE):
+        n = max(entries, 1)
+        self.bits = max(64, math.ceil(-n * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / n * math.log(2)))
+        self.entries = entries
+        self.array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, key: bytes) -> Iterator[int]:
+        # Double hashing; blake2b porque IDs de teste/legados nem sempre são uniformes
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def add(self, key: bytes):
+        for position in self._positions(key):
+            self.array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self.array[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @classmethod
+    def from_keys(cls, keys, entries: int) -> "SegmentBloom":
+        bloom = cls(entries)
+        for key in keys:
+            bloom.add(key)
+        return bloom
+
+    def save(self, path: str):
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(BLOOM_HEADER.pack(self.bits, self.hashes, self.entries) + bytes(self.array))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, entries: int) -> Optional["SegmentBloom"]:
+        """Filtro gravado, ou None se ausente, corrompido ou de outro conteúdo do .idx"""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            bits, hashes, stored_entries = BLOOM_HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        if stored_entries != entries or len(data) != BLOOM_HEADER.size + (bits + 7) // 8:
+            return None
+        bloom = cls.__new__(cls)
+        bloom.bits, bloom.hashes, bloom.entries = bits, hashes, entries
+        bloom.array = bytearray(data[BLOOM_HEADER.size:])
+        return bloom
+
+
+def list_segments(directory: str) -> List[int]:
+    """Números de sequência dos segmentos existentes, em ordem"""
+    seqs = []
+    for path in glob.glob(os.path.join(directory, "segment-*.jsonl")):
+        match = SEGMENT_PATTERN.search(path)
+        if match:
+            seqs.append(int(match.group(1)))
+    return sorted(seqs)
+
+
+def read_index(idx_path: str) -> Iterator[Tuple[bytes, int, int]]:
+    with open(idx_path, "rb") as f:
+        data = f.read()
+    usable = len(data) - len(data) % INDEX_RECORD.size
+    for start in range(0, usable, INDEX_RECORD.size):
+        yield INDEX_RECORD.unpack_from(data, start)
+
+
+def indexed_end(idx_path: str) -> int:
+    """Fim (offset + tamanho) do último registro do índice; os registros seguem a ordem dos dados"""
+    if not os.path.exists(idx_path):
+        return 0
+    with open(idx_path, "rb") as f:
+        usable = f.seek(0, os.SEEK_END)
+        usable -= usable % INDEX_RECORD.size
+        if usable == 0:
+            return 0
+        f.seek(usable - INDEX_RECORD.size)
+        _, offset, length = INDEX_RECORD.unpack(f.read(INDEX_RECORD.size))
+    return offset + length
+
+
+def rebuild_index(data_path: str, idx_path: str) -> int:
+    """Reconstrói o índice de um segmento a partir do JSONL; retorna o número de entradas"""
+    records, offset = [], 0
+    with open(data_path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # linha parcial de uma escrita interrompida
+            try:
+                entry = json.loads(line)
+                records.append(INDEX_RECORD.pack(attestation_key(entry["attestation_id"]), offset, len(line)))
+            except (ValueError, KeyError):
+                logger.warning(f"⚠️  Linha inválida em {data_path} (offset {offset}) ignorada")
+            offset += len(line)
+    with open(idx_path, "wb") as f:
+        f.write(b"".join(records))
+    return len(records)
+
+
+class ResultLog:
+    """Log append-only segmentado, com índice por attestation ID"""
+
+    def __init__(
+        self,
+        directory: str = "logs/verifications",
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_age: float = 3600,
+        flush_every: int = 64,
+        flush_interval: float = 1.0,
+        index_cache_segments: int = 8
+    ):
+        """
+        Args:
+            directory: Diretório dos segmentos
+            max_segment_bytes: Tamanho a partir do qual o segmento é rotacionado
+            max_segment_age: Idade (s) a partir da qual o segmento é rotacionado
+            flush_every: Entradas acumuladas no buffer antes de escrever
+            flush_interval: Tempo máximo (s) de uma entrada no buffer
+            index_cache_segments: Índices de segmentos fechados mantidos em memória (LRU)
+        """
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.index_cache_segments = max(1, index_cache_segments)
+
+        self._lock = threading.Lock()
+        # Índice do segmento em escrita; os fechados (_segments) têm só o filtro de
+        # Bloom em memória e o .idx é lido sob demanda
+        self._index: Dict[bytes, Tuple[int, int, int]] = {}
+        self._segments: List[int] = []
+        self._blooms: Dict[int, SegmentBloom] = {}
+        self._segment_indexes: "OrderedDict[int, Dict[bytes, Tuple[int, int]]]" = OrderedDict()
+        self._buffer: List[Tuple[bytes, bytes]] = []
+        self._buffered: Dict[bytes, bytes] = {}
+        self._last_flush = time.monotonic()
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+        # Cada processo escreve em um segmento novo, aberto só na primeira escrita
+        self.seq = (list_segments(directory) or [0])[-1]
+        self._data = self._idx = None
+
+    def _load(self):
+        for seq in list_segments(self.directory):
+            data_path, idx_path = segment_paths(self.directory, seq)
+            rebuilt = False
+            if indexed_end(idx_path) != os.path.getsize(data_path):
+                # Índice incompleto (ou ausente): reconstrói a partir dos dados
+                logger.warning(f"⚠️  Índice de {data_path} desatualizado, reconstruindo")
+                rebuild_index(data_path, idx_path)
+                rebuilt = True
+            entries = index_entries(idx_path)
+            bloom = None if rebuilt else SegmentBloom.load(bloom_path(self.directory, seq), entries)
+            if bloom is None:
+                # Filtro ausente (segmento de uma versão anterior, queda antes de fechá-lo)
+                bloom = SegmentBloom.from_keys((key for key, _, _ in read_index(idx_path)), entries)
+                bloom.save(bloom_path(self.directory, seq))
+            self._blooms[seq] = bloom
+            self._segments.append(seq)
+
+    def _seal_segment(self):
+        """
+        O segmento em escrita passa a fechado: o filtro de Bloom sai das chaves
+        já em memória e o índice completo deixa a memória
+        """
+        entries = index_entries(segment_paths(self.directory, self.seq)[1])
+        bloom = SegmentBloom.from_keys(self._index, entries)
+        bloom.save(bloom_path(self.directory, self.seq))
+        self._blooms[self.seq] = bloom
+        self._segments.append(self.seq)
+        self._index = {}
+
+    def _segment_index(self, seq: int) -> Dict[bytes, Tuple[int, int]]:
+        """Índice de um segmento fechado (do LRU ou lido do .idx)"""
+        with self._lock:
+            index = self._segment_indexes.get(seq)
+            if index is not None:
+                self._segment_indexes.move_to_end(seq)
+                return index
+        # Dentro do segmento, a entrada mais nova do mesmo ID sobrescreve a anterior
+        index = {key: (offset, length) for key, offset, length in read_index(segment_paths(self.directory, seq)[1])}
+        with self._lock:
+            self._segment_indexes[seq] = index
+            while len(self._segment_indexes) > self.index_cache_segments:
+                self._segment_indexes.popitem(last=False)
+        return index
+
+    def _locate(self, key: bytes) -> Optional[Tuple[int, int, int]]:
+        """(segmento, offset, tamanho) da última entrada gravada do ID"""
+        with self._lock:
+            location = self._index.get(key)
+            segments = [seq for seq in self._segments if key in self._blooms[seq]]
+        if location is not None:
+            return location
+        # Segmentos mais novos têm a entrada mais recente do mesmo ID; só os que
+        # o filtro acusa (o ID ou um falso positivo) têm o .idx lido
+        for seq in reversed(segments):
+            found = self._segment_index(seq).get(key)
+            if found is not None:
+                return (seq,) + found
+        return None
+
+    def _open_segment(self, seq: int):
+        self.seq = seq
+        data_path, idx_path = segment_paths(self.directory, seq)
+        self._data = open(data_path, "ab")
+        self._idx = open(idx_path, "ab")
+        self._offset = self._data.tell()
+        self._opened_at = time.monotonic()
+
+    def _rotate_if_needed(self):
+        too_big = self._offset >= self.max_segment_bytes
+        too_old = time.monotonic() - self._opened_at >= self.max_segment_age
+        if self._offset > 0 and (too_big or too_old):
+            # O próximo segmento é aberto no próximo flush; o índice deste sai da
+            # memória e passa a ser lido do .idx quando preciso
+            self._data.close()
+            self._idx.close()
+            self._data = self._idx = None
+            self._seal_segment()
+
+    def append(self, entry: Dict):
+        """Acrescenta uma entrada (precisa de 'attestation_id'); vai para o disco no próximo flush"""
+        line = json.dumps(entry, separators=(",", ":")).encode() + b"\n"
+        key = attestation_key(entry["attestation_id"])
+        with self._lock:
+            self._buffer.append((key, line))
+            self._buffered[key] = line
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+            if len(self._buffer) >= self.flush_every or due:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        if self._data is None:
+            self._open_segment(self.seq + 1)
+        records, offset = [], self._offset
+        for key, line in self._buffer:
+            records.append((key, offset, len(line)))
+            offset += len(line)
+
+        # Dados antes do índice: o índice nunca aponta para bytes que não existem
+        self._data.write(b"".join(line for _, line in self._buffer))
+        self._data.flush()
+        self._idx.write(b"".join(INDEX_RECORD.pack(*record) for record in records))
+        self._idx.flush()
+
+        for key, record_offset, length in records:
+            self._index[key] = (self.seq, record_offset, length)
+        self._offset = offset
+        self._buffer.clear()
+        self._buffered.clear()
+        self._rotate_if_needed()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def pending(self) -> int:
+        """Entradas no buffer, ainda não escritas no disco"""
+        with self._lock:
+            return len(self._buffer)
+
+    def get(self, attestation_id: str) -> Optional[Dict]:
+        """Última entrada registrada para o attestation ID (None se não existir)"""
+        key = attestation_key(attestation_id)
+        with self._lock:
+            line = self._buffered.get(key)
+        if line is not None:
+            return json.loads(line)
+        location = self._locate(key)
+        if location is None:
+            return None
+        seq, offset, length = location
+        data_path, _ = segment_paths(self.directory, seq)
+        with open(data_path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def __contains__(self, attestation_id: str) -> bool:
+        key = attestation_key(attestation_id)
+        return key in self._buffered or self._locate(key) is not None
+
+    def __len__(self) -> int:
+        """IDs distintos no log (lê todos os índices: para ferramentas, não para o caminho quente)"""
+        with self._lock:
+            keys = set(self._index) | set(self._buffered)
+            segments = list(self._segments)
+        for seq in segments:
+            keys.update(key for key, _, _ in read_index(segment_paths(self.directory, seq)[1]))
+        return len(keys)
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            if self._data is not None:
+                self._data.close()
+                self._idx.close()
+                self._data = self._idx = None
+                # Uma escrita depois de close() vai para um segmento novo
+                self._seal_segment()
+
+
+# ============================================================
+# FERRAMENTAS (rodar com o verificador parado)
+# ============================================================
+
+def compact(directory: str) -> Dict:
+    """
+    Junta todos os segmentos em um só, mantendo apenas a última entrada de cada ID
+
+    O resultado substitui o segmento mais novo; os demais são removidos depois.
+    Se o processo cair no meio, sobram apenas entradas duplicadas mais antigas,
+    que continuam sendo sobrescritas pelas mais novas ao abrir o log.
+    """
+    seqs = list_segments(directory)
+    if not seqs:
+        return {"segments": 0, "entries": 0, "bytes_before": 0, "bytes_after": 0}
+
+    latest: Dict[bytes, Tuple[int, int, int]] = {}
+    bytes_before = 0
+    for seq in seqs:
+        data_path, idx_path = segment_paths(directory, seq)
+        bytes_before += os.path.getsize(data_path)
+        if not os.path.exists(idx_path):
+            rebuild_index(data_path, idx_path)
+        for key, offset, length in read_index(idx_path):
+            latest[key] = (seq, offset, length)
+
+    target_seq = seqs[-1]
+    data_path, idx_path = segment_paths(directory, target_seq)
+    tmp_data, tmp_idx = f"{data_path}.compact", f"{idx_path}.compact"
+    handles = {}
+    offset = 0
+    try:
+        with open(tmp_data, "wb") as out, open(tmp_idx, "wb") as out_idx:
+            # Mantém a ordem original (por segmento e offset)
+            for key, (seq, src_offset, length) in sorted(latest.items(), key=lambda kv: kv[1]):
+                if seq not in handles:
+                    handles[seq] = open(segment_paths(directory, seq)[0], "rb")
+                handles[seq].seek(src_offset)
+                out.write(handles[seq].read(length))
+                out_idx.write(INDEX_RECORD.pack(key, offset, length))
+                offset += length
+    finally:
+        for handle in handles.values():
+            handle.close()
+
+    os.replace(tmp_idx, idx_path)
+    os.replace(tmp_data, data_path)
+    SegmentBloom.from_keys(latest, len(latest)).save(bloom_path(directory, target_seq))
+    for seq in seqs[:-1]:
+        for path in (*segment_paths(directory, seq), bloom_path(directory, seq)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    return {"segments": len(seqs), "entries": len(latest), "bytes_before": bytes_before, "bytes_after": offset}
+
+
+def import_legacy(directory: str, remove: bool = False) -> int:
+    """Importa os arquivos antigos {id[:16]}.json do diretório para o log segmentado"""
+    paths = sorted(glob.glob(os.path.join(directory, "*.json")), key=os.path.getmtime)
+    log = ResultLog(directory)
+    imported = 0
+    try:
+        for path in paths:
+            try:
+                with open(path, "r") as f:
+                    entry = json.load(f)
+                log.append(entry)
+                imported += 1
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"⚠️  {path} ignorado: {e}")
+    finally:
+        log.close()
+    if remove:
+        for path in paths:
+            os.remove(path)
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ANNA segmented verification result log tools')
+    parser.add_argument('command', choices=['get', 'stats', 'compact', 'import-legacy'])
+    parser.add_argument('attestation_id', nargs='?', help='Attestation ID (for get)')
+    parser.add_argument('--dir', default='logs/verifications', help='Log directory (default: logs/verifications)')
+    parser.add_argument('--remove', action='store_true', help='Delete legacy .json files after import')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == 'get':
+        if not args.attestation_id:
+            parser.error("get requires an attestation_id")
+        log = ResultLog(args.dir)
+        entry = log.get(args.attestation_id)
+        log.close()
+        print(json.dumps(entry, indent=2) if entry else "not found")
+    elif args.command == 'stats':
+        log = ResultLog(args.dir)
+        seqs = list_segments(args.dir)
+        size = sum(os.path.getsize(segment_paths(args.dir, s)[0]) for s in seqs)
+        print(json.dumps({"segments": len(seqs), "entries": len(log), "bytes": size}, indent=2))
+        log.close()
+    elif args.command == 'compact':
+        print(json.dumps(compact(args.dir), indent=2))
+    else:
+        print(f"{import_legacy(args.dir, remove=args.remove)} entradas importadas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,454 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Regras de verificação Tier 1
+
+Conjunto de regras compilado uma única vez (validador do schema JSON,
+busca de padrões proibidos, threshold) e compartilhado por todos os
+verificadores do processo, junto com um cache de resultados por hash
+do reasoning.
+
+As regras podem vir de um arquivo versionado (rules.json). O RulesProvider
+observa o arquivo, compila a nova versão em background e troca a referência
+atomicamente: cada verificação usa um único conjunto de regras do início ao fim.
+
+Com um diretório de cache, cada versão compilada é guardada por fingerprint e
+as próximas inicializações pulam a validação do schema (check_schema).
+"""
+
+import os
+import re
+import json
+import time
+import pickle
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import jsonschema
+from jsonschema.exceptions import best_match
+
+from log_setup import HOT
+
+if TYPE_CHECKING:
+    from check_profile import CheckTimer
+
+logger = logging.getLogger(__name__)
+
+# Schema para validação de raciocínios
+REASONING_SCHEMA = {
+    "type": "object",
+    "required": ["input", "reasoning_steps", "conclusion", "confidence"],
+    "properties": {
+        "input": {"type": "string"},
+        "reasoning_steps": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["step_number", "description", "rationale"],
+                "properties": {
+                    "step_number": {"type": "integer"},
+                    "description": {"type": "string", "minLength": 1},
+                    "rationale": {"type": "string", "minLength": 1}
+                }
+            }
+        },
+        "conclusion": {"type": "string", "minLength": 1},
+        "confidence": {"type": "number", "minimum": 0, "maximum": 1}
+    }
+}
+
+# Padrões proibidos (jailbreaks, ataques)
+FORBIDDEN_PATTERNS = [
+    "ignore previous instructions",
+    "ignore all instructions",
+    "jailbreak",
+    "bypass",
+    "hack",
+    "disable safety",
+    "ignore guidelines",
+    "forget everything",
+    "new instructions",
+    "system prompt",
+    "override"
+]
+
+PASS_THRESHOLD = 60  # Threshold mínimo: 60%
+MIN_REASONING_SIZE = 100  # bytes
+MAX_REASONING_SIZE = 50000  # 50KB
+REQUIRED_FIELDS = ["input", "reasoning_steps", "conclusion", "confidence"]
+TOTAL_CHECKS = 7
+
+
+def calculate_reasoning_hash(reasoning_json: dict) -> str:
+    """Calcula SHA256 hash do reasoning para integridade off-chain"""
+    reasoning_str = json.dumps(reasoning_json, sort_keys=True)
+    return hashlib.sha256(reasoning_str.encode()).hexdigest()
+
+
+def _int_field(config: Dict, name: str, default: int) -> int:
+    value = config.get(name, default)
+    if isinstance(value, bool):
+        raise ValueError(f"'{name}' deve ser inteiro, não {value!r}")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' deve ser inteiro, não {value!r}")
+
+
+class RuleSet:
+    """Regras Tier 1 compiladas (imutável depois de criado)"""
+
+    def __init__(
+        self,
+        reasoning_schema: Dict = REASONING_SCHEMA,
+        forbidden_patterns: List[str] = FORBIDDEN_PATTERNS,
+        pass_threshold: int = PASS_THRESHOLD,
+        min_size: int = MIN_REASONING_SIZE,
+        max_size: int = MAX_REASONING_SIZE,
+        version: str = "builtin",
+        fingerprint: Optional[str] = None
+    ):
+        self.version = version
+        # Identifica o conteúdo das regras (chave do cache, mesmo se a versão não mudar)
+        self.fingerprint = fingerprint or version
+        self.reasoning_schema = reasoning_schema
+        self.forbidden_patterns = [p.lower() for p in forbidden_patterns]
+        self.pass_threshold = pass_threshold
+        self.min_size = min_size
+        self.max_size = max_size
+        self._compile(check_schema=True)
+
+    def _compile(self, check_schema: bool):
+        validator_cls = jsonschema.validators.validator_for(self.reasoning_schema)
+        if check_schema:
+            validator_cls.check_schema(self.reasoning_schema)
+        self.validator = validator_cls(self.reasoning_schema)
+        # Uma única passada de regex cobre o caso comum (nenhum padrão presente)
+        self.forbidden_regex = re.compile("|".join(re.escape(p) for p in self.forbidden_patterns)) \
+            if self.forbidden_patterns else None
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        # O validador não é serializável; é reconstruído (sem check_schema) ao carregar
+        del state["validator"]
+        del state["forbidden_regex"]
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self._compile(check_schema=False)
+
+    @classmethod
+    def from_config(cls, config: Dict, fingerprint: Optional[str] = None) -> "RuleSet":
+        """
+        Compila um RuleSet a partir do conteúdo de rules.json
+
+        Raises:
+            ValueError: Se a configuração não tiver versão ou for inválida
+                (inclusive campos com o tipo errado)
+        """
+        if not isinstance(config, dict):
+            raise ValueError("Arquivo de regras deve ser um objeto JSON")
+        if "version" not in config:
+            raise ValueError("Arquivo de regras sem campo 'version'")
+        reasoning_schema = config.get("reasoning_schema", REASONING_SCHEMA)
+        if not isinstance(reasoning_schema, dict):
+            raise ValueError("'reasoning_schema' deve ser um objeto JSON")
+        forbidden_patterns = config.get("forbidden_patterns", FORBIDDEN_PATTERNS)
+        if not isinstance(forbidden_patterns, list) or not all(isinstance(p, str) for p in forbidden_patterns):
+            raise ValueError("'forbidden_patterns' deve ser uma lista de strings")
+        try:
+            return cls(
+                reasoning_schema=reasoning_schema,
+                forbidden_patterns=forbidden_patterns,
+                pass_threshold=_int_field(config, "pass_threshold", PASS_THRESHOLD),
+                min_size=_int_field(config, "min_size", MIN_REASONING_SIZE),
+                max_size=_int_field(config, "max_size", MAX_REASONING_SIZE),
+                version=str(config["version"]),
+                fingerprint=fingerprint
+            )
+        except jsonschema.SchemaError as e:
+            raise ValueError(f"reasoning_schema inválido: {e.message}")
+
+    def find_forbidden(self, reasoning_text: str) -> List[str]:
+        """Retorna os padrões proibidos presentes no texto (na ordem da configuração)"""
+        if self.forbidden_regex is None or not self.forbidden_regex.search(reasoning_text):
+            return []
+        return [p for p in self.forbidden_patterns if p in reasoning_text]
+
+    def evaluate(
+        self,
+        reasoning_json: Dict,
+        reasoning_hash: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+        timer: Optional["CheckTimer"] = None
+    ) -> Tuple[bool, int, str]:
+        """
+        Executa os 7 checks Tier 1 (determinísticos)
+
+        Args:
+            reasoning_json: JSON do raciocínio do agente
+            reasoning_hash: Hash SHA256 já calculado (evita recalcular)
+            timings: Se informado, recebe a duração (s) dos estágios schema, patterns e scoring
+            timer: CheckTimer do modo instrumentado (ns e alocações por check; None = desligado)
+
+        Returns:
+            Tuple (passou: bool, score: int, razão: str)
+        """
+        checks_passed = 0
+        failure_reason = ""
+        clock = time.perf_counter if timings is not None else None
+        started = clock() if clock else 0.0
+        if timer:
+            timer.start()
+
+        # Check 0: Calcular hash de integridade
+        if reasoning_hash is None:
+            reasoning_hash = calculate_reasoning_hash(reasoning_json)
+        logger.debug("✓ Check 0: Hash SHA256 calculado: %.16s...", reasoning_hash)
+        checks_passed += 1
+        if timer:
+            timer.mark("hash")
+
+        # Check 1: Valida estrutura JSON
+        mark = clock() if clock else 0.0
+        error = best_match(self.validator.iter_errors(reasoning_json))
+        if clock:
+            timings["schema"] = clock() - mark
+        if timer:
+            timer.mark("schema")
+        if error is not None:
+            failure_reason = f"Invalid JSON structure: {error.message[:100]}"
+            logger.warning("✗ Check 1: %s", failure_reason, extra=HOT)
+            if clock:
+                timings["patterns"] = 0.0
+                timings["scoring"] = clock() - started - timings["schema"]
+            if timer:
+                timer.size = len(json.dumps(reasoning_json))
+            return (False, 0, failure_reason)
+        checks_passed += 1
+        logger.debug("✓ Check 1: Estrutura JSON válida")
+
+        # Check 2: Verifica campos obrigatórios
+        if all(field in reasoning_json for field in REQUIRED_FIELDS):
+            checks_passed += 1
+            logger.debug("✓ Check 2: Todos campos obrigatórios presentes")
+        else:
+            missing = [f for f in REQUIRED_FIELDS if f not in reasoning_json]
+            failure_reason = f"Missing required fields: {missing}"
+            logger.warning("✗ Check 2: %s", failure_reason, extra=HOT)
+        if timer:
+            timer.mark("fields")
+
+        # Check 3: Detecta padrões proibidos
+        mark = clock() if clock else 0.0
+        reasoning_text = json.dumps(reasoning_json)
+        detected_patterns = self.find_forbidden(reasoning_text.lower())
+        if clock:
+            timings["patterns"] = clock() - mark
+
+        if not detected_patterns:
+            checks_passed += 1
+            logger.debug("✓ Check 3: Nenhum padrão proibido detectado")
+        else:
+            failure_reason = f"Forbidden patterns detected: {detected_patterns[:3]}"
+            logger.warning("✗ Check 3: %s", failure_reason, extra=HOT)
+        if timer:
+            timer.mark("patterns")
+
+        # Check 4: Valida range de confiança
+        confidence = reasoning_json.get("confidence", -1)
+        if 0 <= confidence <= 1:
+            checks_passed += 1
+            logger.debug("✓ Check 4: Confiança válida (%s)", confidence)
+        else:
+            failure_reason = f"Invalid confidence range: {confidence}"
+            logger.warning("✗ Check 4: %s", failure_reason, extra=HOT)
+        if timer:
+            timer.mark("confidence")
+
+        # Check 5: Checa consistência de passos
+        steps = reasoning_json.get("reasoning_steps", [])
+        if len(steps) >= 1 and all(isinstance(s, dict) for s in steps):
+            checks_passed += 1
+            logger.debug("✓ Check 5: %s passos válidos", len(steps))
+        else:
+            failure_reason = f"Invalid reasoning steps: {len(steps)} steps"
+            logger.warning("✗ Check 5: %s", failure_reason, extra=HOT)
+        if timer:
+            timer.mark("steps")
+
+        # Check 6: Valida tamanho razoável (anti-spam)
+        reasoning_size = len(reasoning_text)
+        if self.min_size <= reasoning_size <= self.max_size:
+            checks_passed += 1
+            logger.debug("✓ Check 6: Tamanho razoável (%s bytes)", reasoning_size)
+        else:
+            failure_reason = f"Invalid size: {reasoning_size} bytes"
+            logger.warning("✗ Check 6: %s", failure_reason, extra=HOT)
+        if timer:
+            timer.mark("size")
+            timer.size = reasoning_size
+
+        # Calcula score
+        score = int((checks_passed / TOTAL_CHECKS) * 100)
+        passed = score >= self.pass_threshold
+        if clock:
+            # Demais checks (hash, campos, confiança, passos, tamanho) e o score
+            timings["scoring"] = clock() - started - timings["schema"] - timings["patterns"]
+        if timer:
+            timer.mark("score")
+
+        return (passed, score, failure_reason if not passed else "All checks passed")
+
+
+def load_rules(path: str, cache_dir: Optional[str] = None) -> RuleSet:
+    """
+    Lê e compila um arquivo de regras versionado
+
+    Args:
+        path: Arquivo de regras (rules.json)
+        cache_dir: Diretório do cache de regras pré-compiladas (se None, sempre compila)
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    fingerprint = hashlib.sha256(raw).hexdigest()[:16]
+
+    cache_path = os.path.join(cache_dir, f"rules-{fingerprint}.pickle") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                rules = pickle.load(f)
+            if isinstance(rules, RuleSet) and rules.fingerprint == fingerprint:
+                return rules
+        except Exception as e:
+            logger.warning(f"⚠️  Cache de regras {cache_path} ilegível, recompilando: {e}")
+
+    rules = RuleSet.from_config(json.loads(raw), fingerprint=fingerprint)
+
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(rules, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"⚠️  Não foi possível gravar o cache de regras: {e}")
+    return rules
+
+
+class RulesProvider:
+    """
+    Referência atômica ao RuleSet em uso, com recarga a quente opcional
+
+    Leitores pegam `provider.current` uma vez por verificação; a troca é uma
+    simples atribuição de referência, então nunca há regras pela metade.
+    """
+
+    def __init__(self, rules: Optional[RuleSet] = None, path: Optional[str] = None, cache_dir: Optional[str] = None):
+        """
+        Args:
+            rules: Regras iniciais (se None e path informado, carrega do arquivo)
+            path: Arquivo de regras versionado a observar
+            cache_dir: Diretório do cache de regras pré-compiladas
+        """
+        self.path = path
+        self.cache_dir = cache_dir
+        self.current = rules or (load_rules(path, cache_dir) if path else RuleSet())
+        self.reloads = 0
+        self._mtime = os.path.getmtime(path) if path else None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def version(self) -> str:
+        return self.current.version
+
+    def reload(self) -> bool:
+        """
+        Recompila as regras do arquivo e troca se o conteúdo mudou
+
+        Returns:
+            True se um novo RuleSet entrou em uso
+        """
+        try:
+            new_rules = load_rules(self.path, self.cache_dir)
+        except (OSError, ValueError) as e:
+            # Mantém as regras atuais - um arquivo quebrado nunca derruba o verificador
+            logger.error(f"❌ Regras em {self.path} inválidas, mantendo versão {self.version}: {e}")
+            return False
+
+        if new_rules.fingerprint == self.current.fingerprint:
+            return False
+
+        old_version = self.current.version
+        if new_rules.version == old_version:
+            logger.warning(f"⚠️  Conteúdo de {self.path} mudou sem alterar 'version' ({old_version})")
+        self.current = new_rules
+        self.reloads += 1
+        logger.info(f"🔄 Regras recarregadas: {old_version} -> {new_rules.version}")
+        return True
+
+    def _watch(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                continue
+            if mtime != self._mtime:
+                self._mtime = mtime
+                try:
+                    self.reload()
+                except Exception:
+                    # Erro inesperado não pode matar a thread (a recarga a quente pararia de vez)
+                    logger.exception(f"❌ Falha ao recarregar {self.path}, mantendo versão {self.version}")
+
+    def start_watching(self, interval: float = 5.0):
+        """Observa o arquivo em uma thread daemon e recarrega quando ele mudar"""
+        if not self.path or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._watch, args=(interval,), name="rules-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+class VerificationCache:
+    """Cache LRU thread-safe de resultados, por (versão das regras, hash do reasoning)"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[Tuple[bool, int, str]]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result: Tuple[bool, int, str]):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Verify-as-a-Service
+
+Servidor HTTP (asyncio/aiohttp) que expõe a verificação Tier 1 para que
+operadores de agentes possam pré-checar o reasoning antes de pagar gas.
+
+Endpoints:
+    POST /verify        -> um reasoning JSON
+    POST /verify/batch  -> lista de reasonings JSON
+    GET  /stats         -> throughput e latência p50/p99
+    GET  /health
+
+Desempenho:
+- Conexões keep-alive; requisições pipelined na mesma conexão são atendidas em ordem
+- O corpo cru segue direto para um pool de processos (JSON é parseado no worker,
+  não no event loop)
+- Requisições individuais que chegam juntas são agrupadas em micro-lotes
+  para amortizar o custo de IPC com o pool
+- Limite de requisições em andamento por cliente (X-Client-Id ou IP)
+- Workers usam o RuleSet aceito pelo RulesProvider (serializado com cada
+  tarefa, ~1 KB, e desserializado só quando o fingerprint muda); um
+  rules.json quebrado no disco nunca chega aos workers
+
+Uso:
+    python service.py --port 8080 --workers 8 --rules rules.json
+"""
+
+import os
+import json
+import time
+import pickle
+import asyncio
+import logging
+import argparse
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from rules import RuleSet, RulesProvider, calculate_reasoning_hash
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_ITEMS = 1000
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+
+# ============================================================
+# WORKERS (executam em processos separados)
+# ============================================================
+
+_worker_rules: Optional[RuleSet] = None
+
+
+def _init_worker():
+    # Falhas de check são resultado normal aqui, não precisam ir para o log
+    logging.getLogger("rules").setLevel(logging.ERROR)
+
+
+def _rules_for(fingerprint: str, rules_blob: bytes) -> RuleSet:
+    """Regras do worker: as do servidor, desserializadas só quando ele trocou de versão"""
+    global _worker_rules
+    if _worker_rules is None or _worker_rules.fingerprint != fingerprint:
+        _worker_rules = pickle.loads(rules_blob)
+    return _worker_rules
+
+
+def _verify_one(rules: RuleSet, reasoning) -> Dict:
+    if not isinstance(reasoning, dict):
+        return {"error": "reasoning must be a JSON object"}
+    try:
+        reasoning_hash = calculate_reasoning_hash(reasoning)
+        passed, score, reason = rules.evaluate(reasoning, reasoning_hash)
+    except Exception as e:
+        passed, score, reason, reasoning_hash = False, 0, f"Verification error: {str(e)[:100]}", None
+    return {
+        "passed": passed,
+        "score": score,
+        "reason": reason,
+        "rules_version": rules.version,
+        "reasoning_hash": reasoning_hash
+    }
+
+
+def verify_payloads(payloads: List[bytes], fingerprint: str, rules_blob: bytes) -> List[Dict]:
+    """Verifica vários corpos de /verify (bytes JSON) - um resultado por corpo"""
+    rules = _rules_for(fingerprint, rules_blob)
+    results = []
+    for raw in payloads:
+        try:
+            reasoning = json.loads(raw)
+        except ValueError as e:
+            results.append({"error": f"invalid JSON: {e}"})
+            continue
+        results.append(_verify_one(rules, reasoning))
+    return results
+
+
+def verify_batch_payload(raw: bytes, fingerprint: str, rules_blob: bytes) -> List[Dict]:
+    """Verifica o corpo de /verify/batch (lista JSON, ou {"items": [...]})"""
+    rules = _rules_for(fingerprint, rules_blob)
+    items = json.loads(raw)
+    if isinstance(items, dict):
+        items = items.get("items")
+    if not isinstance(items, list):
+        raise ValueError("batch body must be a JSON list or {\"items\": [...]}")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise ValueError(f"batch limited to {MAX_BATCH_ITEMS} items")
+    return [_verify_one(rules, item) for item in items]
+
+
+# ============================================================
+# SERVIDOR
+# ============================================================
+
+class LatencyTracker:
+    """Janela deslizante de latências para p50/p99 e throughput"""
+
+    def __init__(self, window: int = 20000):
+        self.samples = deque(maxlen=window)
+        self.requests = 0
+        self.verifications = 0
+        self.rejected = 0
+        self.started_at = time.time()
+
+    def record(self, seconds: float, items: int = 1):
+        self.samples.append(seconds)
+        self.requests += 1
+        self.verifications += items
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+    def snapshot(self) -> Dict:
+        elapsed = time.time() - self.started_at
+        p50, p99 = self.percentile(50), self.percentile(99)
+        return {
+            "requests": self.requests,
+            "verifications": self.verifications,
+            "rejected_429": self.rejected,
+            "verifications_per_sec": round(self.verifications / elapsed, 1) if elapsed else 0.0,
+            "latency_p50_ms": round(p50 * 1000, 3) if p50 is not None else None,
+            "latency_p99_ms": round(p99 * 1000, 3) if p99 is not None else None,
+            "window": len(self.samples)
+        }
+
+
+class VerifyService:
+    """Serviço HTTP de verificação Tier 1 sobre um pool de processos"""
+
+    def __init__(
+        self,
+        rules: RulesProvider,
+        workers: Optional[int] = None,
+        max_inflight_per_client: int = 64,
+        micro_batch_size: int = 64,
+        micro_batch_wait: float = 0.002
+    ):
+        """
+        Args:
+            rules: Provedor das regras (recarga a quente vale também para o serviço)
+            workers: Processos no pool (padrão: número de CPUs)
+            max_inflight_per_client: Máximo de requisições em andamento por cliente
+            micro_batch_size: Máximo de requisições /verify agrupadas por tarefa do pool
+            micro_batch_wait: Tempo máximo (s) esperando completar um micro-lote
+        """
+        self.rules = rules
+        self.workers = workers or os.cpu_count() or 1
+        self.max_inflight_per_client = max_inflight_per_client
+        self.micro_batch_size = micro_batch_size
+        self.micro_batch_wait = micro_batch_wait
+        self.latency = LatencyTracker()
+        self.pool = None
+        self._inflight = defaultdict(int)
+        self._pending = []
+        self._flush_handle = None
+        self._rules_blob: Optional[Tuple[str, bytes]] = None
+
+    # -- pool / micro-lotes --
+
+    def _rules_payload(self) -> Tuple[str, bytes]:
+        """(fingerprint, RuleSet serializado) da versão em uso, serializado uma vez por versão"""
+        rules = self.rules.current
+        if self._rules_blob is None or self._rules_blob[0] != rules.fingerprint:
+            self._rules_blob = (rules.fingerprint, pickle.dumps(rules, protocol=pickle.HIGHEST_PROTOCOL))
+        return self._rules_blob
+
+    def _submit(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.pool, fn, *args, *self._rules_payload())
+
+    def _flush(self):
+        self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        future = self._submit(verify_payloads, [raw for raw, _ in batch])
+
+        def _resolve(done):
+            for i, (_, waiter) in enumerate(batch):
+                if waiter.done():
+                    continue
+                if done.exception() is not None:
+                    waiter.set_exception(done.exception())
+                else:
+                    waiter.set_result(done.result()[i])
+
+        future.add_done_callback(_resolve)
+
+    def _enqueue(self, raw: bytes) -> asyncio.Future:
+        waiter = asyncio.get_running_loop().create_future()
+        self._pending.append((raw, waiter))
+        if len(self._pending) >= self.micro_batch_size:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.micro_batch_wait, self._flush)
+        return waiter
+
+    # -- limites por cliente --
+
+    def _client_id(self, request: web.Request) -> str:
+        return request.headers.get("X-Client-Id") or request.remote or "unknown"
+
+    def _acquire(self, client: str) -> bool:
+        if self._inflight[client] >= self.max_inflight_per_client:
+            self.latency.rejected += 1
+            return False
+        self._inflight[client] += 1
+        return True
+
+    def _release(self, client: str):
+        self._inflight[client] -= 1
+        if self._inflight[client] <= 0:
+            del self._inflight[client]
+
+    def _too_busy(self) -> web.Response:
+        return web.json_response(
+            {"error": "too many in-flight verifications for this client"},
+            status=429,
+            headers={"Retry-After": "1"}
+        )
+
+    # -- handlers --
+
+    async def handle_verify(self, request: web.Request) -> web.Response:
+        started = time.perf_counter()
+        client = self._client_id(request)
+        if not self._acquire(client):
+            return self._too_busy()
+        try:
+            result = await self._enqueue(await request.read())
+        finally:
+            self._release(client)
+        self.latency.record(time.perf_counter() - started)
+        return web.json_response(result, status=400 if "error" in result else 200)
+
+    async def handle_batch(self, request: web.Request) -> web.Response:
+        started = time.perf_counter()
+        client = self._client_id(request)
+        if not self._acquire(client):
+            return self._too_busy()
+        try:
+            results = await self._submit(verify_batch_payload, await request.read())
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        finally:
+            self._release(client)
+        self.latency.record(time.perf_counter() - started, len(results))
+        return web.json_response({"results": results})
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        stats = self.latency.snapshot()
+        stats.update({
+            "workers": self.workers,
+            "rules_version": self.rules.version,
+            "clients_in_flight": len(self._inflight)
+        })
+        return web.json_response(stats)
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", "rules_version": self.rules.version})
+
+    # -- ciclo de vida --
+
+    async def _on_startup(self, app):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+
+    async def _on_cleanup(self, app):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=MAX_BODY_BYTES)
+        app.add_routes([
+            web.post("/verify", self.handle_verify),
+            web.post("/verify/batch", self.handle_batch),
+            web.get("/stats", self.handle_stats),
+            web.get("/health", self.handle_health)
+        ])
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+
+def main():
+    """Inicia o serviço HTTP de verificação"""
+    parser = argparse.ArgumentParser(description='ANNA Protocol Verify-as-a-Service')
+    parser.add_argument('--host', default='0.0.0.0', help='Bind address (default: 0.0.0.0)')
+    parser.add_argument('--port', type=int, default=8080, help='Port (default: 8080)')
+    parser.add_argument('--workers', type=int, default=None, help='Process pool size (default: CPU count)')
+    parser.add_argument('--rules', default=os.getenv('VERIFIER_RULES_PATH', 'rules.json'),
+                        help='Versioned rules file, hot-reloaded on change (default: rules.json)')
+    parser.add_argument('--max-inflight-per-client', type=int, default=64,
+                        help='Max in-flight requests per client (default: 64)')
+    parser.add_argument('--keepalive', type=float, default=75.0, help='Keep-alive timeout in seconds (default: 75)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    rules = RulesProvider(path=args.rules) if os.path.exists(args.rules) else RulesProvider()
+    rules.start_watching()
+
+    service = VerifyService(rules, workers=args.workers, max_inflight_per_client=args.max_inflight_per_client)
+    logger.info(f"🚀 Verify-as-a-Service em http://{args.host}:{args.port} "
+                f"({service.workers} workers, regras {rules.version})")
+    web.run_app(
+        service.build_app(),
+        host=args.host,
+        port=args.port,
+        keepalive_timeout=args.keepalive,
+        access_log=None,
+        print=None
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Soak test do verificador (deriva de memória e throughput)
+
+Gera AttestationSubmitted sintéticos numa devchain local (sdk/anna_devchain.py,
+em outro processo) e roda o caminho completo do verificador contra ela:
+listen_for_attestations -> pré-checagem -> verificação Tier 1 -> verifyAttestation.
+
+A cada --sample-interval segundos registra RSS, memória rastreada pelo
+tracemalloc, throughput e backlog (injetadas - processadas). Depois do
+aquecimento, compara o início com o fim da execução e falha (exit 1) se:
+
+- o RSS crescer mais que --max-rss-growth-mb
+- a memória rastreada crescer mais que --max-traced-growth-mb
+- o throughput cair mais que --max-throughput-drop (fração)
+- o backlog terminar acima de --max-backlog
+
+Uso:
+    python soak.py --duration 600 --rate 10
+    python soak.py --duration 300 --rate 100 --dry-run
+    python soak.py --duration 86400 --rate 50 --latency 0.02 --jitter 0.02 --sample-interval 60
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+import tracemalloc
+import urllib.request
+from datetime import datetime
+from typing import Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEVCHAIN = os.path.join(HERE, '..', 'sdk', 'anna_devchain.py')
+
+# Chave de teste (a devchain autoriza qualquer verificador)
+SOAK_PRIVATE_KEY = "0x" + "5a" * 32
+
+
+def rss_bytes() -> int:
+    """RSS atual do processo (Linux: /proc; outros: pico via resource)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def rpc(url: str, method: str, params: Optional[list] = None):
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params or []}).encode()
+    request = urllib.request.Request(url, body, {"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        reply = json.loads(response.read())
+    if "error" in reply:
+        raise RuntimeError(reply["error"]["message"])
+    return reply["result"]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_devchain(args) -> (subprocess.Popen, str):
+    port = free_port()
+    command = [
+        sys.executable, DEVCHAIN, "--port", str(port),
+        "--latency", str(args.latency), "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate)
+    ]
+    command += ["--automine"] if args.block_time <= 0 else ["--block-time", str(args.block_time)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            rpc(url, "eth_chainId")
+            return process, url
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Devchain não respondeu em 30s")
+
+
+class Injector(threading.Thread):
+    """Injeta attestations na devchain a uma taxa constante"""
+
+    def __init__(self, url: str, rate: float, agents: List[str], tick: float = 0.1):
+        super().__init__(name="soak-injector", daemon=True)
+        self.url, self.rate, self.agents, self.tick = url, rate, agents, tick
+        self.injected = 0
+        self.errors = 0
+        self._stop = threading.Event()
+
+    def run(self):
+        started = time.monotonic()
+        while not self._stop.wait(self.tick):
+            due = int((time.monotonic() - started) * self.rate) - self.injected
+            if due <= 0:
+                continue
+            try:
+                rpc(self.url, "anna_injectAttestations", [due, self.agents])
+                self.injected += due
+            except Exception:
+                self.errors += 1
+
+    def stop(self):
+        self._stop.set()
+
+
+def processed_count(verifier) -> int:
+    """Attestations concluídas: verificação submetida (ou só verificada em dry run) ou descartada na pré-checagem"""
+    stats = verifier.stats
+    done = stats["passed"] + stats["failed"] if verifier.dry_run else stats["submitted"]
+    return done + stats["skipped"]
+
+
+def window_median(samples: List[Dict], key: str, start: float, end: float) -> Optional[float]:
+    values = [s[key] for s in samples if start <= s["elapsed"] <= end and s[key] is not None]
+    return statistics.median(values) if values else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Soak test: verifier memory and throughput drift against a local devchain')
+    parser.add_argument('--duration', type=float, default=600, help='Seconds to run (default: 600)')
+    parser.add_argument('--rate', type=float, default=10, help='Synthetic attestations per second (default: 10)')
+    parser.add_argument('--agents', type=int, default=50, help='Distinct agents submitting (default: 50)')
+    parser.add_argument('--block-time', type=float, default=0, help='Devchain block time, 0 = automine (default: 0)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Devchain latency per request in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Devchain random extra latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of devchain requests that fail')
+    parser.add_argument('--poll-interval', type=float, default=0.2, help='Verifier polling interval (default: 0.2)')
+    parser.add_argument('--dry-run', action='store_true', help='Skip verifyAttestation transactions')
+    parser.add_argument('--sample-interval', type=float, default=10, help='Seconds between samples (default: 10)')
+    parser.add_argument('--warmup', type=float, default=None, help='Seconds ignored before the baseline (default: 10%% of duration)')
+    parser.add_argument('--no-tracemalloc', action='store_true', help='Do not trace Python allocations (lower overhead)')
+    parser.add_argument('--trace-frames', type=int, default=1, help='Frames kept per allocation by tracemalloc (default: 1)')
+    parser.add_argument('--max-rss-growth-mb', type=float, default=64)
+    parser.add_argument('--max-traced-growth-mb', type=float, default=32)
+    parser.add_argument('--max-throughput-drop', type=float, default=0.3)
+    parser.add_argument('--max-backlog', type=int, default=None, help='Default: 30 seconds of --rate')
+    parser.add_argument('--output', default=None, help='JSONL file for samples (default: logs/soak-<date>.jsonl)')
+    parser.add_argument('--workdir', default=None, help='Directory for the verifier logs (default: temporary)')
+    args = parser.parse_args()
+
+    warmup = args.warmup if args.warmup is not None else args.duration * 0.1
+    max_backlog = args.max_backlog if args.max_backlog is not None else int(args.rate * 30)
+    output = os.path.abspath(args.output or os.path.join('logs', f"soak-{datetime.now():%Y%m%d-%H%M%S}.jsonl"))
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+
+    devchain, url = start_devchain(args)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="anna-soak-")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+
+    sys.path.insert(0, HERE)
+    import verifier as verifier_module
+    from admission import AdmissionController
+    from log_setup import configure_logging
+    from tx_replacement import FeeBumpPolicy
+    from anna_devchain import DEFAULT_CONTRACT
+
+    # Console só com avisos: o soak mede o verificador, não o terminal
+    configure_logging(level=logging.DEBUG if os.getenv("SOAK_DEBUG") else logging.WARNING)
+    with open(os.path.join(HERE, 'attestation_abi.json')) as f:
+        abi = json.load(f)
+
+    if not args.no_tracemalloc:
+        tracemalloc.start(args.trace_frames)
+
+    verifier = verifier_module.ANNAVerifier(
+        rpc_url=url,
+        private_key=SOAK_PRIVATE_KEY,
+        attestation_contract_address=DEFAULT_CONTRACT,
+        attestation_abi=abi,
+        dry_run=args.dry_run,
+        fee_policy=FeeBumpPolicy(poll_interval=0.05, timeout=60),
+        start_block=int(rpc(url, "eth_blockNumber"), 16) + 1,
+        # Carga sintética distribuída entre agentes: admissão sem limitar ninguém
+        admission=AdmissionController(heavy_share=1.0)
+    )
+    agents = [f"0x{i + 1:040x}" for i in range(args.agents)]
+    injector = Injector(url, args.rate, agents)
+    listener = threading.Thread(
+        target=verifier.listen_for_attestations, kwargs={"poll_interval": args.poll_interval},
+        name="soak-listener", daemon=True
+    )
+
+    print(f"🧪 Soak: {args.duration:.0f}s a {args.rate:.0f}/s ({args.agents} agentes), devchain {url}, logs em {workdir}")
+    print(f"{'t (s)':>8} {'RSS MB':>8} {'traced MB':>10} {'proc/s':>8} {'processadas':>12} {'backlog':>8}")
+
+    samples: List[Dict] = []
+    baseline_snapshot = None
+    started = time.monotonic()
+    last_time, last_processed = started, 0
+    injector.start()
+    listener.start()
+    try:
+        with open(output, "w", encoding="utf-8") as out:
+            while time.monotonic() - started < args.duration:
+                time.sleep(args.sample_interval)
+                now = time.monotonic()
+                processed = processed_count(verifier)
+                traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+                sample = {
+                    "elapsed": round(now - started, 1),
+                    "rss": rss_bytes(),
+                    "traced": traced,
+                    "throughput": (processed - last_processed) / (now - last_time),
+                    "processed": processed,
+                    "injected": injector.injected,
+                    "backlog": injector.injected - processed,
+                    "submitted": verifier.stats["submitted"],
+                    "tracked_events": len(verifier.processed_events),
+                    "pending_events": len(verifier._event_times),
+                    "deferred": len(verifier.admission.deferred)
+                }
+                samples.append(sample)
+                out.write(json.dumps(sample) + "\n")
+                out.flush()
+                print(f"{sample['elapsed']:8.0f} {sample['rss'] / 2**20:8.1f} "
+                      f"{(traced or 0) / 2**20:10.1f} {sample['throughput']:8.1f} {processed:12} {sample['backlog']:8}")
+                last_time, last_processed = now, processed
+                if baseline_snapshot is None and now - started >= warmup and tracemalloc.is_tracing():
+                    baseline_snapshot = tracemalloc.take_snapshot()
+    except KeyboardInterrupt:
+        print("\n⚠️  Soak interrompido; avaliando as amostras coletadas")
+    finally:
+        injector.stop()
+        devchain.terminate()
+        # O listener continua até o fim do processo; sem a devchain ele só geraria erros de conexão
+        logging.disable(logging.CRITICAL)
+
+    elapsed = samples[-1]["elapsed"] if samples else 0
+    steady = [s for s in samples if s["elapsed"] >= warmup]
+    if len(steady) < 4:
+        print("❌ Amostras insuficientes depois do aquecimento (aumente --duration ou reduza --sample-interval)")
+        sys.exit(2)
+
+    third = (elapsed - warmup) / 3
+    early = (warmup, warmup + third)
+    late = (elapsed - third, elapsed)
+    failures = []
+
+    rss_growth = (window_median(samples, "rss", *late) - window_median(samples, "rss", *early)) / 2**20
+    if rss_growth > args.max_rss_growth_mb:
+        failures.append(f"RSS cresceu {rss_growth:.1f} MB (limite {args.max_rss_growth_mb} MB)")
+
+    if tracemalloc.is_tracing():
+        traced_growth = (window_median(samples, "traced", *late) - window_median(samples, "traced", *early)) / 2**20
+        if traced_growth > args.max_traced_growth_mb:
+            failures.append(f"Memória rastreada cresceu {traced_growth:.1f} MB (limite {args.max_traced_growth_mb} MB)")
+    else:
+        traced_growth = None
+
+    early_throughput = window_median(samples, "throughput", *early)
+    late_throughput = window_median(samples, "throughput", *late)
+    drop = 1 - late_throughput / early_throughput if early_throughput else 0.0
+    if drop > args.max_throughput_drop:
+        failures.append(f"Throughput caiu {drop:.0%}: {early_throughput:.1f}/s -> {late_throughput:.1f}/s "
+                        f"(limite {args.max_throughput_drop:.0%})")
+
+    backlog = samples[-1]["backlog"]
+    if backlog > max_backlog:
+        failures.append(f"Backlog final de {backlog} attestations (limite {max_backlog}): o verificador não acompanha --rate")
+
+    print(f"\n📊 {samples[-1]['processed']} attestations processadas em {elapsed:.0f}s | "
+          f"RSS {rss_growth:+.1f} MB | rastreada {'desligada' if traced_growth is None else f'{traced_growth:+.1f} MB'} | "
+          f"throughput {early_throughput:.1f}/s -> {late_throughput:.1f}/s")
+
+    if baseline_snapshot is not None:
+        print("\nMaior crescimento de alocações desde o fim do aquecimento:")
+        current = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        for diff in current.compare_to(baseline_snapshot, "lineno")[:10]:
+            print(f"   {diff}")
+
+    print(f"\nAmostras: {output}")
+    if failures:
+        print("\n❌ SOAK FALHOU")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+    print("\n✅ SOAK OK: sem deriva acima dos limites")
+
+
+if __name__ == "__main__":
+    main()
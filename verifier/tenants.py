@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Verificador multi-tenant
+
+Permite que um único processo verificador atenda vários tenants, onde cada
+tenant é um par (rede, contrato AnnaAttestation).
+
+Compartilhado entre tenants:
+- Regras Tier 1 compiladas (recarregáveis) e cache de resultados
+- Log segmentado de resultados (cada entrada registra o tenant)
+- Pool de workers que executa os polls
+- Conexões Web3 (uma por URL de RPC, ou por lista de URLs com failover)
+
+Próprio de cada tenant:
+- Cursor de blocos, chave do verificador e métricas
+
+Tenants com a mesma chave na mesma rede (mesmo chain ID, ainda que por URLs
+de RPC diferentes) dividem o contador de nonces da wallet
+(anna_nonce.NonceManager): polls em paralelo nunca enviam o mesmo nonce.
+"""
+
+import os
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from web3 import Web3
+
+from anna_rpc import make_web3
+from profiling import Profiler
+from result_log import ResultLog
+from rules import RulesProvider, VerificationCache
+
+logger = logging.getLogger(__name__)
+
+# Explorers conhecidos (mesmas redes de NETWORKS no SDK)
+EXPLORERS = {
+    "polygon-amoy": "https://amoy.polygonscan.com",
+    "polygon-mainnet": "https://polygonscan.com"
+}
+
+
+@dataclass
+class TenantConfig:
+    """Configuração de um tenant (rede + deployment do AnnaAttestation)"""
+    name: str
+    network: str
+    contract: str
+    rpc_url: str
+    private_key: str
+    abi_path: str = "attestation_abi.json"
+    explorer_url: Optional[str] = None
+    start_block: Optional[int] = None
+
+
+def load_tenants(path: str) -> List[TenantConfig]:
+    """
+    Carrega a lista de tenants de um arquivo JSON
+
+    Cada tenant informa a URL do RPC diretamente (rpc_url, uma URL ou uma lista
+    com failover) ou via variável de ambiente (rpc_env), e a chave privada sempre via variável de ambiente
+    (private_key_env), para que o arquivo possa ser versionado.
+
+    Raises:
+        ValueError: Se algum tenant estiver incompleto ou duplicado
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    tenants = []
+    for entry in data.get("tenants", []):
+        name = entry.get("name") or f"{entry.get('network')}:{entry.get('contract', '')[:10]}"
+        rpc_url = entry.get("rpc_url") or os.getenv(entry.get("rpc_env", ""), "")
+        if isinstance(rpc_url, list):
+            rpc_url = ",".join(rpc_url)
+        private_key = os.getenv(entry.get("private_key_env", "VERIFIER_PRIVATE_KEY"), "")
+
+        if not all([entry.get("network"), entry.get("contract"), rpc_url, private_key]):
+            raise ValueError(f"Tenant '{name}' incompleto: network, contract, RPC e chave privada são obrigatórios")
+
+        tenants.append(TenantConfig(
+            name=name,
+            network=entry["network"],
+            contract=entry["contract"],
+            rpc_url=rpc_url,
+            private_key=private_key,
+            abi_path=entry.get("abi_path", "attestation_abi.json"),
+            explorer_url=entry.get("explorer_url") or EXPLORERS.get(entry["network"]),
+            start_block=entry.get("start_block")
+        ))
+
+    names = [t.name for t in tenants]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Nomes de tenant duplicados: {names}")
+    return tenants
+
+
+class SharedResources:
+    """Recursos compartilhados por todos os tenants do processo"""
+
+    def __init__(
+        self,
+        rules: Optional[RulesProvider] = None,
+        max_workers: int = 8,
+        cache_size: int = 10000,
+        rpc_options: Optional[Dict] = None
+    ):
+        self.rules = rules or RulesProvider()
+        self.result_cache = VerificationCache(cache_size)
+        self.result_log = ResultLog('logs/verifications')
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tenant")
+        self._connections: Dict[str, Web3] = {}
+        self._abis: Dict[str, list] = {}
+        self.rpc_options = rpc_options or {}
+
+    def web3_for(self, rpc_url: str) -> Web3:
+        """Uma conexão Web3 por URL de RPC (ou lista separada por vírgula), reaproveitada por tenants da mesma rede"""
+        if rpc_url not in self._connections:
+            self._connections[rpc_url] = make_web3(rpc_url, **self.rpc_options)
+        return self._connections[rpc_url]
+
+    def abi_for(self, abi_path: str) -> list:
+        """ABI carregada uma vez por arquivo"""
+        if abi_path not in self._abis:
+            with open(abi_path, 'r') as f:
+                self._abis[abi_path] = json.load(f)
+        return self._abis[abi_path]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+        self.result_log.close()
+
+
+class MultiTenantVerifier:
+    """Executa o poll de vários verificadores (um por tenant) no pool compartilhado"""
+
+    def __init__(self, verifiers: list, shared: SharedResources, profiler: Optional[Profiler] = None):
+        """
+        Args:
+            verifiers: Instâncias de ANNAVerifier, uma por tenant
+            shared: Recursos compartilhados (pool de workers, regras, cache)
+            profiler: Profiling sob demanda (--profile, SIGUSR1/SIGUSR2)
+        """
+        self.verifiers = verifiers
+        self.shared = shared
+        self.profiler = profiler
+
+    def poll_all(self) -> Dict[str, int]:
+        """Dispara um poll de cada tenant em paralelo e aguarda todos"""
+        if self.profiler is not None:
+            futures = {v.name: self.shared.executor.submit(self.profiler.call, v.poll_once) for v in self.verifiers}
+        else:
+            futures = {v.name: self.shared.executor.submit(v.poll_once) for v in self.verifiers}
+        detected = {}
+        for name, future in futures.items():
+            try:
+                detected[name] = future.result()
+            except Exception as e:
+                logger.error(f"❌ Erro no poll do tenant {name}: {e}")
+                detected[name] = 0
+        return detected
+
+    def tenant_metrics(self) -> Dict[str, Dict]:
+        """Métricas por tenant (cursor e contadores)"""
+        return {
+            v.name: {
+                "cursor": v.cursor,
+                **dict(v.stats),
+                "heavy_hitters": [h["agent"] for h in v.heavy_hitters() if h["limited"]]
+            }
+            for v in self.verifiers
+        }
+
+    def run(self, poll_interval: int = 10, report_every: int = 30):
+        """
+        Loop principal: poll de todos os tenants a cada intervalo
+
+        Args:
+            poll_interval: Intervalo de polling em segundos
+            report_every: A cada quantos polls registrar as métricas por tenant
+        """
+        logger.info(f"👂 Escutando {len(self.verifiers)} tenants: {[v.name for v in self.verifiers]}")
+        polls = 0
+        try:
+            while True:
+                self.poll_all()
+                polls += 1
+                if polls % report_every == 0:
+                    cache = self.shared.result_cache
+                    logger.info(f"📊 Tenants: {self.tenant_metrics()} | cache hit rate: {cache.hit_rate:.1%}")
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            logger.info("⚠️  Verificador multi-tenant interrompido pelo usuário")
+        finally:
+            for verifier in self.verifiers:
+                verifier.close()
+            self.shared.shutdown()
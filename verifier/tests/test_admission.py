@@ -0,0 +1,92 @@
+"""CountMinSketch, TokenBucket e AdmissionController"""
+
+import pytest
+
+import admission
+from admission import AdmissionController, CountMinSketch, TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission.time, "monotonic", clock)
+    return clock
+
+
+def test_sketch_never_underestimates():
+    sketch = CountMinSketch(width=64, depth=4)
+    counts = {f"agent-{i}": i % 7 + 1 for i in range(200)}
+    for agent, count in counts.items():
+        for _ in range(count):
+            sketch.add(agent)
+    assert all(sketch.estimate(agent) >= count for agent, count in counts.items())
+    assert sketch.total == sum(counts.values())
+
+
+def test_sketch_exact_without_collisions():
+    sketch = CountMinSketch()
+    assert sketch.add("a", 5) == 5
+    assert sketch.add("a") == 6
+    assert sketch.estimate("b") == 0
+
+
+def test_sketch_decay_halves():
+    sketch = CountMinSketch()
+    sketch.add("a", 9)
+    sketch.decay()
+    assert sketch.estimate("a") == 4
+    assert sketch.total == 4
+
+
+def test_token_bucket_burst_and_refill(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.take() for _ in range(4)] == [True, True, True, False]
+    clock.now += 0.5  # +1 token
+    assert bucket.take() and not bucket.take()
+    clock.now += 100  # nunca passa da rajada
+    assert sum(bucket.take() for _ in range(10)) == 3
+
+
+def test_heavy_hitter_is_rate_limited(clock):
+    controller = AdmissionController(min_heavy_count=5, heavy_share=0.5, rate=1, burst=2)
+    items = [(f"h{i}", "heavy") for i in range(10)] + [("n0", "normal")]
+    for _, agent in items:
+        controller.observe(agent)
+
+    admitted = controller.schedule(items)
+    assert admitted[0] == "n0"  # agentes normais primeiro
+    assert admitted[1:] == ["h0", "h1"]  # rajada do heavy hitter
+    assert len(controller.deferred) == 8
+    assert controller.heavy_hitters()[0]["deferred"] == 8
+
+    # O backlog sai na ordem de chegada, conforme a taxa
+    clock.now += 2
+    assert controller.schedule([]) == ["h2", "h3"]
+
+
+def test_restore_snapshot(clock):
+    controller = AdmissionController(min_heavy_count=1, heavy_share=0.5, rate=1, burst=1)
+    for _ in range(3):
+        controller.observe("heavy")
+    controller.schedule([("a", "heavy"), ("b", "heavy"), ("c", "heavy")])
+    backlog = list(controller.deferred)
+    state = controller.snapshot()
+    tokens = controller.buckets["heavy"].tokens
+
+    clock.now += 5  # refil: o poll que falha admite do backlog e adia o novo
+    controller.schedule([("d", "heavy"), ("e", "light")])
+    assert controller.deferred_total > 2
+    controller.restore(state)
+    assert list(controller.deferred) == backlog
+    assert controller.deferred_by_agent["heavy"] == len(backlog)
+    assert controller.deferred_total == state["deferred_total"] == 2
+    assert controller.buckets["heavy"].tokens == tokens
+    assert set(controller.buckets) == {"heavy"}
@@ -0,0 +1,46 @@
+"""CheckTimer e CheckProfile: variação líquida de blocos e releitura do JSONL"""
+
+import json
+
+from check_profile import CheckProfile, CheckTimer, load
+from metrics import CHECK_BLOCKS
+
+
+def test_net_blocks_counts_what_the_check_keeps():
+    kept = []
+    timer = CheckTimer()
+    [object() for _ in range(1000)]  # alocado e liberado dentro do check
+    timer.mark("freed")
+    kept.extend(object() for _ in range(1000))
+    timer.mark("kept")
+    del kept[:]
+    timer.mark("released")
+
+    breakdown = timer.breakdown()["checks"]
+    assert abs(breakdown["freed"]["net_blocks"]) < 100
+    assert breakdown["kept"]["net_blocks"] >= 1000
+    assert breakdown["released"]["net_blocks"] <= -900
+
+
+def test_load_reads_net_blocks_and_older_files(tmp_path):
+    path = tmp_path / "profile.jsonl"
+    lines = [
+        {"size": 10, "bucket": "<256", "checks": {"hash": {"ns": 100, "net_blocks": 4, "peak_bytes": None}}},
+        {"size": 10, "bucket": "<256", "checks": {"hash": {"ns": 300, "blocks": -2, "peak_bytes": None}}},
+    ]
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines))
+
+    (row,) = load(str(path)).summary()
+    assert row["count"] == 2
+    assert row["mean_ns"] == 200
+    assert row["mean_net_blocks"] == 1.0
+
+
+def test_metrics_only_count_retained_blocks():
+    profile = CheckProfile()
+    for net_blocks in (-5, 3):
+        timer = CheckTimer()
+        timer.checks = {"test-retained": (100, net_blocks, None)}
+        profile.record(timer)
+    assert CHECK_BLOCKS.values[(("check", "test-retained"), ("size", "<256"))] == 3
+    assert profile.summary()[0]["mean_net_blocks"] == -1
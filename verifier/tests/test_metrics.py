@@ -0,0 +1,93 @@
+"""Coletores de métricas: um por tenant, removidos em close()"""
+
+import json
+import os
+
+import pytest
+
+from metrics import CACHE_HIT_RATIO, REGISTRY, QUEUE_DEPTH, VERIFICATIONS, Registry
+
+ABI_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "attestation_abi.json")
+
+
+def test_collector_key_replaces_and_removes():
+    registry = Registry()
+    calls = []
+    first = lambda: calls.append("first")
+    second = lambda: calls.append("second")
+    key = registry.add_collector(first, key=("tenant", "a"))
+    registry.add_collector(second, key=("tenant", "a"))
+    registry.render()
+    assert calls == ["second"]
+
+    # Quem foi substituído não remove o coletor novo
+    registry.remove_collector(key, first)
+    assert len(registry.collectors) == 1
+    registry.remove_collector(key, second)
+    assert not registry.collectors
+
+
+def test_collector_without_key():
+    registry = Registry()
+    fn = lambda: None
+    registry.add_collector(fn)
+    registry.add_collector(fn)
+    assert len(registry.collectors) == 1
+    registry.remove_collector(fn)
+    assert not registry.collectors
+
+
+@pytest.fixture
+def make_verifier(tmp_path, monkeypatch):
+    from anna_devchain import DevChain, DEFAULT_CONTRACT
+    import verifier
+
+    monkeypatch.chdir(tmp_path)
+    chain = DevChain(block_time=0)
+    url = chain.serve(port=0, background=True)
+    with open(ABI_PATH) as f:
+        abi = json.load(f)
+    created = []
+
+    def make(name):
+        v = verifier.ANNAVerifier(
+            rpc_url=url, private_key="0x" + "44" * 32, attestation_contract_address=DEFAULT_CONTRACT,
+            attestation_abi=abi, dry_run=True, name=name
+        )
+        created.append(v)
+        return v
+
+    yield make
+    for v in created:
+        v.close()
+    chain.stop()
+
+
+def test_verifier_registers_once_per_tenant(make_verifier):
+    before = len(REGISTRY.collectors)
+    first = make_verifier("tenant-a")
+    make_verifier("tenant-a")
+    third = make_verifier("tenant-b")
+    assert len(REGISTRY.collectors) == before + 2
+
+    third.result_log.append({"attestation_id": "0x" + "ab" * 32})
+    REGISTRY.render()
+    assert QUEUE_DEPTH.values[(("queue", "result_log"), ("tenant", "tenant-b"))] == third.result_log.pending()
+
+    first.close()  # substituído: não remove o coletor do tenant-a atual
+    assert len(REGISTRY.collectors) == before + 2
+    third.close()
+    assert len(REGISTRY.collectors) == before + 1
+
+
+def test_totals_are_counters_and_cache_ratio_per_tenant(make_verifier):
+    v = make_verifier("tenant-c")
+    v.stats["detected"] += 3
+    v.stats["deferred"] = 2
+    text = REGISTRY.render()
+    assert "# TYPE anna_gas_spent_wei_total counter" in text
+    assert "# TYPE anna_verifications_total counter" in text
+    assert VERIFICATIONS.values[(("kind", "detected"), ("tenant", "tenant-c"))] == 3
+    # O backlog atual não é um total
+    assert (("kind", "deferred"), ("tenant", "tenant-c")) not in VERIFICATIONS.values
+    assert (("cache", "verification"), ("tenant", "tenant-c")) in CACHE_HIT_RATIO.values
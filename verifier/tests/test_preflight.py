@@ -0,0 +1,72 @@
+"""PreflightChecker: erros passageiros não desligam a leitura em lote"""
+
+import json
+import os
+
+import pytest
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from web3 import Web3
+
+from anna_devchain import DevChain, DEFAULT_CONTRACT
+from preflight import PreflightChecker, STATUS_PENDING
+
+ABI_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "attestation_abi.json")
+
+
+@pytest.fixture
+def checker():
+    chain = DevChain(block_time=0)
+    url = chain.serve(port=0, background=True)
+    w3 = Web3(Web3.HTTPProvider(url))
+    with open(ABI_PATH) as f:
+        contract = w3.eth.contract(address=DEFAULT_CONTRACT, abi=json.load(f))
+    ids = chain.inject(3)
+    yield chain, PreflightChecker(w3, contract, "0x" + "22" * 20, retry_delay=0), ids
+    chain.stop()
+
+
+def _script(w3, replies):
+    original = w3.provider.make_batch_request
+    calls = []
+
+    def make_batch_request(requests):
+        calls.append(len(requests))
+        if replies:
+            reply = replies.pop(0)
+            if isinstance(reply, Exception):
+                raise reply
+            return reply
+        return original(requests)
+
+    w3.provider.make_batch_request = make_batch_request
+    return calls
+
+
+def test_transient_error_keeps_batches(checker):
+    _, preflight, ids = checker
+    calls = _script(preflight.w3, [
+        RequestsConnectionError("reset"),
+        {"jsonrpc": "2.0", "id": None, "error": {"code": -32005, "message": "limit exceeded"}},
+    ])
+    assert set(preflight.read_statuses(ids).values()) == {STATUS_PENDING}
+    assert preflight._batch_supported and len(calls) == 3
+
+
+def test_method_not_found_disables_batches(checker):
+    _, preflight, ids = checker
+    calls = _script(preflight.w3, [{"jsonrpc": "2.0", "id": None, "error": {"code": -32601, "message": "Method not found"}}])
+    assert set(preflight.read_statuses(ids).values()) == {STATUS_PENDING}
+    assert not preflight._batch_supported
+    preflight.read_statuses(ids)
+    assert len(calls) == 1
+
+
+def test_import_verifier_does_not_load_web3():
+    import subprocess
+    import sys
+
+    code = "import sys, verifier; print('web3' in sys.modules, 'anna_rpc' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=os.path.dirname(ABI_PATH), capture_output=True, text=True, check=True
+    ).stdout
+    assert out.split() == ["False", "False"]
@@ -0,0 +1,30 @@
+"""Profiler: gatilhos por sinal"""
+
+import os
+import signal
+import time
+
+import pytest
+
+from profiling import Profiler
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="sem SIGUSR1/SIGUSR2")
+def test_signal_while_lock_is_held_does_not_deadlock(tmp_path):
+    previous = {signum: signal.getsignal(signum) for signum in (signal.SIGUSR1, signal.SIGUSR2)}
+    profiler = Profiler(directory=str(tmp_path), mode="cprofile", window=0.1)
+    try:
+        assert profiler.install_signal_handlers()
+        # Como num call() em andamento na thread principal
+        with profiler._lock:
+            os.kill(os.getpid(), signal.SIGUSR1)
+            os.kill(os.getpid(), signal.SIGUSR2)
+            time.sleep(0.05)
+        deadline = time.monotonic() + 2
+        while not (profiler._cpu_active and profiler._memory_active) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert profiler._cpu_active and profiler._memory_active
+        assert profiler.call(lambda x: x * 2, 21) == 42
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
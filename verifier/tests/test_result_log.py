@@ -0,0 +1,134 @@
+"""ResultLog: rotação, reabertura, índice sob demanda e compactação"""
+
+import os
+
+import result_log
+from result_log import INDEX_RECORD, ResultLog, compact, list_segments, segment_paths
+
+
+def _id(i):
+    return "0x%064x" % i
+
+
+def _fill(log, count, start=0):
+    for i in range(start, start + count):
+        log.append({"attestation_id": _id(i), "n": i})
+    log.flush()
+
+
+def test_rotates_and_reads_closed_segments(tmp_path):
+    log = ResultLog(str(tmp_path), max_segment_bytes=1000, flush_every=4, index_cache_segments=2)
+    _fill(log, 100)
+    assert len(list_segments(str(tmp_path))) > 3
+    # Só o segmento em escrita fica indexado em memória
+    assert len(log._index) < 100
+    assert all(log.get(_id(i))["n"] == i for i in range(100))
+    assert len(log._segment_indexes) <= 2
+    assert _id(5) in log and _id(500) not in log
+    assert log.get(_id(500)) is None
+    assert len(log) == 100
+    log.close()
+
+
+def test_newest_entry_wins_after_reopen(tmp_path):
+    log = ResultLog(str(tmp_path), max_segment_bytes=1000, flush_every=4)
+    _fill(log, 40)
+    log.append({"attestation_id": _id(3), "n": "new"})
+    assert log.pending() == 1
+    assert log.get(_id(3))["n"] == "new"  # ainda no buffer
+    log.close()
+    assert log.pending() == 0
+
+    reopened = ResultLog(str(tmp_path))
+    assert reopened.get(_id(3))["n"] == "new"
+    assert len(reopened) == 40
+    # Escreve num segmento novo, sem tocar nos anteriores
+    before = list_segments(str(tmp_path))
+    _fill(reopened, 1, start=40)
+    assert list_segments(str(tmp_path))[-1] == before[-1] + 1
+    reopened.close()
+
+
+def test_write_after_close_goes_to_new_segment(tmp_path):
+    log = ResultLog(str(tmp_path))
+    _fill(log, 3)
+    log.close()
+    _fill(log, 3, start=3)
+    assert all(log.get(_id(i))["n"] == i for i in range(6))
+    log.close()
+
+
+def test_truncated_index_is_rebuilt(tmp_path):
+    log = ResultLog(str(tmp_path))
+    _fill(log, 10)
+    log.close()
+    seq = list_segments(str(tmp_path))[-1]
+    data_path, idx_path = segment_paths(str(tmp_path), seq)
+    with open(idx_path, "r+b") as f:
+        f.truncate(INDEX_RECORD.size * 3 + 7)  # queda no meio de uma escrita do índice
+
+    reopened = ResultLog(str(tmp_path))
+    assert os.path.getsize(idx_path) == INDEX_RECORD.size * 10
+    assert reopened.get(_id(9))["n"] == 9
+    reopened.close()
+
+
+def test_compact_keeps_latest(tmp_path):
+    log = ResultLog(str(tmp_path), max_segment_bytes=500, flush_every=2)
+    _fill(log, 30)
+    for i in range(10):
+        log.append({"attestation_id": _id(i), "n": f"v2-{i}"})
+    log.close()
+
+    summary = compact(str(tmp_path))
+    assert summary["entries"] == 30
+    assert summary["bytes_after"] < summary["bytes_before"]
+    assert len(list_segments(str(tmp_path))) == 1
+
+    reopened = ResultLog(str(tmp_path))
+    assert reopened.get(_id(4))["n"] == "v2-4"
+    assert reopened.get(_id(29))["n"] == 29
+    assert len(reopened) == 30
+    reopened.close()
+
+
+def test_miss_reads_no_index_file(tmp_path, monkeypatch):
+    log = ResultLog(str(tmp_path), max_segment_bytes=400, flush_every=2)
+    _fill(log, 200)
+    log.close()
+    assert len(list_segments(str(tmp_path))) > 20
+
+    reopened = ResultLog(str(tmp_path))
+    reads = []
+    original = result_log.read_index
+    monkeypatch.setattr(result_log, "read_index", lambda path: reads.append(path) or original(path))
+
+    segments = list_segments(str(tmp_path))
+    lookups = 0
+    for i in range(1000, 1100):
+        key = bytes.fromhex(_id(i)[2:])
+        positives = [seq for seq in segments if key in reopened._blooms[seq]]
+        del reads[:]
+        assert reopened.get(_id(i)) is None
+        # Só os segmentos cujo filtro acusa o ID (falsos positivos) têm o .idx lido
+        # (ou nenhum, se o índice já está no LRU)
+        assert set(reads) <= {segment_paths(str(tmp_path), seq)[1] for seq in positives}
+        lookups += len(positives)
+    # Antes: cada ID ausente lia os .idx de todos os segmentos
+    assert lookups <= 0.03 * 100 * len(segments)
+
+    assert reopened.get(_id(5))["n"] == 5
+    reopened.close()
+
+
+def test_missing_bloom_is_rebuilt(tmp_path):
+    log = ResultLog(str(tmp_path), max_segment_bytes=400, flush_every=2)
+    _fill(log, 40)
+    log.close()
+    for seq in list_segments(str(tmp_path)):
+        os.remove(result_log.bloom_path(str(tmp_path), seq))
+
+    reopened = ResultLog(str(tmp_path))
+    assert all(os.path.exists(result_log.bloom_path(str(tmp_path), seq)) for seq in list_segments(str(tmp_path)))
+    assert all(reopened.get(_id(i))["n"] == i for i in range(40))
+    reopened.close()
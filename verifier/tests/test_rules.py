@@ -0,0 +1,62 @@
+import json
+import os
+import time
+
+import pytest
+
+from rules import RuleSet, RulesProvider
+
+
+@pytest.mark.parametrize("config", [
+    [1, 2],
+    {"pass_threshold": 5},
+    {"version": "v2", "forbidden_patterns": 5},
+    {"version": "v2", "forbidden_patterns": ["ok", 3]},
+    {"version": "v2", "pass_threshold": None},
+    {"version": "v2", "min_size": "abc"},
+    {"version": "v2", "max_size": True},
+    {"version": "v2", "reasoning_schema": []},
+    {"version": "v2", "reasoning_schema": {"type": 5}},
+])
+def test_invalid_config_raises_value_error(config):
+    with pytest.raises(ValueError):
+        RuleSet.from_config(config)
+
+
+def test_valid_config():
+    rules = RuleSet.from_config({"version": 3, "pass_threshold": "6", "forbidden_patterns": ["Hack"]})
+    assert (rules.version, rules.pass_threshold, rules.forbidden_patterns) == ("3", 6, ["hack"])
+
+
+def _write(path, config, mtime):
+    with open(path, "w") as f:
+        json.dump(config, f)
+    os.utime(path, (mtime, mtime))
+
+
+def test_reload_keeps_current_rules_on_bad_file(tmp_path):
+    path = str(tmp_path / "rules.json")
+    _write(path, {"version": "v1"}, 1000)
+    provider = RulesProvider(path=path)
+    _write(path, {"version": "v2", "pass_threshold": None}, 1001)
+    assert provider.reload() is False
+    assert provider.version == "v1"
+
+
+def test_watcher_survives_bad_file(tmp_path):
+    path = str(tmp_path / "rules.json")
+    _write(path, {"version": "v1"}, 1000)
+    provider = RulesProvider(path=path)
+    provider.start_watching(interval=0.02)
+    try:
+        _write(path, {"version": "v2", "forbidden_patterns": 5}, 1001)
+        time.sleep(0.1)
+        assert provider.version == "v1"
+        _write(path, {"version": "v3"}, 1002)
+        deadline = time.time() + 2
+        while provider.version != "v3" and time.time() < deadline:
+            time.sleep(0.02)
+        assert provider.version == "v3"
+        assert provider._thread.is_alive()
+    finally:
+        provider.stop()
@@ -0,0 +1,59 @@
+"""Tenants com a mesma chave na mesma rede não repetem nonce"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from anna_devchain import DevChain, DEFAULT_CONTRACT
+from tenants import SharedResources, load_tenants
+from tx_replacement import FeeBumpPolicy
+
+KEY = "0x" + "55" * 32
+
+
+@pytest.fixture
+def tenants(tmp_path, monkeypatch):
+    import verifier
+
+    chain = DevChain(block_time=0, automine=True)
+    url = chain.serve(port=0, background=True)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("VERIFIER_PRIVATE_KEY", KEY)
+    # Mesma rede por duas URLs: conexões (e providers) diferentes
+    config = tmp_path / "tenants.json"
+    config.write_text(json.dumps({"tenants": [
+        {"name": "a", "network": "devchain", "contract": DEFAULT_CONTRACT, "rpc_url": url},
+        {"name": "b", "network": "devchain", "contract": DEFAULT_CONTRACT, "rpc_url": url.replace("127.0.0.1", "localhost")},
+    ]}))
+    configs = load_tenants(str(config))
+    assert {c.private_key for c in configs} == {KEY}
+
+    shared = SharedResources()
+    abi_path = os.path.join(os.path.dirname(verifier.__file__), "attestation_abi.json")
+    verifiers = [
+        verifier.ANNAVerifier(
+            rpc_url=c.rpc_url, private_key=c.private_key, attestation_contract_address=c.contract,
+            attestation_abi=shared.abi_for(abi_path), name=c.name, w3=shared.web3_for(c.rpc_url),
+            result_log=shared.result_log, fee_policy=FeeBumpPolicy(schedule=[], timeout=10, poll_interval=0.05)
+        )
+        for c in configs
+    ]
+    yield verifiers
+    for v in verifiers:
+        v.close()
+    shared.shutdown()
+    chain.stop()
+
+
+def test_two_tenants_on_one_key_never_share_a_nonce(tenants):
+    a, b = tenants
+    assert a.w3 is not b.w3
+    assert a.tx_engine.nonces is b.tx_engine.nonces
+
+    tx = {"to": a.account.address, "data": "0x", "gas": 21000}
+    with ThreadPoolExecutor(8) as pool:
+        records = list(pool.map(lambda v: v.tx_engine.send(dict(tx)), [a, b] * 6))
+    assert [r.status for r in records] == ["success"] * 12
+    assert sorted(r.nonce for r in records) == list(range(12))
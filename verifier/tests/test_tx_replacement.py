@@ -0,0 +1,133 @@
+"""TxReplacementEngine: o teto de gasto total cobre o pior caso de cada versão"""
+
+import pytest
+from eth_account import Account
+from web3 import Web3
+
+from anna_devchain import DevChain
+from tx_replacement import FeeBumpPolicy, SpendCapExceeded, TxReplacementEngine
+
+GAS = 21000
+
+
+@pytest.fixture
+def w3():
+    chain = DevChain(block_time=0)  # sem blocos: a transação fica presa
+    yield Web3(Web3.HTTPProvider(chain.serve(port=0, background=True)))
+    chain.stop()
+
+
+def _engine(w3, budget):
+    policy = FeeBumpPolicy(schedule=[0, 0.1], timeout=0.5, poll_interval=0.05, max_total_spend_wei=budget)
+    engine = TxReplacementEngine(w3, Account.create(), policy)
+    max_fee, _ = engine.network_fees()
+    return engine, max_fee
+
+
+def _tx(engine):
+    return {"to": engine.account.address, "data": "0x", "gas": GAS}
+
+
+def test_bump_stops_at_total_spend_cap(w3):
+    engine, max_fee = _engine(w3, None)
+    # Cabe a primeira versão, mas não a substituição (+25%)
+    engine.policy.max_total_spend_wei = GAS * max_fee * 11 // 10
+    record = engine.send(_tx(engine))
+    assert record.status == "timeout"
+    assert record.replacements == 0
+
+
+def test_bump_within_total_spend_cap(w3):
+    engine, max_fee = _engine(w3, None)
+    engine.policy.max_total_spend_wei = GAS * max_fee * 14 // 10  # 1ª substituição (+25%), não a 2ª
+    record = engine.send(_tx(engine))
+    assert record.replacements == 1
+    assert GAS * record.attempts[-1].max_fee_per_gas <= engine.policy.max_total_spend_wei
+
+
+def test_first_broadcast_must_fit_budget(w3):
+    engine, max_fee = _engine(w3, None)
+    engine.policy.max_total_spend_wei = GAS * max_fee - 1
+    with pytest.raises(SpendCapExceeded):
+        engine.send(_tx(engine))
+
+
+def test_next_send_after_timeout_uses_next_nonce(w3):
+    engine, _ = _engine(w3, None)
+    first = engine.send(_tx(engine))
+    second = engine.send(_tx(engine))
+    assert first.status == second.status == "timeout"
+    assert second.nonce == first.nonce + 1
+
+
+class ExpiredWatcher:
+    """Watcher cujos futures já terminam com TimeExhausted"""
+
+    def watch(self, tx_hash):
+        from concurrent.futures import Future
+        from web3.exceptions import TimeExhausted
+
+        future = Future()
+        future.set_exception(TimeExhausted(tx_hash))
+        return future
+
+    def forget(self, tx_hash):
+        pass
+
+
+def test_failed_watch_does_not_spin(w3):
+    engine, _ = _engine(w3, None)
+    engine.receipt_watcher = ExpiredWatcher()
+    lookups = []
+    original = engine._find_receipt
+    engine._find_receipt = lambda record, watched: lookups.append(1) or original(record, watched)
+    record = engine.send(_tx(engine))
+    assert record.status == "timeout"
+    # timeout 0.5 s, poll_interval 0.05 s: ~10 voltas, não milhares
+    assert len(lookups) < 30
+
+
+def test_timed_out_tx_stays_charged(w3):
+    engine, max_fee = _engine(w3, None)
+    engine.policy.schedule = []
+    engine.policy.max_total_spend_wei = GAS * max_fee * 3 // 2
+    record = engine.send(_tx(engine))
+    assert record.status == "timeout"
+    assert engine.spent_wei == record.reserved_wei == GAS * record.attempts[-1].max_fee_per_gas
+    assert engine.paid_wei == 0
+    # A expirada ainda pode ser minerada: a próxima não cabe no que resta
+    with pytest.raises(SpendCapExceeded):
+        engine.send(_tx(engine))
+
+
+def test_inclusion_replaces_reservation_with_real_cost():
+    chain = DevChain(block_time=0, automine=True)
+    w3 = Web3(Web3.HTTPProvider(chain.serve(port=0, background=True)))
+    try:
+        engine, _ = _engine(w3, None)
+        record = engine.send(_tx(engine))
+        assert record.status == "success"
+        assert engine.spent_wei == engine.paid_wei == record.fee_paid_wei == record.reserved_wei
+        assert record.fee_paid_wei < GAS * record.attempts[-1].max_fee_per_gas
+    finally:
+        chain.stop()
+
+
+def test_priority_fee_never_exceeds_max_fee(w3):
+    engine, _ = _engine(w3, None)
+    engine.policy.priority_fee_gwei = 1000  # gorjeta acima do teto de maxFeePerGas
+    engine.policy.max_fee_per_gas_gwei = 100
+    record = engine.send(_tx(engine))
+    assert record.attempts
+    for attempt in record.attempts:
+        assert attempt.max_priority_fee_per_gas <= attempt.max_fee_per_gas <= engine.policy.max_fee_per_gas_wei
+
+
+def test_priority_fee_cap(w3):
+    engine, _ = _engine(w3, None)
+    engine.policy.priority_fee_gwei = 5
+    engine.policy.max_priority_fee_gwei = 2
+    record = engine.send(_tx(engine))
+    assert record.attempts[0].max_priority_fee_per_gas == 2 * 10**9
+    # Gorjeta no teto: uma substituição seria recusada pelo nó (+10% nas duas taxas)
+    assert record.replacements == 0
@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+"""
+ANNA Protocol - Substituição de transações presas
+
+Motor de envio do verificador com política de bump de taxas EIP-1559:
+1. Envia a transação com maxFeePerGas/maxPriorityFeePerGas atuais
+2. Se não for minerada até o próximo ponto do cronograma, reenvia o
+   MESMO nonce com taxas aumentadas (substituição)
+3. Respeita tetos de taxa por gas (maxFeePerGas e gorjeta), de custo por transação e de gasto total:
+   o pior caso de cada versão (gas * maxFeePerGas) é contado no envio e
+   trocado pelo custo real na inclusão; transações que expiram seguem contadas
+4. Registra o tempo até inclusão de cada transação
+5. Nonces vêm do anna_nonce.NonceManager da wallet: uma transação que expirou
+   ainda pendente não tem o nonce reaproveitado pelo próximo envio
+
+Com um anna_receipts.ReceiptWatcher, os recibos de todas as versões vêm da
+leitura de blocos compartilhada em vez de um eth_getTransactionReceipt por
+versão a cada poll_interval.
+"""
+
+import time
+import logging
+from concurrent.futures import FIRST_COMPLETED, wait
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+
+from metrics import observe_stage
+
+logger = logging.getLogger(__name__)
+
+# Nós geth/bor só aceitam substituição com pelo menos +10% nas duas taxas
+MIN_BUMP_PERCENT = 10
+
+# Mensagens de erro do nó que indicam que alguma versão do nonce já foi aceita
+NONCE_CONSUMED_ERRORS = ("nonce too low", "already known", "known transaction")
+UNDERPRICED_ERRORS = ("replacement transaction underpriced", "underpriced")
+
+
+@dataclass
+class FeeBumpPolicy:
+    """Política de bump de taxas para transações presas"""
+    schedule: List[int] = field(default_factory=lambda: [30, 60, 90])  # segundos após o 1º envio
+    bump_percent: int = 25
+    base_fee_multiplier: int = 2
+    priority_fee_gwei: Optional[float] = None  # None = eth_maxPriorityFeePerGas do nó (ou do oráculo de taxas)
+    urgency: str = "medium"  # percentil de gorjeta no oráculo de taxas (low | medium | high)
+    max_fee_per_gas_gwei: float = 500.0
+    max_priority_fee_gwei: Optional[float] = None  # teto de maxPriorityFeePerGas (sempre <= maxFeePerGas)
+    max_tx_cost_wei: Optional[int] = None  # teto de gas * maxFeePerGas por transação
+    max_total_spend_wei: Optional[int] = None  # orçamento total do processo
+    timeout: int = 180
+    poll_interval: float = 2.0
+
+    def __post_init__(self):
+        if self.bump_percent < MIN_BUMP_PERCENT:
+            raise ValueError(f"bump_percent deve ser >= {MIN_BUMP_PERCENT} (regra de substituição do nó)")
+        self.schedule = sorted(self.schedule)
+
+    @property
+    def max_fee_per_gas_wei(self) -> int:
+        return int(self.max_fee_per_gas_gwei * 10**9)
+
+    @property
+    def max_priority_fee_wei(self) -> Optional[int]:
+        return int(self.max_priority_fee_gwei * 10**9) if self.max_priority_fee_gwei is not None else None
+
+
+@dataclass
+class TxAttempt:
+    """Uma versão (broadcast) de uma transação"""
+    tx_hash: str
+    max_fee_per_gas: int
+    max_priority_fee_per_gas: int
+    sent_at: float
+
+
+@dataclass
+class TxRecord:
+    """Histórico completo de uma transação e suas substituições"""
+    nonce: int
+    gas: int
+    first_sent_at: float
+    attempts: List[TxAttempt] = field(default_factory=list)
+    status: str = "pending"  # pending | success | failed | timeout
+    tx_hash: Optional[str] = None  # versão que foi minerada
+    block_number: Optional[int] = None
+    included_at: Optional[float] = None
+    fee_paid_wei: int = 0
+    reserved_wei: int = 0  # pior caso (gas * maxFeePerGas da versão mais cara) contado em spent_wei
+
+    @property
+    def replacements(self) -> int:
+        return max(len(self.attempts) - 1, 0)
+
+    @property
+    def time_to_inclusion(self) -> Optional[float]:
+        if self.included_at is None:
+            return None
+        return self.included_at - self.first_sent_at
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["replacements"] = self.replacements
+        data["time_to_inclusion"] = self.time_to_inclusion
+        return data
+
+
+class SpendCapExceeded(Exception):
+    """Orçamento total de gas do processo esgotado"""
+    pass
+
+
+class TxReplacementEngine:
+    """Envia transações e substitui as que ficarem presas no mempool"""
+
+    def __init__(
+        self,
+        w3,
+        account,
+        policy: Optional[FeeBumpPolicy] = None,
+        history_size: int = 1000,
+        fee_oracle=None,
+        gas_estimator=None,
+        receipt_watcher=None,
+        nonces=None
+    ):
+        """
+        Args:
+            w3: Instância Web3 conectada
+            account: Conta (eth_account) que assina as transações
+            policy: Política de bump (padrão: FeeBumpPolicy())
+            history_size: Quantos TxRecord manter em memória para estatísticas
+            fee_oracle: anna_fees.FeeOracle compartilhado (se None, consulta o nó a cada envio)
+            gas_estimator: anna_gas.GasEstimator para transações enviadas sem 'gas'
+            receipt_watcher: anna_receipts.ReceiptWatcher compartilhado (se None, consulta o recibo de cada versão)
+            nonces: anna_nonce.NonceManager da wallet (se None, o compartilhado por chain
+                e wallet): tenants da mesma chave na mesma rede nunca repetem nonce, mesmo
+                com URLs de RPC diferentes
+        """
+        self.w3 = w3
+        self.account = account
+        self.policy = policy or FeeBumpPolicy()
+        self.fee_oracle = fee_oracle
+        self.gas_estimator = gas_estimator
+        self.receipt_watcher = receipt_watcher
+        self._nonces = nonces
+        # spent_wei: orçamento comprometido (custo real das incluídas + pior caso das
+        # demais); paid_wei: só o que foi efetivamente pago em transações mineradas
+        self.spent_wei = 0
+        self.paid_wei = 0
+        self.history = deque(maxlen=history_size)
+        self._chain_id = None
+
+    @property
+    def chain_id(self) -> int:
+        if self._chain_id is None:
+            self._chain_id = self.w3.eth.chain_id
+        return self._chain_id
+
+    @property
+    def nonces(self):
+        if self._nonces is None:
+            from anna_nonce import NonceManager
+            self._nonces = NonceManager.shared(self.w3, self.account.address, chain_id=self.chain_id)
+        return self._nonces
+
+    def network_fees(self) -> Tuple[int, int]:
+        """Retorna (maxFeePerGas, maxPriorityFeePerGas) sugeridos pela rede"""
+        if self.fee_oracle is not None:
+            # Da memória: o oráculo atualiza uma vez por bloco em background
+            max_fee, priority_fee = self.fee_oracle.fees(self.policy.urgency, self.policy.base_fee_multiplier)
+            if self.policy.priority_fee_gwei is not None:
+                fixed = int(self.policy.priority_fee_gwei * 10**9)
+                max_fee, priority_fee = max_fee - priority_fee + fixed, fixed
+            return max_fee, priority_fee
+        if self.policy.priority_fee_gwei is not None:
+            priority_fee = int(self.policy.priority_fee_gwei * 10**9)
+        else:
+            priority_fee = self.w3.eth.max_priority_fee
+        base_fee = self.w3.eth.get_block('latest').get('baseFeePerGas', 0)
+        max_fee = base_fee * self.policy.base_fee_multiplier + priority_fee
+        return max_fee, priority_fee
+
+    def _clamp_priority(self, priority_fee: int, max_fee: int) -> int:
+        """Gorjeta limitada ao maxFeePerGas da versão e ao teto configurado"""
+        priority_fee = min(priority_fee, max_fee, self.policy.max_fee_per_gas_wei)
+        if self.policy.max_priority_fee_wei is not None:
+            priority_fee = min(priority_fee, self.policy.max_priority_fee_wei)
+        return priority_fee
+
+    def _bumped_fees(self, last: TxAttempt) -> Tuple[int, int]:
+        """Taxas da próxima substituição: +bump_percent ou o preço atual da rede, o que for maior"""
+        factor = 100 + self.policy.bump_percent
+        max_fee = last.max_fee_per_gas * factor // 100 + 1
+        priority_fee = last.max_priority_fee_per_gas * factor // 100 + 1
+
+        network_max_fee, network_priority_fee = self.network_fees()
+        max_fee = max(max_fee, network_max_fee)
+        return max_fee, self._clamp_priority(max(priority_fee, network_priority_fee), max_fee)
+
+    @staticmethod
+    def _replaces(last: TxAttempt, max_fee: int, priority_fee: int) -> bool:
+        """Se o nó aceitaria a versão como substituição (+MIN_BUMP_PERCENT nas duas taxas)"""
+        factor = 100 + MIN_BUMP_PERCENT
+        return (max_fee * 100 >= last.max_fee_per_gas * factor
+                and priority_fee * 100 >= last.max_priority_fee_per_gas * factor)
+
+    def _within_caps(self, gas: int, max_fee: int, reserved: int = 0) -> bool:
+        """
+        Se uma versão com este maxFeePerGas respeita os tetos; o de gasto total
+        conta o pior caso dela (gas * maxFeePerGas) no lugar do que já estava
+        reservado para o mesmo nonce (reserved)
+        """
+        if max_fee > self.policy.max_fee_per_gas_wei:
+            return False
+        if self.policy.max_tx_cost_wei is not None and gas * max_fee > self.policy.max_tx_cost_wei:
+            return False
+        total = self.policy.max_total_spend_wei
+        if total is not None and self.spent_wei - reserved + gas * max_fee > total:
+            return False
+        return True
+
+    def _reserve(self, record: TxRecord, attempt: TxAttempt):
+        """
+        Conta em spent_wei o pior caso da versão enviada (só uma versão do nonce
+        é minerada: vale a mais cara). Transações que expiram continuam contadas
+        - podem ser mineradas depois
+        """
+        cost = record.gas * attempt.max_fee_per_gas
+        if cost > record.reserved_wei:
+            self.spent_wei += cost - record.reserved_wei
+            record.reserved_wei = cost
+
+    def _broadcast(self, tx: Dict, record: TxRecord, max_fee: int, priority_fee: int) -> Optional[TxAttempt]:
+        tx = dict(tx, maxFeePerGas=max_fee, maxPriorityFeePerGas=priority_fee)
+        started = time.perf_counter()
+        signed_tx = self.account.sign_transaction(tx)
+        observe_stage("sign", time.perf_counter() - started)
+        attempt = TxAttempt(
+            tx_hash="0x" + signed_tx.hash.hex().removeprefix("0x"),
+            max_fee_per_gas=max_fee,
+            max_priority_fee_per_gas=priority_fee,
+            sent_at=time.time()
+        )
+        started = time.perf_counter()
+        try:
+            self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            observe_stage("send", time.perf_counter() - started)
+        except Exception as e:
+            message = str(e).lower()
+            if any(err in message for err in NONCE_CONSUMED_ERRORS):
+                # Alguma versão já está no mempool ou minerada - segue aguardando
+                logger.debug(f"Broadcast ignorado pelo nó ({e}); aguardando recibo")
+                return None
+            if any(err in message for err in UNDERPRICED_ERRORS):
+                logger.warning(f"Substituição recusada por preço baixo (nonce {record.nonce})")
+                return None
+            raise
+        record.attempts.append(attempt)
+        return attempt
+
+    def _find_receipt(self, record: TxRecord, watched: Dict):
+        from web3.exceptions import TransactionNotFound
+
+        # A versão mais recente é a mais provável de ter sido minerada
+        for attempt in reversed(record.attempts):
+            future = watched.get(attempt.tx_hash)
+            if future is not None:
+                if not future.done():
+                    continue
+                if not future.cancelled() and future.exception() is None:
+                    return attempt, future.result()
+                # O watch terminou sem recibo (expirou ou foi cancelado): a versão
+                # ainda pode ser minerada, então passa a ser consultada direto no nó
+                logger.debug(f"Watch de {attempt.tx_hash} encerrado sem recibo; consultando o nó")
+                watched[attempt.tx_hash] = None
+            try:
+                return attempt, self.w3.eth.get_transaction_receipt(attempt.tx_hash)
+            except TransactionNotFound:
+                continue
+        return None, None
+
+    def send(self, tx: Dict) -> TxRecord:
+        """
+        Envia a transação e a substitui conforme o cronograma até ser minerada
+
+        Args:
+            tx: Dict com 'to' e 'data' (nonce, chainId e taxas são preenchidos aqui; sem
+                'gas', o limite vem do gas_estimator)
+
+        Returns:
+            TxRecord com o resultado e o tempo até inclusão
+
+        Raises:
+            SpendCapExceeded: Se o orçamento total de gas restante não cobre o pior
+                caso da transação (gas * maxFeePerGas)
+            ContractLogicError: Se a estimativa de gas mostra que a chamada reverteria
+        """
+        policy = self.policy
+
+        if policy.max_total_spend_wei is not None and self.spent_wei >= policy.max_total_spend_wei:
+            raise SpendCapExceeded(f"Orçamento de gas esgotado ({self.spent_wei} wei gastos)")
+
+        tx = dict(tx, type=2, chainId=self.chain_id)
+        tx.setdefault('from', self.account.address)
+        tx.setdefault('value', 0)
+        if 'gas' not in tx:
+            tx['gas'] = self.gas_estimator.estimate(tx)
+        gas = tx['gas']
+
+        max_fee, priority_fee = self.network_fees()
+        max_fee = min(max_fee, policy.max_fee_per_gas_wei)
+        if policy.max_tx_cost_wei is not None:
+            max_fee = min(max_fee, policy.max_tx_cost_wei // gas)
+        priority_fee = self._clamp_priority(priority_fee, max_fee)
+        if not self._within_caps(gas, max_fee):
+            raise SpendCapExceeded(
+                f"Orçamento de gas restante ({policy.max_total_spend_wei - self.spent_wei} wei) "
+                f"não cobre {gas} gas a {max_fee} wei"
+            )
+
+        # Nonce do contador local da wallet, não o "latest" do nó: uma transação
+        # anterior que expirou ainda pendente no mempool mantém o nonce dela
+        tx['nonce'] = self.nonces.next()
+        record = TxRecord(nonce=tx['nonce'], gas=gas, first_sent_at=time.time())
+        try:
+            attempt = self._broadcast(tx, record, max_fee, priority_fee)
+        except Exception:
+            self.nonces.release(tx['nonce'])
+            raise
+        if attempt is None:
+            # Nonce já usado fora deste contador (outra ferramenta na mesma wallet)
+            self.nonces.resync()
+            record.status = "failed"
+            self.history.append(record)
+            return record
+        self._reserve(record, attempt)
+
+        watched = {}  # tx_hash da versão -> future do receipt_watcher
+        try:
+            self._await_inclusion(tx, record, attempt, watched)
+        finally:
+            for tx_hash in watched:
+                self.receipt_watcher.forget(tx_hash)
+
+        self.history.append(record)
+        return record
+
+    def _await_inclusion(self, tx: Dict, record: TxRecord, attempt: TxAttempt, watched: Dict):
+        policy = self.policy
+        gas = tx['gas']
+        if self.receipt_watcher is not None:
+            watched[attempt.tx_hash] = self.receipt_watcher.watch(attempt.tx_hash)
+
+        bump_index = 0
+        while time.time() - record.first_sent_at < policy.timeout:
+            attempt, receipt = self._find_receipt(record, watched)
+            if receipt is not None:
+                record.included_at = time.time()
+                record.tx_hash = attempt.tx_hash
+                record.block_number = receipt['blockNumber']
+                record.status = "success" if receipt['status'] == 1 else "failed"
+                if record.status == "failed" and self.gas_estimator is not None:
+                    self.gas_estimator.observe(tx, receipt)
+                record.fee_paid_wei = receipt['gasUsed'] * receipt.get('effectiveGasPrice', attempt.max_fee_per_gas)
+                # Troca o pior caso reservado pelo custo real
+                self.spent_wei += record.fee_paid_wei - record.reserved_wei
+                record.reserved_wei = record.fee_paid_wei
+                self.paid_wei += record.fee_paid_wei
+                observe_stage("mine", record.included_at - record.first_sent_at)
+                break
+
+            elapsed = time.time() - record.first_sent_at
+            if bump_index < len(policy.schedule) and elapsed >= policy.schedule[bump_index]:
+                bump_index += 1
+                last = record.attempts[-1]
+                next_max_fee, next_priority_fee = self._bumped_fees(last)
+                # Gorjeta presa no teto: o nó recusaria a substituição, então não há o que enviar
+                if self._within_caps(gas, next_max_fee, record.reserved_wei) and self._replaces(
+                    last, next_max_fee, next_priority_fee
+                ):
+                    logger.info(
+                        f"Tx presa há {elapsed:.0f}s (nonce {record.nonce}) - substituindo com "
+                        f"maxFee {next_max_fee / 10**9:.2f} gwei, tip {next_priority_fee / 10**9:.2f} gwei"
+                    )
+                    attempt = self._broadcast(tx, record, next_max_fee, next_priority_fee)
+                    if attempt is not None:
+                        self._reserve(record, attempt)
+                        if self.receipt_watcher is not None:
+                            watched[attempt.tx_hash] = self.receipt_watcher.watch(attempt.tx_hash)
+                else:
+                    logger.warning(f"Teto de taxa ou de gasto atingido para nonce {record.nonce}; sem novas substituições")
+                    bump_index = len(policy.schedule)
+
+            if self.receipt_watcher is None:
+                time.sleep(policy.poll_interval)
+                continue
+            # Acorda quando alguma versão for minerada, no próximo bump ou no timeout.
+            # Só futures ainda em aberto entram no wait: um já encerrado o faria
+            # voltar na hora, girando o loop até o prazo
+            elapsed = time.time() - record.first_sent_at
+            deadline = policy.schedule[bump_index] if bump_index < len(policy.schedule) else policy.timeout
+            timeout = max(min(deadline, policy.timeout) - elapsed, 0)
+            live = [future for future in watched.values() if future is not None and not future.done()]
+            if len(live) < len(watched):
+                # Versões sem watch ativo são consultadas no nó a cada poll_interval
+                timeout = min(timeout, policy.poll_interval)
+            if live:
+                wait(live, timeout=timeout, return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(timeout)
+        else:
+            record.status = "timeout"
+
+    def stats(self) -> Dict:
+        """Resumo de inclusão das transações recentes"""
+        included = [r.time_to_inclusion for r in self.history if r.time_to_inclusion is not None]
+        return {
+            "sent": len(self.history),
+            "included": len(included),
+            "timeouts": sum(1 for r in self.history if r.status == "timeout"),
+            "replacements": sum(r.replacements for r in self.history),
+            "avg_time_to_inclusion": sum(included) / len(included) if included else None,
+            "max_time_to_inclusion": max(included) if included else None,
+            "spent_wei": self.spent_wei,
+            "paid_wei": self.paid_wei
+        }
@@ -13,75 +13,43 @@ Este verificador:
 import json
 import time
 import logging
-import hashlib
 import argparse
-from typing import Dict, Tuple, Optional
-from web3 import Web3
-from eth_account import Account
-from dotenv import load_dotenv
+import threading
+from collections import Counter, OrderedDict
+from decimal import Decimal
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
 import os
-import jsonschema
+import sys
 from datetime import datetime
 
-# Configurar logging com UTF-8
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
+# MÃ³dulos compartilhados com o SDK (tracing)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sdk'))
+
+from admission import AdmissionController
+from anna_tracing import JsonlExporter, Tracer
+from check_profile import CheckProfile, CheckTimer
+from log_setup import HOT, configure_logging, enable_json_log, parse_sampling, sampling_filter
+from metrics import (
+    CACHE_HIT_RATIO, CHAIN_LAG, GAS_SPENT, QUEUE_DEPTH, REGISTRY, RPC_ENDPOINT_ERRORS, RPC_ENDPOINT_LATENCY,
+    RPC_ENDPOINT_UP, SLA_SECONDS, VERIFICATIONS, instrument_web3, observe_stage, start_metrics_server
 )
-# Force UTF-8 encoding para o handler
-for handler in logging.root.handlers:
-    if hasattr(handler, 'stream') and hasattr(handler.stream, 'reconfigure'):
-        try:
-            handler.stream.reconfigure(encoding='utf-8')
-        except:
-            pass
+from preflight import PreflightChecker
+from profiling import MODES as PROFILE_MODES, Profiler
+from result_log import ResultLog
+from rules import RulesProvider, VerificationCache, calculate_reasoning_hash
+from tx_replacement import FeeBumpPolicy
 
-logger = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    from web3 import Web3
 
-# Carregar variÃ¡veis de ambiente
-load_dotenv()
+# Configurar logging (assÃ­ncrono, console com UTF-8)
+configure_logging()
 
-# Schema para validaÃ§Ã£o de raciocÃ­nios
-REASONING_SCHEMA = {
-    "type": "object",
-    "required": ["input", "reasoning_steps", "conclusion", "confidence"],
-    "properties": {
-        "input": {"type": "string"},
-        "reasoning_steps": {
-            "type": "array",
-            "minItems": 1,
-            "items": {
-                "type": "object",
-                "required": ["step_number", "description", "rationale"],
-                "properties": {
-                    "step_number": {"type": "integer"},
-                    "description": {"type": "string", "minLength": 1},
-                    "rationale": {"type": "string", "minLength": 1}
-                }
-            }
-        },
-        "conclusion": {"type": "string", "minLength": 1},
-        "confidence": {"type": "number", "minimum": 0, "maximum": 1}
-    }
-}
+logger = logging.getLogger(__name__)
 
-# PadrÃµes proibidos (jailbreaks, ataques)
-FORBIDDEN_PATTERNS = [
-    "ignore previous instructions",
-    "ignore all instructions",
-    "jailbreak",
-    "bypass",
-    "hack",
-    "disable safety",
-    "ignore guidelines",
-    "forget everything",
-    "new instructions",
-    "system prompt",
-    "override"
-]
+# Banners do console, montados uma vez (nÃ£o a cada attestation)
+BELLS = 'ðŸ”” ' * 20
+RULE = '=' * 60
 
 
 class ANNAVerifier:
@@ -93,46 +61,146 @@ class ANNAVerifier:
         private_key: str,
         attestation_contract_address: str,
         attestation_abi: list,
-        dry_run: bool = False
+        dry_run: bool = False,
+        fee_policy: Optional[FeeBumpPolicy] = None,
+        name: str = "default",
+        w3: Optional["Web3"] = None,
+        rules: Optional[RulesProvider] = None,
+        result_cache: Optional[VerificationCache] = None,
+        explorer_url: str = "https://amoy.polygonscan.com",
+        start_block: Optional[int] = None,
+        max_block_range: int = 1000,
+        admission: Optional[AdmissionController] = None,
+        fast_start: bool = False,
+        result_log: Optional[ResultLog] = None,
+        check_profile: Optional[CheckProfile] = None,
+        tracer: Optional[Tracer] = None,
+        max_tracked_events: int = 100000,
+        rpc_options: Optional[Dict] = None,
+        rpc_cache: bool = True
     ):
         """
         Inicializa o verificador
         
         Args:
-            rpc_url: URL do RPC (Polygon Amoy)
+            rpc_url: URL do RPC (Polygon Amoy); vÃ¡rias separadas por vÃ­rgula usam o provider multi-RPC
             private_key: Chave privada do verificador
             attestation_contract_address: EndereÃ§o do contrato AnnaAttestation
             attestation_abi: ABI do contrato
             dry_run: Se True, nÃ£o envia transaÃ§Ãµes (apenas simula)
+            fee_policy: PolÃ­tica de bump de taxas para transaÃ§Ãµes presas
+            name: Nome do tenant (rede + contrato) atendido por este verificador
+            w3: ConexÃ£o Web3 compartilhada (se None, cria uma para rpc_url)
+            rules: Provedor das regras compiladas, compartilhado e recarregÃ¡vel (se None, usa as regras padrÃ£o)
+            result_cache: Cache de resultados compartilhado entre tenants
+            explorer_url: URL base do block explorer da rede
+            start_block: Bloco inicial do cursor (se None, comeÃ§a no bloco atual)
+            max_block_range: MÃ¡ximo de blocos lidos por chamada eth_getLogs
+            admission: Controle de admissÃ£o por agente (se None, usa os limites padrÃ£o)
+            fast_start: Se True, conecta e checa o RPC em background (a verificaÃ§Ã£o Tier 1
+                jÃ¡ fica disponÃ­vel; o primeiro poll aguarda apenas a conexÃ£o, nÃ£o os checks)
+            result_log: Log segmentado de resultados (se None, usa logs/verifications)
+            check_profile: Modo instrumentado: tempo e alocaÃ§Ãµes por check Tier 1 (se None, desligado)
+            tracer: Tracing por attestation (se None, usa ANNA_TRACE_FILE quando definido)
+            max_tracked_events: IDs recentes lembrados para descartar eventos duplicados
+            rpc_options: OpÃ§Ãµes do MultiRPCProvider (hedge, broadcast, ...) quando rpc_url tem vÃ¡rios endpoints
+            rpc_cache: Se True, instala o cache de respostas JSON-RPC (anna_cache) na conexÃ£o
         """
         self.dry_run = dry_run
-        self.w3 = Web3(Web3.HTTPProvider(rpc_url))
+        self.name = name
+        self.fast_start = fast_start
+        self.rules = rules or RulesProvider()
+        self.result_cache = result_cache or VerificationCache()
+        self.explorer_url = explorer_url
+        self.max_block_range = max_block_range
+        self.admission = admission or AdmissionController()
+        self.result_log = result_log or ResultLog('logs/verifications')
+        self.check_profile = check_profile
+        self.tracer = tracer or Tracer.from_env("verifier")
+        self.rpc_options = rpc_options or {}
+        self.use_rpc_cache = rpc_cache
+        self.rpc_cache = None
         
-        if not self.w3.is_connected():
-            raise ConnectionError("NÃ£o foi possÃ­vel conectar ao RPC")
+        # Cursor e mÃ©tricas prÃ³prios deste tenant
+        self.cursor = start_block - 1 if start_block is not None else None
+        # SÃ³ os IDs mais recentes: o cursor jÃ¡ impede reler blocos antigos, e um set
+        # sem limite crescia para sempre em um verificador rodando por meses
+        self.processed_events: "OrderedDict[str, None]" = OrderedDict()
+        self.max_tracked_events = max_tracked_events
+        self.stats = Counter()
+        # attestation_id -> (timestamp do bloco do AttestationSubmitted, momento da detecÃ§Ã£o)
+        self._event_times: Dict[str, Tuple[int, float]] = {}
+        # Um coletor por tenant (recriar o tenant substitui o anterior); close() remove
+        self._metrics_key = REGISTRY.add_collector(self._collect_metrics, key=("tenant", self.name))
         
+        # Setup structured logging
+        self.setup_structured_logging()
+        
+        # ConexÃ£o (web3 Ã© importado sÃ³ aqui) e checks de inicializaÃ§Ã£o
+        self.ready = threading.Event()
+        self.checks_done = threading.Event()
+        self.startup_error: Optional[Exception] = None
+        connect_args = (rpc_url, w3, private_key, attestation_contract_address, attestation_abi, fee_policy)
+        
+        if fast_start:
+            threading.Thread(
+                target=self._start_in_background, args=connect_args, name=f"startup-{name}", daemon=True
+            ).start()
+            logger.info(f"âš¡ Fast start [{self.name}]: regras {self.rules.version} prontas, conectando em background")
+        else:
+            self._connect(*connect_args)
+            self._startup_checks()
+    
+    def _connect(self, rpc_url, w3, private_key, attestation_contract_address, attestation_abi, fee_policy):
+        """Cria conexÃ£o, conta e contrato (sem chamadas RPC)"""
+        from web3 import Web3
+        from eth_account import Account
+        from anna_cache import install_cache
+        from anna_fees import FeeOracle
+        from anna_gas import GasEstimator
+        from anna_receipts import ReceiptWatcher
+        from anna_rpc import make_web3
+        from tx_replacement import TxReplacementEngine
+        
+        self.w3 = instrument_web3(w3 or make_web3(rpc_url, **self.rpc_options))
+        if self.use_rpc_cache:
+            # Por fora das mÃ©tricas: acertos do cache nÃ£o contam como chamadas ao nÃ³
+            self.rpc_cache = install_cache(self.w3)
         self.account = Account.from_key(private_key)
         self.contract = self.w3.eth.contract(
             address=Web3.to_checksum_address(attestation_contract_address),
             abi=attestation_abi
         )
-        
-        # Setup structured logging
-        self.setup_structured_logging()
+        # OrÃ¡culo de taxas, estimativas de gas e leitura de recibos Ãºnicos por RPC:
+        # tenants da mesma rede dividem os mesmos
+        self.tx_engine = TxReplacementEngine(
+            self.w3, self.account, fee_policy,
+            fee_oracle=FeeOracle.shared(self.w3), gas_estimator=GasEstimator.shared(self.w3),
+            receipt_watcher=ReceiptWatcher.shared(self.w3)
+        )
+        self.preflight = PreflightChecker(self.w3, self.contract, self.account.address)
+        self.ready.set()
+    
+    def _startup_checks(self):
+        """Checks bloqueantes de inicializaÃ§Ã£o (conexÃ£o, rede, saldo, autorizaÃ§Ã£o)"""
+        if not self.w3.is_connected():
+            raise ConnectionError("NÃ£o foi possÃ­vel conectar ao RPC")
         
         logger.info("=" * 60)
-        logger.info(f"ðŸ¤– ANNA Verifier Tier 1 Iniciado {'(DRY RUN MODE)' if dry_run else ''}")
+        logger.info(f"ðŸ¤– ANNA Verifier Tier 1 Iniciado {'(DRY RUN MODE)' if self.dry_run else ''}")
         logger.info("=" * 60)
+        logger.info(f"Tenant: {self.name}")
         logger.info(f"Verificador: {self.account.address}")
         logger.info(f"Network: {self.w3.eth.chain_id}")
-        logger.info(f"Contrato: {attestation_contract_address}")
+        logger.info(f"Contrato: {self.contract.address}")
+        logger.info(f"Regras: versÃ£o {self.rules.version}")
         
         balance = self.w3.eth.get_balance(self.account.address)
         balance_matic = self.w3.from_wei(balance, 'ether')
         logger.info(f"Saldo: {balance_matic:.4f} MATIC")
         
         # Verificar se estÃ¡ autorizado
-        if not dry_run:
+        if not self.dry_run:
             is_authorized = self.contract.functions.authorizedVerifiers(self.account.address).call()
             if is_authorized:
                 logger.info("âœ… Verificador AUTORIZADO")
@@ -140,20 +208,62 @@ class ANNAVerifier:
                 logger.warning("âš ï¸  Verificador NÃƒO autorizado - precisa ser adicionado pelo owner")
         
         logger.info("=" * 60)
+        self.checks_done.set()
+    
+    def _start_in_background(self, *connect_args):
+        """Fast start: conecta e roda os checks fora do caminho crÃ­tico"""
+        try:
+            self._connect(*connect_args)
+            self._startup_checks()
+        except Exception as e:
+            self.startup_error = e
+            logger.error(f"âŒ Falha na inicializaÃ§Ã£o em background [{self.name}]: {e}")
+        finally:
+            self.ready.set()
+            self.checks_done.set()
+    
+    def wait_ready(self, timeout: Optional[float] = None):
+        """Aguarda a conexÃ£o criada em background (fast start)"""
+        if not self.ready.wait(timeout):
+            raise TimeoutError(f"Verificador {self.name} ainda conectando ao RPC")
+        if self.startup_error is not None and not hasattr(self, 'contract'):
+            raise self.startup_error
+    
+    def _collect_metrics(self):
+        """Atualiza as mÃ©tricas deste tenant antes de cada scrape de /metrics"""
+        CACHE_HIT_RATIO.set(self.result_cache.hit_rate, tenant=self.name, cache="verification")
+        if self.rpc_cache is not None:
+            CACHE_HIT_RATIO.set(self.rpc_cache.hit_rate, tenant=self.name, cache="rpc")
+        QUEUE_DEPTH.set(len(self.admission.deferred), tenant=self.name, queue="deferred")
+        QUEUE_DEPTH.set(self.result_log.pending(), tenant=self.name, queue="result_log")
+        for kind, value in list(self.stats.items()):
+            # "deferred" Ã© o tamanho atual do backlog, nÃ£o um total: jÃ¡ sai em anna_queue_depth
+            if kind != "deferred":
+                VERIFICATIONS.set_total(value, tenant=self.name, kind=kind)
+        if hasattr(self, 'tx_engine'):
+            GAS_SPENT.set_total(self.tx_engine.paid_wei, tenant=self.name)
+        provider = getattr(getattr(self, 'w3', None), 'provider', None)
+        if hasattr(provider, 'snapshot'):
+            for endpoint in provider.snapshot():
+                if endpoint["latency_ms"] is not None:
+                    RPC_ENDPOINT_LATENCY.set(endpoint["latency_ms"] / 1000, endpoint=endpoint["host"])
+                RPC_ENDPOINT_ERRORS.set(endpoint["error_rate"], endpoint=endpoint["host"])
+                RPC_ENDPOINT_UP.set(1 if endpoint["healthy"] else 0, endpoint=endpoint["host"])
+    
+    def close(self):
+        """Encerra o tenant: tira o coletor do /metrics e grava o que ainda estÃ¡ em buffer"""
+        REGISTRY.remove_collector(self._metrics_key, self._collect_metrics)
+        self.result_log.flush()
+        if self.check_profile is not None:
+            self.check_profile.flush()
     
     def setup_structured_logging(self):
         """Configura logging estruturado em JSON"""
         os.makedirs('logs', exist_ok=True)
         
-        json_handler = logging.FileHandler('logs/verifier.json.log')
-        json_formatter = logging.Formatter('{"timestamp":"%(asctime)s","level":"%(levelname)s","message":"%(message)s"}')
-        json_handler.setFormatter(json_formatter)
-        
-        json_logger = logging.getLogger('structured')
-        json_logger.addHandler(json_handler)
-        json_logger.setLevel(logging.INFO)
-        
-        self.json_logger = json_logger
+        # VÃ¡rios tenants no mesmo processo compartilham o mesmo arquivo (JSON por linha)
+        enable_json_log('logs/verifier.json.log')
+        self.json_logger = logging.getLogger('structured')
     
     def log_verification(self, attestation_id: str, result: dict):
         """Salva verificaÃ§Ã£o em log estruturado"""
@@ -161,22 +271,19 @@ class ANNAVerifier:
             "timestamp": datetime.now().isoformat(),
             "attestation_id": attestation_id,
             "result": result,
-            "verifier": self.account.address
+            "verifier": self.account.address,
+            "tenant": self.name
         }
         
-        # Salvar em arquivo JSON individual
-        os.makedirs('logs/verifications', exist_ok=True)
-        filename = f"logs/verifications/{attestation_id[:16]}.json"
-        with open(filename, 'w') as f:
-            json.dump(log_entry, f, indent=2)
+        # Log segmentado append-only (consultÃ¡vel por ID com result_log.py get)
+        self.result_log.append(log_entry)
         
-        # Log estruturado
-        self.json_logger.info(json.dumps(log_entry))
+        # Log estruturado (campos viram chaves do JSON)
+        self.json_logger.info("verification", extra=log_entry)
     
     def calculate_reasoning_hash(self, reasoning_json: dict) -> str:
         """Calcula SHA256 hash do reasoning para integridade off-chain"""
-        reasoning_str = json.dumps(reasoning_json, sort_keys=True)
-        return hashlib.sha256(reasoning_str.encode()).hexdigest()
+        return calculate_reasoning_hash(reasoning_json)
     
     def verify_reasoning(self, reasoning_json: Dict) -> Tuple[bool, int, str]:
         """
@@ -188,94 +295,73 @@ class ANNAVerifier:
         Returns:
             Tuple (passou: bool, score: int, razÃ£o: str)
         """
-        checks_passed = 0
-        total_checks = 7  # Aumentado para incluir hash check
-        failure_reason = ""
+        passed, score, reason, _ = self.verify_reasoning_versioned(reasoning_json)
+        return (passed, score, reason)
+    
+    def verify_reasoning_breakdown(self, reasoning_json: Dict) -> Tuple[bool, int, str, Dict]:
+        """
+        Igual a verify_reasoning, mas sem cache e com o tempo/alocaÃ§Ãµes de cada check
         
+        Returns:
+            Tuple (passou: bool, score: int, razÃ£o: str, breakdown: dict) - breakdown no
+            formato de CheckTimer.breakdown() (ns, blocos e pico de bytes por check)
+        """
+        rules = self.rules.current
+        timer = CheckTimer()
+        passed, score, reason = rules.evaluate(reasoning_json, timer=timer)
+        if self.check_profile is not None:
+            self.check_profile.record(timer, rules_version=rules.version)
+        return (passed, score, reason, dict(timer.breakdown(), rules_version=rules.version))
+    
+    def verify_reasoning_versioned(self, reasoning_json: Dict, attestation_id: Optional[str] = None) -> Tuple[bool, int, str, str]:
+        """
+        Igual a verify_reasoning, mas tambÃ©m retorna a versÃ£o das regras usada
+        
+        Args:
+            reasoning_json: JSON do raciocÃ­nio do agente
+            attestation_id: ID da attestation (sÃ³ identifica a linha do modo instrumentado)
+        
+        Returns:
+            Tuple (passou: bool, score: int, razÃ£o: str, versÃ£o_das_regras: str)
+        """
+        # Uma Ãºnica referÃªncia por verificaÃ§Ã£o: uma recarga no meio nÃ£o afeta este resultado
+        rules = self.rules.current
         try:
-            # Check 0: Calcular hash de integridade
-            reasoning_hash = self.calculate_reasoning_hash(reasoning_json)
-            logger.debug(f"âœ“ Check 0: Hash SHA256 calculado: {reasoning_hash[:16]}...")
-            checks_passed += 1
-            
-            # Check 1: Valida estrutura JSON
-            try:
-                jsonschema.validate(instance=reasoning_json, schema=REASONING_SCHEMA)
-                checks_passed += 1
-                logger.debug("âœ“ Check 1: Estrutura JSON vÃ¡lida")
-            except jsonschema.ValidationError as e:
-                failure_reason = f"Invalid JSON structure: {e.message[:100]}"
-                logger.warning(f"âœ— Check 1: {failure_reason}")
-                return (False, 0, failure_reason)
-            
-            # Check 2: Verifica campos obrigatÃ³rios
-            required_fields = ["input", "reasoning_steps", "conclusion", "confidence"]
-            if all(field in reasoning_json for field in required_fields):
-                checks_passed += 1
-                logger.debug("âœ“ Check 2: Todos campos obrigatÃ³rios presentes")
-            else:
-                missing = [f for f in required_fields if f not in reasoning_json]
-                failure_reason = f"Missing required fields: {missing}"
-                logger.warning(f"âœ— Check 2: {failure_reason}")
-            
-            # Check 3: Detecta padrÃµes proibidos
-            reasoning_text = json.dumps(reasoning_json).lower()
-            detected_patterns = [p for p in FORBIDDEN_PATTERNS if p in reasoning_text]
-            
-            if not detected_patterns:
-                checks_passed += 1
-                logger.debug("âœ“ Check 3: Nenhum padrÃ£o proibido detectado")
-            else:
-                failure_reason = f"Forbidden patterns detected: {detected_patterns[:3]}"
-                logger.warning(f"âœ— Check 3: {failure_reason}")
+            reasoning_hash = calculate_reasoning_hash(reasoning_json)
+            cache_key = (rules.fingerprint, reasoning_hash)
             
-            # Check 4: Valida range de confianÃ§a
-            confidence = reasoning_json.get("confidence", -1)
-            if 0 <= confidence <= 1:
-                checks_passed += 1
-                logger.debug(f"âœ“ Check 4: ConfianÃ§a vÃ¡lida ({confidence})")
+            result = self.result_cache.get(cache_key)
+            if result is None:
+                timings = {}
+                timer = self.check_profile.timer() if self.check_profile is not None else None
+                result = rules.evaluate(reasoning_json, reasoning_hash, timings, timer)
+                for stage, seconds in timings.items():
+                    observe_stage(stage, seconds)
+                if timer:
+                    self.check_profile.record(timer, attestation_id, rules.version)
+                self.result_cache.put(cache_key, result)
             else:
-                failure_reason = f"Invalid confidence range: {confidence}"
-                logger.warning(f"âœ— Check 4: {failure_reason}")
-            
-            # Check 5: Checa consistÃªncia de passos
-            steps = reasoning_json.get("reasoning_steps", [])
-            if len(steps) >= 1 and all(isinstance(s, dict) for s in steps):
-                checks_passed += 1
-                logger.debug(f"âœ“ Check 5: {len(steps)} passos vÃ¡lidos")
-            else:
-                failure_reason = f"Invalid reasoning steps: {len(steps)} steps"
-                logger.warning(f"âœ— Check 5: {failure_reason}")
-            
-            # Check 6: Valida tamanho razoÃ¡vel (anti-spam)
-            reasoning_size = len(json.dumps(reasoning_json))
-            if 100 <= reasoning_size <= 50000:  # Entre 100 bytes e 50KB
-                checks_passed += 1
-                logger.debug(f"âœ“ Check 6: Tamanho razoÃ¡vel ({reasoning_size} bytes)")
-            else:
-                failure_reason = f"Invalid size: {reasoning_size} bytes"
-                logger.warning(f"âœ— Check 6: {failure_reason}")
-            
-            # Calcula score
-            score = int((checks_passed / total_checks) * 100)
-            passed = score >= 60  # Threshold mÃ­nimo: 60%
+                logger.debug("Resultado em cache para reasoning %.16s...", reasoning_hash)
             
+            passed, score, reason = result
             if passed:
-                logger.info(f"âœ… VerificaÃ§Ã£o PASSOU - Score: {score}/100 ({checks_passed}/{total_checks} checks)")
+                logger.info("âœ… VerificaÃ§Ã£o PASSOU - Score: %s/100 (regras %s)", score, rules.version, extra=HOT)
             else:
-                logger.warning(f"âŒ VerificaÃ§Ã£o FALHOU - Score: {score}/100 - {failure_reason}")
+                logger.warning("âŒ VerificaÃ§Ã£o FALHOU - Score: %s/100 - %s (regras %s)", score, reason, rules.version, extra=HOT)
             
-            return (passed, score, failure_reason if not passed else "All checks passed")
+            return (passed, score, reason, rules.version)
             
         except Exception as e:
             logger.error(f"âŒ Erro durante verificaÃ§Ã£o: {e}")
-            return (False, 0, f"Verification error: {str(e)[:100]}")
+            return (False, 0, f"Verification error: {str(e)[:100]}", rules.version)
     
     def submit_verification(
         self,
         attestation_id: str,
         passed: bool,
-        score: int
+        score: int,
+        rules_version: Optional[str] = None,
+        submitted_at: Optional[int] = None
     ) -> Optional[str]:
         """
         Submete resultado da verificaÃ§Ã£o para a blockchain
@@ -284,23 +370,25 @@ class ANNAVerifier:
             attestation_id: ID da attestation (hex string)
             passed: Se a verificaÃ§Ã£o passou
             score: Score 0-100
+            rules_version: VersÃ£o das regras que produziu o resultado
+            submitted_at: Timestamp do evento AttestationSubmitted (para o SLA atÃ© a inclusÃ£o)
             
         Returns:
             Transaction hash ou None se falhar
         """
         try:
-            logger.info(f"ðŸ“¤ Submetendo verificaÃ§Ã£o para attestation {attestation_id[:10]}...")
+            logger.info("ðŸ“¤ Submetendo verificaÃ§Ã£o para attestation %.10s...", attestation_id, extra=HOT)
             
             # Dry run mode - apenas simula
             if self.dry_run:
-                logger.info(f"   ðŸ” DRY RUN - NÃ£o enviando transaÃ§Ã£o real")
-                logger.info(f"   âœ“ Passed: {passed}")
-                logger.info(f"   âœ“ Score: {score}")
+                logger.info("   ðŸ” DRY RUN - NÃ£o enviando transaÃ§Ã£o real\n   âœ“ Passed: %s\n   âœ“ Score: %s",
+                            passed, score, extra=HOT)
                 
                 # Log estruturado
                 self.log_verification(attestation_id, {
                     "passed": passed,
                     "score": score,
+                    "rules_version": rules_version,
                     "dry_run": True
                 })
                 
@@ -312,166 +400,487 @@ class ANNAVerifier:
             else:
                 attestation_id_bytes = bytes.fromhex(attestation_id)
             
-            # Construir transaÃ§Ã£o
-            tx = self.contract.functions.verifyAttestation(
-                attestation_id_bytes,
-                passed,
-                score
-            ).build_transaction({
-                'from': self.account.address,
-                'nonce': self.w3.eth.get_transaction_count(self.account.address),
-                'gas': 200000,
-                'gasPrice': self.w3.eth.gas_price
-            })
-            
-            # Assinar e enviar
-            signed_tx = self.w3.eth.account.sign_transaction(tx, self.account.key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            
-            logger.info(f"   ðŸ“ TX Hash: {tx_hash.hex()}")
-            logger.info(f"   â³ Aguardando confirmaÃ§Ã£o...")
+            # Construir transaÃ§Ã£o (nonce, chainId, limite de gas e taxas EIP-1559 ficam com o motor de substituiÃ§Ã£o)
+            from anna_codec import encode_verify_attestation
+            tx = {
+                'to': self.contract.address,
+                'data': encode_verify_attestation(attestation_id_bytes, passed, score)
+            }
             
-            # Aguardar confirmaÃ§Ã£o
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            # Enviar, substituindo com bump de taxas enquanto estiver preso no mempool
+            logger.info("   â³ Enviando e aguardando confirmaÃ§Ã£o...", extra=HOT)
+            record = self.tx_engine.send(tx)
+            tx_hash = record.attempts[-1].tx_hash if record.attempts else None
+            if record.attempts:
+                first = record.attempts[0]
+                self.tracer.record(attestation_id, "verifier.sign", record.first_sent_at, first.sent_at, tenant=self.name)
+                self.tracer.record(
+                    attestation_id, "verifier.mine", first.sent_at, record.included_at, tenant=self.name,
+                    status=record.status, replacements=record.replacements, block_number=record.block_number
+                )
             
-            if receipt['status'] == 1:
-                logger.info(f"   âœ… VerificaÃ§Ã£o submetida com sucesso!")
-                logger.info(f"   ðŸ”— Explorer: https://amoy.polygonscan.com/tx/{tx_hash.hex()}")
-                
-                # Log estruturado
-                self.log_verification(attestation_id, {
-                    "passed": passed,
-                    "score": score,
-                    "tx_hash": tx_hash.hex(),
-                    "status": "success"
-                })
+            if record.status == "success":
+                logger.info(
+                    "   âœ… VerificaÃ§Ã£o submetida com sucesso!\n   â±ï¸  InclusÃ£o em %.1fs (%s substituiÃ§Ãµes)\n   ðŸ”— Explorer: %s/tx/%s",
+                    record.time_to_inclusion, record.replacements, self.explorer_url, record.tx_hash, extra=HOT
+                )
+                tx_hash = record.tx_hash
+                if submitted_at is not None:
+                    SLA_SECONDS.observe(record.included_at - submitted_at, tenant=self.name)
+            elif record.status == "timeout":
+                logger.error("   âŒ TransaÃ§Ã£o nÃ£o minerada em %ss!", self.tx_engine.policy.timeout)
             else:
-                logger.error(f"   âŒ TransaÃ§Ã£o falhou!")
-                
-                # Log estruturado
-                self.log_verification(attestation_id, {
-                    "passed": passed,
-                    "score": score,
-                    "status": "failed"
-                })
+                logger.error("   âŒ TransaÃ§Ã£o falhou!")
+            
+            # Log estruturado
+            self.log_verification(attestation_id, {
+                "passed": passed,
+                "score": score,
+                "rules_version": rules_version,
+                "tx_hash": tx_hash,
+                "status": record.status,
+                "nonce": record.nonce,
+                "replacements": record.replacements,
+                "time_to_inclusion": record.time_to_inclusion,
+                "fee_paid_wei": record.fee_paid_wei
+            })
             
-            return tx_hash.hex()
+            return tx_hash
             
         except Exception as e:
             logger.error(f"âŒ Erro ao submeter verificaÃ§Ã£o: {e}")
             return None
     
-    def listen_for_attestations(self, poll_interval: int = 10):
+    def fetch_reasoning(self, attestation_id: str) -> Dict:
+        """
+        Busca o reasoning de uma attestation no storage off-chain
+        
+        Args:
+            attestation_id: ID da attestation
+            
+        Returns:
+            JSON do raciocÃ­nio do agente
+        """
+        # IMPORTANTE: Aqui vocÃª buscaria o reasoning do storage off-chain
+        # Por enquanto, vamos simular um reasoning de exemplo
+        
+        # Em produÃ§Ã£o, vocÃª faria:
+        # reasoning = fetch_from_ipfs(attestation_id)
+        # ou
+        # reasoning = fetch_from_api(attestation_id)
+        
+        # Para demonstraÃ§Ã£o, vamos usar um exemplo
+        return {
+            "input": "Generate legal contract",
+            "reasoning_steps": [
+                {
+                    "step_number": 1,
+                    "description": "Identified contract type",
+                    "rationale": "User requested legal contract"
+                },
+                {
+                    "step_number": 2,
+                    "description": "Applied legal framework",
+                    "rationale": "Used Brazilian Civil Code"
+                }
+            ],
+            "conclusion": "Contract generated successfully",
+            "confidence": 0.92
+        }
+    
+    def process_attestations(self, attestation_ids: List[str]):
+        """
+        Processa uma fila de attestations: prÃ©-checagem, verificaÃ§Ã£o e submissÃ£o
+        
+        Args:
+            attestation_ids: IDs detectados neste poll (hex string)
+        """
+        self.wait_ready(timeout=60)
+        
+        # PrÃ©-checagem 1: status de toda a fila em uma requisiÃ§Ã£o em lote
+        pending, skipped = self.preflight.filter_pending(attestation_ids)
+        self.stats["skipped"] += len(skipped)
+        for attestation_id, reason in skipped.items():
+            logger.info("â­ï¸  Attestation %.10s... descartada antes do envio: %s", attestation_id, reason, extra=HOT)
+        
+        results = []
+        for attestation_id in pending:
+            _, detected_at = self._event_times.get(attestation_id, (None, None))
+            fetch_started = time.time()
+            reasoning = self.fetch_reasoning(attestation_id)
+            fetched_at = time.time()
+            observe_stage("fetch", fetched_at - fetch_started)
+            self.tracer.record(attestation_id, "verifier.queue", detected_at, fetch_started, tenant=self.name)
+            self.tracer.record(attestation_id, "verifier.fetch", fetch_started, fetched_at, tenant=self.name)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("   ðŸ“„ Reasoning obtido (%s bytes)", len(json.dumps(reasoning)))
+            
+            # Verificar
+            logger.info("ðŸ” Executando verificaÃ§Ã£o Tier 1 (%.10s...)...", attestation_id, extra=HOT)
+            passed, score, reason, rules_version = self.verify_reasoning_versioned(reasoning, attestation_id)
+            self.tracer.record(
+                attestation_id, "verifier.verify", fetched_at, time.time(), tenant=self.name,
+                passed=passed, score=score, rules_version=rules_version
+            )
+            results.append((attestation_id, passed, score, rules_version))
+            self.stats["passed" if passed else "failed"] += 1
+        
+        # PrÃ©-checagem 2: simular verifyAttestation (em dry run o verificador pode nÃ£o estar autorizado)
+        if not self.dry_run:
+            results, reverted = self.preflight.filter_simulated(results)
+            for attestation_id, reason in reverted.items():
+                logger.warning("â­ï¸  Attestation %.10s... reverteria on-chain: %s", attestation_id, reason, extra=HOT)
+            skipped.update(reverted)
+            self.stats["skipped"] += len(reverted)
+        
+        # Submeter resultado (sempre submete, mesmo se falhou)
+        for attestation_id, passed, score, rules_version in results:
+            tx_hash = self.submit_verification(
+                attestation_id, passed, score, rules_version, self._event_times.get(attestation_id, (None,))[0]
+            )
+            
+            if tx_hash:
+                self.stats["submitted"] += 1
+                logger.info(
+                    "\n%s\nâœ… VERIFICAÃ‡ÃƒO COMPLETA\n   Resultado: %s\n   Score: %s/100\n   TX: %.16s...\n%s\n",
+                    RULE, 'APROVADO' if passed else 'REJEITADO', score, tx_hash, RULE, extra=HOT
+                )
+        
+        for attestation_id in attestation_ids:
+            self._event_times.pop(attestation_id, None)
+        
+        if skipped:
+            report = self.preflight.report()
+            logger.info(
+                f"ðŸ“Š PrÃ©-checagem: {len(skipped)}/{len(attestation_ids)} descartadas neste poll "
+                f"({report['skipped']} no total: {report['by_reason']})"
+            )
+    
+    def poll_once(self) -> int:
+        """
+        LÃª os eventos AttestationSubmitted desde o cursor deste tenant e processa a fila
+        
+        Returns:
+            Quantidade de attestations novas detectadas
+        """
+        self.wait_ready(timeout=60)
+        head = self.w3.eth.block_number
+        if self.cursor is None:
+            self.cursor = head
+        
+        to_block = min(head, self.cursor + self.max_block_range)
+        # Logs decodificados pelo codec prÃ©-compilado (sem Contract.events do web3)
+        from anna_codec import ATTESTATION_SUBMITTED, AttestationSubmitted, decode_logs
+        new_events = decode_logs(self.w3.eth.get_logs({
+            'address': self.contract.address,
+            'topics': ['0x' + ATTESTATION_SUBMITTED.hex()],
+            'fromBlock': self.cursor + 1,
+            'toBlock': to_block
+        }), AttestationSubmitted) if head > self.cursor else []
+        queue = []
+        
+        for event in new_events:
+            attestation_id = event.attestation_id.hex()
+            
+            # Evitar processar duplicados
+            if attestation_id in self.processed_events:
+                continue
+            
+            self.processed_events[attestation_id] = None
+            if len(self.processed_events) > self.max_tracked_events:
+                self.processed_events.popitem(last=False)
+            
+            agent = event.agent
+            category = event.category
+            timestamp = event.timestamp
+            
+            logger.info(
+                "\n%s\nðŸ”” NOVA ATTESTATION DETECTADA! [%s]\n%s\n   ID: %s\n   Agent: %s\n   Category: %s\n   Timestamp: %s",
+                BELLS, self.name, BELLS, attestation_id, agent, category, timestamp, extra=HOT
+            )
+            
+            detected_at = time.time()
+            if self.tracer.enabled:
+                self.tracer.record(
+                    attestation_id, "verifier.detection_lag", timestamp, detected_at, tenant=self.name,
+                    submit_tx_hash=event.transaction_hash.hex(), block_number=event.block_number
+                )
+            
+            self.admission.observe(agent)
+            self._event_times[attestation_id] = (timestamp, detected_at)
+            queue.append((attestation_id, agent))
+        
+        QUEUE_DEPTH.set(len(queue), tenant=self.name, queue="poll")
+        
+        # Agentes normais primeiro; excesso dos heavy hitters fica para os prÃ³ximos polls
+        admission_state = self.admission.snapshot()
+        try:
+            ready = self.admission.schedule(queue)
+            if ready:
+                self.process_attestations(ready)
+        except Exception:
+            # O cursor nÃ£o avanÃ§a: o prÃ³ximo poll relÃª o intervalo, entÃ£o os IDs
+            # deste poll deixam de contar como vistos e a admissÃ£o (backlog e tokens) volta ao que era
+            for attestation_id, _ in queue:
+                self.processed_events.pop(attestation_id, None)
+                self._event_times.pop(attestation_id, None)
+            self.admission.restore(admission_state)
+            raise
+        self.stats["detected"] += len(queue)
+        self.stats["deferred"] = len(self.admission.deferred)
+        
+        # SÃ³ avanÃ§a o cursor depois que o intervalo foi processado
+        self.result_log.flush()
+        if self.check_profile is not None:
+            self.check_profile.flush()
+        self.cursor = to_block
+        CHAIN_LAG.set(head - to_block, tenant=self.name)
+        return len(queue)
+    
+    def heavy_hitters(self, limit: int = 10) -> List[Dict]:
+        """Agentes que mais submeteram attestations na janela atual"""
+        return self.admission.heavy_hitters(limit)
+    
+    def listen_for_attestations(
+        self,
+        poll_interval: int = 10,
+        report_every: int = 30,
+        profiler: Optional[Profiler] = None
+    ):
         """
         Escuta eventos de AttestationSubmitted e verifica automaticamente
         
         Args:
             poll_interval: Intervalo de polling em segundos
+            report_every: A cada quantos polls registrar os heavy hitters
+            profiler: Profiling sob demanda (--profile, SIGUSR1/SIGUSR2)
         """
         logger.info(f"\n{'='*60}")
         logger.info(f"ðŸ‘‚ Escutando novos attestations...")
         logger.info(f"   Intervalo de polling: {poll_interval}s")
         logger.info(f"{'='*60}\n")
         
-        # Criar filtro para eventos
-        event_filter = self.contract.events.AttestationSubmitted.create_filter(
-            from_block='latest'
-        )
-        
-        processed_events = set()
-        
+        polls = 0
         while True:
             try:
-                # Buscar novos eventos
-                new_events = event_filter.get_new_entries()
-                
-                for event in new_events:
-                    attestation_id = event['args']['attestationId'].hex()
-                    
-                    # Evitar processar duplicados
-                    if attestation_id in processed_events:
-                        continue
-                    
-                    processed_events.add(attestation_id)
-                    
-                    agent = event['args']['agent']
-                    category = event['args']['category']
-                    timestamp = event['args']['timestamp']
-                    
-                    logger.info(f"\n{'ðŸ”” '*20}")
-                    logger.info(f"ðŸ”” NOVA ATTESTATION DETECTADA!")
-                    logger.info(f"{'ðŸ”” '*20}")
-                    logger.info(f"   ID: {attestation_id}")
-                    logger.info(f"   Agent: {agent}")
-                    logger.info(f"   Category: {category}")
-                    logger.info(f"   Timestamp: {timestamp}")
-                    
-                    # IMPORTANTE: Aqui vocÃª buscaria o reasoning do storage off-chain
-                    # Por enquanto, vamos simular um reasoning de exemplo
-                    logger.info(f"\n   â³ Buscando reasoning do storage off-chain...")
-                    
-                    # Em produÃ§Ã£o, vocÃª faria:
-                    # reasoning = fetch_from_ipfs(attestation_id)
-                    # ou
-                    # reasoning = fetch_from_api(attestation_id)
-                    
-                    # Para demonstraÃ§Ã£o, vamos usar um exemplo
-                    example_reasoning = {
-                        "input": "Generate legal contract",
-                        "reasoning_steps": [
-                            {
-                                "step_number": 1,
-                                "description": "Identified contract type",
-                                "rationale": "User requested legal contract"
-                            },
-                            {
-                                "step_number": 2,
-                                "description": "Applied legal framework",
-                                "rationale": "Used Brazilian Civil Code"
-                            }
-                        ],
-                        "conclusion": "Contract generated successfully",
-                        "confidence": 0.92
-                    }
-                    
-                    logger.info(f"   ðŸ“„ Reasoning obtido ({len(json.dumps(example_reasoning))} bytes)")
-                    
-                    # Verificar
-                    logger.info(f"\n   ðŸ” Executando verificaÃ§Ã£o Tier 1...")
-                    passed, score, reason = self.verify_reasoning(example_reasoning)
-                    
-                    # Submeter resultado
-                    if passed or not passed:  # Sempre submete (mesmo se falhou)
-                        tx_hash = self.submit_verification(attestation_id, passed, score)
-                        
-                        if tx_hash:
-                            logger.info(f"\n{'='*60}")
-                            logger.info(f"âœ… VERIFICAÃ‡ÃƒO COMPLETA")
-                            logger.info(f"   Resultado: {'APROVADO' if passed else 'REJEITADO'}")
-                            logger.info(f"   Score: {score}/100")
-                            logger.info(f"   TX: {tx_hash[:16]}...")
-                            logger.info(f"{'='*60}\n")
+                if profiler is not None:
+                    profiler.call(self.poll_once)
+                else:
+                    self.poll_once()
+                polls += 1
+                if polls % report_every == 0:
+                    limited = [h for h in self.heavy_hitters() if h["limited"]]
+                    if limited:
+                        logger.info(f"ðŸš¦ Heavy hitters limitados: {limited}")
+                    sampler = sampling_filter()
+                    if sampler is not None and sampler.dropped:
+                        logger.info(f"ðŸ“‰ Logs de alto volume omitidos pela amostragem: {sampler.dropped}")
                 
                 # Aguardar prÃ³ximo poll
                 time.sleep(poll_interval)
                 
             except KeyboardInterrupt:
                 logger.info("\n\nâš ï¸  Verificador interrompido pelo usuÃ¡rio")
+                self.close()
+                self.result_log.close()
+                if self.check_profile is not None:
+                    self.check_profile.close()
                 break
             except Exception as e:
                 logger.error(f"âŒ Erro no loop de escuta: {e}")
                 time.sleep(poll_interval)
 
 
+def matic_to_wei(value: Optional[float]) -> Optional[int]:
+    """Converte MATIC para wei sem importar o web3"""
+    return int(Decimal(str(value)) * 10**18) if value is not None else None
+
+
+def build_admission(args) -> AdmissionController:
+    """Controle de admissÃ£o por agente a partir das opÃ§Ãµes de linha de comando"""
+    return AdmissionController(
+        heavy_share=args.heavy_hitter_share,
+        rate=args.agent_rate,
+        burst=args.agent_burst,
+        decay_interval=args.admission_window
+    )
+
+
+def build_check_profile(args) -> Optional[CheckProfile]:
+    """Modo instrumentado por check (--profile-checks), compartilhado pelos tenants"""
+    if not args.profile_checks:
+        return None
+    os.makedirs(os.path.dirname(args.profile_checks) or '.', exist_ok=True)
+    return CheckProfile(args.profile_checks, sample_every=args.profile_checks_sample)
+
+
+def build_tracer(args) -> Tracer:
+    """Tracing por attestation (--trace-file ou ANNA_TRACE_FILE), compartilhado pelos tenants"""
+    if args.trace_file:
+        return Tracer("verifier", JsonlExporter(args.trace_file))
+    return Tracer.from_env("verifier")
+
+
+def build_rpc_options(args) -> Dict:
+    """OpÃ§Ãµes do provider multi-RPC (valem quando o RPC lista vÃ¡rios endpoints)"""
+    return {"hedge": args.rpc_hedge, "broadcast": args.rpc_broadcast}
+
+
+def build_profiler(args) -> Profiler:
+    """Profiling sob demanda: sinais sempre instalados, janela inicial com --profile"""
+    profiler = Profiler(directory=args.profile_dir, mode=args.profile_mode, window=args.profile_window)
+    profiler.install_signal_handlers()
+    if args.profile:
+        profiler.start()
+    return profiler
+
+
+def run_multi_tenant(args, fee_policy: FeeBumpPolicy, rules: RulesProvider):
+    """Atende vÃ¡rios tenants (rede + contrato) em um Ãºnico processo"""
+    from tenants import MultiTenantVerifier, SharedResources, load_tenants
+    
+    try:
+        tenant_configs = load_tenants(args.tenants)
+    except (OSError, ValueError) as e:
+        logger.error(f"âŒ Erro ao carregar tenants de {args.tenants}: {e}")
+        return
+    
+    shared = SharedResources(
+        rules=rules, max_workers=max(args.workers, len(tenant_configs)), rpc_options=build_rpc_options(args)
+    )
+    check_profile = build_check_profile(args)
+    tracer = build_tracer(args)
+    verifiers = []
+    try:
+        for tenant in tenant_configs:
+            verifiers.append(ANNAVerifier(
+                rpc_url=tenant.rpc_url,
+                private_key=tenant.private_key,
+                attestation_contract_address=tenant.contract,
+                attestation_abi=shared.abi_for(tenant.abi_path),
+                dry_run=args.dry_run,
+                fee_policy=fee_policy,
+                name=tenant.name,
+                w3=shared.web3_for(tenant.rpc_url),
+                rules=shared.rules,
+                result_cache=shared.result_cache,
+                result_log=shared.result_log,
+                explorer_url=tenant.explorer_url or "https://amoy.polygonscan.com",
+                start_block=tenant.start_block,
+                admission=build_admission(args),
+                fast_start=args.fast_start,
+                check_profile=check_profile,
+                tracer=tracer,
+                rpc_cache=not args.no_rpc_cache
+            ))
+    except Exception as e:
+        logger.error(f"âŒ Erro fatal: {e}")
+        for verifier in verifiers:
+            verifier.close()
+        shared.shutdown()
+        return
+    
+    MultiTenantVerifier(verifiers, shared, profiler=build_profiler(args)).run(poll_interval=args.poll_interval)
+
+
 def main():
     """FunÃ§Ã£o principal"""
+    from dotenv import load_dotenv
+    
+    # Carregar variÃ¡veis de ambiente
+    load_dotenv()
     
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='ANNA Protocol Tier 1 Verifier')
     parser.add_argument('--dry-run', action='store_true', help='Run in simulation mode (no real transactions)')
     parser.add_argument('--poll-interval', type=int, default=10, help='Polling interval in seconds (default: 10)')
+    parser.add_argument('--fee-bump-schedule', default='30,60,90',
+                        help='Seconds after first broadcast at which a stuck tx is replaced (default: 30,60,90)')
+    parser.add_argument('--fee-bump-percent', type=int, default=25, help='Fee increase per replacement in %% (default: 25)')
+    parser.add_argument('--max-fee-gwei', type=float, default=500.0, help='Cap for maxFeePerGas in gwei (default: 500)')
+    parser.add_argument('--fee-urgency', default='medium', choices=['low', 'medium', 'high'],
+                        help='Priority fee percentile from recent blocks: p10, p50 or p90 (default: medium)')
+    parser.add_argument('--max-priority-fee-gwei', type=float, default=None,
+                        help='Cap for maxPriorityFeePerGas in gwei (default: only bounded by maxFeePerGas)')
+    parser.add_argument('--max-tx-cost', type=float, default=None, help='Cap for gas * maxFeePerGas per tx in MATIC')
+    parser.add_argument('--max-total-spend', type=float, default=None, help='Total gas budget for this process in MATIC')
+    parser.add_argument('--tx-timeout', type=int, default=180, help='Seconds to wait for inclusion (default: 180)')
+    parser.add_argument('--tenants', default=None,
+                        help='JSON file listing (network, contract) tenants to serve from this process')
+    parser.add_argument('--workers', type=int, default=8, help='Shared worker pool size in multi-tenant mode (default: 8)')
+    parser.add_argument('--rules', default=os.getenv('VERIFIER_RULES_PATH', 'rules.json'),
+                        help='Versioned rules file, hot-reloaded on change (default: rules.json)')
+    parser.add_argument('--rules-reload-interval', type=float, default=5.0,
+                        help='Seconds between rules file checks, 0 disables hot reload (default: 5)')
+    parser.add_argument('--agent-rate', type=float, default=0.2,
+                        help='Attestations/s admitted per heavy-hitter agent; excess is deferred (default: 0.2)')
+    parser.add_argument('--agent-burst', type=float, default=5,
+                        help='Burst admitted per heavy-hitter agent (default: 5)')
+    parser.add_argument('--heavy-hitter-share', type=float, default=0.2,
+                        help='Share of recent traffic that makes an agent a heavy hitter (default: 0.2)')
+    parser.add_argument('--admission-window', type=float, default=300,
+                        help='Seconds between halvings of the per-agent counters (default: 300)')
+    parser.add_argument('--fast-start', action='store_true',
+                        help='Connect and run startup RPC checks in the background; load rules from the precompiled cache')
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help='Log level (default: INFO)')
+    parser.add_argument('--log-sampling', default='',
+                        help='Keep 1 in N high-volume per-attestation records per level, e.g. INFO=10,WARNING=5')
+    parser.add_argument('--rules-cache', default='.rules_cache',
+                        help='Directory for precompiled rules used with --fast-start (default: .rules_cache)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Serve Prometheus metrics on this port at /metrics (default: disabled)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Capture a CPU and memory profiling window at startup (SIGUSR1/SIGUSR2 trigger more)')
+    parser.add_argument('--profile-mode', default='sampling', choices=PROFILE_MODES,
+                        help='CPU profiler: sampled collapsed stacks or cProfile (default: sampling)')
+    parser.add_argument('--profile-window', type=float, default=60,
+                        help='Seconds each profiling window lasts (default: 60)')
+    parser.add_argument('--profile-dir', default='logs/profiles',
+                        help='Directory for profiling output (default: logs/profiles)')
+    parser.add_argument('--trace-file', default=None, metavar='PATH',
+                        help='Write per-attestation trace spans to this JSONL file (default: $ANNA_TRACE_FILE)')
+    parser.add_argument('--profile-checks', default=None, metavar='PATH',
+                        help='Record ns timings and allocations per Tier 1 check to this JSONL file')
+    parser.add_argument('--profile-checks-sample', type=int, default=1, metavar='N',
+                        help='Instrument 1 in N verifications with --profile-checks (default: 1)')
+    parser.add_argument('--rpc-hedge', action='store_true',
+                        help='With several comma-separated RPC URLs, resend slow reads to the next fastest endpoint')
+    parser.add_argument('--rpc-broadcast', type=int, default=3, metavar='N',
+                        help='With several RPC URLs, send each signed transaction to the N best endpoints (default: 3)')
+    parser.add_argument('--no-rpc-cache', action='store_true',
+                        help='Disable the JSON-RPC response cache (chain ID, finalized blocks/receipts, terminal attestations)')
     args = parser.parse_args()
     
+    configure_logging(level=getattr(logging, args.log_level), sampling=parse_sampling(args.log_sampling))
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+    
+    fee_policy = FeeBumpPolicy(
+        schedule=[int(s) for s in args.fee_bump_schedule.split(',') if s.strip()],
+        bump_percent=args.fee_bump_percent,
+        max_fee_per_gas_gwei=args.max_fee_gwei,
+        max_priority_fee_gwei=args.max_priority_fee_gwei,
+        urgency=args.fee_urgency,
+        max_tx_cost_wei=matic_to_wei(args.max_tx_cost),
+        max_total_spend_wei=matic_to_wei(args.max_total_spend),
+        timeout=args.tx_timeout
+    )
+    
+    # Regras versionadas (recarregadas a quente sem reiniciar o verificador)
+    rules_cache = args.rules_cache if args.fast_start else None
+    try:
+        rules = RulesProvider(path=args.rules, cache_dir=rules_cache) if os.path.exists(args.rules) else RulesProvider()
+    except ValueError as e:
+        logger.error(f"âŒ Erro: arquivo de regras invÃ¡lido {args.rules}: {e}")
+        return
+    if args.rules_reload_interval > 0:
+        rules.start_watching(args.rules_reload_interval)
+    
+    if args.tenants:
+        run_multi_tenant(args, fee_policy, rules)
+        return
+    
     # Carregar configuraÃ§Ãµes do .env
     rpc_url = os.getenv('POLYGON_AMOY_RPC')
     private_key = os.getenv('VERIFIER_PRIVATE_KEY')
@@ -480,7 +889,7 @@ def main():
     if not all([rpc_url, private_key, contract_address]):
         logger.error("âŒ Erro: VariÃ¡veis de ambiente faltando!")
         logger.error("   Certifique-se de ter no .env:")
-        logger.error("   - POLYGON_AMOY_RPC")
+        logger.error("   - POLYGON_AMOY_RPC (uma URL ou vÃ¡rias separadas por vÃ­rgula)")
         logger.error("   - VERIFIER_PRIVATE_KEY")
         logger.error("   - ATTESTATION_CONTRACT_ADDRESS")
         return
@@ -504,11 +913,19 @@ def main():
             private_key=private_key,
             attestation_contract_address=contract_address,
             attestation_abi=attestation_abi,
-            dry_run=args.dry_run
+            dry_run=args.dry_run,
+            fee_policy=fee_policy,
+            rules=rules,
+            admission=build_admission(args),
+            fast_start=args.fast_start,
+            check_profile=build_check_profile(args),
+            tracer=build_tracer(args),
+            rpc_options=build_rpc_options(args),
+            rpc_cache=not args.no_rpc_cache
         )
         
         # Modo: escutar eventos
-        verifier.listen_for_attestations(poll_interval=args.poll_interval)
+        verifier.listen_for_attestations(poll_interval=args.poll_interval, profiler=build_profiler(args))
         
     except Exception as e:
         logger.error(f"âŒ Erro fatal: {e}")